@@ -1,13 +1,21 @@
 from django.contrib import admin
-from .models import Completion
+from config.pagination import EstimatedCountPaginator
+from .models import Completion, CompletionArchive
 
 
 @admin.register(Completion)
 class CompletionAdmin(admin.ModelAdmin):
     list_display = ['task', 'completed_date', 'completed_time', 'created_at']
-    list_filter = ['completed_date', 'created_at']
+    list_select_related = ['task']
     search_fields = ['task__title', 'note']
     readonly_fields = ['completed_time', 'created_at']
+    autocomplete_fields = ['task']
+    # 날짜 필터 대신 연/월/일 탐색 (completion_date_idx 사용)
+    date_hierarchy = 'completed_date'
+
+    # 대용량 테이블에서 COUNT(*) 전체 스캔 방지
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ('완료 정보', {
@@ -17,3 +25,13 @@ class CompletionAdmin(admin.ModelAdmin):
             'fields': ('created_at',)
         }),
     )
+
+
+@admin.register(CompletionArchive)
+class CompletionArchiveAdmin(admin.ModelAdmin):
+    list_display = ['task', 'year', 'completed_count']
+    list_filter = ['year']
+    list_select_related = ['task']
+    search_fields = ['task__title']
+    autocomplete_fields = ['task']
+    readonly_fields = ['days']
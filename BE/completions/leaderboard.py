@@ -0,0 +1,243 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+METRICS = ('current', 'longest')
+
+
+class _Node:
+    __slots__ = ('key', 'forward', 'span')
+
+    def __init__(self, key, level):
+        self.key = key
+        self.forward = [None] * level
+        # span[i]: forward[i] 까지 건너뛰는 원소 수 (순위 계산용)
+        self.span = [0] * level
+
+
+class RankedSet:
+    """점수 내림차순 순위 집합 (구간 길이를 기록한 skip list, Redis sorted set 과 같은 구조)
+
+    원소는 (-점수, member) 순으로 정렬되어 같은 점수면 member 가 작은 쪽이 앞선다.
+    add/discard/rank 는 O(log n), 상위 N 개는 O(log n + N).
+    """
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1
+        self._length = 0
+        self._scores = {}
+        self._random = random.Random()
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, member):
+        return member in self._scores
+
+    def score(self, member):
+        return self._scores.get(member)
+
+    def add(self, member, score):
+        """member 의 점수를 추가하거나 바꾼다"""
+        old = self._scores.get(member)
+        if old == score:
+            return
+        if old is not None:
+            self._delete((-old, member))
+        self._insert((-score, member))
+        self._scores[member] = score
+
+    def discard(self, member):
+        old = self._scores.pop(member, None)
+        if old is not None:
+            self._delete((-old, member))
+
+    def rank(self, member):
+        """1부터 시작하는 순위 (같은 점수는 같은 순위), 없으면 None"""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        # (-score,) 는 같은 점수의 어떤 (-score, member) 보다 앞선다
+        return self._count_before((-score,)) + 1
+
+    def top(self, n):
+        """상위 n 개의 (순위, member, 점수)"""
+        result = []
+        node = self._head.forward[0]
+        rank = 0
+        while node is not None and len(result) < n:
+            score = -node.key[0]
+            if not result or result[-1][2] != score:
+                rank = len(result) + 1
+            result.append((rank, node.key[1], score))
+            node = node.forward[0]
+        return result
+
+    def _random_level(self):
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < self.P:
+            level += 1
+        return level
+
+    def _count_before(self, key):
+        """key 보다 앞선 원소 수"""
+        count = 0
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.forward[i] is not None and node.forward[i].key < key:
+                count += node.span[i]
+                node = node.forward[i]
+        return count
+
+    def _insert(self, key):
+        update = [None] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            rank[i] = 0 if i == self._level - 1 else rank[i + 1]
+            while node.forward[i] is not None and node.forward[i].key < key:
+                rank[i] += node.span[i]
+                node = node.forward[i]
+            update[i] = node
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                rank[i] = 0
+                update[i] = self._head
+                self._head.span[i] = self._length
+            self._level = level
+
+        new = _Node(key, level)
+        for i in range(level):
+            new.forward[i] = update[i].forward[i]
+            update[i].forward[i] = new
+            new.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self._level):
+            update[i].span[i] += 1
+        self._length += 1
+
+    def _delete(self, key):
+        update = [None] * self.MAX_LEVEL
+        node = self._head
+        for i in range(self._level - 1, -1, -1):
+            while node.forward[i] is not None and node.forward[i].key < key:
+                node = node.forward[i]
+            update[i] = node
+
+        target = node.forward[0]
+        if target is None or target.key != key:
+            return
+        for i in range(self._level):
+            if update[i].forward[i] is target:
+                update[i].span[i] += target.span[i] - 1
+                update[i].forward[i] = target.forward[i]
+            else:
+                update[i].span[i] -= 1
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+        self._length -= 1
+
+
+class LocalLeaderboardStore:
+    """프로세스 메모리 순위표
+
+    (task_type, 'current'|'longest') 마다 RankedSet 하나에 참여 사용자의 최고 연속 일수를 둔다.
+    점수가 0 인 사용자는 순위에 넣지 않는다. 다른 프로세스의 변경은
+    LEADERBOARD_REFRESH_SECONDS 마다 DB(StreakStat)에서 다시 읽어 반영한다.
+    """
+
+    now = staticmethod(time.monotonic)
+
+    def __init__(self):
+        self._boards = {}
+        self._members = set()
+        self._lock = threading.Lock()
+        self.loaded_at = None
+
+    def is_stale(self):
+        return self.loaded_at is None or self.now() - self.loaded_at > settings.LEADERBOARD_REFRESH_SECONDS
+
+    def load(self, members, rows):
+        """전체 교체. rows: (user_id, task_type, current, longest) - 참여 사용자의 task_type 별 최고 기록"""
+        boards = {}
+        for user_id, task_type, current, longest in rows:
+            if user_id not in members:
+                continue
+            for metric, score in zip(METRICS, (current, longest)):
+                if score > 0:
+                    boards.setdefault((task_type, metric), RankedSet()).add(user_id, score)
+        with self._lock:
+            self._boards = boards
+            self._members = set(members)
+            self.loaded_at = self.now()
+
+    def is_member(self, user_id):
+        return user_id in self._members
+
+    def set_user(self, user_id, scores):
+        """사용자의 점수를 교체. scores: {task_type: (current, longest)}"""
+        with self._lock:
+            self._members.add(user_id)
+            for (task_type, metric), board in self._boards.items():
+                if task_type not in scores:
+                    board.discard(user_id)
+            for task_type, values in scores.items():
+                for metric, score in zip(METRICS, values):
+                    board = self._boards.setdefault((task_type, metric), RankedSet())
+                    if score > 0:
+                        board.add(user_id, score)
+                    else:
+                        board.discard(user_id)
+
+    def remove_user(self, user_id):
+        with self._lock:
+            self._members.discard(user_id)
+            for board in self._boards.values():
+                board.discard(user_id)
+
+    def top(self, task_type, metric, n):
+        """상위 n 명의 (순위, user_id, 점수)와 순위에 있는 전체 사용자 수"""
+        with self._lock:
+            board = self._boards.get((task_type, metric))
+            if board is None:
+                return [], 0
+            return board.top(n), len(board)
+
+    def rank(self, task_type, metric, user_id):
+        """(순위, 점수), 순위에 없으면 None"""
+        with self._lock:
+            board = self._boards.get((task_type, metric))
+            if board is None or user_id not in board:
+                return None
+            return board.rank(user_id), board.score(user_id)
+
+    def clear(self):
+        with self._lock:
+            self._boards = {}
+            self._members = set()
+            self.loaded_at = None
+
+
+_store = None
+
+
+def get_leaderboard_store():
+    """LEADERBOARD_STORE 설정에 지정된 저장소 (프로세스당 1개, 내용은 LeaderboardService 가 채움)"""
+    global _store
+    if _store is None:
+        _store = import_string(settings.LEADERBOARD_STORE)()
+    return _store
+
+
+def reset_leaderboard_store():
+    """저장소를 버리고 다음 조회 때 DB 에서 새로 읽음 (설정 변경, 테스트용)"""
+    global _store
+    _store = None
@@ -0,0 +1,35 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from completions.services import CompletionArchiveService
+
+
+class Command(BaseCommand):
+    """오래된 완료 기록을 연도별 보관 테이블로 이동
+
+    청크마다 커밋하므로 중단되면 다시 실행해서 이어서 처리하면 된다.
+    """
+    help = 'COMPLETION_ARCHIVE_AFTER_DAYS 보다 오래된 완료 기록 보관'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='트랜잭션당 옮길 완료 기록 수')
+        parser.add_argument('--date', type=date.fromisoformat, help='기준 날짜 (YYYY-MM-DD, 기본: 오늘)')
+
+    def handle(self, *args, **options):
+        cutoff = CompletionArchiveService.cutoff(options['date'])
+        self.stdout.write(f'{cutoff} 이전 완료 기록 보관')
+
+        stats = CompletionArchiveService.archive_old(
+            today=options['date'],
+            chunk_size=options['chunk_size'],
+            progress=self._report if options['verbosity'] > 1 else None
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['moved']}건 이동 ({stats['chunks']}개 청크, {stats['seconds']:.2f}초)"
+        ))
+
+    def _report(self, stats):
+        rate = stats['moved'] / stats['seconds'] if stats['seconds'] else 0.0
+        self.stdout.write(f"  {stats['chunks']}번째 청크: 누적 {stats['moved']}건, {rate:.0f}건/초")
@@ -0,0 +1,82 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from config.middleware import ENCODERS, compress
+from completions.models import Completion
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    """대표 엔드포인트 응답에 대해 압축 방식/레벨별 절감 바이트와 CPU 시간 측정
+
+    측정용 데이터는 트랜잭션 안에서 만들고 끝나면 롤백합니다.
+    """
+    help = '응답 압축 벤치마크 (절감 바이트 vs CPU 시간)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=200, help='생성할 할 일 수')
+        parser.add_argument('--days', type=int, default=365, help='할 일당 완료 기록 일수')
+        parser.add_argument('--repeat', type=int, default=20, help='압축 반복 횟수')
+
+    def handle(self, *args, **options):
+        with override_settings(ALLOWED_HOSTS=['*']), transaction.atomic():
+            bodies = self._collect_bodies(options['tasks'], options['days'])
+            self._report(bodies, options['repeat'])
+            transaction.set_rollback(True)
+
+    def _collect_bodies(self, task_count, days):
+        """벤치마크 데이터 생성 후 대표 엔드포인트의 비압축 응답 수집"""
+        user = User.objects.create(username='__bench_compression__')
+        tasks = Task.objects.bulk_create([
+            Task(user=user, title=f'습관 {i}', description='벤치마크용 할 일', task_type='daily')
+            for i in range(task_count)
+        ])
+        today = date.today()
+        Completion.objects.bulk_create([
+            Completion(task=task, completed_date=today - timedelta(days=d), note='완료')
+            for task in tasks
+            for d in range(days)
+        ], batch_size=5000)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        task_id = tasks[0].id
+        endpoints = [
+            '/api/tasks/',
+            f'/api/completions/history/?task_id={task_id}&days=30',
+            f'/api/completions/history/?task_id={task_id}&days={days}',
+            f'/api/completions/?task_id={task_id}',
+            '/api/completions/',
+        ]
+
+        bodies = []
+        for url in endpoints:
+            response = client.get(url, HTTP_ACCEPT_ENCODING='identity')
+            bodies.append((url, response.content))
+        return bodies
+
+    def _report(self, bodies, repeat):
+        levels = {'gzip': [1, 6, 9], 'br': [1, 5, 11]}
+
+        for url, content in bodies:
+            self.stdout.write(f'\n{url}  ({len(content):,} bytes)')
+            self.stdout.write(f'  {"encoding":<10}{"level":>6}{"size":>12}{"saved":>8}{"cpu ms":>10}{"MB/s":>10}')
+            for encoding in ENCODERS:
+                for level in levels[encoding]:
+                    started = time.process_time()
+                    for _ in range(repeat):
+                        compressed = compress(content, encoding, level)
+                    elapsed = (time.process_time() - started) / repeat
+
+                    saved = 1 - len(compressed) / len(content) if content else 0
+                    throughput = len(content) / elapsed / 1_000_000 if elapsed else float('inf')
+                    self.stdout.write(
+                        f'  {encoding:<10}{level:>6}{len(compressed):>12,}{saved:>8.1%}'
+                        f'{elapsed * 1000:>10.3f}{throughput:>10.1f}'
+                    )
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F, OuterRef, Subquery
+
+from completions.models import Completion
+from config.sharding import each_database
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    """Completion.user 가 task.user 와 같은지 확인
+
+    관리자 페이지 등에서 할 일의 사용자를 바꾸면 비정규화된 Completion.user 가 어긋난다.
+    --fix 를 주면 어긋난 행을 청크 단위로 고친다.
+    """
+    help = 'Completion.user 와 task.user 일치 여부 확인 (--fix 로 수정)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='어긋난 행을 task.user 로 수정')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='트랜잭션당 수정할 행 수')
+
+    def handle(self, *args, **options):
+        for alias in each_database():
+            self._check(alias, options)
+
+    def _check(self, alias, options):
+        mismatched = Completion.objects.exclude(user_id=F('task__user_id'))
+        count = mismatched.count()
+
+        if not count:
+            self.stdout.write(self.style.SUCCESS(f'{alias}: 모든 완료 기록의 사용자가 할 일의 사용자와 일치합니다.'))
+            return
+
+        self.stdout.write(self.style.WARNING(f'{alias}: 사용자가 어긋난 완료 기록 {count}건'))
+        if options['verbosity'] > 1:
+            for completion_id, task_id, user_id, task_user_id in mismatched.values_list(
+                'id', 'task_id', 'user_id', 'task__user_id'
+            )[:20]:
+                self.stdout.write(f'  completion={completion_id} task={task_id} user={user_id} task.user={task_user_id}')
+
+        if not options['fix']:
+            self.stdout.write('--fix 로 수정할 수 있습니다.')
+            return
+
+        owner = Subquery(Task.objects.filter(id=OuterRef('task_id')).values('user_id')[:1])
+        fixed = 0
+        while True:
+            ids = list(mismatched.order_by().values_list('id', flat=True)[:options['chunk_size']])
+            if not ids:
+                break
+            fixed += Completion.objects.filter(id__in=ids).update(user_id=owner)
+
+        self.stdout.write(self.style.SUCCESS(f'{alias}: {fixed}건 수정'))
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from completions.services import LeaderboardService
+
+
+class Command(BaseCommand):
+    """완료 기록에서 모든 할 일의 연속 달성 기록(StreakStat)을 다시 만듦
+
+    DB 마다 완료 기록을 (task_id, completed_date) 인덱스 순서로 한 번만 읽는다.
+    처음 배포할 때(마이그레이션 후)나 기록이 어긋났을 때 실행한다.
+    보관 테이블로 옮긴 오래된 완료 기록은 세지 않는다.
+    """
+    help = '연속 달성 순위표 재계산'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help='기준 날짜 (YYYY-MM-DD, 기본: 오늘)')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='한 번에 읽고 쓸 행 수')
+
+    def handle(self, *args, **options):
+        counts = LeaderboardService.rebuild(options['date'], options['chunk_size'])
+        for alias, count in counts.items():
+            self.stdout.write(f'  {alias}: 할 일 {count}개')
+        self.stdout.write(self.style.SUCCESS('연속 달성 기록을 다시 계산했습니다.'))
@@ -0,0 +1,21 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from completions.services import LeaderboardService
+
+
+class Command(BaseCommand):
+    """어제까지 완료하지 않아 끊긴 연속 기록을 0 으로 만들고 순위표를 다시 읽게 함
+
+    날짜가 바뀐 직후 하루 1번 실행한다 (cron 등). 다른 프로세스의 순위표는
+    LEADERBOARD_REFRESH_SECONDS 안에 DB 에서 다시 읽어 반영된다.
+    """
+    help = '연속 달성 기록 날짜 변경 처리'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help='기준 날짜 (YYYY-MM-DD, 기본: 오늘)')
+
+    def handle(self, *args, **options):
+        reset = LeaderboardService.rollover(options['date'])
+        self.stdout.write(self.style.SUCCESS(f'끊긴 연속 기록 {reset}건 초기화'))
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('completions', '0001_initial'),
+        ('tasks', '0003_task_expiry_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompletionArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='연도')),
+                ('days', models.BinaryField(max_length=46, verbose_name='완료 날짜 비트맵')),
+                ('completed_count', models.PositiveSmallIntegerField(default=0, verbose_name='완료 횟수')),
+                ('notes', models.JSONField(blank=True, default=dict, verbose_name='메모')),
+            ],
+            options={
+                'verbose_name': '완료 기록 보관',
+                'verbose_name_plural': '완료 기록 보관 목록',
+                'ordering': ['-year'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='completion',
+            index=models.Index(fields=['completed_date'], name='completion_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='completionarchive',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completion_archives', to='tasks.task', verbose_name='할 일'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='completionarchive',
+            unique_together={('task', 'year')},
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+from search import sql
+
+BACKFILL_CHUNK_SIZE = 10000
+
+
+def backfill_user(apps, schema_editor):
+    """기존 완료 기록의 user 를 task.user 로 채운다 (id 범위 청크 단위)"""
+    Completion = apps.get_model('completions', 'Completion')
+    Task = apps.get_model('tasks', 'Task')
+    db = schema_editor.connection.alias
+
+    owner = Subquery(Task.objects.using(db).filter(id=OuterRef('task_id')).values('user_id')[:1])
+    last_id = Completion.objects.using(db).order_by('-id').values_list('id', flat=True).first() or 0
+    for start in range(0, last_id + 1, BACKFILL_CHUNK_SIZE):
+        Completion.objects.using(db).filter(
+            id__gte=start,
+            id__lt=start + BACKFILL_CHUNK_SIZE,
+            user__isnull=True
+        ).update(user_id=owner)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('completions', '0002_completion_archive'),
+        ('search', '0001_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # SQLite 는 NOT NULL 변경(되돌릴 때는 컬럼 삭제) 시 테이블을 재생성하므로 검색 동기화 트리거를 내린 상태로 실행
+        sql.WithoutSearchTriggers(
+            # 1. nullable 로 추가 (테이블 재생성 없이 컬럼만 추가)
+            migrations.AddField(
+                model_name='completion',
+                name='user',
+                field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='completions', to=settings.AUTH_USER_MODEL, verbose_name='사용자'),
+            ),
+            # 2. 기존 데이터 채우기
+            migrations.RunPython(backfill_user, migrations.RunPython.noop),
+            # 3. NOT NULL 로 변경
+            migrations.AlterField(
+                model_name='completion',
+                name='user',
+                field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='completions', to=settings.AUTH_USER_MODEL, verbose_name='사용자'),
+            ),
+        ),
+        # 4. 사용자별 조회 인덱스
+        migrations.AddIndex(
+            model_name='completion',
+            index=models.Index(fields=['user', 'completed_date'], name='completion_user_date_idx'),
+        ),
+    ]
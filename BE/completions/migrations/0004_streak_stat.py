@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('completions', '0003_completion_user'),
+        ('tasks', '0003_task_expiry_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StreakStat',
+            fields=[
+                ('task', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='streak_stat', serialize=False, to='tasks.task', verbose_name='할 일')),
+                ('current', models.PositiveIntegerField(default=0, verbose_name='현재 연속 일수')),
+                ('longest', models.PositiveIntegerField(default=0, verbose_name='최장 연속 일수')),
+                ('last_date', models.DateField(blank=True, null=True, verbose_name='마지막 완료 날짜')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='streak_stats', to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+            ],
+            options={
+                'verbose_name': '연속 달성 기록',
+                'verbose_name_plural': '연속 달성 기록 목록',
+                'indexes': [models.Index(condition=models.Q(('current__gt', 0)), fields=['last_date'], name='streak_rollover_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:40
+
+import completions.models
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import ExtractHour
+
+from search import sql
+
+BACKFILL_CHUNK_SIZE = 10000
+
+
+def backfill_hour(apps, schema_editor):
+    """기존 완료 기록의 completed_hour 를 completed_time 으로 채운다 (id 범위 청크 단위)"""
+    Completion = apps.get_model('completions', 'Completion')
+    db = schema_editor.connection.alias
+
+    last_id = Completion.objects.using(db).order_by('-id').values_list('id', flat=True).first() or 0
+    for start in range(0, last_id + 1, BACKFILL_CHUNK_SIZE):
+        Completion.objects.using(db).filter(
+            id__gte=start,
+            id__lt=start + BACKFILL_CHUNK_SIZE
+        ).update(completed_hour=ExtractHour('completed_time'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('completions', '0004_streak_stat'),
+        ('search', '0001_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # SQLite 는 기본값이 있는 NOT NULL 컬럼 추가 시 테이블을 재생성하므로 검색 동기화 트리거를 내린 상태로 실행
+        sql.WithoutSearchTriggers(
+            migrations.AddField(
+                model_name='completion',
+                name='completed_hour',
+                field=completions.models.HourField(default=0, source='completed_time', verbose_name='완료 시'),
+                preserve_default=False,
+            ),
+        ),
+        migrations.RunPython(backfill_hour, migrations.RunPython.noop),
+        # 사용자별 (날짜, 시) 집계를 테이블을 읽지 않고 처리하는 커버링 인덱스로 교체
+        migrations.RemoveIndex(
+            model_name='completion',
+            name='completion_user_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='completion',
+            index=models.Index(fields=['user', 'completed_date', 'completed_hour', 'task'], name='completion_user_date_hour_idx'),
+        ),
+    ]
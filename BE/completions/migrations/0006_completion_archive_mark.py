@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:15
+
+from datetime import date, timedelta
+
+from django.db import migrations, models
+
+
+def backfill_mark(apps, schema_editor):
+    """이미 보관한 기록이 있으면 가장 늦은 보관 날짜 다음 날을 기준일로 기록"""
+    alias = schema_editor.connection.alias
+    CompletionArchive = apps.get_model('completions', 'CompletionArchive')
+    CompletionArchiveMark = apps.get_model('completions', 'CompletionArchiveMark')
+
+    last_year = CompletionArchive.objects.using(alias).order_by('-year').values_list('year', flat=True).first()
+    if last_year is None:
+        return
+    last_bit = 0
+    for days in CompletionArchive.objects.using(alias).filter(year=last_year).values_list('days', flat=True):
+        bitmap = bytes(days or b'')
+        for bit in range(len(bitmap) * 8 - 1, last_bit - 1, -1):
+            if bitmap[bit // 8] & (1 << (bit % 8)):
+                last_bit = bit
+                break
+    CompletionArchiveMark.objects.using(alias).create(
+        id=1, archived_before=date(last_year, 1, 1) + timedelta(days=last_bit + 1)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('completions', '0005_completion_hour'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompletionArchiveMark',
+            fields=[
+                ('id', models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ('archived_before', models.DateField(help_text='이 날짜 이전 완료 기록은 보관 테이블에 있을 수 있음', verbose_name='보관 기준일')),
+            ],
+            options={
+                'verbose_name': '완료 기록 보관 기준일',
+                'verbose_name_plural': '완료 기록 보관 기준일',
+            },
+        ),
+        migrations.RunPython(backfill_mark, migrations.RunPython.noop),
+    ]
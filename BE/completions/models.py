@@ -1,27 +1,198 @@
+from datetime import date, timedelta
 from django.db import models
+from django.contrib.auth.models import User
+from config.sharding import ShardedQuerySet
 from tasks.models import Task
 
 
+class CompletionQuerySet(ShardedQuerySet):
+    """user 를 task.user 로 채워서 저장하는 QuerySet"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            if obj.user_id is None:
+                obj.user_id = obj.task.user_id
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class HourField(models.PositiveSmallIntegerField):
+    """source 시각 필드의 시(0 ~ 23)를 저장할 때 채우는 필드
+
+    SQLite 는 생성 컬럼(GeneratedField)이 들어간 인덱스를 커버링 인덱스로 쓰지 않으므로 일반 컬럼으로 둔다.
+    source 보다 뒤에 선언해야 auto_now_add 로 채워진 값을 읽는다 (save, bulk_create 모두 선언 순서로 pre_save).
+    """
+
+    def __init__(self, *args, source=None, **kwargs):
+        self.source = source
+        kwargs['editable'] = False
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        del kwargs['editable']
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.source)
+        setattr(model_instance, self.attname, None if value is None else value.hour)
+        return getattr(model_instance, self.attname)
+
+
 class Completion(models.Model):
     """할 일 완료 기록 모델"""
 
     # 관계
     task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='completions', verbose_name='할 일')
+    # task.user 비정규화 (사용자별 조회를 tasks_task JOIN 없이 (user, completed_date) 인덱스로 처리)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='completions', verbose_name='사용자')
 
     # 완료 정보
     completed_date = models.DateField(verbose_name='완료 날짜')
     completed_time = models.TimeField(auto_now_add=True, verbose_name='완료 시각')
+    # 완료 시각의 시 (0 ~ 23), 요일 x 시간대 분석을 인덱스만으로 집계하기 위한 비정규화
+    completed_hour = HourField(source='completed_time', verbose_name='완료 시')
     note = models.TextField(blank=True, verbose_name='메모')
 
     # 메타 정보
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
 
+    objects = CompletionQuerySet.as_manager()
+
     class Meta:
         verbose_name = '완료 기록'
         verbose_name_plural = '완료 기록 목록'
         ordering = ['-completed_date', '-completed_time']
         # 같은 할 일은 하루에 한 번만 완료 가능
         unique_together = ['task', 'completed_date']
+        indexes = [
+            # 오래된 기록 보관(CompletionArchiveService.archive_old) 대상 조회용
+            models.Index(fields=['completed_date'], name='completion_date_idx'),
+            # 사용자별 완료 기록 조회 + 분석(CompletionAnalyticsService) 집계를 테이블을 읽지 않고 처리하는 커버링 인덱스
+            models.Index(fields=['user', 'completed_date', 'completed_hour', 'task'], name='completion_user_date_hour_idx'),
+        ]
 
     def __str__(self):
         return f"{self.task.title} - {self.completed_date}"
+
+    def save(self, *args, **kwargs):
+        """user 는 항상 task.user 와 같게 저장"""
+        if self.user_id is None:
+            self.user_id = self.task.user_id
+        super().save(*args, **kwargs)
+
+
+class CompletionArchive(models.Model):
+    """연도별 완료 기록 보관 모델
+
+    오래된 Completion 을 할 일 x 연도당 1행으로 압축해 둔다.
+    days 는 1월 1일부터의 일수를 비트 위치로 쓰는 366비트 비트맵이고,
+    메모가 있던 날만 notes 에 {'YYYY-MM-DD': 메모} 로 남긴다.
+    """
+
+    BITMAP_SIZE = 46  # 366비트
+
+    # 관계
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='completion_archives', verbose_name='할 일')
+
+    # 보관 데이터
+    year = models.PositiveSmallIntegerField(verbose_name='연도')
+    days = models.BinaryField(max_length=BITMAP_SIZE, verbose_name='완료 날짜 비트맵')
+    completed_count = models.PositiveSmallIntegerField(default=0, verbose_name='완료 횟수')
+    notes = models.JSONField(default=dict, blank=True, verbose_name='메모')
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = '완료 기록 보관'
+        verbose_name_plural = '완료 기록 보관 목록'
+        ordering = ['-year']
+        unique_together = ['task', 'year']
+
+    def __str__(self):
+        return f"{self.task.title} - {self.year} ({self.completed_count}일)"
+
+    @staticmethod
+    def _bit(day):
+        return day.timetuple().tm_yday - 1
+
+    def _bitmap(self):
+        return bytearray(self.days) if self.days else bytearray(self.BITMAP_SIZE)
+
+    def has_day(self, day):
+        """해당 날짜 완료 여부"""
+        bit = self._bit(day)
+        return bool(self._bitmap()[bit // 8] & (1 << (bit % 8)))
+
+    def add_day(self, day, note=''):
+        """완료 날짜 추가 (이미 있으면 메모만 갱신)"""
+        bitmap = self._bitmap()
+        bit = self._bit(day)
+        if not bitmap[bit // 8] & (1 << (bit % 8)):
+            bitmap[bit // 8] |= 1 << (bit % 8)
+            self.completed_count += 1
+        self.days = bytes(bitmap)
+        if note:
+            self.notes[day.isoformat()] = note
+
+    def dates(self):
+        """완료 날짜 목록 (오름차순)"""
+        start = date(self.year, 1, 1)
+        bitmap = self._bitmap()
+        return [
+            start + timedelta(days=bit)
+            for bit in range(len(bitmap) * 8)
+            if bitmap[bit // 8] & (1 << (bit % 8)) and (start + timedelta(days=bit)).year == self.year
+        ]
+
+
+class CompletionArchiveMark(models.Model):
+    """DB 별 보관 기준일 (1행)
+
+    archive_completions 는 청크를 옮기는 트랜잭션에서 이 값을 옮길 기준일까지 먼저 올린다.
+    조회는 오늘 날짜/설정이 아니라 이 값과 비교하므로 --date 로 앞당겨 보관했거나
+    COMPLETION_ARCHIVE_AFTER_DAYS 를 늘린 뒤에도 보관된 기록을 놓치지 않는다. 값은 앞으로만 움직인다.
+    """
+
+    # 행이 하나뿐이라 id 를 고정 (샤드 간 id 할당 불필요)
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    archived_before = models.DateField(verbose_name='보관 기준일', help_text='이 날짜 이전 완료 기록은 보관 테이블에 있을 수 있음')
+
+    class Meta:
+        verbose_name = '완료 기록 보관 기준일'
+        verbose_name_plural = '완료 기록 보관 기준일'
+
+    def __str__(self):
+        return f'{self.archived_before} 이전 보관'
+
+
+class StreakStat(models.Model):
+    """할 일별 연속 달성 기록 (순위표용, 완료 처리/취소 때마다 LeaderboardService 가 갱신)
+
+    current 는 last_date 까지 이어진 연속 일수로, last_date 가 어제보다 이전이 되면
+    rollover_streaks 가 0 으로 만든다. 오늘 아직 완료하지 않았어도 어제까지 이어졌으면 유지된다.
+    """
+
+    # 관계 (할 일당 1행이라 기본 키로 사용 - 샤드 간 id 할당 불필요)
+    task = models.OneToOneField(Task, on_delete=models.CASCADE, primary_key=True, related_name='streak_stat',
+                                verbose_name='할 일')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='streak_stats', verbose_name='사용자')
+
+    # 연속 기록
+    current = models.PositiveIntegerField(default=0, verbose_name='현재 연속 일수')
+    longest = models.PositiveIntegerField(default=0, verbose_name='최장 연속 일수')
+    last_date = models.DateField(null=True, blank=True, verbose_name='마지막 완료 날짜')
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = '연속 달성 기록'
+        verbose_name_plural = '연속 달성 기록 목록'
+        indexes = [
+            # 날짜 변경 시 끊긴 기록 찾기 (rollover_streaks)
+            models.Index(fields=['last_date'], condition=models.Q(current__gt=0), name='streak_rollover_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id}: {self.current}일 (최장 {self.longest}일)"
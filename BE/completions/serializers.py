@@ -22,14 +22,19 @@ class CompletionCreateSerializer(serializers.Serializer):
     note = serializers.CharField(required=False, allow_blank=True, default='')
 
     def validate_task_id(self, value):
-        """Task 존재 및 권한 확인"""
+        """Task 존재 및 권한 확인 (조회한 Task 는 validated_data['task'] 로 전달)"""
         user = self.context['request'].user
         try:
-            task = Task.objects.get(id=value, user=user)
+            self._task = Task.objects.get(id=value, user=user)
         except Task.DoesNotExist:
             raise serializers.ValidationError('해당 할 일을 찾을 수 없거나 권한이 없습니다.')
         return value
 
+    def validate(self, attrs):
+        """뷰에서 Task 를 다시 조회하지 않도록 함께 전달"""
+        attrs['task'] = self._task
+        return attrs
+
     def validate_completed_date(self, value):
         """미래 날짜 방지"""
         if value > date.today():
@@ -53,3 +58,69 @@ class MonthlyStatsSerializer(serializers.Serializer):
     completed_days = serializers.IntegerField()
     completion_rate = serializers.FloatField()
     dates = serializers.ListField(child=serializers.CharField())
+
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    """순위표 항목 Serializer"""
+    rank = serializers.IntegerField()
+    username = serializers.CharField()
+    score = serializers.IntegerField()
+
+
+class LeaderboardRankSerializer(serializers.Serializer):
+    """내 순위 Serializer"""
+    rank = serializers.IntegerField()
+    score = serializers.IntegerField()
+
+
+class LeaderboardSerializer(serializers.Serializer):
+    """연속 달성 순위표 Serializer"""
+    task_type = serializers.CharField()
+    metric = serializers.CharField()
+    total = serializers.IntegerField()
+    opted_in = serializers.BooleanField()
+    top = LeaderboardEntrySerializer(many=True)
+    me = LeaderboardRankSerializer(allow_null=True)
+
+
+class TrendPointSerializer(serializers.Serializer):
+    """추이 구간 Serializer"""
+    period = serializers.DateField()
+    completions = serializers.IntegerField()
+    active_days = serializers.IntegerField()
+
+
+class TrendSerializer(serializers.Serializer):
+    """완료 추이 Serializer"""
+    bucket = serializers.CharField()
+    slope = serializers.FloatField()
+    points = TrendPointSerializer(many=True)
+
+
+class TaskConsistencySerializer(serializers.Serializer):
+    """할 일별 꾸준함 Serializer"""
+    task_id = serializers.IntegerField()
+    title = serializers.CharField()
+    task_type = serializers.CharField()
+    scheduled = serializers.IntegerField()
+    completed = serializers.IntegerField()
+    completion_rate = serializers.FloatField(allow_null=True)
+    avg_hour = serializers.FloatField(allow_null=True)
+    hour_stddev = serializers.FloatField(allow_null=True)
+    last_completed = serializers.DateField(allow_null=True)
+    score = serializers.FloatField(allow_null=True)
+
+
+class CompletionAnalyticsSerializer(serializers.Serializer):
+    """완료 패턴 분석 Serializer"""
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    total = serializers.IntegerField()
+    heatmap = serializers.ListField(
+        child=serializers.ListField(child=serializers.IntegerField()),
+        help_text='요일(월~일) x 시(0~23) 완료 수'
+    )
+    weekdays = serializers.ListField(child=serializers.IntegerField(), help_text='요일별(월~일) 완료 수')
+    hours = serializers.ListField(child=serializers.IntegerField(), help_text='시간대별(0~23) 완료 수')
+    trend = TrendSerializer()
+    tasks = TaskConsistencySerializer(many=True)
@@ -1,39 +1,171 @@
+import heapq
+import math
+import time
+from collections import defaultdict
 from datetime import date, timedelta
-from .models import Completion
+from itertools import chain, groupby
+from operator import itemgetter
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import router, transaction
+from django.db.models import Avg, Count, F, FilteredRelation, Max, Q, Subquery
+from django.utils import timezone
+from .leaderboard import get_leaderboard_store
+from .models import Completion, CompletionArchive, CompletionArchiveMark, StreakStat
+from .writebehind import get_write_behind
+from config import singleflight
+from config.contention import immediate_atomic, retry_on_lock
+from config.sharding import all_databases, each_database, shard_for_user
 from tasks.models import Task
+from tasks.services import TaskService
+from users.models import UserSetting
+from webhooks.services import WebhookService, completion_payload
+
+
+class ArchivedCompletionError(Exception):
+    """보관 테이블로 옮긴 날짜의 완료 기록 (저장된 Completion 이 없어 돌려주거나 바꿀 수 없음)"""
+
+    def __init__(self, completed_date):
+        super().__init__(f'{completed_date} 완료 기록은 보관되었습니다.')
+        self.completed_date = completed_date
 
 
 class CompletionService:
-    """Completion 관련 비즈니스 로직"""
+    """Completion 관련 비즈니스 로직
+
+    통계 조회(weekly/monthly/streak/history)는 single_flight 로 같은 인자의 동시 요청을 한 번만 계산하고,
+    완료 처리/취소가 커밋되면 그 할 일의 결과를 버린다.
+    """
 
     @staticmethod
     def mark_complete(task, completed_date=None, note=''):
-        """할 일 완료 처리"""
+        """할 일 완료 처리 (보관된 날짜에 이미 완료했으면 ArchivedCompletionError)"""
         if completed_date is None:
             completed_date = date.today()
 
-        # 중복 완료 방지 (get_or_create 사용)
-        completion, created = Completion.objects.get_or_create(
-            task=task,
-            completed_date=completed_date,
-            defaults={'note': note}
-        )
+        archived_before = CompletionArchiveService.archived_before(task._state.db)
+        if CompletionArchiveService.may_be_archived(completed_date, archived_before):
+            if completed_date in CompletionArchiveService.get_archived(task.id, completed_date, completed_date):
+                raise ArchivedCompletionError(completed_date)
+
+        # 쓰기 지연 모드: 저널에 기록하고 바로 반환 (DB 반영은 백그라운드에서 묶어서)
+        if settings.COMPLETION_WRITE_BEHIND:
+            return get_write_behind().mark_complete(task, completed_date, note)
 
+        # 이미 완료한 날짜면 쓰기 잠금 없이 바로 반환 (연속 탭)
+        completion = Completion.objects.filter(task=task, completed_date=completed_date).first()
+        if completion is not None:
+            return completion, False
+        return CompletionService._create_completion(task, completed_date, note)
+
+    @staticmethod
+    @retry_on_lock
+    def _create_completion(task, completed_date, note):
+        """쓰기 잠금을 잡은 뒤 다시 확인하고 저장 (동시 요청이 먼저 저장했으면 그 기록을 반환)"""
+        db = router.db_for_write(Completion)
+        with immediate_atomic(using=db):
+            # 중복 완료 방지 (get_or_create 사용)
+            completion, created = Completion.objects.get_or_create(
+                task=task,
+                completed_date=completed_date,
+                defaults={'note': note, 'user_id': task.user_id}
+            )
+            if created:
+                LeaderboardService.record_completion(task.id, task.user_id, completed_date, db)
+                TaskService.refresh_occurrences([task.id], db)
+                CompletionService.forget_stats_on_commit(task.id, db)
+                WebhookService.record(task.user_id, 'completion.created', completion_payload(completion), db)
         return completion, created
 
     @staticmethod
-    def is_completed_on_date(task_id, check_date=None):
-        """특정 날짜에 완료했는지 확인"""
+    @retry_on_lock
+    def delete_completion(completion):
+        """완료 취소 (동시에 취소해 이미 지워졌어도 오류 없이 끝남)"""
+        db = completion._state.db
+        with immediate_atomic(using=db):
+            deleted, _ = Completion.objects.using(db).filter(pk=completion.pk).delete()
+            if deleted:
+                LeaderboardService.recompute(completion.task_id, completion.user_id, db)
+                TaskService.refresh_occurrences([completion.task_id], db)
+                CompletionService.forget_stats_on_commit(completion.task_id, db)
+
+    @staticmethod
+    def forget_stats_on_commit(task_id, using):
+        """커밋되면 할 일의 통계 결과를 버린다 (다음 조회는 새로 계산)"""
+        transaction.on_commit(lambda: singleflight.forget(task_id), using=using)
+
+    @staticmethod
+    def _owned_task_completions(task_id, user, start_date, end_date, fields=('completed_date',)):
+        """할 일 소유권 확인과 기간 내 완료 기록 조회를 한 쿼리로 처리
+
+        Task 에 기간 조건을 건 완료 기록을 LEFT JOIN(FilteredRelation) 하므로
+        완료 기록이 없어도 할 일 행은 1개 나온다. 할 일이 없거나 user 의 것이 아니면 Task.DoesNotExist.
+        보관 기준일도 서브쿼리로 같이 읽는다.
+        반환값: (task 필드 dict, 완료 기록 dict 목록 - 최신순, 보관 기준일)
+        """
+        condition = Q(completions__completed_date__lte=end_date)
+        if start_date is not None:
+            condition &= Q(completions__completed_date__gte=start_date)
+
+        tasks = Task.objects.filter(id=task_id)
+        if user is not None:
+            tasks = tasks.filter(user=user)
+
+        rows = list(
+            tasks.annotate(
+                period=FilteredRelation('completions', condition=condition),
+                archived_before=CompletionArchiveService.archived_before_subquery(),
+            )
+            .order_by('-period__completed_date')
+            .values('title', 'task_type', 'archived_before', *[f'period__{field}' for field in fields])
+        )
+        if not rows:
+            raise Task.DoesNotExist
+
+        task = {'id': int(task_id), 'title': rows[0]['title'], 'task_type': rows[0]['task_type']}
+        completions = [
+            {field: row[f'period__{field}'] for field in fields}
+            for row in rows if row['period__completed_date'] is not None
+        ]
+        return task, completions, rows[0]['archived_before']
+
+    @staticmethod
+    def is_completed_on_date(task_id, check_date=None, user=None):
+        """특정 날짜에 완료했는지 확인 (user 를 주면 소유권도 함께 확인)"""
         if check_date is None:
             check_date = date.today()
 
-        return Completion.objects.filter(
-            task_id=task_id,
-            completed_date=check_date
-        ).exists()
+        if user is None:
+            completed = Completion.objects.filter(task_id=task_id, completed_date=check_date).exists()
+            archived_before = None if completed else CompletionArchiveService.archived_before()
+        else:
+            _, completions, archived_before = CompletionService._owned_task_completions(
+                task_id, user, check_date, check_date
+            )
+            completed = bool(completions)
+        if completed:
+            return True
+        if not CompletionArchiveService.may_be_archived(check_date, archived_before):
+            return False
+        return check_date in CompletionArchiveService.get_archived(task_id, check_date, check_date)
+
+    @staticmethod
+    def get_completed_dates(task_id, start_date, end_date, user=None):
+        """기간 내 완료 날짜 목록 (최신순)
+
+        기간이 보관 기준일 이후면 Completion 만 조회하고, 더 오래된 날짜가 포함될 때만 보관 데이터를 함께 읽는다.
+        """
+        _, completions, archived_before = CompletionService._owned_task_completions(task_id, user, start_date, end_date)
+        dates = {c['completed_date'] for c in completions}
+
+        if CompletionArchiveService.may_be_archived(start_date, archived_before):
+            dates.update(CompletionArchiveService.get_archived(task_id, start_date, end_date))
+
+        return sorted(dates, reverse=True)
 
     @staticmethod
-    def get_weekly_stats(task_id, start_date=None):
+    @singleflight.single_flight(tag='task_id')
+    def get_weekly_stats(task_id, start_date=None, user=None):
         """주간 완료 통계"""
         if start_date is None:
             today = date.today()
@@ -41,56 +173,80 @@ class CompletionService:
 
         end_date = start_date + timedelta(days=6)
 
-        completions = Completion.objects.filter(
-            task_id=task_id,
-            completed_date__gte=start_date,
-            completed_date__lte=end_date
-        )
+        dates = CompletionService.get_completed_dates(task_id, start_date, end_date, user)
 
-        completed_days = completions.count()
+        completed_days = len(dates)
         total_days = 7
 
         return {
             'total_days': total_days,
             'completed_days': completed_days,
             'completion_rate': round((completed_days / total_days) * 100, 1) if total_days > 0 else 0,
-            'dates': [c.completed_date.isoformat() for c in completions]
+            'dates': [d.isoformat() for d in dates]
         }
 
     @staticmethod
-    def get_streak(task_id):
+    @singleflight.single_flight(tag='task_id')
+    def get_streak(task_id, user=None):
         """연속 달성일 계산"""
         today = date.today()
         streak = 0
 
-        # 오늘부터 거꾸로 확인
+        # 보관되지 않은 완료 날짜를 한 번에 읽어서 오늘부터 거꾸로 확인
+        _, completions, archived_before = CompletionService._owned_task_completions(task_id, user, None, today)
+        completed = {c['completed_date'] for c in completions}
         check_date = today
 
-        while True:
-            if CompletionService.is_completed_on_date(task_id, check_date):
+        while check_date in completed:
+            streak += 1
+            check_date -= timedelta(days=1)
+
+        if not CompletionArchiveService.may_be_archived(check_date, archived_before):
+            return streak
+
+        # 보관 기준일 너머까지 이어지면 연도별 보관 데이터를 최신 연도부터 확인
+        archives = CompletionArchive.objects.filter(task_id=task_id, year__lte=check_date.year).order_by('-year')
+        for archive in archives.iterator():
+            if archive.year != check_date.year:
+                break
+            while check_date.year == archive.year and (archive.has_day(check_date) or check_date in completed):
                 streak += 1
                 check_date -= timedelta(days=1)
-            else:
+            if check_date.year == archive.year:
                 break
 
         return streak
 
     @staticmethod
-    def get_completion_history(task_id, days=30):
-        """완료 히스토리 조회"""
+    @singleflight.single_flight(tag='task_id')
+    def get_completion_history(task_id, days=30, user=None):
+        """완료 히스토리 조회 (최신순 Completion 목록)"""
         end_date = date.today()
         start_date = end_date - timedelta(days=days-1)
 
-        completions = Completion.objects.filter(
-            task_id=task_id,
-            completed_date__gte=start_date,
-            completed_date__lte=end_date
-        ).order_by('-completed_date')
+        task_values, rows, archived_before = CompletionService._owned_task_completions(
+            task_id, user, start_date, end_date,
+            fields=('id', 'completed_date', 'completed_time', 'note', 'created_at')
+        )
+        task = Task(**task_values)
+        completions = [Completion(task=task, **row) for row in rows]
 
+        if not CompletionArchiveService.may_be_archived(start_date, archived_before):
+            return completions
+
+        # 보관된 날짜는 저장되지 않은 Completion 으로 만들어 함께 반환 (id, 완료 시각 없음)
+        hot_dates = {c.completed_date for c in completions}
+        archived = CompletionArchiveService.get_archived(task_id, start_date, end_date)
+        completions += [
+            Completion(task=task, completed_date=day, note=note)
+            for day, note in archived.items() if day not in hot_dates
+        ]
+        completions.sort(key=lambda c: c.completed_date, reverse=True)
         return completions
 
     @staticmethod
-    def get_monthly_stats(task_id, year=None, month=None):
+    @singleflight.single_flight(tag='task_id')
+    def get_monthly_stats(task_id, year=None, month=None, user=None):
         """월간 완료 통계"""
         today = date.today()
         if year is None:
@@ -104,13 +260,9 @@ class CompletionService:
         start_date = date(year, month, 1)
         end_date = date(year, month, days_in_month)
 
-        completions = Completion.objects.filter(
-            task_id=task_id,
-            completed_date__gte=start_date,
-            completed_date__lte=end_date
-        )
+        dates = CompletionService.get_completed_dates(task_id, start_date, end_date, user)
 
-        completed_days = completions.count()
+        completed_days = len(dates)
 
         return {
             'year': year,
@@ -118,5 +270,443 @@ class CompletionService:
             'total_days': days_in_month,
             'completed_days': completed_days,
             'completion_rate': round((completed_days / days_in_month) * 100, 1),
-            'dates': [c.completed_date.isoformat() for c in completions]
+            'dates': [d.isoformat() for d in dates]
         }
+
+
+class CompletionAnalyticsService:
+    """완료 패턴 분석 (요일 x 시간대 분포, 기간별 추이, 할 일별 꾸준함 점수)
+
+    집계는 모두 DB 의 GROUP BY 로 하고 파이썬은 집계 결과만 다룬다.
+    - (날짜, 시) 별 완료 수: completion_user_date_hour_idx 순서대로 읽으며 묶으므로 정렬 없이 인덱스만 읽는다.
+      결과는 최대 (기간 일수 x 24) 행이라 완료 기록 수와 관계없이 요일/구간으로 다시 묶는 비용이 일정하다
+    - 할 일별 완료 수와 완료 시의 평균/제곱 평균(표준편차용)
+    보관된 완료 기록(CompletionArchive)은 완료 시각이 없으므로 포함하지 않는다.
+    """
+
+    DEFAULT_DAYS = 90
+    MAX_DAYS = 366
+    BUCKETS = ('day', 'week', 'month')
+
+    @staticmethod
+    def get_analytics(user, start_date=None, end_date=None, bucket='week', task_id=None):
+        """start_date ~ end_date(기본: 최근 DEFAULT_DAYS 일) 분석 결과"""
+        if end_date is None:
+            end_date = date.today()
+        if start_date is None:
+            start_date = end_date - timedelta(days=CompletionAnalyticsService.DEFAULT_DAYS - 1)
+
+        completions = Completion.objects.filter(user=user, completed_date__range=(start_date, end_date))
+        tasks = Task.objects.filter(user=user)
+        if task_id is not None:
+            completions = completions.filter(task_id=task_id)
+            tasks = tasks.filter(id=task_id)
+
+        rollup = list(
+            completions.values_list('completed_date', 'completed_hour')
+            .annotate(count=Count('id'))
+            .order_by('completed_date', 'completed_hour')
+        )
+
+        heatmap = [[0] * 24 for _ in range(7)]
+        by_day = defaultdict(int)
+        for completed_date, hour, count in rollup:
+            heatmap[completed_date.weekday()][hour] += count
+            by_day[completed_date] += count
+
+        return {
+            'start_date': start_date,
+            'end_date': end_date,
+            'total': sum(by_day.values()),
+            'heatmap': heatmap,
+            'weekdays': [sum(row) for row in heatmap],
+            'hours': [sum(column) for column in zip(*heatmap)],
+            'trend': CompletionAnalyticsService._trend(by_day, start_date, end_date, bucket),
+            'tasks': CompletionAnalyticsService._consistency(completions, tasks, start_date, end_date),
+        }
+
+    @staticmethod
+    def _bucket_start(day, bucket):
+        if bucket == 'week':
+            return day - timedelta(days=day.weekday())
+        if bucket == 'month':
+            return day.replace(day=1)
+        return day
+
+    @staticmethod
+    def _trend(by_day, start_date, end_date, bucket):
+        """구간별 완료 수/완료한 날 수와 최소제곱 기울기 (구간당 완료 수 증감)"""
+        points = {}
+        day = start_date
+        while day <= end_date:
+            points.setdefault(CompletionAnalyticsService._bucket_start(day, bucket), {'completions': 0, 'active_days': 0})
+            day += timedelta(days=1)
+        for day, count in by_day.items():
+            point = points[CompletionAnalyticsService._bucket_start(day, bucket)]
+            point['completions'] += count
+            point['active_days'] += 1
+
+        values = [point['completions'] for point in points.values()]
+        n = len(values)
+        mean_x, mean_y = (n - 1) / 2, sum(values) / n
+        variance = sum((x - mean_x) ** 2 for x in range(n))
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values)) / variance if variance else 0.0
+
+        return {
+            'bucket': bucket,
+            'slope': round(slope, 3),
+            'points': [{'period': period, **point} for period, point in sorted(points.items())],
+        }
+
+    @staticmethod
+    def _consistency(completions, tasks, start_date, end_date):
+        """할 일별 꾸준함 점수 (활성 할 일 + 기간 안에 완료 기록이 있는 할 일)
+
+        completion_rate = 완료 수 / 일정일 수 (생성일 이후 오늘까지, 1 을 넘지 않음)
+        hour_stddev = 완료 시의 표준편차, regularity = max(0, 1 - hour_stddev / 12)
+        score = 100 x completion_rate x regularity
+        """
+        stats = {
+            row['task_id']: row for row in completions.values('task_id').annotate(
+                completed=Count('id'),
+                avg_hour=Avg('completed_hour'),
+                avg_hour_sq=Avg(F('completed_hour') * F('completed_hour')),
+                last_date=Max('completed_date'),
+            ).order_by()
+        }
+        last_day = min(end_date, date.today())
+
+        result = []
+        for task in tasks.filter(Q(status='active') | Q(id__in=list(stats))):
+            row = stats.get(task.id, {'completed': 0, 'avg_hour': None, 'avg_hour_sq': None, 'last_date': None})
+            first_day = max(start_date, timezone.localtime(task.created_at).date())
+            scheduled = task.rule().count_between(first_day, last_day)
+            rate = min(row['completed'] / scheduled, 1.0) if scheduled else None
+            stddev = None
+            if row['avg_hour'] is not None:
+                stddev = math.sqrt(max(row['avg_hour_sq'] - row['avg_hour'] ** 2, 0.0))
+            score = None
+            if rate is not None:
+                score = round(100 * rate * max(0.0, 1 - (stddev or 0.0) / 12), 1)
+            result.append({
+                'task_id': task.id,
+                'title': task.title,
+                'task_type': task.task_type,
+                'scheduled': scheduled,
+                'completed': row['completed'],
+                'completion_rate': None if rate is None else round(rate * 100, 1),
+                'avg_hour': None if row['avg_hour'] is None else round(row['avg_hour'], 1),
+                'hour_stddev': None if stddev is None else round(stddev, 2),
+                'last_completed': row['last_date'],
+                'score': score,
+            })
+        result.sort(key=lambda item: (item['score'] is None, -(item['score'] or 0), item['task_id']))
+        return result
+
+
+class CompletionArchiveService:
+    """오래된 완료 기록 보관 관련 비즈니스 로직
+
+    COMPLETION_ARCHIVE_AFTER_DAYS 보다 오래된 Completion 은 archive_old() 가
+    CompletionArchive(할 일 x 연도당 1행 비트맵)로 옮긴다.
+    옮길 때 DB 의 보관 기준일(CompletionArchiveMark)을 같은 트랜잭션에서 앞으로 당기므로
+    조회는 그 값 이후 날짜면 Completion 만 읽으면 된다.
+    """
+
+    @staticmethod
+    def cutoff(today=None):
+        """이 날짜보다 이전 기록은 보관 대상"""
+        if today is None:
+            today = date.today()
+        return today - timedelta(days=settings.COMPLETION_ARCHIVE_AFTER_DAYS)
+
+    @staticmethod
+    def archived_before(using=None):
+        """DB 의 보관 기준일 (보관한 적이 없으면 None)"""
+        marks = CompletionArchiveMark.objects.using(using or router.db_for_read(CompletionArchiveMark))
+        return marks.values_list('archived_before', flat=True).first()
+
+    @staticmethod
+    def archived_before_subquery():
+        """다른 조회에 붙여 같은 쿼리로 보관 기준일을 읽는 서브쿼리"""
+        return Subquery(CompletionArchiveMark.objects.values('archived_before')[:1])
+
+    @staticmethod
+    def may_be_archived(day, archived_before):
+        """보관 테이블까지 확인해야 하는 날짜인지 (archived_before: archived_before() 값)"""
+        return archived_before is not None and day < archived_before
+
+    @staticmethod
+    def _advance_mark(cutoff):
+        """보관 기준일을 cutoff 까지 올린다 (내리지 않음, archive_chunk 의 트랜잭션 안에서 호출)"""
+        mark = CompletionArchiveMark.objects.select_for_update().filter(pk=1).first()
+        if mark is None:
+            CompletionArchiveMark.objects.create(pk=1, archived_before=cutoff)
+        elif mark.archived_before < cutoff:
+            CompletionArchiveMark.objects.filter(pk=1).update(archived_before=cutoff)
+
+    @staticmethod
+    def get_archived(task_id, start_date, end_date):
+        """기간 내 보관된 완료 날짜 {날짜: 메모}"""
+        archived = {}
+        archives = CompletionArchive.objects.filter(
+            task_id=task_id,
+            year__gte=start_date.year,
+            year__lte=end_date.year
+        )
+        for archive in archives:
+            for day in archive.dates():
+                if start_date <= day <= end_date:
+                    archived[day] = archive.notes.get(day.isoformat(), '')
+        return archived
+
+    @staticmethod
+    def archive_chunk(cutoff, chunk_size=1000):
+        """보관 대상 Completion 한 청크를 옮기고 옮긴 개수를 반환
+
+        청크마다 한 트랜잭션에서 보관 행 갱신과 원본 삭제를 같이 하므로
+        중간에 멈춰도 다시 실행하면 남은 기록부터 이어서 처리한다.
+        """
+        with transaction.atomic(using=router.db_for_write(Completion)):
+            rows = list(
+                Completion.objects.filter(completed_date__lt=cutoff)
+                .order_by()
+                .values_list('id', 'task_id', 'completed_date', 'note')[:chunk_size]
+            )
+            if not rows:
+                return 0
+            CompletionArchiveService._advance_mark(cutoff)
+
+            grouped = defaultdict(list)
+            for _, task_id, completed_date, note in rows:
+                grouped[(task_id, completed_date.year)].append((completed_date, note))
+
+            existing = {
+                (archive.task_id, archive.year): archive
+                for archive in CompletionArchive.objects.select_for_update().filter(
+                    task_id__in={task_id for task_id, _ in grouped},
+                    year__in={year for _, year in grouped}
+                )
+            }
+
+            created, updated = [], []
+            for (task_id, year), entries in grouped.items():
+                archive = existing.get((task_id, year))
+                if archive is None:
+                    archive = CompletionArchive(task_id=task_id, year=year)
+                    created.append(archive)
+                else:
+                    updated.append(archive)
+                for completed_date, note in entries:
+                    archive.add_day(completed_date, note)
+
+            CompletionArchive.objects.bulk_create(created)
+            CompletionArchive.objects.bulk_update(updated, ['days', 'completed_count', 'notes'])
+            Completion.objects.filter(id__in=[row[0] for row in rows]).delete()
+
+        return len(rows)
+
+    @staticmethod
+    def archive_old(today=None, chunk_size=1000, progress=None):
+        """보관 기준일 이전의 Completion 을 모두 보관 테이블로 이동 (샤딩을 쓰면 DB 마다 차례로)
+
+        반환값: {'moved', 'chunks', 'seconds'}
+        """
+        cutoff = CompletionArchiveService.cutoff(today)
+        stats = {'moved': 0, 'chunks': 0, 'seconds': 0.0}
+        started = time.monotonic()
+
+        for _ in each_database():
+            while True:
+                moved = CompletionArchiveService.archive_chunk(cutoff, chunk_size)
+                if not moved:
+                    break
+                stats['moved'] += moved
+                stats['chunks'] += 1
+                stats['seconds'] = time.monotonic() - started
+                if progress is not None:
+                    progress(stats)
+
+        stats['seconds'] = time.monotonic() - started
+        return stats
+
+
+class LeaderboardService:
+    """연속 달성 순위표 (순위표에 참여한 사용자만, task_type x 현재/최장 연속 일수별)
+
+    - 완료 처리/취소 때 그 할 일의 StreakStat 1행만 갱신하고, 커밋 후 순위표 저장소의 사용자 점수를 바꾼다
+    - 순위표 저장소(completions.leaderboard)는 사용자의 task_type 별 최고 기록으로 상위 N 명과 내 순위를 O(log n) 으로 조회한다
+    - 저장소는 LEADERBOARD_REFRESH_SECONDS 가 지나면 StreakStat 에서 다시 읽는다 (다른 프로세스의 변경 반영)
+    """
+
+    @staticmethod
+    def compute_streaks(dates, today=None):
+        """오름차순 완료 날짜들의 (현재 연속 일수, 최장 연속 일수, 마지막 날짜)
+
+        현재 연속 일수는 마지막 날짜가 오늘 또는 어제일 때만 센다.
+        """
+        today = today or date.today()
+        run = longest = 0
+        previous = None
+        for day in dates:
+            run = run + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+            longest = max(longest, run)
+            previous = day
+        current = run if previous is not None and previous >= today - timedelta(days=1) else 0
+        return current, longest, previous
+
+    @staticmethod
+    def record_completion(task_id, user_id, completed_date, using):
+        """새 완료 기록을 할 일의 연속 기록에 반영 (완료 기록을 저장한 트랜잭션 안에서 호출)"""
+        stat = StreakStat.objects.using(using).filter(task_id=task_id).first()
+        if stat is None or stat.last_date is None:
+            # 처음이면 기존 완료 기록에서 계산
+            return LeaderboardService.recompute(task_id, user_id, using)
+
+        next_day = stat.last_date + timedelta(days=1)
+        if completed_date == next_day and stat.current > 0:
+            stat.current += 1
+        elif completed_date > next_day:
+            stat.current = 1
+        else:
+            # 지난 날짜를 채우면 끊겼던 구간이 이어질 수 있으므로 다시 계산
+            return LeaderboardService.recompute(task_id, user_id, using)
+        stat.last_date = completed_date
+        stat.longest = max(stat.longest, stat.current)
+        stat.save(using=using, update_fields=['current', 'longest', 'last_date'])
+        LeaderboardService._publish_on_commit(user_id, using)
+        return stat
+
+    @staticmethod
+    def recompute(task_id, user_id, using):
+        """할 일의 완료 기록(보관 테이블 포함)으로 연속 기록을 다시 계산 (완료 취소, 지난 날짜 완료)"""
+        dates = set(Completion.objects.using(using).filter(task_id=task_id).values_list('completed_date', flat=True))
+        for archive in CompletionArchive.objects.using(using).filter(task_id=task_id).only('year', 'days'):
+            dates.update(archive.dates())
+        stat = StreakStat(task_id=task_id, user_id=user_id)
+        stat.current, stat.longest, stat.last_date = LeaderboardService.compute_streaks(sorted(dates))
+        stat.save(using=using)
+        LeaderboardService._publish_on_commit(user_id, using)
+        return stat
+
+    @staticmethod
+    def _publish_on_commit(user_id, using):
+        transaction.on_commit(lambda: LeaderboardService.publish(user_id, using), using=using)
+
+    @staticmethod
+    def _user_scores(user_id, using):
+        """사용자의 task_type 별 (최고 현재 연속 일수, 최고 최장 연속 일수)"""
+        rows = (
+            StreakStat.objects.using(using).filter(user_id=user_id)
+            .values('task__task_type')
+            .annotate(best_current=Max('current'), best_longest=Max('longest'))
+            .values_list('task__task_type', 'best_current', 'best_longest')
+        )
+        return {task_type: (current, longest) for task_type, current, longest in rows}
+
+    @staticmethod
+    def publish(user_id, using=None):
+        """순위표 저장소의 사용자 점수 갱신 (참여하지 않았거나 저장소를 다시 읽을 때가 되었으면 생략)"""
+        store = get_leaderboard_store()
+        if store.is_stale() or not store.is_member(user_id):
+            return
+        store.set_user(user_id, LeaderboardService._user_scores(user_id, using or shard_for_user(user_id)))
+
+    @staticmethod
+    def set_opt_in(user, opted_in):
+        """순위표 참여 설정이 바뀌면 저장소에 바로 반영"""
+        store = get_leaderboard_store()
+        if store.is_stale():
+            return
+        if opted_in:
+            store.set_user(user.pk, LeaderboardService._user_scores(user.pk, shard_for_user(user)))
+        else:
+            store.remove_user(user.pk)
+
+    @staticmethod
+    def reload(store=None):
+        """순위표 저장소를 StreakStat 전체에서 다시 채움 (DB 마다 GROUP BY 쿼리 1번)"""
+        store = store or get_leaderboard_store()
+        members = set(UserSetting.objects.filter(leaderboard_opt_in=True).values_list('user_id', flat=True))
+        rows = []
+        for alias in all_databases():
+            rows += (
+                StreakStat.objects.using(alias)
+                .values('user_id', 'task__task_type')
+                .annotate(best_current=Max('current'), best_longest=Max('longest'))
+                .values_list('user_id', 'task__task_type', 'best_current', 'best_longest')
+            )
+        store.load(members, rows)
+        return store
+
+    @staticmethod
+    def get_leaderboard(user, task_type, metric='current', limit=10):
+        """상위 limit 명과 내 순위"""
+        store = get_leaderboard_store()
+        if store.is_stale():
+            LeaderboardService.reload(store)
+
+        top, total = store.top(task_type, metric, limit)
+        usernames = dict(User.objects.filter(pk__in=[user_id for _, user_id, _ in top]).values_list('pk', 'username'))
+        me = store.rank(task_type, metric, user.pk)
+        return {
+            'task_type': task_type,
+            'metric': metric,
+            'total': total,
+            'opted_in': store.is_member(user.pk),
+            'top': [
+                {'rank': rank, 'username': usernames.get(user_id, ''), 'score': score}
+                for rank, user_id, score in top
+            ],
+            'me': {'rank': me[0], 'score': me[1]} if me else None,
+        }
+
+    @staticmethod
+    def rollover(today=None):
+        """어제까지 완료하지 않아 끊긴 연속 기록의 current 를 0 으로 (날짜가 바뀐 뒤 하루 1번 실행). 바꾼 행 수 반환"""
+        yesterday = (today or date.today()) - timedelta(days=1)
+        reset = 0
+        for alias in all_databases():
+            with immediate_atomic(alias):
+                reset += StreakStat.objects.using(alias).filter(current__gt=0, last_date__lt=yesterday).update(current=0)
+        get_leaderboard_store().clear()
+        return reset
+
+    @staticmethod
+    def rebuild(today=None, chunk_size=2000):
+        """Completion 과 보관 테이블을 (task_id, 날짜) 순으로 한 번씩 읽어 모든 StreakStat 을 다시 만듦. DB 별 행 수 반환
+
+        두 테이블을 task_id 순으로 읽어 병합하므로 할 일 하나의 날짜만 메모리에 둔다.
+        """
+        counts = {}
+        for alias in all_databases():
+            hot = (
+                Completion.objects.using(alias).order_by('task_id', 'completed_date')
+                .values_list('task_id', 'user_id', 'completed_date')
+                .iterator(chunk_size=chunk_size)
+            )
+            archived = (
+                (task_id, user_id, day)
+                for task_id, user_id, year, days in (
+                    CompletionArchive.objects.using(alias).order_by('task_id', 'year')
+                    .values_list('task_id', 'task__user_id', 'year', 'days')
+                    .iterator(chunk_size=chunk_size)
+                )
+                for day in CompletionArchive(year=year, days=days).dates()
+            )
+            rows = heapq.merge(hot, archived, key=itemgetter(0, 2))
+            stats = []
+            for task_id, group in groupby(rows, key=itemgetter(0)):
+                first = next(group)
+                # 완료 기록과 보관 테이블에 같은 날짜가 있어도 한 번만 센다
+                dates = (day for day, _ in groupby(chain([first[2]], (row[2] for row in group))))
+                current, longest, last_date = LeaderboardService.compute_streaks(dates, today)
+                stats.append(StreakStat(
+                    task_id=task_id, user_id=first[1], current=current, longest=longest, last_date=last_date
+                ))
+            with immediate_atomic(alias):
+                StreakStat.objects.using(alias).all().delete()
+                StreakStat.objects.using(alias).bulk_create(stats, batch_size=chunk_size)
+            counts[alias] = len(stats)
+        get_leaderboard_store().clear()
+        return counts
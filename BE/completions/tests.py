@@ -1,3 +1,725 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import io
+import tempfile
+import threading
+from datetime import date, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from config import singleflight
+from config.contention import retry_on_lock
+from tasks.models import Task
+from users.models import UserSetting
+from webhooks.models import OutboxEvent, Webhook
+from . import writebehind
+from .leaderboard import RankedSet, reset_leaderboard_store
+from .models import Completion, CompletionArchive, CompletionArchiveMark, StreakStat
+from .services import (
+    ArchivedCompletionError, CompletionAnalyticsService, CompletionArchiveService, CompletionService,
+    LeaderboardService,
+)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class CompletionAdminTests(TestCase):
+    """대용량 테이블용 완료 기록 admin"""
+
+    # 세션, 사용자, 행 수 추정(2), 제한 COUNT, 목록(task JOIN), date_hierarchy(2)
+    CHANGELIST_QUERIES = 8
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass1234!')
+        user = User.objects.create_user('tester')
+        tasks = Task.objects.bulk_create([Task(user=user, title=f'습관 {i}', task_type='daily') for i in range(30)])
+        Completion.objects.bulk_create([
+            Completion(task=task, completed_date=date.today() - timedelta(days=day))
+            for task in tasks for day in range(5)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelist_page_has_constant_query_count(self):
+        with self.assertNumQueries(self.CHANGELIST_QUERIES):
+            response = self.client.get('/admin/completions/completion/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 100)
+        self.assertContains(response, '습관 0')
+
+
+@override_settings(DATABASE_SHARDS=[])
+class CompletionReadQueryTests(TestCase):
+    """완료 기록 조회 API 쿼리 수 (기록 수와 관계없이 일정해야 함)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        other = User.objects.create_user('other')
+        cls.task = Task.objects.create(user=cls.user, title='습관', task_type='daily')
+        cls.other_task = Task.objects.create(user=other, title='남의 습관', task_type='daily')
+        for task in (cls.task, cls.other_task):
+            Completion.objects.bulk_create([
+                Completion(task=task, completed_date=date.today() - timedelta(days=day), note=f'{day}일 전')
+                for day in range(40)
+            ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        singleflight.clear()
+
+    def assert_queries(self, url, num, status_code=200):
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status_code)
+        return response
+
+    def test_list_and_retrieve(self):
+        response = self.assert_queries('/api/completions/', 1)
+        self.assertEqual(len(response.data), 40)
+        self.assertEqual(response.data[0]['task_title'], '습관')
+        self.assert_queries(f'/api/completions/?task_id={self.task.id}', 1)
+        self.assert_queries(f'/api/completions/{self.task.completions.first().id}/', 1)
+
+    def test_list_filters_owner_on_denormalized_column(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/completions/')
+        where = queries[0]['sql'].split(' WHERE ', 1)[1]
+        self.assertIn('"completions_completion"."user_id"', where)
+        self.assertNotIn('"tasks_task"."user_id"', where)
+
+    def test_task_actions_fold_ownership_check(self):
+        task_id = self.task.id
+        self.assert_queries(f'/api/completions/check/?task_id={task_id}', 1)
+        response = self.assert_queries(f'/api/completions/history/?task_id={task_id}', 1)
+        self.assertEqual(len(response.data), 30)
+        self.assertEqual(response.data[0]['task_type'], 'daily')
+        self.assert_queries(f'/api/completions/weekly_stats/?task_id={task_id}', 1)
+        self.assert_queries(f'/api/completions/monthly_stats/?task_id={task_id}', 1)
+        response = self.assert_queries(f'/api/completions/streak/?task_id={task_id}', 1)
+        self.assertEqual(response.data['streak'], 40)
+
+    def test_other_users_task_is_not_found(self):
+        for action in ('check', 'history', 'weekly_stats', 'monthly_stats', 'streak'):
+            with self.subTest(action=action):
+                self.assert_queries(f'/api/completions/{action}/?task_id={self.other_task.id}', 1, 404)
+
+    def test_task_without_completions(self):
+        task = Task.objects.create(user=self.user, title='새 습관', task_type='daily')
+        response = self.assert_queries(f'/api/completions/history/?task_id={task.id}', 1)
+        self.assertEqual(response.data, [])
+        response = self.assert_queries(f'/api/completions/streak/?task_id={task.id}', 1)
+        self.assertEqual(response.data['streak'], 0)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class CompletionArchiveTests(TestCase):
+    """오래된 완료 기록 보관과 조회"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        cls.task = Task.objects.create(user=cls.user, title='습관', task_type='daily')
+        cls.today = date.today()
+        Completion.objects.bulk_create([
+            Completion(task=cls.task, completed_date=cls.today - timedelta(days=day), note=f'{day}일 전')
+            for day in range(10)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        singleflight.clear()
+
+    def archive(self, days_ago=5, chunk_size=3):
+        """오늘보다 앞선 날짜를 기준으로 보관 (기준일: 오늘 - days_ago)"""
+        out = io.StringIO()
+        with override_settings(COMPLETION_ARCHIVE_AFTER_DAYS=0):
+            call_command(
+                'archive_completions', date=self.today - timedelta(days=days_ago), chunk_size=chunk_size, stdout=out
+            )
+        return out.getvalue()
+
+    def test_bitmap_round_trip(self):
+        archive = CompletionArchive(task=self.task, year=2024)
+        days = [date(2024, 1, 1), date(2024, 2, 29), date(2024, 7, 15), date(2024, 12, 31)]
+        for day in reversed(days):
+            archive.add_day(day, note='메모' if day.month == 7 else '')
+        archive.add_day(days[0])  # 같은 날을 다시 넣어도 한 번만 센다
+
+        self.assertEqual(archive.dates(), days)
+        self.assertEqual(archive.completed_count, 4)
+        self.assertEqual(len(archive.days), CompletionArchive.BITMAP_SIZE)
+        self.assertTrue(archive.has_day(date(2024, 12, 31)))
+        self.assertFalse(archive.has_day(date(2024, 12, 30)))
+        self.assertEqual(archive.notes, {'2024-07-15': '메모'})
+        self.assertEqual(CompletionArchive(task=self.task, year=2023).dates(), [])
+
+    def test_command_moves_rows_in_chunks_and_records_mark(self):
+        output = self.archive()
+
+        cutoff = self.today - timedelta(days=5)
+        self.assertIn('4건 이동 (2개 청크', output)
+        self.assertFalse(Completion.objects.filter(completed_date__lt=cutoff).exists())
+        self.assertEqual(Completion.objects.count(), 6)
+        archived = CompletionArchiveService.get_archived(self.task.id, date.min, self.today)
+        self.assertEqual(sorted(archived), [self.today - timedelta(days=day) for day in range(9, 5, -1)])
+        self.assertEqual(archived[self.today - timedelta(days=7)], '7일 전')
+        self.assertEqual(CompletionArchiveMark.objects.get().archived_before, cutoff)
+
+        # 다시 실행하면 옮길 것이 없고, 더 이른 기준일로 실행해도 기준일은 내려가지 않는다
+        self.assertIn('0건 이동', self.archive())
+        self.archive(days_ago=8)
+        self.assertEqual(CompletionArchiveService.archived_before(), cutoff)
+
+    def test_reads_fall_through_to_archive_after_mark(self):
+        # 오늘 기준 설정값(365일)보다 최근 날짜를 보관해도 조회는 기준일을 보고 보관 테이블까지 읽는다
+        self.archive()
+        task_id = self.task.id
+
+        response = self.client.get(f'/api/completions/history/?task_id={task_id}')
+        self.assertEqual(len(response.data), 10)
+        self.assertEqual(response.data[-1]['note'], '9일 전')
+
+        old_day = self.today - timedelta(days=7)
+        self.assertTrue(CompletionService.is_completed_on_date(task_id, old_day, user=self.user))
+        self.assertTrue(CompletionService.is_completed_on_date(task_id, old_day))
+        self.assertFalse(CompletionService.is_completed_on_date(task_id, self.today - timedelta(days=20)))
+
+        response = self.client.get(f'/api/completions/streak/?task_id={task_id}')
+        self.assertEqual(response.data['streak'], 10)
+
+        # 기준일을 읽는 것은 같은 쿼리의 서브쿼리라 쿼리 수는 그대로
+        with self.assertNumQueries(1):
+            self.client.get(f'/api/completions/check/?task_id={task_id}')
+
+    def test_completing_archived_date_is_conflict(self):
+        self.archive()
+        old_day = self.today - timedelta(days=7)
+        with self.assertRaises(ArchivedCompletionError):
+            CompletionService.mark_complete(self.task, old_day)
+
+        response = self.client.post(
+            '/api/completions/', {'task_id': self.task.id, 'completed_date': old_day.isoformat()}, format='json'
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Completion.objects.filter(completed_date=old_day).exists())
+
+        # 보관 기준일 이전이라도 완료 기록이 없던 날은 새로 완료할 수 있다
+        new_day = self.today - timedelta(days=20)
+        response = self.client.post(
+            '/api/completions/', {'task_id': self.task.id, 'completed_date': new_day.isoformat()}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNotNone(response.data['completion']['id'])
+
+
+@override_settings(DATABASE_SHARDS=[])
+class CompletionOwnerTests(TestCase):
+    """비정규화된 Completion.user 검사/수정 명령"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        cls.other = User.objects.create_user('other')
+        cls.task = Task.objects.create(user=cls.user, title='습관', task_type='daily')
+        cls.completions = Completion.objects.bulk_create([
+            Completion(task=cls.task, completed_date=date.today() - timedelta(days=day)) for day in range(5)
+        ])
+
+    def check_owners(self, *args):
+        out = io.StringIO()
+        call_command('check_completion_owners', *args, stdout=out)
+        return out.getvalue()
+
+    def test_reports_and_fixes_mismatched_rows(self):
+        self.assertIn('모든 완료 기록의 사용자가 할 일의 사용자와 일치합니다', self.check_owners())
+
+        # 관리자 페이지에서 할 일의 사용자를 바꾼 상황
+        Task.objects.filter(id=self.task.id).update(user=self.other)
+        output = self.check_owners('--verbosity=2')
+        self.assertIn('사용자가 어긋난 완료 기록 5건', output)
+        self.assertIn(f'task={self.task.id} user={self.user.id} task.user={self.other.id}', output)
+        self.assertEqual(Completion.objects.filter(user=self.user).count(), 5)
+
+        self.assertIn('5건 수정', self.check_owners('--fix', '--chunk-size=2'))
+        self.assertEqual(Completion.objects.filter(user=self.other).count(), 5)
+        self.assertIn('일치합니다', self.check_owners())
+
+
+@override_settings(DATABASE_SHARDS=[])
+class CompletionUserMigrationTests(TransactionTestCase):
+    """0003_completion_user: 기존 완료 기록의 user 채우기"""
+
+    before = [('completions', '0002_completion_archive')]
+    after = [('completions', '0003_completion_user')]
+
+    def migrate(self, targets):
+        """targets 까지 마이그레이션하고 현재 적용된 상태의 apps 반환"""
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets)
+        loader = MigrationExecutor(connection).loader
+        return loader.project_state(list(loader.applied_migrations)).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_backfills_user_from_task_in_chunks(self):
+        apps = self.migrate(self.before)
+        User = apps.get_model('auth', 'User')
+        Task = apps.get_model('tasks', 'Task')
+        Completion = apps.get_model('completions', 'Completion')
+        owners = [User.objects.create(username=f'user{i}') for i in range(2)]
+        tasks = [Task.objects.create(user=owner, title='습관', task_type='daily') for owner in owners]
+        Completion.objects.bulk_create([
+            Completion(task=tasks[i % 2], completed_date=date.today() - timedelta(days=i), note='메모' if i == 0 else '')
+            for i in range(7)
+        ])
+
+        migration = importlib.import_module('completions.migrations.0003_completion_user')
+        with mock.patch.object(migration, 'BACKFILL_CHUNK_SIZE', 3):
+            apps = self.migrate(self.after)
+
+        Completion = apps.get_model('completions', 'Completion')
+        self.assertFalse(Completion.objects.filter(user__isnull=True).exists())
+        self.assertEqual(
+            set(Completion.objects.values_list('user_id', 'task__user_id').distinct()),
+            {(owners[0].id, owners[0].id), (owners[1].id, owners[1].id)}
+        )
+        # 테이블을 재생성한 뒤에도 검색 트리거가 남아 있다
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'search_%'")
+            self.assertEqual(cursor.fetchone()[0], 6)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class CompletionContentionTests(TestCase):
+    """동시 요청에 안전한 완료 처리/취소"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        cls.task = Task.objects.create(user=cls.user, title='습관', task_type='daily')
+
+    def test_double_tap_returns_existing_completion(self):
+        first, created = CompletionService.mark_complete(self.task, date.today(), '처음')
+        self.assertTrue(created)
+        second, created = CompletionService.mark_complete(self.task, date.today(), '두 번째')
+        self.assertFalse(created)
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(second.note, '처음')
+
+        CompletionService.delete_completion(first)
+        CompletionService.delete_completion(first)  # 이미 지워졌어도 오류 없음
+        self.assertFalse(Completion.objects.exists())
+
+
+@override_settings(DATABASE_SHARDS=[])
+class CompletionAnalyticsTests(TestCase):
+    """완료 패턴 분석"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        cls.today = date.today()
+        cls.task = Task.objects.create(user=cls.user, title='습관', task_type='daily')
+        cls.idle = Task.objects.create(user=cls.user, title='쉬는 습관', task_type='daily')
+        Task.objects.filter(user=cls.user).update(created_at=timezone.now() - timedelta(days=30))
+        # 최근 7일 중 4일은 9시, 3일은 21시에 완료
+        for days_ago in range(7):
+            hour = 9 if days_ago < 4 else 21
+            completion = Completion.objects.create(task=cls.task, completed_date=cls.today - timedelta(days=days_ago))
+            Completion.objects.filter(pk=completion.pk).update(completed_time=time(hour, 30), completed_hour=hour)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_heatmap_trend_and_consistency(self):
+        start = self.today - timedelta(days=13)
+        result = CompletionAnalyticsService.get_analytics(self.user, start, self.today, 'day')
+        self.assertEqual(result['total'], 7)
+        self.assertEqual((result['hours'][9], result['hours'][21]), (4, 3))
+        self.assertEqual(result['heatmap'][self.today.weekday()][9], 1)
+        self.assertEqual(sum(result['weekdays']), 7)
+
+        points = result['trend']['points']
+        self.assertEqual(len(points), 14)
+        self.assertEqual([point['completions'] for point in points], [0] * 7 + [1] * 7)
+        self.assertGreater(result['trend']['slope'], 0)
+
+        first, second = result['tasks']
+        self.assertEqual((first['task_id'], first['scheduled'], first['completed']), (self.task.id, 14, 7))
+        self.assertEqual(first['completion_rate'], 50.0)
+        self.assertEqual(first['hour_stddev'], 5.94)  # 9시 4번, 21시 3번
+        self.assertEqual(first['score'], 25.3)  # 100 x 0.5 x (1 - 5.94 / 12)
+        self.assertEqual((second['task_id'], second['completed'], second['score']), (self.idle.id, 0, 0.0))
+
+    def test_rollup_reads_covering_index(self):
+        completions = Completion.objects.filter(user=self.user, completed_date__range=(self.today, self.today))
+        query = completions.values_list('completed_date', 'completed_hour').annotate(n=Count('id')).order_by(
+            'completed_date', 'completed_hour'
+        ).query
+        with connection.cursor() as cursor:
+            sql, params = query.sql_with_params()
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(row[-1] for row in cursor.fetchall())
+        self.assertIn('COVERING INDEX completion_user_date_hour_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_api(self):
+        response = self.client.get(f'/api/completions/analytics/?task_id={self.task.id}&bucket=month')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 7)
+        self.assertEqual(response.data['trend']['bucket'], 'month')
+        self.assertEqual([task['task_id'] for task in response.data['tasks']], [self.task.id])
+
+        yesterday, long_ago = self.today - timedelta(days=1), self.today - timedelta(days=400)
+        for query in ('bucket=year', 'start_date=2024-13-01', f'start_date={self.today}&end_date={yesterday}',
+                      f'start_date={long_ago}&end_date={self.today}'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/completions/analytics/?{query}').status_code, 400)
+
+        other = Task.objects.create(user=User.objects.create_user('other'), title='남의 습관', task_type='daily')
+        self.assertEqual(self.client.get(f'/api/completions/analytics/?task_id={other.id}').status_code, 404)
+
+
+@mock.patch('config.contention.time.sleep')
+class RetryOnLockTests(SimpleTestCase):
+    """잠금 오류 재시도"""
+
+    def test_retries_lock_errors_only(self, sleep):
+        calls = []
+
+        @retry_on_lock(attempts=3)
+        def write(error):
+            calls.append(error)
+            if len(calls) < 3:
+                raise OperationalError(error)
+            return 'ok'
+
+        self.assertEqual(write('database is locked'), 'ok')
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(sleep.call_count, 2)
+
+        calls.clear()
+        with self.assertRaises(OperationalError):
+            write('no such table: tasks_task')
+        self.assertEqual(len(calls), 1)
+
+
+class SingleFlightTests(SimpleTestCase):
+    """같은 인자의 동시 계산 묶기"""
+
+    def test_concurrent_callers_share_one_computation(self):
+        flight = singleflight.SingleFlight(ttl=60)
+        started, release, calls, results = threading.Event(), threading.Event(), [], []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {'value': 1}
+
+        threads = [threading.Thread(target=lambda: results.append(flight.do('key', compute))) for _ in range(5)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_ttl_forget_and_errors(self):
+        flight = singleflight.SingleFlight(ttl=2)
+        now = [100.0]
+        flight.now = lambda: now[0]
+        self.assertEqual(flight.do('key', lambda: 1, tags=('7',)), 1)
+        self.assertEqual(flight.do('key', lambda: 2, tags=('7',)), 1)
+        now[0] += 2
+        self.assertEqual(flight.do('key', lambda: 3, tags=('7',)), 3)
+        flight.forget('7')
+        self.assertEqual(flight.do('key', lambda: 4, tags=('7',)), 4)
+
+        # 예외는 기다리던 호출에만 전달하고 재사용하지 않는다
+        with self.assertRaises(ZeroDivisionError):
+            flight.do('error', lambda: 1 / 0)
+        self.assertEqual(flight.do('error', lambda: 5), 5)
+
+    def test_event_loop_callers_share_one_task(self):
+        flight = singleflight.AsyncSingleFlight(ttl=0)
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        async def main():
+            waiters = [asyncio.ensure_future(flight.do('key', compute)) for _ in range(5)]
+            await asyncio.sleep(0)
+            waiters[0].cancel()  # 먼저 부른 요청이 끊겨도 계산은 계속된다
+            results = await asyncio.gather(*waiters[1:])
+            return results, await flight.do('key', compute)
+
+        results, after = asyncio.run(main())
+        self.assertEqual(results, [1, 1, 1, 1])
+        self.assertEqual(after, 2)  # ttl=0 이면 끝난 결과는 재사용하지 않음
+
+
+@override_settings(DATABASE_SHARDS=[])
+class StatsCoalescingTests(TestCase):
+    """통계 조회 결과 재사용과 완료 처리 후 무효화"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        cls.task = Task.objects.create(user=cls.user, title='습관', task_type='daily')
+
+    def setUp(self):
+        singleflight.clear()
+        self.addCleanup(singleflight.clear)
+
+    def test_repeated_stats_reuse_result_until_completion_commits(self):
+        stats = CompletionService.get_weekly_stats(self.task.id, user=self.user)
+        self.assertEqual(stats['completed_days'], 0)
+        with self.assertNumQueries(0):
+            self.assertIs(CompletionService.get_weekly_stats(str(self.task.id), user=self.user), stats)
+
+        # 다른 사용자는 결과를 공유하지 않는다
+        other = User.objects.create_user('other')
+        with self.assertRaises(Task.DoesNotExist):
+            CompletionService.get_weekly_stats(self.task.id, user=other)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            completion, _ = CompletionService.mark_complete(self.task)
+        self.assertEqual(CompletionService.get_weekly_stats(self.task.id, user=self.user)['completed_days'], 1)
+        self.assertEqual(CompletionService.get_streak(self.task.id, user=self.user), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CompletionService.delete_completion(completion)
+        self.assertEqual(CompletionService.get_streak(self.task.id, user=self.user), 0)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class CompletionWriteBehindTests(TestCase):
+    """완료 기록 쓰기 지연 (저널 기록 후 묶어서 반영)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        cls.task = Task.objects.create(user=cls.user, title='습관', task_type='daily')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        # 백그라운드 스레드 없이 flush() 를 직접 호출
+        self.queue = writebehind.CompletionWriteBehind(self.directory)
+        self.addCleanup(self.queue.journal.close)
+
+    def test_mark_complete_is_journaled_then_flushed_in_one_batch(self):
+        days = [date.today() - timedelta(days=day) for day in range(3)]
+        for day in days:
+            completion, created = self.queue.mark_complete(self.task, day, '메모')
+            self.assertTrue(created)
+            self.assertIsNone(completion.id)
+
+        # 반영 전에도 중복 완료는 막는다
+        _, created = self.queue.mark_complete(self.task, days[0])
+        self.assertFalse(created)
+        self.assertTrue(self.queue.has_pending(self.user.id))
+        self.assertFalse(Completion.objects.exists())
+
+        self.assertEqual(self.queue.flush(), 3)
+        self.assertFalse(self.queue.has_pending(self.user.id))
+        self.assertEqual(
+            sorted(Completion.objects.filter(user=self.user).values_list('completed_date', flat=True)),
+            sorted(days),
+        )
+        _, created = self.queue.mark_complete(self.task, days[0])
+        self.assertFalse(created)
+
+    def test_crash_recovery_replays_unflushed_journal(self):
+        flushed_day = date.today() - timedelta(days=1)
+        self.queue.mark_complete(self.task, flushed_day)
+        self.queue.flush()
+        self.queue.mark_complete(self.task, date.today(), '반영 전')
+        # 마지막 줄을 쓰는 도중에 죽은 경우
+        with open(self.queue.journal.path, 'ab') as file:
+            file.write(b'{"db": "default", "task_id"')
+
+        # 반영하지 않고 프로세스가 죽음 (파일이 닫히며 잠금이 풀림)
+        self.queue.journal.close()
+        Completion.objects.filter(completed_date=flushed_day).delete()
+
+        recovered = writebehind.CompletionWriteBehind(self.directory)
+        self.addCleanup(recovered.journal.close)
+
+        # 체크포인트 이후 기록만 다시 넣고, 복구한 저널은 지운다
+        self.assertEqual(
+            list(Completion.objects.values_list('completed_date', 'note')),
+            [(date.today(), '반영 전')],
+        )
+        self.assertFalse(self.queue.journal.path.exists())
+        self.assertTrue(recovered.journal.path.exists())
+
+    def test_replaying_flushed_entries_does_not_repeat_events(self):
+        Webhook.objects.create(user=self.user, url='http://127.0.0.1:9/hook')
+        today, yesterday = date.today(), date.today() - timedelta(days=1)
+        self.queue.mark_complete(self.task, yesterday)
+        entries = list(self.queue.journal.entries())
+        self.queue.flush()
+        self.queue.mark_complete(self.task, today)
+        entries += self.queue.journal.entries()
+
+        # 체크포인트를 쓰기 전에 죽어 반영한 기록까지 다시 넣는 경우 (같은 기록이 두 번 들어 있어도 한 번만)
+        self.assertEqual(writebehind._insert(entries + entries), 1)
+
+        self.assertEqual(Completion.objects.filter(task=self.task).count(), 2)
+        created = OutboxEvent.objects.filter(event_type='completion.created')
+        self.assertEqual(sorted(str(e.payload['completed_date']) for e in created), [str(yesterday), str(today)])
+
+    def test_live_journal_is_not_replayed(self):
+        self.queue.mark_complete(self.task, date.today())
+        other = writebehind.CompletionWriteBehind(self.directory)
+        self.addCleanup(other.journal.close)
+        self.assertFalse(Completion.objects.exists())
+        self.assertTrue(self.queue.journal.path.exists())
+
+    @override_settings(COMPLETION_WRITE_BEHIND=True)
+    def test_api_reads_see_own_pending_writes(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with mock.patch.object(writebehind, '_queue', self.queue):
+            response = client.post('/api/completions/', {'task_id': self.task.id}, format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertTrue(self.queue.has_pending(self.user.id))
+
+            response = client.get(f'/api/completions/check/?task_id={self.task.id}')
+            self.assertTrue(response.data['is_completed_today'])
+            self.assertFalse(self.queue.has_pending(self.user.id))
+
+
+@override_settings(DATABASE_SHARDS=[])
+class LeaderboardTests(TestCase):
+    """연속 달성 순위표"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = [User.objects.create_user(name) for name in ('alice', 'bob', 'carol')]
+        cls.tasks = [Task.objects.create(user=user, title='습관', task_type='daily') for user in cls.users]
+        for user in cls.users[:2]:
+            UserSetting.objects.create(user=user, leaderboard_opt_in=True)
+
+    def setUp(self):
+        reset_leaderboard_store()
+        self.addCleanup(reset_leaderboard_store)
+        self.today = date.today()
+
+    def complete(self, task, days_ago):
+        with self.captureOnCommitCallbacks(execute=True):
+            return CompletionService.mark_complete(task, self.today - timedelta(days=days_ago))
+
+    def test_ranked_set(self):
+        ranked = RankedSet()
+        for member, score in [(1, 5), (2, 9), (3, 5), (4, 1)]:
+            ranked.add(member, score)
+        ranked.add(4, 7)
+        self.assertEqual(ranked.top(3), [(1, 2, 9), (2, 4, 7), (3, 1, 5)])
+        self.assertEqual([ranked.rank(member) for member in (1, 2, 3, 4)], [3, 1, 3, 2])
+        ranked.discard(2)
+        self.assertEqual(ranked.rank(4), 1)
+        self.assertIsNone(ranked.rank(2))
+        self.assertEqual(len(ranked), 3)
+
+    def test_streak_updates_incrementally_and_matches_rebuild(self):
+        task = self.tasks[0]
+        for days_ago in (5, 4, 2, 1):
+            self.complete(task, days_ago)
+        stat = StreakStat.objects.get(task=task)
+        self.assertEqual((stat.current, stat.longest), (2, 2))
+
+        # 빠진 날을 채우면 구간이 이어진다
+        self.complete(task, 3)
+        stat.refresh_from_db()
+        self.assertEqual((stat.current, stat.longest, stat.last_date), (5, 5, self.today - timedelta(days=1)))
+
+        # 완료 취소는 다시 계산
+        completion = Completion.objects.get(task=task, completed_date=self.today - timedelta(days=2))
+        with self.captureOnCommitCallbacks(execute=True):
+            CompletionService.delete_completion(completion)
+        stat.refresh_from_db()
+        self.assertEqual((stat.current, stat.longest), (1, 3))
+
+        # 어제까지 완료하지 않으면 날짜 변경 때 끊긴다
+        self.assertEqual(LeaderboardService.rollover(self.today), 0)
+        self.assertEqual(LeaderboardService.rollover(self.today + timedelta(days=1)), 1)
+        stat.refresh_from_db()
+        self.assertEqual((stat.current, stat.longest), (0, 3))
+
+        incremental = list(StreakStat.objects.values_list('task_id', 'current', 'longest', 'last_date'))
+        LeaderboardService.rebuild(self.today + timedelta(days=1))
+        self.assertEqual(list(StreakStat.objects.values_list('task_id', 'current', 'longest', 'last_date')), incremental)
+
+    def test_recompute_and_rebuild_include_archived_completions(self):
+        task = self.tasks[0]
+        for days_ago in range(9, 0, -1):
+            self.complete(task, days_ago)
+        # 6일 전까지는 보관 테이블로 옮겨진다
+        with override_settings(COMPLETION_ARCHIVE_AFTER_DAYS=0):
+            CompletionArchiveService.archive_old(today=self.today - timedelta(days=5))
+        self.assertEqual(Completion.objects.filter(task=task).count(), 5)
+
+        completion = Completion.objects.get(task=task, completed_date=self.today - timedelta(days=3))
+        with self.captureOnCommitCallbacks(execute=True):
+            CompletionService.delete_completion(completion)
+        stat = StreakStat.objects.get(task=task)
+        self.assertEqual((stat.current, stat.longest), (2, 6))
+
+        incremental = list(StreakStat.objects.values_list('task_id', 'current', 'longest', 'last_date'))
+        LeaderboardService.rebuild(self.today)
+        self.assertEqual(list(StreakStat.objects.values_list('task_id', 'current', 'longest', 'last_date')), incremental)
+
+    def test_leaderboard_ranks_opted_in_users(self):
+        alice, bob, carol = self.tasks
+        for days_ago in range(3):
+            self.complete(alice, days_ago)
+            self.complete(carol, days_ago)
+        self.complete(bob, 0)
+
+        client = APIClient()
+        client.force_authenticate(self.users[1])
+        response = client.get('/api/completions/leaderboard/?task_type=daily&metric=current')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(
+            [(entry['rank'], entry['username'], entry['score']) for entry in response.data['top']],
+            [(1, 'alice', 3), (2, 'bob', 1)],
+        )
+        self.assertEqual(response.data['me'], {'rank': 2, 'score': 1})
+
+        # 참여한 뒤 완료하면 저장소에 바로 반영된다
+        client.force_authenticate(self.users[2])
+        client.patch('/api/users/me/settings/', {'leaderboard_opt_in': True}, format='json')
+        self.complete(bob, 1)
+        response = client.get('/api/completions/leaderboard/?limit=1')
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['top'][0]['rank'], 1)
+        self.assertEqual(response.data['me'], {'rank': 1, 'score': 3})
+        self.assertEqual(client.get('/api/completions/leaderboard/?metric=best').status_code, 400)
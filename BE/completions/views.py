@@ -2,27 +2,57 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from drf_spectacular.utils import extend_schema, OpenApiParameter
-from datetime import date
+from django.conf import settings
+from drf_spectacular.utils import OpenApiParameter
+from config.schema import extend_schema
+from config.idempotency import idempotency_key_parameter, idempotent
+from config.renderers import compact_renderer_classes
+from config.sharding import ShardedViewMixin
+from datetime import date, timedelta
 from .models import Completion
 from tasks.models import Task
 from .serializers import (
     CompletionSerializer,
     CompletionCreateSerializer,
     CompletionStatsSerializer,
-    MonthlyStatsSerializer
+    MonthlyStatsSerializer,
+    LeaderboardSerializer,
+    CompletionAnalyticsSerializer
 )
-from .services import CompletionService
+from .leaderboard import METRICS
+from .services import ArchivedCompletionError, CompletionAnalyticsService, CompletionService, LeaderboardService
+from .writebehind import PendingCompletionsMixin
 
 
-class CompletionViewSet(viewsets.ModelViewSet):
+# CompletionSerializer 가 쓰는 Completion 컬럼
+COMPLETION_FIELDS = ('id', 'task_id', 'completed_date', 'completed_time', 'note', 'created_at')
+
+NOT_FOUND_MESSAGE = '해당 할 일을 찾을 수 없습니다.'
+
+
+class CompletionViewSet(ShardedViewMixin, PendingCompletionsMixin, viewsets.ModelViewSet):
     """완료 기록 ViewSet"""
     permission_classes = [IsAuthenticated]
+    renderer_classes = compact_renderer_classes()
+    throttle_scope = 'completions'
+    # 통계/히스토리는 기간만큼 읽으므로 토큰을 더 쓴다
+    throttle_costs = {'streak': 3, 'history': 2, 'weekly_stats': 2, 'monthly_stats': 2, 'analytics': 3}
     serializer_class = CompletionSerializer
 
     def get_queryset(self):
-        """사용자의 완료 기록만 조회"""
-        return Completion.objects.filter(task__user=self.request.user)
+        """사용자의 완료 기록만 조회
+
+        소유자는 비정규화된 user 컬럼으로 거르고(할 일 JOIN 없이 completion_user_date_hour_idx 사용),
+        task JOIN 은 Serializer 의 task_title/task_type 을 같은 쿼리에서 읽기 위해서만 남긴다
+        (prefetch 로 바꾸면 요청마다 쿼리가 하나 늘어난다).
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return Completion.objects.none()
+        return (
+            Completion.objects.using(self.shard).filter(user=self.request.user)
+            .select_related('task')
+            .only(*COMPLETION_FIELDS, 'task__id', 'task__title', 'task__task_type')
+        )
 
     @extend_schema(
         tags=['Completions'],
@@ -48,19 +78,26 @@ class CompletionViewSet(viewsets.ModelViewSet):
         tags=['Completions'],
         summary='완료 처리',
         description='할 일을 완료 처리합니다.',
-        request=CompletionCreateSerializer
+        request=CompletionCreateSerializer,
+        parameters=[idempotency_key_parameter]
     )
+    @idempotent
     def create(self, request, *args, **kwargs):
         """완료 처리"""
         serializer = CompletionCreateSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
 
-        task_id = serializer.validated_data['task_id']
+        task = serializer.validated_data['task']
         completed_date = serializer.validated_data.get('completed_date', date.today())
         note = serializer.validated_data.get('note', '')
 
-        task = Task.objects.get(id=task_id, user=request.user)
-        completion, created = CompletionService.mark_complete(task, completed_date, note)
+        try:
+            completion, created = CompletionService.mark_complete(task, completed_date, note)
+        except ArchivedCompletionError:
+            return Response(
+                {'detail': '보관된 날짜의 완료 기록은 변경할 수 없습니다.'},
+                status=status.HTTP_409_CONFLICT
+            )
 
         if created:
             return Response(
@@ -88,6 +125,9 @@ class CompletionViewSet(viewsets.ModelViewSet):
         """완료 취소"""
         return super().destroy(request, *args, **kwargs)
 
+    def perform_destroy(self, instance):
+        CompletionService.delete_completion(instance)
+
     @extend_schema(
         tags=['Completions'],
         summary='오늘 완료 여부',
@@ -103,13 +143,11 @@ class CompletionViewSet(viewsets.ModelViewSet):
         if not task_id:
             return Response({'detail': 'task_id는 필수입니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 권한 확인
+        # 소유권 확인은 조회 쿼리에 포함
         try:
-            task = Task.objects.get(id=task_id, user=request.user)
+            is_completed = CompletionService.is_completed_on_date(task_id, user=request.user)
         except Task.DoesNotExist:
-            return Response({'detail': '해당 할 일을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
-
-        is_completed = CompletionService.is_completed_on_date(task_id)
+            return Response({'detail': NOT_FOUND_MESSAGE}, status=status.HTTP_404_NOT_FOUND)
 
         return Response({
             'task_id': task_id,
@@ -134,13 +172,11 @@ class CompletionViewSet(viewsets.ModelViewSet):
         if not task_id:
             return Response({'detail': 'task_id는 필수입니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 권한 확인
         try:
-            task = Task.objects.get(id=task_id, user=request.user)
+            completions = CompletionService.get_completion_history(task_id, days, user=request.user)
         except Task.DoesNotExist:
-            return Response({'detail': '해당 할 일을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'detail': NOT_FOUND_MESSAGE}, status=status.HTTP_404_NOT_FOUND)
 
-        completions = CompletionService.get_completion_history(task_id, days)
         serializer = CompletionSerializer(completions, many=True)
 
         return Response(serializer.data)
@@ -161,13 +197,11 @@ class CompletionViewSet(viewsets.ModelViewSet):
         if not task_id:
             return Response({'detail': 'task_id는 필수입니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 권한 확인
         try:
-            task = Task.objects.get(id=task_id, user=request.user)
+            stats = CompletionService.get_weekly_stats(task_id, user=request.user)
         except Task.DoesNotExist:
-            return Response({'detail': '해당 할 일을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
+            return Response({'detail': NOT_FOUND_MESSAGE}, status=status.HTTP_404_NOT_FOUND)
 
-        stats = CompletionService.get_weekly_stats(task_id)
         serializer = CompletionStatsSerializer(stats)
 
         return Response(serializer.data)
@@ -193,16 +227,14 @@ class CompletionViewSet(viewsets.ModelViewSet):
         if not task_id:
             return Response({'detail': 'task_id는 필수입니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 권한 확인
-        try:
-            task = Task.objects.get(id=task_id, user=request.user)
-        except Task.DoesNotExist:
-            return Response({'detail': '해당 할 일을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
-
         year = int(year) if year else None
         month = int(month) if month else None
 
-        stats = CompletionService.get_monthly_stats(task_id, year, month)
+        try:
+            stats = CompletionService.get_monthly_stats(task_id, year, month, user=request.user)
+        except Task.DoesNotExist:
+            return Response({'detail': NOT_FOUND_MESSAGE}, status=status.HTTP_404_NOT_FOUND)
+
         serializer = MonthlyStatsSerializer(stats)
 
         return Response(serializer.data)
@@ -222,15 +254,88 @@ class CompletionViewSet(viewsets.ModelViewSet):
         if not task_id:
             return Response({'detail': 'task_id는 필수입니다.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 권한 확인
         try:
-            task = Task.objects.get(id=task_id, user=request.user)
+            streak = CompletionService.get_streak(task_id, user=request.user)
         except Task.DoesNotExist:
-            return Response({'detail': '해당 할 일을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
-
-        streak = CompletionService.get_streak(task_id)
+            return Response({'detail': NOT_FOUND_MESSAGE}, status=status.HTTP_404_NOT_FOUND)
 
         return Response({
             'task_id': task_id,
             'streak': streak
         })
+
+    @extend_schema(
+        tags=['Completions'],
+        summary='완료 패턴 분석',
+        description=(
+            '기간 내 완료 기록의 요일 x 시간대 분포, 구간별 추이(day/week/month)와 기울기, '
+            '할 일별 꾸준함 점수(일정 대비 완료율 x 완료 시각 규칙성)를 조회합니다. 기간은 최대 366일입니다.'
+        ),
+        parameters=[
+            OpenApiParameter(name='start_date', type=date, description='시작일 (기본: 종료일 89일 전)', required=False),
+            OpenApiParameter(name='end_date', type=date, description='종료일 (기본: 오늘)', required=False),
+            OpenApiParameter(name='bucket', type=str, description='추이 구간 (기본: week)', required=False,
+                             enum=CompletionAnalyticsService.BUCKETS),
+            OpenApiParameter(name='task_id', type=int, description='특정 할 일만', required=False)
+        ],
+        responses={200: CompletionAnalyticsSerializer}
+    )
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """완료 패턴 분석"""
+        params = request.query_params
+        try:
+            start_date = date.fromisoformat(params['start_date']) if params.get('start_date') else None
+            end_date = date.fromisoformat(params['end_date']) if params.get('end_date') else None
+            task_id = int(params['task_id']) if params.get('task_id') else None
+        except ValueError:
+            return Response({'detail': '날짜는 YYYY-MM-DD, task_id는 숫자여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        bucket = params.get('bucket', 'week')
+        if bucket not in CompletionAnalyticsService.BUCKETS:
+            return Response({'detail': 'bucket은 day, week, month 중 하나입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        if end_date is None:
+            end_date = date.today()
+            if start_date is not None:
+                end_date = min(end_date, start_date + timedelta(days=CompletionAnalyticsService.MAX_DAYS - 1))
+        if start_date is None:
+            start_date = end_date - timedelta(days=CompletionAnalyticsService.DEFAULT_DAYS - 1)
+        if not 0 <= (end_date - start_date).days < CompletionAnalyticsService.MAX_DAYS:
+            return Response(
+                {'detail': f'종료일은 시작일부터 {CompletionAnalyticsService.MAX_DAYS}일 이내여야 합니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if task_id is not None and not Task.objects.filter(id=task_id, user=request.user).exists():
+            return Response({'detail': NOT_FOUND_MESSAGE}, status=status.HTTP_404_NOT_FOUND)
+
+        analytics = CompletionAnalyticsService.get_analytics(request.user, start_date, end_date, bucket, task_id)
+        return Response(CompletionAnalyticsSerializer(analytics).data)
+
+    @extend_schema(
+        tags=['Completions'],
+        summary='연속 달성 순위표',
+        description='순위표에 참여한 사용자(설정의 leaderboard_opt_in)의 할 일 타입별 연속 달성 순위와 내 순위를 조회합니다.',
+        parameters=[
+            OpenApiParameter(name='task_type', type=str, description='할 일 타입 (기본: daily)', required=False,
+                             enum=[value for value, _ in Task.TASK_TYPE_CHOICES]),
+            OpenApiParameter(name='metric', type=str, description='current(현재 연속) 또는 longest(최장 연속)',
+                             required=False, enum=METRICS),
+            OpenApiParameter(name='limit', type=int, description='상위 몇 명 (기본 10)', required=False)
+        ],
+        responses={200: LeaderboardSerializer}
+    )
+    @action(detail=False, methods=['get'])
+    def leaderboard(self, request):
+        """연속 달성 순위표"""
+        task_type = request.query_params.get('task_type', 'daily')
+        metric = request.query_params.get('metric', 'current')
+        if task_type not in dict(Task.TASK_TYPE_CHOICES):
+            return Response({'detail': '올바르지 않은 할 일 타입입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        if metric not in METRICS:
+            return Response({'detail': 'metric은 current 또는 longest입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), settings.LEADERBOARD_MAX_LIMIT)
+        except ValueError:
+            return Response({'detail': 'limit은 숫자여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        leaderboard = LeaderboardService.get_leaderboard(request.user, task_type, metric, limit)
+        return Response(LeaderboardSerializer(leaderboard).data)
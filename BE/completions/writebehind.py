@@ -0,0 +1,396 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import Counter, defaultdict
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections
+
+from config.contention import immediate_atomic
+from tasks.services import TaskService
+from webhooks.services import WebhookService, completion_payload
+
+from .models import Completion
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 자기 저널만 사용
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+def _lock(file):
+    """다른 프로세스가 쓰는 저널이 아니면 배타 잠금을 잡고 True"""
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+class CompletionJournal:
+    """완료 기록 쓰기 저널 (프로세스마다 파일 1개, JSON Lines)
+
+    append() 는 fsync 까지 마친 뒤 반환하므로 응답한 요청은 프로세스가 죽어도 남는다.
+    DB 에 반영된 위치는 .checkpoint 파일에 seq 로 기록하고, 살아 있는 프로세스는 자기 저널에
+    flock 을 잡고 있어서 잠글 수 있는 저널은 주인이 죽은 것으로 보고 복구한다.
+    """
+
+    def __init__(self, path, file=None):
+        self.path = Path(path)
+        self.checkpoint_path = self.path.with_suffix('.checkpoint')
+        self._file = file
+        self.last_seq = self.read_checkpoint()
+
+    @classmethod
+    def create(cls, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'journal-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl'
+        file = open(path, 'ab')
+        _lock(file)
+        return cls(path, file)
+
+    @classmethod
+    def orphans(cls, directory, exclude=None):
+        """주인 프로세스가 없는 저널 (잠금을 잡은 채로 반환)"""
+        for path in sorted(Path(directory).glob('journal-*.jsonl')):
+            if exclude is not None and path == exclude:
+                continue
+            file = open(path, 'ab')
+            if _lock(file):
+                yield cls(path, file)
+            else:
+                file.close()
+
+    def append(self, entry):
+        self.last_seq += 1
+        entry['seq'] = self.last_seq
+        self._file.write(json.dumps(entry, ensure_ascii=False).encode() + b'\n')
+        self._file.flush()
+        if settings.COMPLETION_JOURNAL_FSYNC:
+            os.fsync(self._file.fileno())
+        return entry
+
+    def entries(self):
+        """체크포인트 이후 항목 (마지막 줄이 쓰다 만 줄이면 무시)"""
+        checkpoint = self.read_checkpoint()
+        with open(self.path, 'rb') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logger.warning('완료 기록 저널의 손상된 줄을 건너뜀: %s', self.path)
+                    continue
+                if entry['seq'] > checkpoint:
+                    yield entry
+
+    def read_checkpoint(self):
+        try:
+            return int(self.checkpoint_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def checkpoint(self, seq):
+        """seq 까지 DB 에 반영됨을 기록 (임시 파일에 쓰고 교체)"""
+        tmp = self.checkpoint_path.with_suffix('.tmp')
+        with open(tmp, 'w') as file:
+            file.write(str(seq))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, self.checkpoint_path)
+
+    def truncate(self):
+        """모두 반영된 저널을 비운다 (seq 는 이어서 증가)"""
+        self._file.truncate(0)
+
+    def size(self):
+        return self._file.tell()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self.checkpoint_path.unlink(missing_ok=True)
+
+
+def _record_streaks(completions, alias):
+    """반영한 완료 기록을 연속 달성 기록에 반영 (이미 있던 기록이면 다시 계산만 됨)"""
+    from .services import LeaderboardService
+
+    for completion in sorted(completions, key=lambda c: (c.task_id, c.completed_date)):
+        LeaderboardService.record_completion(completion.task_id, completion.user_id, completion.completed_date, alias)
+
+
+def _forget_stats(completions, alias):
+    """커밋되면 반영한 할 일의 통계 결과를 버린다"""
+    from .services import CompletionService
+
+    for task_id in {completion.task_id for completion in completions}:
+        CompletionService.forget_stats_on_commit(task_id, alias)
+
+
+def _record_events(completions, alias):
+    """completion.created 이벤트 기록 (_apply 가 새로 넣은 기록만 넘긴다)"""
+    WebhookService.record_many(
+        [(completion.user_id, 'completion.created', completion_payload(completion)) for completion in completions], alias
+    )
+
+
+def _new_completions(completions, alias):
+    """DB 에 아직 없는 완료 기록만 (같은 (task_id, completed_date) 는 첫 기록만 남김)
+
+    쓰기 잠금을 잡은 트랜잭션에서 호출하므로 확인한 뒤 넣기 전까지 다른 프로세스가 끼어들지 않는다.
+    """
+    existing = set(
+        Completion.objects.using(alias).filter(
+            task_id__in={c.task_id for c in completions},
+            completed_date__in={c.completed_date for c in completions},
+        ).values_list('task_id', 'completed_date')
+    )
+    created = []
+    for completion in completions:
+        key = (completion.task_id, completion.completed_date)
+        if key not in existing:
+            existing.add(key)
+            created.append(completion)
+    return created
+
+
+def _apply(completions, alias):
+    """새 완료 기록만 넣고 연속 기록/다음 일정일/통계/이벤트에 반영. 넣은 수 반환"""
+    with immediate_atomic(alias):
+        created = _new_completions(completions, alias)
+        if not created:
+            return 0
+        Completion.objects.using(alias).bulk_create(created)
+        _record_streaks(created, alias)
+        TaskService.refresh_occurrences({c.task_id for c in created}, alias)
+        _forget_stats(created, alias)
+        _record_events(created, alias)
+    return len(created)
+
+
+def _insert(entries):
+    """저널 항목을 DB 별로 묶어 반영. 이미 있는 기록은 건너뛰므로 다시 실행해도 기록과 이벤트가 중복되지 않는다
+
+    반환값: 새로 넣은 기록 수
+    """
+    by_db = defaultdict(list)
+    for entry in entries:
+        by_db[entry['db']].append(Completion(
+            task_id=entry['task_id'],
+            user_id=entry['user_id'],
+            completed_date=date.fromisoformat(entry['completed_date']),
+            note=entry['note'],
+        ))
+    inserted = 0
+    for alias, completions in by_db.items():
+        try:
+            inserted += _apply(completions, alias)
+        except IntegrityError:
+            # 그 사이 할 일이 삭제된 기록이 섞여 있으면 한 건씩 넣고 실패한 기록은 버린다
+            for completion in completions:
+                try:
+                    inserted += _apply([completion], alias)
+                except IntegrityError:
+                    logger.warning(
+                        '완료 기록 반영 불가로 버림: task=%s date=%s', completion.task_id, completion.completed_date
+                    )
+    return inserted
+
+
+def replay_orphans(directory, exclude=None):
+    """죽은 프로세스의 저널에서 DB 에 반영되지 않은 기록을 넣고 저널을 지운다. 넣은 항목 수 반환"""
+    replayed = 0
+    for journal in CompletionJournal.orphans(directory, exclude=exclude):
+        replayed += _insert(list(journal.entries()))
+        journal.remove()
+    return replayed
+
+
+class CompletionWriteBehind:
+    """완료 기록 쓰기 지연(write-behind) 큐
+
+    - mark_complete() 는 저널에 fsync 한 뒤 바로 반환하고, 백그라운드 스레드가
+      COMPLETION_FLUSH_INTERVAL_MS 마다 모인 기록을 DB 별 bulk_create 트랜잭션 하나로 넣는다
+    - 반영 전 기록은 같은 프로세스의 중복 완료 확인에 쓰이고, 사용자가 다른 요청을 보내면
+      flush_for_user() 로 먼저 반영해 자신이 쓴 기록을 읽을 수 있게 한다
+    - 시작할 때 죽은 프로세스의 저널을 복구한다
+    """
+
+    def __init__(self, directory, interval=0.005, batch_size=500):
+        self.directory = Path(directory)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.journal = CompletionJournal.create(self.directory)
+        replay_orphans(self.directory, exclude=self.journal.path)
+
+        self._pending = {}  # (db, task_id, completed_date) -> 저널 항목
+        self._pending_users = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        """백그라운드 반영 스레드 시작"""
+        self._thread = threading.Thread(target=self._run, name='completion-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def mark_complete(self, task, completed_date, note=''):
+        """(Completion, created) 반환. 새 기록은 id 가 없는 저장 전 인스턴스"""
+        alias = task._state.db or DEFAULT_DB_ALIAS
+        key = (alias, task.id, completed_date.isoformat())
+
+        with self._lock:
+            entry = self._pending.get(key)
+        if entry is not None:
+            return self._completion(task, entry), False
+
+        existing = Completion.objects.using(alias).filter(task=task, completed_date=completed_date).first()
+        if existing is not None:
+            return existing, False
+
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is not None:
+                return self._completion(task, entry), False
+            entry = self.journal.append({
+                'db': alias,
+                'task_id': task.id,
+                'user_id': task.user_id,
+                'completed_date': key[2],
+                'note': note,
+            })
+            self._pending[key] = entry
+            self._pending_users[task.user_id] += 1
+
+        self._wakeup.set()
+        return self._completion(task, entry), True
+
+    @staticmethod
+    def _completion(task, entry):
+        return Completion(
+            task=task,
+            user_id=entry['user_id'],
+            completed_date=date.fromisoformat(entry['completed_date']),
+            note=entry['note'],
+        )
+
+    def has_pending(self, user_id):
+        return self._pending_users[user_id] > 0
+
+    def flush_for_user(self, user_id):
+        """사용자의 반영 전 기록이 있으면 바로 반영"""
+        if self.has_pending(user_id):
+            self.flush()
+
+    def flush(self):
+        """반영 전 기록을 batch_size 개씩 DB 에 넣고 체크포인트를 기록. 넣은 항목 수 반환"""
+        flushed = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = sorted(self._pending.values(), key=lambda e: e['seq'])[:self.batch_size]
+                if not batch:
+                    break
+                _insert(batch)
+                flushed += len(batch)
+
+                with self._lock:
+                    for entry in batch:
+                        self._pending.pop((entry['db'], entry['task_id'], entry['completed_date']), None)
+                        self._pending_users[entry['user_id']] -= 1
+                    self._pending_users += Counter()  # 0 이하 제거
+                    remaining = min((e['seq'] for e in self._pending.values()), default=self.journal.last_seq + 1)
+                    self.journal.checkpoint(remaining - 1)
+                    if not self._pending and self.journal.size() > settings.COMPLETION_JOURNAL_MAX_BYTES:
+                        self.journal.truncate()
+        return flushed
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            # 짧게 기다려서 그동안 들어온 기록을 한 트랜잭션으로 묶는다
+            threading.Event().wait(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                # DB 잠금 등으로 실패하면 저널에 남아 있으므로 다음 주기에 다시 시도
+                logger.exception('완료 기록 반영 실패')
+                connections.close_all()
+                self._wakeup.set()
+                threading.Event().wait(max(self.interval, 0.5))
+
+    def close(self):
+        """남은 기록을 반영하고 스레드/저널 정리"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+        if not self._pending:
+            self.journal.remove()
+        else:
+            self.journal.close()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_write_behind():
+    """COMPLETION_WRITE_BEHIND 가 켜져 있을 때 쓰는 프로세스당 1개의 큐"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                queue = CompletionWriteBehind(
+                    settings.COMPLETION_JOURNAL_DIR,
+                    interval=settings.COMPLETION_FLUSH_INTERVAL_MS / 1000,
+                    batch_size=settings.COMPLETION_FLUSH_BATCH_SIZE,
+                )
+                queue.start()
+                _queue = queue
+    return _queue
+
+
+def reset_write_behind():
+    """큐를 반영 후 버리고 다음 호출 때 새로 생성 (설정 변경, 테스트용)"""
+    global _queue
+    with _queue_lock:
+        if _queue is not None:
+            _queue.close()
+        _queue = None
+
+
+class PendingCompletionsMixin:
+    """요청한 사용자의 반영 전 완료 기록을 먼저 DB 에 넣는 ViewSet 믹스인 (read-your-writes)
+
+    완료 처리(create) 자체는 큐에서 중복을 확인하므로 반영하지 않는다.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            _queue is not None
+            and request.user and request.user.is_authenticated
+            and getattr(self, 'action', None) != 'create'
+        ):
+            _queue.flush_for_user(request.user.pk)
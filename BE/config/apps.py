@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+
+
+class ConfigConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'config'
+    verbose_name = '프로젝트 공통'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save, pre_save
+
+        from . import sharding
+
+        User = get_user_model()
+        pre_save.connect(sharding.assign_shard_id, dispatch_uid='config.sharding.assign_shard_id')
+        post_save.connect(sharding.create_user_stub, sender=User, dispatch_uid='config.sharding.create_user_stub')
+        post_delete.connect(sharding.delete_user_shard_rows, sender=User, dispatch_uid='config.sharding.delete_user_shard_rows')
@@ -0,0 +1,69 @@
+import logging
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+LOCK_ERROR_MESSAGES = ('database is locked', 'database table is locked', 'database is busy')
+
+
+def is_lock_error(exc):
+    """다른 연결의 쓰기 잠금 때문에 실패한 경우 (다시 시도하면 성공할 수 있음)"""
+    return isinstance(exc, OperationalError) and any(message in str(exc) for message in LOCK_ERROR_MESSAGES)
+
+
+@contextmanager
+def immediate_atomic(using=None):
+    """쓰기 잠금을 먼저 잡고 시작하는 트랜잭션 (SQLite BEGIN IMMEDIATE)
+
+    SQLite 의 기본(DEFERRED) 트랜잭션은 읽은 뒤 쓰기로 올라갈 때 다른 연결이 쓰는 중이면
+    busy timeout 을 기다리지 않고 바로 'database is locked' 가 난다. 처음부터 쓰기 잠금을
+    요청하면 잠금 대기가 트랜잭션 시작 시점 한 곳으로 모인다.
+    바깥 트랜잭션 안에서 부르면 일반 atomic(세이브포인트)과 같다. 다른 DB 도 일반 atomic 과 같다.
+    """
+    alias = using or DEFAULT_DB_ALIAS
+    connection = connections[alias]
+    outermost = not connection.in_atomic_block
+    with transaction.atomic(using=alias):
+        if outermost and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                # atomic 이 실행한 BEGIN(DEFERRED) 은 아직 아무것도 하지 않았으므로 IMMEDIATE 로 다시 시작
+                if connection.connection.in_transaction:
+                    cursor.execute('ROLLBACK')
+                cursor.execute('BEGIN IMMEDIATE')
+        yield
+
+
+def retry_on_lock(func=None, *, attempts=None):
+    """잠금 오류가 나면 지터를 준 지수 백오프로 다시 실행하는 데코레이터
+
+    최대 DB_LOCK_RETRIES 번 다시 시도하고, n 번째 대기는 0 ~ min(DB_LOCK_RETRY_MAX_MS, DB_LOCK_RETRY_BASE_MS * 2**n)
+    사이의 임의 시간(full jitter)이다. 바깥 트랜잭션 안에서는 트랜잭션이 이미 깨졌으므로 다시 시도하지 않는다.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            retries = settings.DB_LOCK_RETRIES if attempts is None else attempts
+            for attempt in range(retries + 1):
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as exc:
+                    if (
+                        attempt == retries
+                        or not is_lock_error(exc)
+                        or any(connection.in_atomic_block for connection in connections.all(initialized_only=True))
+                    ):
+                        raise
+                    delay = min(settings.DB_LOCK_RETRY_MAX_MS, settings.DB_LOCK_RETRY_BASE_MS * 2 ** attempt)
+                    logger.debug('%s: DB 잠금으로 재시도 (%d/%d)', func.__qualname__, attempt + 1, retries)
+                    time.sleep(random.uniform(0, delay) / 1000)
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import status
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# 처리 중인 요청 표시
+PENDING = 'pending'
+
+idempotency_key_parameter = OpenApiParameter(
+    name=IDEMPOTENCY_HEADER,
+    type=str,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description='재시도해도 한 번만 처리할 요청의 고유 키 (같은 키로 다시 보내면 저장된 응답을 반환)'
+)
+
+
+class LocalIdempotencyStore:
+    """프로세스 메모리 저장소 (워커가 하나일 때만)
+
+    워커마다 따로 가지므로 재시도가 다른 워커로 가면 중복 처리된다.
+    WEB_CONCURRENCY 가 2 이상이면 만들 때 ImproperlyConfigured.
+    항목 수는 IDEMPOTENCY_MAX_ENTRIES 를 넘지 않고(오래된 것부터 제거),
+    IDEMPOTENCY_TTL 이 지난 항목은 조회할 때 버린다.
+    """
+
+    def __init__(self):
+        if settings.WEB_CONCURRENCY > 1:
+            raise ImproperlyConfigured(
+                f'LocalIdempotencyStore 는 워커 {settings.WEB_CONCURRENCY}개가 공유할 수 없습니다. '
+                'IDEMPOTENCY_STORE 를 config.idempotency.CacheIdempotencyStore 로 설정하세요.'
+            )
+        self.max_entries = settings.IDEMPOTENCY_MAX_ENTRIES
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def add(self, key, value, timeout):
+        """키가 없을 때만 저장하고 성공 여부를 반환"""
+        with self._lock:
+            if self.get(key) is not None:
+                return False
+            self._set(key, value, timeout)
+            return True
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._set(key, value, timeout)
+
+    def _set(self, key, value, timeout):
+        self._entries[key] = (time.monotonic() + timeout, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class CacheIdempotencyStore:
+    """Django 캐시 저장소 (여러 프로세스/서버가 공유, 기본값)
+
+    IDEMPOTENCY_CACHE_ALIAS 캐시의 add() 가 원자적이어야 한다 (DB/Redis/Memcached, LocMem 은 프로세스별).
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.IDEMPOTENCY_CACHE_ALIAS]
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def add(self, key, value, timeout):
+        return self.cache.add(key, value, timeout)
+
+    def set(self, key, value, timeout):
+        self.cache.set(key, value, timeout)
+
+    def delete(self, key):
+        self.cache.delete(key)
+
+    def clear(self):
+        self.cache.clear()
+
+
+_store = None
+
+
+def get_idempotency_store():
+    """IDEMPOTENCY_STORE 설정에 지정된 저장소 (프로세스당 1개)"""
+    global _store
+    if _store is None:
+        _store = import_string(settings.IDEMPOTENCY_STORE)()
+    return _store
+
+
+def reset_idempotency_store():
+    """저장소를 버리고 다음 요청 때 새로 생성 (설정 변경, 테스트용)"""
+    global _store
+    _store = None
+
+
+def _fingerprint(request):
+    """같은 키로 다른 요청을 보냈는지 확인하기 위한 요청 본문 해시"""
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def idempotent(view_method):
+    """Idempotency-Key 헤더를 지원하는 뷰 메서드 데코레이터
+
+    - 같은 사용자가 같은 경로에 같은 키로 다시 보내면 뷰를 실행하지 않고 저장된 응답을 반환
+    - 같은 키로 다른 본문을 보내면 422, 첫 요청이 아직 처리 중이면 409
+    - 5xx 응답이나 예외는 저장하지 않으므로 다시 시도할 수 있다
+    - 처리 중 표시는 IDEMPOTENCY_PENDING_TTL 동안만 유지하고(워커가 죽어도 키가 막히지 않음),
+      완료한 응답만 IDEMPOTENCY_TTL 동안 보관한다
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response(
+                {'detail': f'{IDEMPOTENCY_HEADER} 는 {MAX_KEY_LENGTH}자 이하여야 합니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        store = get_idempotency_store()
+        store_key = f'idempotency:{request.user.pk}:{request.method}:{request.path}:{key}'
+        fingerprint = _fingerprint(request)
+
+        if not store.add(store_key, {'state': PENDING, 'fingerprint': fingerprint}, settings.IDEMPOTENCY_PENDING_TTL):
+            saved = store.get(store_key) or {}
+            if saved.get('fingerprint') != fingerprint:
+                return Response(
+                    {'detail': f'같은 {IDEMPOTENCY_HEADER} 로 다른 요청을 보낼 수 없습니다.'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            if saved.get('state') == PENDING:
+                return Response(
+                    {'detail': '같은 요청을 처리하고 있습니다. 잠시 후 다시 시도해 주세요.'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            response = Response(saved['data'], status=saved['status'])
+            response['Idempotent-Replayed'] = 'true'
+            return response
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            store.delete(store_key)
+            raise
+
+        if response.status_code >= 500:
+            store.delete(store_key)
+        else:
+            store.set(store_key, {
+                'state': 'done',
+                'fingerprint': fingerprint,
+                'status': response.status_code,
+                'data': response.data,
+            }, settings.IDEMPOTENCY_TTL)
+        return response
+
+    return wrapper
@@ -0,0 +1,73 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+# API 전용 미들웨어 도입 전의 기본 스택
+BASELINE_MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'config.middleware.CompressionMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+class Command(BaseCommand):
+    """기본 미들웨어 스택과 API 전용 스택의 요청당 오버헤드 비교
+
+    관리자 페이지에 로그인한 브라우저처럼 sessionid 쿠키를 함께 보내고,
+    측정용 데이터는 트랜잭션 안에서 만든 뒤 롤백합니다.
+    """
+    help = 'API 요청의 미들웨어 오버헤드 측정 (기본 스택 vs API 전용 스택)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='스택별 요청 수')
+        parser.add_argument('--path', default='/api/users/me/', help='측정할 API 경로')
+
+    def handle(self, *args, **options):
+        with override_settings(ALLOWED_HOSTS=['*']), transaction.atomic():
+            user = User.objects.create(username='__bench_middleware__', is_staff=True)
+            headers = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+            # 관리자 로그인 세션을 만들어 쿠키를 재사용
+            session_client = Client()
+            session_client.force_login(user)
+            cookies = session_client.cookies
+
+            results = {}
+            for label, middleware in (('baseline', BASELINE_MIDDLEWARE), ('api-only', settings.MIDDLEWARE)):
+                results[label] = self._measure(middleware, cookies, headers, options['path'], options['requests'])
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'{options["path"]} x {options["requests"]}')
+        self.stdout.write(f'  {"stack":<10}{"us/request":>12}{"queries/request":>18}')
+        for label, (per_request, queries) in results.items():
+            self.stdout.write(f'  {label:<10}{per_request * 1_000_000:>12.1f}{queries:>18.2f}')
+
+        baseline, api_only = results['baseline'][0], results['api-only'][0]
+        self.stdout.write(f'  절감: {(baseline - api_only) * 1_000_000:.1f} us/request ({1 - api_only / baseline:.1%})')
+
+    def _measure(self, middleware, cookies, headers, path, count):
+        with override_settings(MIDDLEWARE=middleware):
+            client = Client()
+            client.cookies = cookies
+            client.get(path, **headers)  # 미들웨어 체인 로드 및 워밍업
+
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                for _ in range(count):
+                    client.get(path, **headers)
+                elapsed = time.perf_counter() - started
+
+        return elapsed / count, len(captured.captured_queries) / count
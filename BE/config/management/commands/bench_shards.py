@@ -0,0 +1,136 @@
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.test.utils import override_settings
+
+from completions.models import Completion
+from completions.services import CompletionService
+from config.sharding import shard_for_user, use_shard
+from tasks.models import Task
+
+TEMPLATE_ALIAS = 'bench_template'
+
+
+class Command(BaseCommand):
+    """SQLite 샤드 수에 따른 동시 처리량 비교
+
+    임시 디렉터리에 마이그레이션한 SQLite 파일을 샤드 수만큼 복사해 쓰므로 실제 DB 는 건드리지 않는다.
+    사용자마다 스레드 하나가 완료 기록 쓰기 1번과 주간 통계 읽기 --reads 번을 반복한다.
+    샤드가 1개면 모든 사용자의 쓰기가 같은 파일 잠금을 기다린다.
+    """
+    help = 'SQLite 샤드 수별 완료 기록 쓰기/읽기 처리량 측정'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shards', type=int, nargs='+', default=[1, 4], help='비교할 샤드 수 목록')
+        parser.add_argument('--users', type=int, default=16, help='동시 사용자(스레드) 수')
+        parser.add_argument('--ops', type=int, default=100, help='사용자당 쓰기 횟수')
+        parser.add_argument('--reads', type=int, default=4, help='쓰기 1번당 읽기 횟수')
+
+    def handle(self, *args, **options):
+        workdir = Path(tempfile.mkdtemp(prefix='bench_shards_'))
+        try:
+            template = self._add_database(TEMPLATE_ALIAS, workdir / 'template.sqlite3')
+            call_command('migrate', database=TEMPLATE_ALIAS, verbosity=0)
+            self._remove_database(TEMPLATE_ALIAS)
+
+            self.stdout.write(
+                f"users={options['users']} ops/user={options['ops']} reads/op={options['reads']}"
+            )
+            self.stdout.write(f'  {"shards":>6}{"writes/s":>10}{"reads/s":>10}{"p50 ms":>9}{"p95 ms":>9}{"locked":>8}')
+            for count in options['shards']:
+                aliases = [f'bench_shard_{count}_{i}' for i in range(count)]
+                for alias in aliases:
+                    path = workdir / f'{alias}.sqlite3'
+                    shutil.copyfile(template, path)
+                    self._add_database(alias, path)
+                try:
+                    with override_settings(DATABASE_SHARDS=aliases):
+                        result = self._run(options)
+                finally:
+                    for alias in aliases:
+                        self._remove_database(alias)
+                self.stdout.write(
+                    f"  {count:>6}{result['writes'] / result['seconds']:>10.0f}{result['reads'] / result['seconds']:>10.0f}"
+                    f"{result['p50'] * 1000:>9.1f}{result['p95'] * 1000:>9.1f}{result['locked']:>8}"
+                )
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    @staticmethod
+    def _add_database(alias, path):
+        connections.settings[alias] = {**connections.settings['default'], 'NAME': path}
+        return path
+
+    @staticmethod
+    def _remove_database(alias):
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+    def _run(self, options):
+        """사용자/할 일을 만들고 스레드를 동시에 시작해 처리량과 지연 시간을 잰다"""
+        tasks = []
+        for user_id in range(1, options['users'] + 1):
+            alias = shard_for_user(user_id)
+            User.objects.using(alias).create(id=user_id, username=f'__bench_shards_{user_id}__')
+            # 사용자가 default 에 없으므로 Task.save() 의 외래 키 검증을 거치지 않는 bulk_create 사용
+            tasks += Task.objects.using(alias).bulk_create([
+                Task(id=user_id, user_id=user_id, title='bench', task_type='daily')
+            ])
+
+        latencies, locked = [], [0]
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(tasks) + 1)
+
+        def worker(task):
+            local_latencies, local_locked = [], 0
+            # 완료 기록 id 는 사용자마다 겹치지 않는 범위에서 직접 지정 (default 의 ShardSequence 를 건드리지 않음)
+            first_id = task.id * 1_000_000
+            try:
+                with use_shard(shard_for_user(task.user_id)):
+                    barrier.wait()
+                    for i in range(options['ops']):
+                        started = time.perf_counter()
+                        try:
+                            Completion.objects.create(
+                                id=first_id + i, task_id=task.id, user_id=task.user_id,
+                                completed_date=date.today() - timedelta(days=i)
+                            )
+                            for _ in range(options['reads']):
+                                CompletionService.get_weekly_stats(task.id, date.today() - timedelta(days=i))
+                        except OperationalError:
+                            local_locked += 1
+                        local_latencies.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+            with lock:
+                latencies.extend(local_latencies)
+                locked[0] += local_locked
+
+        threads = [threading.Thread(target=worker, args=(task,)) for task in tasks]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - started
+
+        operations = len(tasks) * options['ops']
+        return {
+            'seconds': seconds,
+            'writes': operations - locked[0],
+            'reads': (operations - locked[0]) * options['reads'],
+            'p50': statistics.median(latencies),
+            'p95': statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0],
+            'locked': locked[0],
+        }
@@ -0,0 +1,89 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from rest_framework.request import Request
+from rest_framework.throttling import UserRateThrottle
+
+from config.throttling import (
+    CacheBucketStore,
+    LocalBucketStore,
+    ScopedTokenBucketThrottle,
+    UserTokenBucketThrottle,
+    reset_bucket_store,
+)
+
+
+class _View:
+    action = 'streak'
+    throttle_scope = 'completions'
+    throttle_costs = {'streak': 3}
+
+
+class Command(BaseCommand):
+    """스로틀 검사 1회당 오버헤드 측정
+
+    버킷이 비지 않도록 rate/burst 를 크게 잡고 같은 사용자로 반복 호출한다.
+    DRF 기본 UserRateThrottle(캐시에 요청 시각 목록 저장)과 비교한다.
+    """
+    help = '토큰 버킷 스로틀 검사 오버헤드 측정'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=100_000, help='측정할 검사 횟수')
+
+    def handle(self, *args, **options):
+        checks = options['checks']
+        buckets = {scope: {'rate': f'{checks * 10}/s', 'burst': checks * 10} for scope in ('user', 'anon', 'completions')}
+
+        user = User(id=1, username='__bench_throttle__')
+        request = Request(RequestFactory().get('/api/completions/streak/'))
+        request.user = user
+        anon_request = Request(RequestFactory().get('/api/users/login/'))
+        anon_request.user = AnonymousUser()
+        view = _View()
+
+        results = []
+        with override_settings(
+            THROTTLE_BUCKETS=buckets,
+            REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': {'user': f'{checks * 10}/day'}}
+        ):
+            for label, store_path in (('local', 'config.throttling.LocalBucketStore'),
+                                      ('cache', 'config.throttling.CacheBucketStore')):
+                with override_settings(THROTTLE_BUCKET_STORE=store_path):
+                    reset_bucket_store()
+                    store = LocalBucketStore() if label == 'local' else CacheBucketStore()
+                    results.append((f'{label} consume()', self._measure(
+                        lambda: store.consume('throttle:bench', checks * 10, checks * 10, 1), checks)))
+                    user_throttle = UserTokenBucketThrottle()
+                    results.append((f'{label} user throttle', self._measure(
+                        lambda: user_throttle.allow_request(request, view), checks)))
+                    results.append((f'{label} anon throttle', self._measure(
+                        lambda: user_throttle.allow_request(anon_request, view), checks)))
+                    scoped_throttle = ScopedTokenBucketThrottle()
+                    results.append((f'{label} scoped throttle', self._measure(
+                        lambda: scoped_throttle.allow_request(request, view), checks)))
+                    store.clear()
+
+            # DRF 기본 스로틀 (비교용)
+            # 요청 시각 목록을 통째로 읽고 쓰므로 목록이 길수록 느려진다
+            original_rates = UserRateThrottle.THROTTLE_RATES
+            UserRateThrottle.THROTTLE_RATES = {'user': f'{checks * 10}/day'}
+            drf_throttle = UserRateThrottle()
+            results.append(('drf UserRateThrottle', self._measure(
+                lambda: drf_throttle.allow_request(request, view), min(checks, 5_000))))
+            drf_throttle.cache.delete(drf_throttle.get_cache_key(request, view))
+            UserRateThrottle.THROTTLE_RATES = original_rates
+        reset_bucket_store()
+
+        self.stdout.write(f'{"":<26}{"us/check":>10}')
+        for label, seconds in results:
+            self.stdout.write(f'{label:<26}{seconds * 1_000_000:>10.2f}')
+
+    @staticmethod
+    def _measure(func, n):
+        started = time.perf_counter()
+        for _ in range(n):
+            func()
+        return (time.perf_counter() - started) / n
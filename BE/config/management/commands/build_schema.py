@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from config.schema import schema_path
+
+
+class Command(BaseCommand):
+    """OpenAPI 스키마를 정적 파일로 미리 생성
+
+    /api/schema/ 는 이 파일이 있으면 요청마다 스키마를 생성하지 않고 파일을 그대로 제공합니다.
+    배포 빌드 단계에서 한 번 실행하세요.
+    """
+    help = 'OpenAPI 스키마(yaml/json)를 PREBUILT_SCHEMA_DIR 에 생성'
+
+    def handle(self, *args, **options):
+        settings.PREBUILT_SCHEMA_DIR.mkdir(parents=True, exist_ok=True)
+
+        for fmt, renderer_format in (('yaml', 'openapi'), ('json', 'openapi-json')):
+            path = schema_path(fmt)
+            call_command('spectacular', format=renderer_format, file=str(path))
+            self.stdout.write(self.style.SUCCESS(f'{path} 생성 완료'))
@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from completions.models import Completion, CompletionArchive, StreakStat
+from config.sharding import all_databases, copy_rows, ensure_user_stubs, shard_for_user, sync_sequences
+from reminders.models import Reminder
+from tasks.models import Task
+from webhooks.models import OutboxEvent, Webhook
+
+
+class Command(BaseCommand):
+    """사용자의 할 일/완료 기록/알림/연속 기록/웹훅을 shard_for_user() 가 가리키는 DB 로 옮김
+
+    샤딩을 처음 켤 때(default 의 기존 데이터) 또는 DB_SHARD_COUNT 를 바꾼 뒤 실행한다.
+    먼저 모든 DB 에 migrate --database <별칭> 을 실행해 두어야 한다.
+
+    사용자마다 대상 DB 에 복사하고 커밋한 뒤 원본을 삭제한다. 중간에 멈추면 원본이 남아 있으므로
+    다시 실행하면 대상의 복사본을 지우고 처음부터 다시 복사한다.
+    옮기는 동안 해당 사용자의 요청은 새 샤드를 보므로 점검 시간에 실행한다.
+    """
+    help = '사용자 데이터를 해시 샤드로 재배치'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='특정 사용자(username)만 처리')
+        parser.add_argument('--dry-run', action='store_true', help='옮길 사용자만 출력')
+        parser.add_argument('--batch-size', type=int, default=500, help='자리 표시 사용자 행을 만들 때 한 번에 처리할 사용자 수')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"사용자를 찾을 수 없습니다: {options['user']}")
+
+        if not options['dry_run']:
+            created = 0
+            batch = []
+            for user in users.only('pk', 'username').iterator(chunk_size=options['batch_size']):
+                batch.append(user)
+                if len(batch) >= options['batch_size']:
+                    created += ensure_user_stubs(batch)
+                    batch = []
+            created += ensure_user_stubs(batch)
+            sync_sequences()
+            self.stdout.write(f'샤드 사용자 행 {created}개 생성')
+
+        user_ids = set(users.values_list('pk', flat=True)) if options['user'] else None
+        moved = 0
+        for source in all_databases():
+            owners = set(Task.objects.using(source).values_list('user_id', flat=True).distinct())
+            owners.update(Webhook.objects.using(source).values_list('user_id', flat=True).distinct())
+            for user_id in sorted(owners):
+                if user_ids is not None and user_id not in user_ids:
+                    continue
+                target = shard_for_user(user_id)
+                if target == source:
+                    continue
+                if options['dry_run']:
+                    self.stdout.write(f'  user={user_id}: {source} -> {target}')
+                else:
+                    counts = self.move_user(user_id, source, target)
+                    self.stdout.write(f'  user={user_id}: {source} -> {target} ' + ', '.join(
+                        f'{name} {count}' for name, count in counts.items()
+                    ))
+                moved += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{moved}명 {"이동 예정" if options["dry_run"] else "이동"}'))
+
+    @staticmethod
+    def move_user(user_id, source, target):
+        """한 사용자의 행을 target 에 복사하고 source 에서 삭제 (id, 생성 시각 등은 그대로)"""
+        tasks = Task.objects.using(source).filter(user_id=user_id)
+        task_ids = list(tasks.values_list('id', flat=True))
+
+        with transaction.atomic(using=target):
+            # 이전 실행이 중간에 멈춰 남은 복사본 정리 (CASCADE 로 완료 기록/보관/알림/연속 기록도 삭제)
+            Task.objects.using(target).filter(id__in=task_ids).delete()
+            Webhook.objects.using(target).filter(user_id=user_id).delete()
+            OutboxEvent.objects.using(target).filter(user_id=user_id).delete()
+            counts = {
+                'tasks': copy_rows(tasks, target),
+                'completions': copy_rows(Completion.objects.using(source).filter(task_id__in=task_ids), target),
+                'archives': copy_rows(CompletionArchive.objects.using(source).filter(task_id__in=task_ids), target),
+                'reminders': copy_rows(Reminder.objects.using(source).filter(task_id__in=task_ids), target),
+                'streaks': copy_rows(StreakStat.objects.using(source).filter(task_id__in=task_ids), target),
+                'webhooks': copy_rows(Webhook.objects.using(source).filter(user_id=user_id), target),
+                'outbox': copy_rows(OutboxEvent.objects.using(source).filter(user_id=user_id), target),
+            }
+
+        with transaction.atomic(using=source):
+            Task.objects.using(source).filter(id__in=task_ids).delete()
+            OutboxEvent.objects.using(source).filter(user_id=user_id).delete()
+            Webhook.objects.using(source).filter(user_id=user_id).delete()
+        return counts
@@ -0,0 +1,100 @@
+import json
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# 별도 프로세스에서 WSGI 앱을 올리고 첫 요청까지의 시간을 잰다
+FIRST_REQUEST_SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+from config.wsgi import application
+loaded = time.perf_counter()
+
+from wsgiref.util import setup_testing_defaults
+
+def request(path):
+    environ = {'PATH_INFO': path, 'HTTP_HOST': 'localhost', 'SERVER_NAME': 'localhost'}
+    setup_testing_defaults(environ)
+    status = []
+    body = b''.join(application(environ, lambda s, h, exc_info=None: status.append(s)))
+    return status[0]
+
+first_status = request(sys.argv[1])
+first = time.perf_counter()
+request(sys.argv[1])
+second = time.perf_counter()
+print(json.dumps({
+    'wsgi_import': loaded - started,
+    'first_request': first - loaded,
+    'second_request': second - first,
+    'status': first_status,
+}))
+'''
+
+
+def parse_importtime(stderr):
+    """-X importtime 출력을 (모듈, self us, cumulative us) 목록으로 변환"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+class Command(BaseCommand):
+    """프로세스 콜드 스타트 계측
+
+    - config.wsgi import 시간의 패키지별/모듈별 분해 (python -X importtime)
+    - config.wsgi 첫 요청까지 걸린 시간
+    - manage.py check 실행 시간
+    """
+    help = 'import 시간 분해와 첫 요청까지의 시간 리포트'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/tasks/', help='첫 요청에 사용할 경로')
+        parser.add_argument('--top', type=int, default=15, help='출력할 항목 수')
+
+    def _run(self, args):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, *args], cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True,
+        )
+        return result, time.perf_counter() - started
+
+    def handle(self, *args, **options):
+        top = options['top']
+
+        result, _ = self._run(['-X', 'importtime', '-c', 'import config.wsgi'])
+        rows = parse_importtime(result.stderr)
+
+        by_package = defaultdict(int)
+        for name, self_us, _ in rows:
+            by_package[name.split('.')[0]] += self_us
+        total_us = sum(by_package.values())
+
+        self.stdout.write(f'config.wsgi import: {total_us / 1000:.1f} ms ({len(rows)} modules)')
+        self.stdout.write('\n[패키지별 self 시간]')
+        for package, self_us in sorted(by_package.items(), key=lambda x: -x[1])[:top]:
+            self.stdout.write(f'  {package:<32}{self_us / 1000:>9.1f} ms{self_us / total_us:>8.1%}')
+
+        self.stdout.write('\n[모듈별 누적 시간]')
+        for name, _, cumulative_us in sorted(rows, key=lambda x: -x[2])[:top]:
+            self.stdout.write(f'  {name:<48}{cumulative_us / 1000:>9.1f} ms')
+
+        result, wall = self._run(['-c', FIRST_REQUEST_SCRIPT, options['path']])
+        timing = json.loads(result.stdout.strip().splitlines()[-1])
+        self.stdout.write(f'\n[config.wsgi 첫 요청: {options["path"]} -> {timing["status"]}]')
+        self.stdout.write(f'  wsgi import      {timing["wsgi_import"] * 1000:>9.1f} ms')
+        self.stdout.write(f'  first request    {timing["first_request"] * 1000:>9.1f} ms')
+        self.stdout.write(f'  second request   {timing["second_request"] * 1000:>9.1f} ms')
+        self.stdout.write(f'  process total    {wall * 1000:>9.1f} ms (인터프리터 기동 포함)')
+
+        _, wall = self._run(['manage.py', 'check'])
+        self.stdout.write(f'\n[manage.py check]\n  process total    {wall * 1000:>9.1f} ms')
@@ -0,0 +1,214 @@
+import argparse
+import json
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import override_settings
+
+from completions.models import Completion
+from completions.services import CompletionService
+from tasks.models import Task
+from tasks.services import TaskService
+
+# 작업 종류와 비율
+OPERATIONS = (('complete', 4), ('uncomplete', 3), ('archive', 2), ('restore', 2))
+
+
+class Command(BaseCommand):
+    """완료 처리/취소와 할 일 보관/복구를 여러 프로세스 x 스레드에서 동시에 실행하는 부하 테스트
+
+    임시 디렉터리에 마이그레이션한 SQLite 파일을 만들어 쓰므로 실제 DB 는 건드리지 않는다.
+    할 일 --tasks 개와 날짜 --days 개만 쓰므로 같은 기록을 동시에 만들고 지우는 요청이 계속 부딪힌다.
+    프로세스마다 이 명령을 --worker 로 다시 실행하고, 모두 준비되면 동시에 시작한다.
+    끝나면 작업별 처리량/오류율/지연 시간과 DB 무결성 검사 결과를 출력한다.
+    """
+    help = '동시 쓰기 부하 테스트 (처리량/오류율 측정)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4, help='프로세스 수')
+        parser.add_argument('--threads', type=int, default=4, help='프로세스당 스레드 수')
+        parser.add_argument('--seconds', type=float, default=5, help='실행 시간(초)')
+        parser.add_argument('--tasks', type=int, default=4, help='경합시킬 할 일 수')
+        parser.add_argument('--days', type=int, default=3, help='경합시킬 완료 날짜 수')
+        parser.add_argument('--retries', type=int, help='잠금 오류 재시도 횟수 (기본: DB_LOCK_RETRIES)')
+        parser.add_argument('--worker', help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['retries'] is None:
+            options['retries'] = settings.DB_LOCK_RETRIES
+        # 샤딩/쓰기 지연 없이 임시 DB 하나에 바로 쓴다
+        with override_settings(DATABASE_SHARDS=[], COMPLETION_WRITE_BEHIND=False, DB_LOCK_RETRIES=options['retries']):
+            if options['worker']:
+                self._worker(options)
+            else:
+                self._main(options)
+
+    def _main(self, options):
+        workdir = Path(tempfile.mkdtemp(prefix='stress_writes_'))
+        try:
+            path = workdir / 'stress.sqlite3'
+            self._use_database(path)
+            call_command('migrate', verbosity=0)
+            user = User.objects.create_user('__stress_writes__')
+            for i in range(options['tasks']):
+                Task.objects.create(user=user, title=f'stress {i}', task_type='daily')
+            connections.close_all()
+
+            results = self._run_workers(path, options)
+            self._report(results, options)
+        finally:
+            connections.close_all()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    @staticmethod
+    def _use_database(path):
+        """default 를 path 의 SQLite 파일로 바꾼다 (이 프로세스 안에서만)"""
+        connections.close_all()
+        connections.settings[DEFAULT_DB_ALIAS]['NAME'] = path
+
+    def _run_workers(self, path, options):
+        """워커 프로세스를 띄우고 모두 준비되면 동시에 시작시킨 뒤 결과를 모은다"""
+        command = [
+            sys.executable, str(Path(settings.BASE_DIR) / 'manage.py'), 'stress_writes',
+            '--worker', str(path),
+            '--threads', str(options['threads']),
+            '--seconds', str(options['seconds']),
+            '--days', str(options['days']),
+            '--retries', str(options['retries']),
+        ]
+        workers = [
+            subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+            for _ in range(options['processes'])
+        ]
+        try:
+            for worker in workers:
+                if worker.stdout.readline().strip() != 'ready':
+                    raise CommandError('워커 프로세스를 시작하지 못했습니다.')
+            for worker in workers:
+                worker.stdin.write('go\n')
+                worker.stdin.flush()
+            results = [json.loads(worker.stdout.readline()) for worker in workers]
+        finally:
+            for worker in workers:
+                worker.wait()
+        return results
+
+    def _worker(self, options):
+        """--worker: 스레드를 띄우고 부모가 시작 신호를 보내면 --seconds 동안 작업을 반복한다"""
+        self._use_database(options['worker'])
+        tasks = list(Task.objects.filter(user__username='__stress_writes__'))
+        connections.close_all()
+
+        results = {'ops': Counter(), 'errors': Counter(), 'latencies': defaultdict(list), 'seconds': 0.0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['threads'] + 1)
+
+        def thread_main(seed):
+            rng = random.Random(seed)
+            names, weights = zip(*OPERATIONS)
+            ops, errors, latencies = Counter(), Counter(), defaultdict(list)
+            try:
+                barrier.wait()
+                deadline = time.monotonic() + options['seconds']
+                while time.monotonic() < deadline:
+                    name = rng.choices(names, weights)[0]
+                    task = rng.choice(tasks)
+                    completed_date = date.today() - timedelta(days=rng.randrange(options['days']))
+                    started = time.perf_counter()
+                    try:
+                        self._operation(name, task, completed_date)
+                    except Exception as exc:
+                        errors[f'{name}: {type(exc).__name__}: {exc}'] += 1
+                    else:
+                        ops[name] += 1
+                    latencies[name].append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+            with lock:
+                results['ops'].update(ops)
+                results['errors'].update(errors)
+                for name, values in latencies.items():
+                    results['latencies'][name].extend(values)
+
+        threads = [threading.Thread(target=thread_main, args=(random.random(),)) for _ in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        self.stdout.write('ready')
+        self.stdout.flush()
+        sys.stdin.readline()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        results['seconds'] = time.perf_counter() - started
+        self.stdout.write(json.dumps(results))
+
+    @staticmethod
+    def _operation(name, task, completed_date):
+        """API 의 각 쓰기 요청과 같은 경로를 실행"""
+        if name == 'complete':
+            CompletionService.mark_complete(task, completed_date)
+        elif name == 'uncomplete':
+            completion = Completion.objects.filter(task=task, completed_date=completed_date).first()
+            if completion is not None:
+                CompletionService.delete_completion(completion)
+        else:
+            TaskService.set_archived(Task.objects.get(pk=task.pk), archived=name == 'archive')
+
+    def _report(self, results, options):
+        ops, errors, latencies = Counter(), Counter(), defaultdict(list)
+        for result in results:
+            ops.update(result['ops'])
+            errors.update(result['errors'])
+            for name, values in result['latencies'].items():
+                latencies[name].extend(values)
+        seconds = max(result['seconds'] for result in results)
+
+        self.stdout.write(
+            f"processes={options['processes']} threads/process={options['threads']} "
+            f"seconds={options['seconds']} tasks={options['tasks']} days={options['days']} retries={options['retries']}"
+        )
+        self.stdout.write(f'  {"op":<11}{"ok":>8}{"errors":>8}{"ops/s":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}')
+        error_counts = Counter()
+        for message, count in errors.items():
+            error_counts[message.split(':', 1)[0]] += count
+        for name, _ in OPERATIONS:
+            self._row(name, ops[name], error_counts[name], latencies[name], seconds)
+        total_ok, total_errors = sum(ops.values()), sum(errors.values())
+        self._row('total', total_ok, total_errors, [v for values in latencies.values() for v in values], seconds)
+
+        attempted = total_ok + total_errors
+        error_rate = total_errors / attempted * 100 if attempted else 0
+        style = self.style.SUCCESS if total_errors == 0 else self.style.WARNING
+        self.stdout.write(style(f'오류율 {error_rate:.2f}% ({total_errors}/{attempted})'))
+        for message, count in errors.most_common(10):
+            self.stdout.write(f'  {count:>6}  {message}')
+
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            cursor.execute('PRAGMA integrity_check')
+            integrity = cursor.fetchone()[0]
+        self.stdout.write(f'무결성 검사: {integrity}, 완료 기록 {Completion.objects.count()}개')
+
+    def _row(self, name, ok, errors, latencies, seconds):
+        if latencies:
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            p50, p95, p99 = statistics.median(latencies), quantiles[94], quantiles[98]
+        else:
+            p50 = p95 = p99 = 0.0
+        self.stdout.write(
+            f'  {name:<11}{ok:>8}{errors:>8}{ok / seconds:>9.0f}{p50 * 1000:>9.1f}{p95 * 1000:>9.1f}{p99 * 1000:>9.1f}'
+        )
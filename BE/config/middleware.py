@@ -0,0 +1,203 @@
+import importlib.util
+import zlib
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+HAS_BROTLI = importlib.util.find_spec('brotli') is not None
+
+
+class GzipEncoder:
+    """zlib 기반 gzip 스트리밍 인코더"""
+    name = 'gzip'
+
+    def __init__(self, level=6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    """brotli 스트리밍 인코더 (brotli 패키지 필요)"""
+    name = 'br'
+
+    def __init__(self, quality=5):
+        import brotli
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk):
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+ENCODERS = {'gzip': GzipEncoder}
+if HAS_BROTLI:
+    ENCODERS['br'] = BrotliEncoder
+
+
+def compress(content, encoding, level):
+    """한 번에 압축 (일반 응답, 벤치마크용)"""
+    encoder = ENCODERS[encoding](level)
+    return encoder.compress(content) + encoder.finish()
+
+
+def parse_accept_encoding(header):
+    """Accept-Encoding 헤더의 인코딩 이름과 q 값 (거부한 q=0 도 '*' 보다 우선하도록 남긴다)"""
+    accepted = {}
+    for part in header.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """gzip/brotli 응답 압축 미들웨어
+
+    - COMPRESSION_MIN_SIZE 보다 작은 응답은 압축하지 않는다 (압축 비용 > 이득)
+    - COMPRESSION_CONTENT_TYPES 에 해당하는 응답만 압축한다
+      (CSRF 토큰이 들어가는 HTML 은 BREACH 위험이 있어 기본적으로 제외)
+    - 클라이언트가 br 을 받을 수 있고 brotli 가 설치되어 있으면 br 을 우선 사용
+    - 스트리밍 응답은 청크 단위로 이어서 압축한다
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.levels = {
+            'gzip': getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6),
+            'br': getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5),
+        }
+        self.content_types = tuple(getattr(settings, 'COMPRESSION_CONTENT_TYPES', ('application/json',)))
+
+    def select_encoding(self, request):
+        accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        # 이름으로 지정한 q 값이 '*' 보다 우선 (br;q=0, * 이면 br 제외)
+        q_values = {name: accepted.get(name, accepted.get('*', 0)) for name in ENCODERS}
+        candidates = [name for name, q in q_values.items() if q > 0]
+        if not candidates:
+            return None
+        # q 값이 같으면 br 을 우선
+        return max(candidates, key=lambda name: (q_values[name], name == 'br'))
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if not content_type.startswith(self.content_types):
+            return response
+
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = self.select_encoding(request)
+        if encoding is None:
+            return response
+
+        level = self.levels[encoding]
+
+        if response.streaming:
+            encoder = ENCODERS[encoding](level)
+            if response.is_async:
+                original_iterator = response.streaming_content
+
+                async def async_wrapper():
+                    async for chunk in original_iterator:
+                        data = encoder.compress(chunk)
+                        if data:
+                            yield data
+                    yield encoder.finish()
+
+                response.streaming_content = async_wrapper()
+            else:
+                original_iterator = response.streaming_content
+
+                def wrapper():
+                    for chunk in original_iterator:
+                        data = encoder.compress(chunk)
+                        if data:
+                            yield data
+                    yield encoder.finish()
+
+                response.streaming_content = wrapper()
+            # 압축 후 크기는 스트리밍이 끝나야 알 수 있다
+            del response.headers['Content-Length']
+        else:
+            compressed_content = compress(response.content, encoding, level)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # 강한 ETag 는 약한 ETag 로 변경 (RFC 9110 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+
+        return response
+
+
+def is_api_request(request):
+    """JWT 로만 인증하는 API 경로인지 확인"""
+    return request.path_info.startswith(settings.API_PATH_PREFIX)
+
+
+def _skip_for_api(hook_name, hook):
+    if hook_name == 'process_response':
+        def wrapper(self, request, response):
+            if is_api_request(request):
+                return response
+            return hook(self, request, response)
+    else:
+        def wrapper(self, request, *args, **kwargs):
+            if is_api_request(request):
+                return None
+            return hook(self, request, *args, **kwargs)
+    wrapper.__name__ = hook_name
+    return wrapper
+
+
+def web_only(middleware_class):
+    """API 경로(API_PATH_PREFIX)에서는 아무 일도 하지 않는 미들웨어 클래스 생성
+
+    원본 클래스가 가진 훅(process_request/view/response/exception)만 감싸므로
+    /admin/ 등 나머지 경로에서는 원본과 동일하게 동작한다.
+    Django 시스템 체크(admin.E408 등)는 서브클래스도 인정한다.
+    """
+    attrs = {'__module__': __name__}
+    for hook_name in ('process_request', 'process_view', 'process_response', 'process_exception'):
+        hook = getattr(middleware_class, hook_name, None)
+        if hook is not None:
+            attrs[hook_name] = _skip_for_api(hook_name, hook)
+    return type(f'WebOnly{middleware_class.__name__}', (middleware_class,), attrs)
+
+
+# API 요청은 JWT 로 인증하므로 세션/CSRF/인증/메시지 미들웨어가 필요 없다
+WebOnlySessionMiddleware = web_only(SessionMiddleware)
+WebOnlyCsrfViewMiddleware = web_only(CsrfViewMiddleware)
+WebOnlyAuthenticationMiddleware = web_only(AuthenticationMiddleware)
+WebOnlyMessageMiddleware = web_only(MessageMiddleware)
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShardSequence',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False, verbose_name='모델')),
+                ('next_id', models.BigIntegerField(verbose_name='다음 id')),
+            ],
+            options={
+                'verbose_name': '샤드 id 시퀀스',
+                'verbose_name_plural': '샤드 id 시퀀스 목록',
+            },
+        ),
+    ]
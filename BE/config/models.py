@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class ShardSequence(models.Model):
+    """샤딩 모델의 id 발급 상태 (config.sharding.allocate_id)"""
+    name = models.CharField(max_length=100, primary_key=True, verbose_name='모델')
+    next_id = models.BigIntegerField(verbose_name='다음 id')
+
+    class Meta:
+        verbose_name = '샤드 id 시퀀스'
+        verbose_name_plural = '샤드 id 시퀀스 목록'
+
+    def __str__(self):
+        return f'{self.name}: {self.next_id}'
@@ -0,0 +1,51 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimate_table_rows(model, using='default'):
+    """DB 통계로 추정한 테이블 행 수 (통계가 없으면 None)
+
+    - PostgreSQL: pg_class.reltuples (ANALYZE/autovacuum 이 갱신)
+    - SQLite: sqlite_stat1 (ANALYZE 후), 없으면 MAX(id) 로 근사
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            row = cursor.fetchone()
+            return row[0] if row and row[0] >= 0 else None
+
+        if connection.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s AND idx IS NULL', [table])
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+            pk_column = connection.ops.quote_name(model._meta.pk.column)
+            cursor.execute(f'SELECT MAX({pk_column}) FROM {connection.ops.quote_name(table)}')
+            return cursor.fetchone()[0] or 0
+
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """대용량 테이블용 admin 페이지네이터
+
+    전체 목록은 DB 통계로 행 수를 추정하고, 필터/검색이 걸린 목록은
+    최대 count_limit 개까지만 센다. 두 경우 모두 COUNT(*) 전체 스캔을 하지 않는다.
+    """
+    count_limit = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            # 통계가 작게 잡혀 있으면 (행이 적은 테이블) 정확히 센다
+            if estimate is not None and estimate > self.count_limit:
+                return estimate
+        return queryset.order_by()[:self.count_limit].count()
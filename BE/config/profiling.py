@@ -0,0 +1,190 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+from importlib import import_module
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth import get_user
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .middleware import is_api_request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_QUERY_PARAM = '_profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+# cProfile(3.12+ 는 sys.monitoring 도구 하나만 허용)과 tracemalloc 은 프로세스 전역이므로 동시에 한 요청만 프로파일링
+_profile_lock = threading.Lock()
+
+
+def parse_profile_flag(value):
+    """X-Profile / ?_profile= 값에서 (프로파일 요청 여부, 메모리 추적 여부) 반환
+
+    '1', 'cpu' 는 CPU 만, 'memory', 'cpu,memory' 는 메모리 할당도 함께 추적
+    """
+    options = {part.strip().lower() for part in (value or '').split(',')} - {''}
+    if not options or options <= {'0', 'false', 'off'}:
+        return False, False
+    return True, 'memory' in options
+
+
+def slugify_path(path):
+    """파일 이름에 쓸 수 있도록 경로를 정리"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', path).strip('_')[:60] or 'root'
+
+
+class ProfilingMiddleware:
+    """요청 단위 CPU(cProfile)/메모리(tracemalloc) 프로파일링 미들웨어
+
+    - 스태프 사용자가 X-Profile 헤더나 ?_profile= 로 요청하면 해당 요청을 프로파일링하고
+      응답의 X-Profile-Id 헤더로 결과 파일 이름을 알려준다
+    - PROFILING_SAMPLE_RATE 비율만큼은 누구의 요청이든 무작위로 프로파일링하고,
+      PROFILING_MIN_DURATION_MS 보다 오래 걸린 것만 저장한다
+    - 결과는 PROFILING_DIR 에 저장하고 PROFILING_MAX_FILES 개를 넘으면 오래된 것부터 지운다
+    - PROFILING_ENABLED 가 False 면 요청마다 설정값 하나만 확인하고 통과시킨다
+    - 다른 미들웨어(압축, 세션, 인증 등) 비용까지 측정하도록 MIDDLEWARE 앞쪽에 둔다
+    - 프로파일링은 한 번에 한 요청만 한다. 다른 요청을 프로파일링 중이면 샘플링 요청은 그냥 처리하고,
+      스태프가 요청한 프로파일링은 앞 요청이 끝날 때까지 기다린다
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.PROFILING_ENABLED
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.min_duration = settings.PROFILING_MIN_DURATION_MS / 1000
+        self.output_dir = Path(settings.PROFILING_DIR)
+        self.max_files = settings.PROFILING_MAX_FILES
+        self.top_n = settings.PROFILING_TOP_N
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        requested, memory = parse_profile_flag(
+            request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_QUERY_PARAM)
+        )
+        if requested and not self.is_staff(request):
+            requested = memory = False
+
+        if requested:
+            min_duration = 0
+        elif self.sample_rate and random.random() < self.sample_rate:
+            min_duration = self.min_duration
+        else:
+            return self.get_response(request)
+
+        return self.profile(request, memory, min_duration, report=requested)
+
+    def is_staff(self, request):
+        """프로파일링을 요청한 사용자가 스태프인지 확인
+
+        인증 미들웨어보다 먼저 실행되므로 프로파일 요청이 있을 때만 직접 확인한다
+        (API 경로는 JWT, 나머지는 세션).
+        """
+        if not is_api_request(request):
+            session = import_module(settings.SESSION_ENGINE).SessionStore(
+                request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+            )
+            return get_user(SimpleNamespace(session=session)).is_staff
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except APIException:
+            return False
+        return bool(result and result[0].is_staff)
+
+    def profile(self, request, memory, min_duration, report):
+        """cProfile(+tracemalloc) 로 요청을 처리하고 min_duration 보다 오래 걸렸으면 저장"""
+        if not _profile_lock.acquire(blocking=report):
+            return self.get_response(request)
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # 프로세스에서 다른 프로파일러가 이미 동작 중 (python -m cProfile 등)
+                logger.warning('다른 프로파일러가 동작 중이라 프로파일링하지 않음: %s', request.path)
+                return self.get_response(request)
+
+            tracing = memory and not tracemalloc.is_tracing()
+            snapshot = None
+            if tracing:
+                tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+            started = time.perf_counter()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+                elapsed = time.perf_counter() - started
+                if tracing:
+                    snapshot = tracemalloc.take_snapshot()
+                    tracemalloc.stop()
+        finally:
+            _profile_lock.release()
+
+        if elapsed >= min_duration:
+            try:
+                profile_id = self.save(request, response, profiler, snapshot, elapsed)
+            except OSError:
+                logger.exception('프로파일 결과 저장 실패: %s', request.path)
+            else:
+                if report:
+                    response[PROFILE_ID_HEADER] = profile_id
+        return response
+
+    def save(self, request, response, profiler, snapshot, elapsed):
+        """결과 파일을 저장하고 파일 이름 공통부(프로파일 ID)를 반환
+
+        - {id}.prof: pstats 덤프 (snakeviz, flameprof, gprof2dot 등으로 열 수 있음)
+        - {id}.txt: 누적 시간 상위 함수
+        - {id}.alloc.txt: 메모리 할당 상위 위치 (메모리 추적 시)
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        profile_id = '{}-{:06d}-{}-{}-{}-{}ms'.format(
+            time.strftime('%Y%m%d-%H%M%S'),
+            int(time.time() % 1 * 1_000_000),
+            os.getpid(),
+            request.method,
+            slugify_path(request.path),
+            int(elapsed * 1000),
+        )
+        base = self.output_dir / profile_id
+
+        profiler.dump_stats(f'{base}.prof')
+
+        summary = io.StringIO()
+        summary.write(f'{request.method} {request.get_full_path()} -> {response.status_code} ({elapsed * 1000:.1f}ms)\n\n')
+        pstats.Stats(profiler, stream=summary).sort_stats('cumulative').print_stats(self.top_n)
+        Path(f'{base}.txt').write_text(summary.getvalue())
+
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+            stats = snapshot.statistics('lineno')
+            lines = [f'total {sum(stat.size for stat in stats) / 1024:.1f} KiB in {len(stats)} sites\n']
+            lines += [str(stat) for stat in stats[:self.top_n]]
+            Path(f'{base}.alloc.txt').write_text('\n'.join(lines) + '\n')
+
+        self.prune()
+        return profile_id
+
+    def prune(self):
+        """PROFILING_MAX_FILES 개를 넘는 오래된 결과 삭제"""
+        profiles = sorted(self.output_dir.glob('*.prof'), key=lambda path: path.stat().st_mtime)
+        for path in profiles[:max(len(profiles) - self.max_files, 0)]:
+            stem = path.with_suffix('')
+            for suffix in ('.prof', '.txt', '.alloc.txt'):
+                Path(f'{stem}{suffix}').unlink(missing_ok=True)
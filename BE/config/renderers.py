@@ -0,0 +1,100 @@
+import importlib.util
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+
+def to_columnar(data):
+    """dict 리스트를 {'columns': [...], 'rows': [[...], ...]} 형태로 변환
+
+    리스트가 아니거나 행 구조가 다르면 None을 반환합니다.
+    """
+    if not isinstance(data, list):
+        return None
+    if not data:
+        return {'columns': [], 'rows': []}
+    if not all(isinstance(row, dict) for row in data):
+        return None
+
+    columns = list(data[0].keys())
+    column_set = set(columns)
+    if any(row.keys() != column_set for row in data):
+        return None
+
+    return {
+        'columns': columns,
+        'rows': [[row[c] for c in columns] for row in data],
+    }
+
+
+def _columnar_payload(data):
+    """목록 응답(페이지네이션 포함)만 컬럼형으로 바꾸고 나머지는 그대로 둔다"""
+    columnar = to_columnar(data)
+    if columnar is not None:
+        return columnar
+
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        columnar = to_columnar(data['results'])
+        if columnar is not None:
+            return {**data, 'results': columnar}
+
+    return data
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """컬럼 헤더 + 행 배열 형태의 JSON 렌더러
+
+    행마다 반복되는 필드 이름을 한 번만 보내 대량 목록의 크기를 줄입니다.
+    """
+    media_type = 'application/vnd.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(_columnar_payload(data), accepted_media_type, renderer_context)
+
+
+def _msgpack_default(obj):
+    """msgpack이 직접 처리하지 못하는 타입은 JSON 인코더 규칙을 따른다"""
+    from rest_framework.utils.encoders import JSONEncoder
+    return JSONEncoder().default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack 렌더러 (msgpack 패키지 필요)"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        import msgpack
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True)
+
+
+class ColumnarMessagePackRenderer(MessagePackRenderer):
+    """컬럼형 레이아웃을 MessagePack으로 인코딩하는 렌더러"""
+    media_type = 'application/vnd.columnar+msgpack'
+    format = 'columnar-msgpack'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return super().render(_columnar_payload(data), accepted_media_type, renderer_context)
+
+
+def _msgpack_available():
+    return importlib.util.find_spec('msgpack') is not None
+
+
+def compact_renderer_classes():
+    """기본 렌더러 뒤에 압축 포맷 렌더러를 붙인 목록
+
+    기본 렌더러가 앞에 있으므로 Accept 헤더가 없으면 기존 JSON 응답이 유지됩니다.
+    """
+    renderers = list(api_settings.DEFAULT_RENDERER_CLASSES) + [ColumnarJSONRenderer]
+    if _msgpack_available():
+        renderers += [MessagePackRenderer, ColumnarMessagePackRenderer]
+    return renderers
@@ -0,0 +1,128 @@
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.module_loading import import_string
+from django.views.decorators.csrf import csrf_exempt
+
+SCHEMA_FILES = {
+    'yaml': ('openapi.yaml', 'application/vnd.oai.openapi; charset=utf-8'),
+    'json': ('openapi.json', 'application/vnd.oai.openapi+json; charset=utf-8'),
+}
+
+# {format: (mtime, content, etag)}
+_schema_cache = {}
+
+# 아직 적용하지 않은 (뷰, extend_schema 인자) 목록
+_deferred_annotations = []
+
+
+def extend_schema(**kwargs):
+    """drf_spectacular.utils.extend_schema 의 지연 적용 버전
+
+    원본 데코레이터는 적용 시점에 DEFAULT_SCHEMA_CLASS(drf_spectacular.openapi)를 import 하므로
+    뷰 모듈을 불러오는 것만으로 스키마 생성기 전체가 로드된다.
+    여기서는 인자만 기록해 두고 스키마를 생성할 때 apply_deferred_schemas() 로 적용한다.
+    """
+    def decorator(f):
+        _deferred_annotations.append((f, kwargs))
+        return f
+    return decorator
+
+
+def apply_deferred_schemas():
+    """기록해 둔 extend_schema 를 실제로 적용 (스키마 생성 직전에 호출)"""
+    if not _deferred_annotations:
+        return
+
+    from drf_spectacular.utils import extend_schema as spectacular_extend_schema
+
+    while _deferred_annotations:
+        f, kwargs = _deferred_annotations.pop(0)
+        spectacular_extend_schema(**kwargs)(f)
+
+
+def schema_path(fmt):
+    """미리 생성한 스키마 파일 경로"""
+    return settings.PREBUILT_SCHEMA_DIR / SCHEMA_FILES[fmt][0]
+
+
+def _load_schema(fmt):
+    """스키마 파일을 읽어 메모리에 캐시 (파일이 바뀌면 다시 읽음)"""
+    path = schema_path(fmt)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+
+    cached = _schema_cache.get(fmt)
+    if cached and cached[0] == mtime:
+        return cached
+
+    content = path.read_bytes()
+    etag = '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+    _schema_cache[fmt] = (mtime, content, etag)
+    return _schema_cache[fmt]
+
+
+def lazy_view(import_path, **initkwargs):
+    """처음 호출될 때 뷰 클래스를 import 하는 뷰
+
+    drf_spectacular.views 는 스키마 생성기 전체를 끌어오므로
+    부팅 시점이 아니라 실제 요청이 들어올 때 불러온다.
+    """
+    view = None
+
+    def wrapper(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(import_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return csrf_exempt(wrapper)
+
+
+_dynamic_schema_view = lazy_view('drf_spectacular.views.SpectacularAPIView')
+
+
+def _requested_format(request):
+    fmt = request.GET.get('format', '')
+    if fmt in ('json', 'openapi-json'):
+        return 'json'
+    if fmt in ('yaml', 'openapi'):
+        return 'yaml'
+    accept = request.META.get('HTTP_ACCEPT', '')
+    return 'json' if 'json' in accept and 'yaml' not in accept else 'yaml'
+
+
+def _etag_matches(if_none_match, etag):
+    """If-None-Match 가 etag 와 맞는지 (약한 비교)
+
+    여러 값을 쉼표로 나열할 수 있고 `*` 는 모든 ETag 와 맞는다.
+    CompressionMiddleware 가 압축하면서 ETag 를 W/"..." 로 바꾸므로 W/ 를 떼고 비교한다.
+    """
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+@csrf_exempt
+def schema_view(request, *args, **kwargs):
+    """미리 생성된 OpenAPI 스키마 제공
+
+    `manage.py build_schema` 로 생성한 파일이 없으면 drf-spectacular 로 즉석 생성한다.
+    """
+    loaded = _load_schema(_requested_format(request))
+    if loaded is None:
+        return _dynamic_schema_view(request, *args, **kwargs)
+
+    _, content, etag = loaded
+    if _etag_matches(request.META.get('HTTP_IF_NONE_MATCH', ''), etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=SCHEMA_FILES[_requested_format(request)][1])
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={settings.PREBUILT_SCHEMA_MAX_AGE}'
+    return response
@@ -0,0 +1,11 @@
+from drf_spectacular.generators import SchemaGenerator as SpectacularSchemaGenerator
+
+from config.schema import apply_deferred_schemas
+
+
+class SchemaGenerator(SpectacularSchemaGenerator):
+    """지연 적용된 @extend_schema 를 반영한 뒤 스키마를 생성"""
+
+    def get_schema(self, request=None, public=False):
+        apply_deferred_schemas()
+        return super().get_schema(request=request, public=public)
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from datetime import timedelta
 import os
 from dotenv import load_dotenv
@@ -52,22 +53,32 @@ INSTALLED_APPS = [
     'django_filters',
 
     # Local apps
+    'config',
     'users',
     'tasks',
     'completions',
+    'search',
+    'reminders',
+    'webhooks',
 ]
 
+# WebOnly* 미들웨어는 API_PATH_PREFIX 경로에서 건너뛴다 (API 는 JWT 인증만 사용)
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    # 아래 미들웨어 비용까지 측정하도록 앞쪽에 둔다 (PROFILING_ENABLED 가 False 면 바로 통과)
+    'config.profiling.ProfilingMiddleware',
+    'config.middleware.CompressionMiddleware',
+    'config.middleware.WebOnlySessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'config.middleware.WebOnlyCsrfViewMiddleware',
+    'config.middleware.WebOnlyAuthenticationMiddleware',
+    'config.middleware.WebOnlyMessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+API_PATH_PREFIX = '/api/'
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -92,13 +103,35 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# 쓰기 잠금을 기다리는 최대 시간(초). 넘으면 'database is locked' (config.contention 이 재시도)
+DATABASE_BUSY_TIMEOUT = int(os.getenv('DATABASE_BUSY_TIMEOUT', 5))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {'timeout': DATABASE_BUSY_TIMEOUT},
     }
 }
 
+# 사용자 샤딩 (config.sharding): DB_SHARD_COUNT 개의 SQLite 파일에 사용자별 할 일/완료 기록/알림을 나눠 저장
+# auth_user 등 전역 테이블은 default 에 둔다. 개수를 바꾼 뒤에는 migrate --database 와 rebalance_shards 실행
+DB_SHARD_COUNT = int(os.getenv('DB_SHARD_COUNT', 0))
+DATABASE_SHARDS = [f'shard_{i}' for i in range(DB_SHARD_COUNT)]
+for _alias in DATABASE_SHARDS:
+    DATABASES[_alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db_{_alias}.sqlite3',
+        'OPTIONS': {'timeout': DATABASE_BUSY_TIMEOUT},
+    }
+DATABASE_ROUTERS = ['config.sharding.ShardRouter']
+SHARD_ID_BLOCK_SIZE = 100  # 프로세스가 default 에서 한 번에 예약할 id 수
+
+# 쓰기 경합 재시도 (config.contention.retry_on_lock): 잠금 오류 시 지터를 준 지수 백오프로 다시 시도
+DB_LOCK_RETRIES = int(os.getenv('DB_LOCK_RETRIES', 5))
+DB_LOCK_RETRY_BASE_MS = 20
+DB_LOCK_RETRY_MAX_MS = 1000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -156,8 +189,24 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'config.throttling.UserTokenBucketThrottle',
+        'config.throttling.ScopedTokenBucketThrottle',
+    ],
 }
 
+# Token bucket throttle settings (config.throttling)
+# rate 로 토큰이 차고 burst 개까지 쌓인다. 뷰의 throttle_costs 로 액션별 소모 토큰 수 지정
+THROTTLE_BUCKETS = {
+    'anon': {'rate': os.getenv('THROTTLE_ANON_RATE', '30/min'), 'burst': 20},
+    'user': {'rate': os.getenv('THROTTLE_USER_RATE', '600/min'), 'burst': 120},
+    'completions': {'rate': '240/min', 'burst': 60},
+    'search': {'rate': '60/min', 'burst': 20},
+}
+# 여러 프로세스가 버킷을 공유하려면 'config.throttling.CacheBucketStore'
+THROTTLE_BUCKET_STORE = os.getenv('THROTTLE_BUCKET_STORE', 'config.throttling.LocalBucketStore')
+THROTTLE_CACHE_ALIAS = 'default'
+
 
 # JWT settings
 SIMPLE_JWT = {
@@ -186,6 +235,8 @@ SIMPLE_JWT = {
 # CORS settings
 CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000,http://localhost:5173').split(',')
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'x-profile')
+CORS_EXPOSE_HEADERS = ['X-Profile-Id']
 
 
 # drf-spectacular settings
@@ -195,4 +246,117 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
     'COMPONENT_SPLIT_REQUEST': True,
+    # 지연 적용된 @extend_schema 를 스키마 생성 직전에 반영
+    'DEFAULT_GENERATOR_CLASS': 'config.schema_generator.SchemaGenerator',
 }
+
+# `python manage.py build_schema` 로 생성한 스키마 파일 위치
+PREBUILT_SCHEMA_DIR = BASE_DIR / 'schema'
+PREBUILT_SCHEMA_MAX_AGE = int(os.getenv('PREBUILT_SCHEMA_MAX_AGE', 3600))  # seconds
+
+
+# Response compression settings
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # bytes
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))  # 1~9
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 5))  # 0~11
+COMPRESSION_CONTENT_TYPES = [
+    'application/json',
+    'application/vnd.columnar+json',
+    'application/msgpack',
+    'application/vnd.columnar+msgpack',
+    'application/vnd.oai.openapi',
+    'text/csv',
+]
+
+
+# Reminder settings
+# 알림 발송 대상 (reminders.sinks.BaseSink 구현 클래스 경로)
+REMINDER_SINK = os.getenv('REMINDER_SINK', 'reminders.sinks.LogSink')
+REMINDER_SINK_FILE = os.getenv('REMINDER_SINK_FILE', BASE_DIR / 'reminders.jsonl')  # FileSink 출력 파일
+
+
+# Auto-archive settings (python manage.py archive_expired_tasks)
+# 마감일(once)/종료일(period)이 이 일수보다 더 지난 할 일을 보관 (사용자별 UserSetting 으로 변경 가능)
+AUTO_ARCHIVE_GRACE_DAYS = int(os.getenv('AUTO_ARCHIVE_GRACE_DAYS', 7))
+# 로그인할 때 해당 사용자의 할 일도 자동 보관
+AUTO_ARCHIVE_ON_LOGIN = os.getenv('AUTO_ARCHIVE_ON_LOGIN', 'False') == 'True'
+
+
+# Completion archive settings (python manage.py archive_completions)
+# 이 일수보다 오래된 완료 기록은 연도별 보관 테이블(CompletionArchive)로 이동
+COMPLETION_ARCHIVE_AFTER_DAYS = int(os.getenv('COMPLETION_ARCHIVE_AFTER_DAYS', 365))
+
+
+# Streak leaderboard settings (completions.leaderboard)
+# 순위표 저장소 (프로세스 메모리). 다른 프로세스의 변경은 LEADERBOARD_REFRESH_SECONDS 마다 DB 에서 다시 읽어 반영
+LEADERBOARD_STORE = os.getenv('LEADERBOARD_STORE', 'completions.leaderboard.LocalLeaderboardStore')
+LEADERBOARD_REFRESH_SECONDS = int(os.getenv('LEADERBOARD_REFRESH_SECONDS', 300))
+LEADERBOARD_MAX_LIMIT = 100  # 한 번에 조회할 수 있는 최대 순위 수
+
+
+# Completion write-behind settings (completions.writebehind)
+# 켜면 완료 처리는 저널 파일에 기록(fsync)한 뒤 바로 응답하고, 모인 기록을 주기적으로 bulk_create 로 반영
+COMPLETION_WRITE_BEHIND = os.getenv('COMPLETION_WRITE_BEHIND', 'False') == 'True'
+COMPLETION_JOURNAL_DIR = os.getenv('COMPLETION_JOURNAL_DIR', BASE_DIR / 'completion_journal')
+COMPLETION_JOURNAL_FSYNC = True  # False 면 OS 버퍼까지만 기록 (전원 장애 시 유실 가능)
+COMPLETION_JOURNAL_MAX_BYTES = 1024 * 1024  # 모두 반영된 저널이 이보다 크면 비움
+COMPLETION_FLUSH_INTERVAL_MS = int(os.getenv('COMPLETION_FLUSH_INTERVAL_MS', 5))
+COMPLETION_FLUSH_BATCH_SIZE = int(os.getenv('COMPLETION_FLUSH_BATCH_SIZE', 500))  # 트랜잭션 1개에 넣을 최대 기록 수
+
+
+# Single-flight settings (config.singleflight)
+# 같은 인자로 동시에 들어온 통계 계산을 한 번만 실행하고, 결과를 이 시간 동안 재사용 (0 이면 동시 호출만 묶음)
+# 완료 처리/취소 때 그 할 일의 결과는 버리지만 다른 프로세스의 변경은 이 시간이 지나야 보인다
+SINGLE_FLIGHT_TTL_SECONDS = float(os.getenv('SINGLE_FLIGHT_TTL_SECONDS', 2))
+SINGLE_FLIGHT_MAX_ENTRIES = 10000  # 프로세스당 재사용할 최대 결과 수
+
+
+# Webhook settings (python manage.py run_webhooks)
+# 이벤트는 변경과 같은 트랜잭션에서 outbox 에 기록하고, 워커가 웹훅마다 묶어 동시에 전송
+WEBHOOK_TIMEOUT_SECONDS = float(os.getenv('WEBHOOK_TIMEOUT_SECONDS', 5))
+WEBHOOK_CONCURRENCY = int(os.getenv('WEBHOOK_CONCURRENCY', 50))  # 동시에 보낼 최대 요청 수 (호스트당 연결 수도 같음)
+WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', 500))  # 한 번에 가져올 이벤트 수
+WEBHOOK_MAX_EVENTS_PER_REQUEST = 100  # 요청 하나에 묶을 최대 이벤트 수
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', 8))  # 이만큼 실패하면 status=failed 로 남김
+WEBHOOK_RETRY_BASE_SECONDS = 10  # 재시도 간격: 0 ~ min(MAX, BASE * 2^(시도 수-1)) 사이 임의 값
+WEBHOOK_RETRY_MAX_SECONDS = 3600
+# 루프백/사설/링크 로컬 주소로의 등록과 전송 허용 (로컬 개발용, 운영에서 켜면 SSRF 에 노출됨)
+WEBHOOK_ALLOW_PRIVATE_URLS = os.getenv('WEBHOOK_ALLOW_PRIVATE_URLS', 'False') == 'True'
+
+# Idempotency-Key settings (config.idempotency)
+# 워커 프로세스 수 (gunicorn 등이 읽는 환경 변수, 프로세스 메모리 저장소를 쓸 수 있는지 확인용)
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 86400))  # seconds
+# 처리 중 표시의 유효 시간 (초). 요청 타임아웃(gunicorn 기본 30초)보다 조금 길게 두어
+# 처리 중에 워커가 죽어도 이 시간이 지나면 같은 키로 다시 보낼 수 있다
+IDEMPOTENCY_PENDING_TTL = int(os.getenv('IDEMPOTENCY_PENDING_TTL', 35))
+IDEMPOTENCY_MAX_ENTRIES = int(os.getenv('IDEMPOTENCY_MAX_ENTRIES', 10000))  # 저장소 최대 항목 수
+# 기본값은 모든 워커가 공유하는 DB 캐시 (python manage.py createcachetable 필요)
+# 'config.idempotency.LocalIdempotencyStore' 는 프로세스 메모리라 단일 프로세스에서만 쓸 수 있다
+IDEMPOTENCY_STORE = os.getenv('IDEMPOTENCY_STORE', 'config.idempotency.CacheIdempotencyStore')
+IDEMPOTENCY_CACHE_ALIAS = 'idempotency'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # 같은 키의 첫 요청만 처리하도록 add() 가 기본 키 제약으로 원자적인 DB 캐시 (default DB)
+    'idempotency': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'idempotency_cache',
+        'TIMEOUT': IDEMPOTENCY_TTL,
+        'OPTIONS': {'MAX_ENTRIES': IDEMPOTENCY_MAX_ENTRIES},
+    },
+}
+
+
+# Request profiling settings (config.profiling.ProfilingMiddleware)
+# 스태프가 X-Profile: 1 (메모리까지: X-Profile: cpu,memory) 헤더나 ?_profile=1 로 요청하면 프로파일링
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True'
+# 이 비율(0~1)만큼 모든 요청을 무작위로 프로파일링하고 PROFILING_MIN_DURATION_MS 이상 걸린 것만 저장
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+PROFILING_MIN_DURATION_MS = int(os.getenv('PROFILING_MIN_DURATION_MS', 500))
+PROFILING_DIR = os.getenv('PROFILING_DIR', BASE_DIR / 'profiles')
+PROFILING_MAX_FILES = int(os.getenv('PROFILING_MAX_FILES', 200))  # 보관할 최대 프로파일 수
+PROFILING_TOP_N = 40  # 요약 파일에 남길 상위 함수/할당 위치 수
+PROFILING_TRACEMALLOC_FRAMES = 1  # 할당 위치별 저장할 호출 스택 깊이
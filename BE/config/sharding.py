@@ -0,0 +1,273 @@
+import threading
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, models, router, transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+
+# 사용자별로 나눠 저장하는 앱 (할 일과 할 일에 딸린 완료 기록/보관/알림, 이벤트를 변경과 같은 트랜잭션에 기록하는 웹훅)
+SHARDED_APPS = frozenset({'tasks', 'completions', 'reminders', 'webhooks'})
+
+_current_shard = ContextVar('current_shard', default=None)
+
+
+def is_sharded(model):
+    return model._meta.app_label in SHARDED_APPS
+
+
+def shard_aliases():
+    """샤드 DB 별칭 목록 (샤딩을 쓰지 않으면 default 하나)"""
+    return list(settings.DATABASE_SHARDS) or [DEFAULT_DB_ALIAS]
+
+
+def all_databases():
+    """샤딩 모델 행이 있을 수 있는 모든 DB (샤드로 옮기기 전 기록이 남은 default 포함)"""
+    return list(dict.fromkeys([DEFAULT_DB_ALIAS, *settings.DATABASE_SHARDS]))
+
+
+def shard_for_user(user):
+    """사용자(또는 사용자 id)의 할 일/완료 기록을 저장하는 DB 별칭 (사용자 id 의 해시로 결정)"""
+    shards = settings.DATABASE_SHARDS
+    if not shards:
+        return DEFAULT_DB_ALIAS
+    user_id = getattr(user, 'pk', user)
+    return shards[zlib.crc32(str(user_id).encode()) % len(shards)]
+
+
+def current_shard():
+    """use_shard() 로 활성화된 DB 별칭 (없으면 None)"""
+    return _current_shard.get()
+
+
+@contextmanager
+def use_shard(alias):
+    """블록 안에서 샤딩 모델 조회/저장을 alias DB 로 보낸다"""
+    token = _current_shard.set(alias)
+    try:
+        yield alias
+    finally:
+        _current_shard.reset(token)
+
+
+def each_database():
+    """all_databases() 를 차례로 활성화하며 별칭을 반환 (배치 작업용)"""
+    for alias in all_databases():
+        with use_shard(alias):
+            yield alias
+
+
+class ShardRouter:
+    """사용자 id 기반 샤딩 라우터
+
+    - auth_user 등 전역 모델은 항상 default
+    - 샤딩 모델은 인스턴스가 있으면 인스턴스의 DB(새 인스턴스는 user_id 의 샤드),
+      없으면 use_shard() 로 활성화된 DB(ShardedViewMixin 이 요청마다 설정)
+    - 스키마는 모든 DB 에 같게 만든다. 샤드의 auth_user 에는 외래 키 제약을 맞추기 위한
+      자리 표시 행만 둔다 (ensure_user_stubs)
+    """
+
+    def _db(self, model, **hints):
+        if not is_sharded(model):
+            return DEFAULT_DB_ALIAS
+
+        instance = hints.get('instance')
+        if instance is not None:
+            if is_sharded(type(instance)):
+                if instance._state.db:
+                    return instance._state.db
+                if getattr(instance, 'user_id', None) is not None:
+                    return shard_for_user(instance.user_id)
+                task = instance._state.fields_cache.get('task')
+                if task is not None and task._state.db:
+                    return task._state.db
+            elif instance._meta.label == settings.AUTH_USER_MODEL:
+                return shard_for_user(instance)
+
+        return current_shard()
+
+    db_for_read = _db
+    db_for_write = _db
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 샤드의 할 일 -> default 의 사용자 관계 허용
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class ShardedViewMixin:
+    """요청한 사용자의 샤드를 요청 처리 동안 활성화하는 ViewSet 믹스인
+
+    self.shard 로 get_queryset 에서 .using() 을 지정하고, 서비스 코드의 조회/저장은 라우터가 같은 샤드로 보낸다.
+    """
+    shard = None
+    _shard_token = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.user and request.user.is_authenticated:
+            self.shard = shard_for_user(request.user)
+            self._shard_token = _current_shard.set(self.shard)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if self._shard_token is not None:
+            _current_shard.reset(self._shard_token)
+            self._shard_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+# 프로세스별로 예약해 둔 id 블록 {모델: (다음 id, 블록 끝)}
+_id_blocks = {}
+_id_lock = threading.Lock()
+
+
+def allocate_id(model):
+    """모든 샤드에서 겹치지 않는 새 id
+
+    샤드마다 AUTOINCREMENT 를 쓰면 사용자를 다른 샤드로 옮길 때 id 가 충돌하므로
+    default 의 ShardSequence 에서 SHARD_ID_BLOCK_SIZE 개씩 예약해 쓴다.
+    """
+    label = model._meta.label_lower
+    with _id_lock:
+        next_id, end = _id_blocks.get(label, (0, 0))
+        if next_id >= end:
+            # 예약을 감싼 트랜잭션이 롤백돼 시퀀스가 되돌아가도 이미 나눠 준 id 뒤에서 예약
+            next_id, end = _reserve_ids(model, settings.SHARD_ID_BLOCK_SIZE, floor=end)
+        _id_blocks[label] = (next_id + 1, end)
+    return next_id
+
+
+def _max_id(model):
+    return max(model._base_manager.using(alias).aggregate(max_id=Max('pk'))['max_id'] or 0 for alias in all_databases())
+
+
+def _reserve_ids(model, count, floor=0):
+    """[시작, 끝) id 범위를 예약 (시작은 floor 이상)"""
+    from .models import ShardSequence
+
+    label = model._meta.label_lower
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        if ShardSequence.objects.filter(name=label).update(next_id=Greatest(F('next_id'), floor) + count):
+            end = ShardSequence.objects.values_list('next_id', flat=True).get(name=label)
+            return end - count, end
+
+    # 처음 쓰는 모델이면 모든 DB 의 최대 id 다음부터 시작
+    start = max(_max_id(model) + 1, floor)
+    try:
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            ShardSequence.objects.create(name=label, next_id=start + count)
+    except IntegrityError:
+        # 다른 프로세스가 먼저 만들었으면 그 값에서 예약
+        return _reserve_ids(model, count, floor)
+    return start, start + count
+
+
+def sync_sequences():
+    """ShardSequence 를 모든 DB 의 최대 id 뒤로 당긴다 (샤딩을 껐다 켠 뒤 등, rebalance_shards 에서 호출)"""
+    from django.apps import apps
+    from .models import ShardSequence
+
+    for model in apps.get_models():
+        if not is_sharded(model):
+            continue
+        label = model._meta.label_lower
+        next_id = _max_id(model) + 1
+        sequence, created = ShardSequence.objects.get_or_create(name=label, defaults={'next_id': next_id})
+        if not created and sequence.next_id < next_id:
+            ShardSequence.objects.filter(name=label, next_id__lt=next_id).update(next_id=next_id)
+    with _id_lock:
+        _id_blocks.clear()
+
+
+class ShardedQuerySet(models.QuerySet):
+    """샤드 간에 겹치지 않는 id 를 붙이고, 저장할 DB 를 인스턴스로 정하는 QuerySet
+
+    using() 없이 create/bulk_create 를 호출하면 QuerySet 에는 인스턴스 힌트가 없어 활성 샤드(없으면 default)로
+    가므로, 인스턴스마다 라우터에 물어 사용자(할 일)의 샤드에 저장한다 (배치 작업/다른 사용자의 행 생성).
+    """
+
+    def _routed(self):
+        return self._db is None and bool(settings.DATABASE_SHARDS)
+
+    def create(self, **kwargs):
+        if not self._routed():
+            return super().create(**kwargs)
+        alias = router.db_for_write(self.model, instance=self.model(**kwargs))
+        return self.using(alias).create(**kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if settings.DATABASE_SHARDS:
+            for obj in objs:
+                if obj.pk is None:
+                    obj.pk = allocate_id(self.model)
+        if not self._routed():
+            return super().bulk_create(objs, *args, **kwargs)
+
+        by_alias = {}
+        for obj in objs:
+            by_alias.setdefault(router.db_for_write(self.model, instance=obj), []).append(obj)
+        for alias, shard_objs in by_alias.items():
+            self.using(alias).bulk_create(shard_objs, *args, **kwargs)
+        return objs
+
+
+def assign_shard_id(sender, instance, raw=False, **kwargs):
+    """pre_save: 샤딩 중이면 새 샤딩 모델 인스턴스에 id 를 미리 붙인다"""
+    if instance.pk is None and not raw and settings.DATABASE_SHARDS and is_sharded(sender):
+        instance.pk = allocate_id(sender)
+
+
+def ensure_user_stubs(users):
+    """사용자마다 샤드의 auth_user 에 같은 id 의 자리 표시 행을 만든다 (로그인 불가, 개인 정보 없음)"""
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    by_shard = {}
+    for user in users:
+        alias = shard_for_user(user)
+        if alias != DEFAULT_DB_ALIAS:
+            by_shard.setdefault(alias, []).append(user)
+
+    created = 0
+    for alias, shard_users in by_shard.items():
+        existing = set(User.objects.using(alias).filter(pk__in=[u.pk for u in shard_users]).values_list('pk', flat=True))
+        stubs = [User(pk=u.pk, username=f'shard-user-{u.pk}', password='!') for u in shard_users if u.pk not in existing]
+        User.objects.using(alias).bulk_create(stubs)
+        created += len(stubs)
+    return created
+
+
+def create_user_stub(sender, instance, created, raw=False, **kwargs):
+    """post_save(User): 새 사용자를 샤드에도 등록"""
+    if created and not raw and settings.DATABASE_SHARDS:
+        ensure_user_stubs([instance])
+
+
+def delete_user_shard_rows(sender, instance, **kwargs):
+    """post_delete(User): 샤드의 사용자 행과 할 일/완료 기록도 삭제"""
+    alias = shard_for_user(instance)
+    if alias not in (DEFAULT_DB_ALIAS, instance._state.db):
+        type(instance).objects.using(alias).filter(pk=instance.pk).delete()
+
+
+def copy_rows(queryset, target):
+    """queryset 의 행을 id 와 저장된 값(auto_now 포함) 그대로 target DB 에 INSERT"""
+    model = queryset.model
+    connection = connections[target]
+    fields = [f for f in model._meta.concrete_fields if not f.generated]
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ', '.join(connection.ops.quote_name(f.column) for f in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    rows = [
+        [f.get_db_prep_save(getattr(obj, f.attname), connection) for f in fields]
+        for obj in queryset.iterator()
+    ]
+    if rows:
+        with connection.cursor() as cursor:
+            cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', rows)
+    return len(rows)
@@ -0,0 +1,212 @@
+import asyncio
+import inspect
+import threading
+import time
+import weakref
+from datetime import date
+from functools import partial, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+
+class _Call:
+    """키 하나의 계산 (진행 중이거나 TTL 동안 재사용하는 결과)"""
+    __slots__ = ('tags', 'expires_at', 'event', 'result', 'error', 'task')
+
+    def __init__(self, tags):
+        self.tags = frozenset(tags)
+        self.expires_at = None  # 끝나서 결과를 재사용 중일 때만 값이 있음
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.task = None
+
+
+class _Flights:
+    """키 -> _Call 저장소 (TTL, 최대 항목 수, 태그로 버리기)"""
+
+    now = staticmethod(time.monotonic)
+
+    def __init__(self, ttl=None, max_entries=None):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return settings.SINGLE_FLIGHT_TTL_SECONDS if self._ttl is None else self._ttl
+
+    @property
+    def max_entries(self):
+        return settings.SINGLE_FLIGHT_MAX_ENTRIES if self._max_entries is None else self._max_entries
+
+    def _all_calls(self):
+        raise NotImplementedError
+
+    def _lookup(self, calls, key):
+        """재사용할 수 있는 호출 (만료된 결과는 버림). self._lock 안에서 호출"""
+        call = calls.get(key)
+        if call is not None and call.expires_at is not None and call.expires_at <= self.now():
+            del calls[key]
+            call = None
+        return call
+
+    def _finish(self, calls, key, call, failed):
+        """계산이 끝난 호출을 TTL 동안 남기거나 버린다. 그 사이 forget() 으로 버려졌으면 남기지 않는다"""
+        with self._lock:
+            if calls.get(key) is not call:
+                return
+            if failed or self.ttl <= 0:
+                del calls[key]
+                return
+            call.expires_at = self.now() + self.ttl
+            if len(calls) > self.max_entries:
+                self._prune(calls)
+
+    def _prune(self, calls):
+        """만료된 결과를 버리고, 그래도 많으면 오래된 결과부터 버린다 (진행 중인 호출은 남김)"""
+        now = self.now()
+        finished = [key for key, call in calls.items() if call.expires_at is not None]
+        for key in finished:
+            if calls[key].expires_at <= now:
+                del calls[key]
+        for key in finished:
+            if len(calls) <= self.max_entries:
+                break
+            calls.pop(key, None)
+
+    def forget(self, tag):
+        """tag 가 붙은 결과와 진행 중인 호출을 버린다 (진행 중인 계산은 끝나도 재사용되지 않음)"""
+        with self._lock:
+            for calls in self._all_calls():
+                for key in [key for key, call in calls.items() if tag in call.tags]:
+                    del calls[key]
+
+    def clear(self):
+        with self._lock:
+            for calls in self._all_calls():
+                calls.clear()
+
+
+class SingleFlight(_Flights):
+    """스레드 간 single-flight (WSGI)
+
+    같은 키로 계산 중인 호출이 있으면 새로 계산하지 않고 threading.Event 로 기다렸다가 같은 결과(또는 예외)를 받는다.
+    끝난 결과는 ttl 초 동안 재사용한다. 결과 객체를 호출한 쪽끼리 공유하므로 고치지 말아야 한다.
+    """
+
+    def __init__(self, ttl=None, max_entries=None):
+        super().__init__(ttl, max_entries)
+        self._calls = {}
+
+    def _all_calls(self):
+        return [self._calls]
+
+    def do(self, key, func, tags=()):
+        with self._lock:
+            call = self._lookup(self._calls, key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call(tags)
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            self._finish(self._calls, key, call, failed=call.error is not None)
+            call.event.set()
+        return call.result
+
+
+class AsyncSingleFlight(_Flights):
+    """이벤트 루프 안의 single-flight (ASGI)
+
+    키마다 계산을 Task 하나로 실행하고 같은 루프의 호출은 모두 그 Task 를 기다린다.
+    기다리던 요청이 취소되어도 계산은 계속되어 다른 호출에 결과를 준다. 루프마다 따로 관리한다.
+    """
+
+    def __init__(self, ttl=None, max_entries=None):
+        super().__init__(ttl, max_entries)
+        self._loops = weakref.WeakKeyDictionary()  # 이벤트 루프 -> {키: _Call}
+
+    def _all_calls(self):
+        return list(self._loops.values())
+
+    async def do(self, key, func, tags=()):
+        """func: 코루틴을 반환하는 함수"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            calls = self._loops.setdefault(loop, {})
+            call = self._lookup(calls, key)
+            if call is None:
+                call = calls[key] = _Call(tags)
+                call.task = loop.create_task(func())
+                call.task.add_done_callback(partial(self._task_done, calls, key, call))
+        return await asyncio.shield(call.task)
+
+    def _task_done(self, calls, key, call, task):
+        self._finish(calls, key, call, failed=task.cancelled() or task.exception() is not None)
+
+
+_threads = SingleFlight()
+_loops = AsyncSingleFlight()
+
+
+def _key_value(value):
+    """모델 인스턴스는 pk, 나머지는 문자열로 (쿼리 파라미터 '1' 과 1 을 같은 키로)"""
+    value = getattr(value, 'pk', value)
+    return None if value is None else str(value)
+
+
+def single_flight(tag):
+    """같은 인자로 동시에 들어온 호출을 한 번만 계산하는 데코레이터
+
+    키는 (함수, 오늘 날짜, 모든 인자)이고 결과는 SINGLE_FLIGHT_TTL_SECONDS 동안 재사용한다.
+    tag 인자(예: task_id)의 값으로 forget() 하면 그 값의 결과를 버린다.
+    함수를 그대로 부르면 스레드 간(WSGI), await f.acall(...) 로 부르면 이벤트 루프 안(ASGI)에서 공유한다.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        def key_and_tags(args, kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            # 기본 날짜가 오늘이라 날짜가 바뀌면 다른 키
+            key = (func.__module__, func.__qualname__, date.today(),
+                   *(_key_value(value) for value in bound.arguments.values()))
+            return key, (_key_value(bound.arguments[tag]),)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key, tags = key_and_tags(args, kwargs)
+            return _threads.do(key, partial(func, *args, **kwargs), tags)
+
+        async def acall(*args, **kwargs):
+            key, tags = key_and_tags(args, kwargs)
+            return await _loops.do(key, partial(sync_to_async(func), *args, **kwargs), tags)
+
+        wrapper.acall = acall
+        return wrapper
+    return decorator
+
+
+def forget(tag):
+    """tag 값으로 계산한 결과를 버린다 (데이터를 바꾼 뒤 호출)"""
+    tag = _key_value(tag)
+    _threads.forget(tag)
+    _loops.forget(tag)
+
+
+def clear():
+    """모든 결과를 버린다 (테스트용)"""
+    _threads.clear()
+    _loops.clear()
@@ -0,0 +1,825 @@
+import asyncio
+import gzip
+import importlib.util
+import io
+import json
+import os
+import pstats
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import path
+from drf_spectacular.generators import SchemaGenerator
+from drf_spectacular.utils import OpenApiParameter, extend_schema as spectacular_extend_schema
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from completions.models import Completion
+from config import profiling, schema, sharding
+from config.idempotency import CacheIdempotencyStore, LocalIdempotencyStore, reset_idempotency_store
+from config.middleware import (
+    HAS_BROTLI, BrotliEncoder, CompressionMiddleware, GzipEncoder, WebOnlyAuthenticationMiddleware,
+    WebOnlyCsrfViewMiddleware, WebOnlyMessageMiddleware, WebOnlySessionMiddleware,
+)
+from config.profiling import PROFILE_ID_HEADER
+from config.renderers import ColumnarJSONRenderer, ColumnarMessagePackRenderer, to_columnar
+from config.throttling import LocalBucketStore, reset_bucket_store
+from config.management.commands import rebalance_shards
+from tasks.models import Task
+from tasks.services import TaskService
+from .models import ShardSequence
+
+SHARDS = ['test_shard_0', 'test_shard_1']
+
+
+class ShardEchoView(sharding.ShardedViewMixin, APIView):
+    def get(self, request):
+        return Response({'shard': sharding.current_shard(), 'self_shard': self.shard})
+
+
+class ShardedTestCase(TestCase):
+    """임시 샤드 DB 두 개를 붙여 DATABASE_SHARDS 를 켠 테스트 (bench_shards 와 같은 방식으로 등록)"""
+
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        for alias in SHARDS:
+            connections.settings[alias] = {**connections.settings[DEFAULT_DB_ALIAS], 'NAME': ':memory:'}
+            call_command('migrate', database=alias, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in SHARDS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+
+    @staticmethod
+    def users_on_each_shard():
+        """서로 다른 샤드에 배치되는 사용자 두 명"""
+        users = {}
+        i = 0
+        while len(users) < len(SHARDS):
+            user = User.objects.create_user(f'user{i}')
+            users.setdefault(sharding.shard_for_user(user), user)
+            i += 1
+        return [users[alias] for alias in SHARDS]
+
+
+@override_settings(DATABASE_SHARDS=SHARDS)
+class ShardRoutingTests(ShardedTestCase):
+    """사용자별 조회/저장 라우팅과 샤드 간 id"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.first, cls.second = cls.users_on_each_shard()
+
+    def test_writes_and_reads_follow_user_shard(self):
+        for user, alias in zip((self.first, self.second), SHARDS):
+            client = APIClient()
+            client.force_authenticate(user)
+            response = client.post('/api/tasks/', {'title': f'{user.username} 할 일', 'task_type': 'daily'}, format='json')
+            self.assertEqual(response.status_code, 201)
+            response = client.post('/api/completions/', {'task_id': response.data['id']}, format='json')
+            self.assertEqual(response.status_code, 201)
+
+            self.assertEqual(Task.objects.using(alias).filter(user=user).count(), 1)
+            self.assertEqual(Completion.objects.using(alias).filter(user=user).count(), 1)
+            response = client.get('/api/tasks/')
+            self.assertEqual([task['title'] for task in response.data], [f'{user.username} 할 일'])
+
+        # 샤딩 모델은 default 에 쓰지 않는다
+        self.assertFalse(Task.objects.using(DEFAULT_DB_ALIAS).exists())
+        self.assertFalse(Completion.objects.using(DEFAULT_DB_ALIAS).exists())
+
+    def test_create_outside_request_uses_instance_shard(self):
+        # 활성 샤드와 관계없이 인스턴스의 사용자 샤드에 저장 (배치 작업)
+        with sharding.use_shard(SHARDS[0]):
+            task = Task.objects.create(user=self.second, title='배치', task_type='daily')
+            tasks = Task.objects.bulk_create([
+                Task(user=user, title='묶음', task_type='daily') for user in (self.first, self.second)
+            ])
+        self.assertEqual(task._state.db, SHARDS[1])
+        self.assertEqual([t._state.db for t in tasks], SHARDS)
+        self.assertEqual(Task.objects.using(SHARDS[1]).filter(user=self.second).count(), 2)
+
+    def test_ids_are_unique_across_shards(self):
+        tasks = [Task.objects.create(user=user, title='습관', task_type='daily') for user in (self.first, self.second)]
+        tasks += Task.objects.bulk_create([
+            Task(user=user, title=f'묶음 {i}', task_type='daily') for i in range(150) for user in (self.first, self.second)
+        ])
+        ids = [pk for alias in SHARDS for pk in Task.objects.using(alias).values_list('pk', flat=True)]
+        self.assertEqual(len(ids), 302)
+        self.assertEqual(len(set(ids)), 302)
+        self.assertEqual(sorted(ids), sorted(task.pk for task in tasks))
+
+        # 예약한 구간은 프로세스 캐시를 지워도 다시 나오지 않는다
+        sequence = ShardSequence.objects.get(name='tasks.task')
+        sharding._id_blocks.clear()
+        self.assertGreaterEqual(sharding.allocate_id(Task), sequence.next_id)
+
+    def test_reservation_survives_rolled_back_sequence(self):
+        first = sharding.allocate_id(Task)
+        # 예약을 감싼 트랜잭션이 롤백돼 시퀀스 행이 사라진 경우
+        ShardSequence.objects.filter(name='tasks.task').delete()
+        with self.settings(SHARD_ID_BLOCK_SIZE=1):
+            sharding._id_blocks['tasks.task'] = (first + 1, first + 1)
+            self.assertGreater(sharding.allocate_id(Task), first)
+
+    def test_user_stub_and_view_mixin(self):
+        for user, alias in zip((self.first, self.second), SHARDS):
+            stub = User.objects.using(alias).get(pk=user.pk)
+            self.assertEqual(stub.username, f'shard-user-{user.pk}')
+            self.assertFalse(stub.has_usable_password())
+            self.assertFalse(User.objects.using(SHARDS[1 - SHARDS.index(alias)]).filter(pk=user.pk).exists())
+
+            request = APIRequestFactory().get('/')
+            force_authenticate(request, user)
+            response = ShardEchoView.as_view()(request)
+            self.assertEqual(response.data, {'shard': alias, 'self_shard': alias})
+            self.assertIsNone(sharding.current_shard())
+
+        request = APIRequestFactory().get('/')
+        self.assertEqual(ShardEchoView.as_view()(request).status_code, 401)
+        self.assertIsNone(sharding.current_shard())
+
+
+@override_settings(DATABASE_SHARDS=[])
+class RebalanceShardsTests(ShardedTestCase):
+    """샤딩을 켠 뒤 default 의 기존 데이터를 샤드로 옮김"""
+
+    @classmethod
+    def setUpTestData(cls):
+        # 샤딩을 켜기 전: 모든 데이터가 default 에 있다
+        cls.users = [User.objects.create_user(f'user{i}') for i in range(4)]
+        today = date.today()
+        for user in cls.users:
+            task = Task.objects.create(user=user, title=f'{user.username} 습관', task_type='daily')
+            for day in range(3):
+                Completion.objects.create(task=task, completed_date=today - timedelta(days=day))
+
+    def rebalance(self):
+        out = io.StringIO()
+        with self.settings(DATABASE_SHARDS=SHARDS):
+            call_command('rebalance_shards', stdout=out)
+        return out.getvalue()
+
+    def assert_all_moved(self):
+        with self.settings(DATABASE_SHARDS=SHARDS):
+            for user in self.users:
+                alias = sharding.shard_for_user(user)
+                self.assertEqual(Task.objects.using(alias).filter(user=user).count(), 1)
+                self.assertEqual(Completion.objects.using(alias).filter(user=user).count(), 3)
+        self.assertFalse(Task.objects.using(DEFAULT_DB_ALIAS).exists())
+        self.assertFalse(Completion.objects.using(DEFAULT_DB_ALIAS).exists())
+
+    def test_interrupted_run_can_be_rerun(self):
+        copy_rows = sharding.copy_rows
+        calls = []
+
+        def interrupt_third_user(queryset, target):
+            if queryset.model is Completion:
+                calls.append(target)
+                if len(calls) == 3:
+                    raise KeyboardInterrupt
+            return copy_rows(queryset, target)
+
+        with mock.patch.object(rebalance_shards, 'copy_rows', interrupt_third_user):
+            with self.assertRaises(KeyboardInterrupt):
+                self.rebalance()
+        # 앞의 두 명은 옮겨졌고 나머지는 default 에 그대로 있다
+        self.assertEqual(Task.objects.using(DEFAULT_DB_ALIAS).count(), 2)
+        self.assertEqual(Completion.objects.using(DEFAULT_DB_ALIAS).count(), 6)
+
+        self.assertIn('2명 이동', self.rebalance())
+        self.assert_all_moved()
+        self.assertIn('0명 이동', self.rebalance())
+
+    def test_leftover_copy_from_crash_is_replaced(self):
+        # 대상에 복사·커밋한 뒤 원본을 지우기 전에 멈춘 경우
+        user = self.users[0]
+        with self.settings(DATABASE_SHARDS=SHARDS):
+            alias = sharding.shard_for_user(user)
+            sharding.ensure_user_stubs([user])
+        tasks = Task.objects.using(DEFAULT_DB_ALIAS).filter(user=user)
+        sharding.copy_rows(tasks, alias)
+        sharding.copy_rows(Completion.objects.using(DEFAULT_DB_ALIAS).filter(task__in=tasks), alias)
+
+        self.assertIn('4명 이동', self.rebalance())
+        self.assert_all_moved()
+        # 옮긴 뒤 새로 만든 행의 id 는 옮긴 행과 겹치지 않는다
+        with self.settings(DATABASE_SHARDS=SHARDS):
+            task = Task.objects.create(user=user, title='새 습관', task_type='daily')
+        moved_ids = {pk for alias in SHARDS for pk in Task.objects.using(alias).exclude(pk=task.pk).values_list('pk', flat=True)}
+        self.assertNotIn(task.pk, moved_ids)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class IdempotencyTests(TestCase):
+    """Idempotency-Key 재전송/충돌 처리"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+
+    def setUp(self):
+        reset_idempotency_store()
+        self.addCleanup(reset_idempotency_store)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, key, title='운동'):
+        return self.client.post(
+            '/api/tasks/', {'title': title, 'task_type': 'daily'}, format='json', HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_same_key_replays_first_response(self):
+        first = self.post('key-1')
+        self.assertEqual(first.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', first)
+
+        second = self.post('key-1')
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(Task.objects.count(), 1)
+
+        # 다른 키는 새로 처리
+        self.assertEqual(self.post('key-2').status_code, 201)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_same_key_while_first_is_in_flight_is_conflict(self):
+        create_task = TaskService.create_task
+        retried = []
+
+        def create_and_retry(user, **data):
+            # 첫 요청을 처리하는 중에 클라이언트가 같은 키로 다시 보냄
+            retried.append(self.post('key-1'))
+            return create_task(user, **data)
+
+        with mock.patch.object(TaskService, 'create_task', side_effect=create_and_retry):
+            response = self.post('key-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(retried[0].status_code, 409)
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertEqual(self.post('key-1')['Idempotent-Replayed'], 'true')
+
+    def test_same_key_with_different_body_is_rejected(self):
+        self.assertEqual(self.post('key-1').status_code, 201)
+        response = self.post('key-1', title='독서')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_failed_request_can_be_retried(self):
+        with mock.patch.object(TaskService, 'create_task', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.post('key-1')
+        self.assertEqual(self.post('key-1').status_code, 201)
+
+    @override_settings(IDEMPOTENCY_STORE='config.idempotency.LocalIdempotencyStore')
+    def test_stale_pending_entry_expires_after_lease(self):
+        clock = [1000.0]
+        with mock.patch('config.idempotency.time.monotonic', side_effect=lambda: clock[0]):
+            # 처리 중에 워커가 죽어 처리 중 표시만 남음
+            with mock.patch.object(TaskService, 'create_task', side_effect=SystemExit):
+                with self.assertRaises(SystemExit):
+                    self.post('key-1')
+            self.assertEqual(self.post('key-1').status_code, 409)
+
+            clock[0] += settings.IDEMPOTENCY_PENDING_TTL
+            self.assertEqual(self.post('key-1').status_code, 201)
+
+            # 완료한 응답은 IDEMPOTENCY_TTL 동안 남는다
+            clock[0] += settings.IDEMPOTENCY_PENDING_TTL
+            self.assertEqual(self.post('key-1')['Idempotent-Replayed'], 'true')
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_default_store_is_shared_between_workers(self):
+        # 워커마다 저장소 인스턴스가 달라도 같은 캐시 테이블을 본다
+        first, second = CacheIdempotencyStore(), CacheIdempotencyStore()
+        self.assertTrue(first.add('idempotency:test', {'state': 'pending'}, 60))
+        self.assertFalse(second.add('idempotency:test', {'state': 'pending'}, 60))
+        self.assertEqual(second.get('idempotency:test'), {'state': 'pending'})
+
+    def test_local_store_refuses_multiple_workers(self):
+        with self.settings(WEB_CONCURRENCY=4):
+            with self.assertRaises(ImproperlyConfigured):
+                LocalIdempotencyStore()
+        self.assertIsInstance(LocalIdempotencyStore(), LocalIdempotencyStore)
+
+
+class LocalBucketStoreTests(SimpleTestCase):
+    """프로세스 메모리 토큰 버킷"""
+
+    def setUp(self):
+        self.clock = 1000.0
+        self.store = LocalBucketStore()
+        self.store.now = lambda: self.clock
+
+    def test_cost_and_wait(self):
+        self.assertEqual(self.store.consume('a', rate=1.0, burst=5, cost=3), (True, 0.0))
+        allowed, wait = self.store.consume('a', rate=1.0, burst=5, cost=3)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(wait, 1.0)
+        self.clock += 1
+        self.assertTrue(self.store.consume('a', rate=1.0, burst=5, cost=3)[0])
+
+    def test_prune_uses_each_buckets_refill_time(self):
+        self.store.max_keys = 10
+        self.store.prune_ratio = 0.5
+        # 100초에 걸쳐 다시 차는 버킷을 비워 둔다
+        self.store.consume('slow', rate=1.0, burst=100, cost=100)
+        self.clock += 1
+        # 0.1초면 다시 차는 버킷이 많이 생겨 정리가 돌아도 slow 는 남는다
+        for i in range(30):
+            self.store.consume(f'fast{i}', rate=10.0, burst=1, cost=1)
+            self.clock += 0.5
+        self.assertLessEqual(len(self.store._buckets), 10)
+        self.assertFalse(self.store.consume('slow', rate=1.0, burst=100, cost=50)[0])
+
+    def test_prune_is_amortized_and_falls_back_to_lru(self):
+        self.store.max_keys = 100
+        with mock.patch.object(self.store, '_prune', wraps=self.store._prune) as prune:
+            # 모두 아직 차는 중이라 가장 오래 쓰지 않은 것부터 지운다
+            for i in range(1000):
+                self.store.consume(f'key{i}', rate=1.0, burst=10, cost=10)
+        self.assertLessEqual(prune.call_count, 1000 // 10)
+        self.assertLessEqual(len(self.store._buckets), 100)
+        self.assertIn('key999', self.store._buckets)
+        self.assertNotIn('key0', self.store._buckets)
+
+
+@override_settings(DATABASE_SHARDS=[], THROTTLE_BUCKETS={'user': {'rate': '1/min', 'burst': 3}})
+class ThrottleAPITests(TestCase):
+    """요청 제한 응답"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+
+    def setUp(self):
+        reset_bucket_store()
+        self.addCleanup(reset_bucket_store)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_action_cost_and_retry_after(self):
+        # dashboard 는 토큰 2개를 쓴다: 3 -> 1
+        self.assertEqual(self.client.get('/api/tasks/dashboard/').status_code, 200)
+        response = self.client.get('/api/tasks/dashboard/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '60')
+        # 남은 1개로 일반 요청은 허용
+        self.assertEqual(self.client.get('/api/tasks/').status_code, 200)
+        self.assertEqual(self.client.get('/api/tasks/').status_code, 429)
+
+        # 다른 사용자는 따로 센다
+        other = User.objects.create_user('other')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get('/api/tasks/').status_code, 200)
+
+
+@override_settings(COMPRESSION_MIN_SIZE=100, COMPRESSION_CONTENT_TYPES=['application/json'])
+class CompressionMiddlewareTests(SimpleTestCase):
+    """gzip/brotli 응답 압축"""
+
+    BODY = json.dumps([{'id': i, 'title': f'할 일 {i}'} for i in range(50)]).encode()
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def encoding_for(self, accept_encoding):
+        middleware = CompressionMiddleware(lambda request: None)
+        return middleware.select_encoding(self.factory.get('/', HTTP_ACCEPT_ENCODING=accept_encoding))
+
+    def respond(self, response, accept_encoding='gzip'):
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(self.factory.get('/api/tasks/', HTTP_ACCEPT_ENCODING=accept_encoding))
+
+    # 인코더를 만들지 않고 이름만 고르므로 brotli 가 없어도 된다
+    @mock.patch.dict('config.middleware.ENCODERS', {'gzip': GzipEncoder, 'br': BrotliEncoder})
+    def test_q_values(self):
+        self.assertEqual(self.encoding_for('gzip, br'), 'br')
+        self.assertEqual(self.encoding_for('gzip;q=1.0, br;q=0.5'), 'gzip')
+        self.assertEqual(self.encoding_for('GZIP'), 'gzip')
+        self.assertEqual(self.encoding_for('*'), 'br')
+        self.assertEqual(self.encoding_for('br;q=0, *'), 'gzip')
+        self.assertEqual(self.encoding_for('*;q=0.5, gzip;q=0.1'), 'br')
+        self.assertIsNone(self.encoding_for('br;q=0, gzip;q=0'))
+        self.assertIsNone(self.encoding_for('*;q=0'))
+        self.assertIsNone(self.encoding_for('identity'))
+        self.assertIsNone(self.encoding_for(''))
+
+    def test_compresses_large_json(self):
+        response = self.respond(HttpResponse(self.BODY, content_type='application/json', headers={'ETag': '"v1"'}))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.BODY)
+        self.assertEqual(response['Content-Length'], str(len(response.content)))
+        self.assertEqual(response['ETag'], 'W/"v1"')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    @skipUnless(HAS_BROTLI, 'brotli 미설치')
+    def test_brotli(self):
+        import brotli
+
+        response = self.respond(HttpResponse(self.BODY, content_type='application/json'), 'gzip, br')
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), self.BODY)
+
+    def test_skips_small_and_other_content_types(self):
+        small = self.respond(HttpResponse(b'{"ok": true}', content_type='application/json'))
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertFalse(small.has_header('Vary'))
+
+        html = self.respond(HttpResponse(self.BODY, content_type='text/html'))
+        self.assertFalse(html.has_header('Content-Encoding'))
+        self.assertEqual(html.content, self.BODY)
+
+    def test_vary_is_set_even_when_not_compressed(self):
+        response = self.respond(HttpResponse(self.BODY, content_type='application/json'), 'identity')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(response.content, self.BODY)
+
+    def test_streaming_response(self):
+        chunks = [self.BODY[i:i + 64] for i in range(0, len(self.BODY), 64)]
+        response = self.respond(StreamingHttpResponse(iter(chunks), content_type='application/json'))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), self.BODY)
+
+    def test_async_streaming_response(self):
+        async def chunks():
+            for i in range(0, len(self.BODY), 64):
+                yield self.BODY[i:i + 64]
+
+        async def collect(iterator):
+            return b''.join([chunk async for chunk in iterator])
+
+        response = self.respond(StreamingHttpResponse(chunks(), content_type='application/json'))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(asyncio.run(collect(response.streaming_content))), self.BODY)
+
+
+@override_settings(DATABASE_SHARDS=[], PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=0, PROFILING_MIN_DURATION_MS=0)
+class ProfilingMiddlewareTests(TestCase):
+    """요청 단위 프로파일링"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user('staff', is_staff=True)
+        cls.user = User.objects.create_user('tester')
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output_dir = Path(tmp.name)
+        override = self.settings(PROFILING_DIR=self.output_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def get(self, user, path='/api/tasks/', **extra):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        response = client.get(path, **extra)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def saved(self):
+        return sorted(path.name for path in self.output_dir.iterdir())
+
+    def test_staff_request_is_profiled(self):
+        response = self.get(self.staff, HTTP_X_PROFILE='1')
+
+        profile_id = response[PROFILE_ID_HEADER]
+        self.assertRegex(profile_id, r'^\d{8}-\d{6}-\d{6}-\d+-GET-api_tasks-\d+ms$')
+        self.assertEqual(self.saved(), [f'{profile_id}.prof', f'{profile_id}.txt'])
+        summary = (self.output_dir / f'{profile_id}.txt').read_text()
+        self.assertTrue(summary.startswith('GET /api/tasks/ -> 200 ('))
+        self.assertIn('cumulative', summary)
+        pstats.Stats(str(self.output_dir / f'{profile_id}.prof'))
+
+    def test_memory_profile(self):
+        response = self.get(self.staff, '/api/tasks/?_profile=cpu,memory')
+
+        alloc = (self.output_dir / f'{response[PROFILE_ID_HEADER]}.alloc.txt').read_text()
+        self.assertTrue(alloc.startswith('total '))
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_non_staff_request_is_not_profiled(self):
+        response = self.get(self.user, HTTP_X_PROFILE='1')
+
+        self.assertFalse(response.has_header(PROFILE_ID_HEADER))
+        self.assertFalse(self.output_dir.exists() and self.saved())
+
+    def test_staff_session_on_web_paths(self):
+        # 인증 미들웨어보다 먼저 실행되므로 세션에서 직접 사용자를 읽는다
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pass1234!'))
+        response = self.client.get('/admin/', {'_profile': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(PROFILE_ID_HEADER, response)
+
+        self.client.logout()
+        response = self.client.get('/admin/login/', {'_profile': '1'})
+        self.assertNotIn(PROFILE_ID_HEADER, response)
+
+    def test_sampling_saves_slow_requests_without_reporting(self):
+        with self.settings(PROFILING_SAMPLE_RATE=1):
+            response = self.get(self.user)
+            self.assertFalse(response.has_header(PROFILE_ID_HEADER))
+            self.assertEqual(len(self.saved()), 2)
+
+            with self.settings(PROFILING_MIN_DURATION_MS=60_000):
+                self.get(self.user)
+            self.assertEqual(len(self.saved()), 2)
+
+        with self.settings(PROFILING_SAMPLE_RATE=0):
+            self.get(self.user)
+        self.assertEqual(len(self.saved()), 2)
+
+    def test_one_request_at_a_time(self):
+        with self.settings(PROFILING_SAMPLE_RATE=1), profiling._profile_lock:
+            # 다른 요청을 프로파일링 중이면 샘플링 요청은 그대로 처리
+            self.get(self.user)
+        self.assertFalse(self.output_dir.exists() and self.saved())
+
+        # 다른 프로파일러가 이미 동작 중이면 프로파일링 없이 처리
+        with mock.patch('config.profiling.cProfile.Profile.enable', side_effect=ValueError):
+            response = self.get(self.staff, HTTP_X_PROFILE='1')
+        self.assertFalse(response.has_header(PROFILE_ID_HEADER))
+
+    def test_disabled(self):
+        with self.settings(PROFILING_ENABLED=False, PROFILING_SAMPLE_RATE=1):
+            response = self.get(self.staff, HTTP_X_PROFILE='1')
+        self.assertFalse(response.has_header(PROFILE_ID_HEADER))
+        self.assertFalse(self.output_dir.exists() and self.saved())
+
+
+class SchemaEchoSerializer(serializers.Serializer):
+    q = serializers.CharField()
+
+
+SCHEMA_ANNOTATION = dict(
+    tags=['Echo'],
+    summary='에코',
+    description='검색어를 그대로 돌려줍니다.',
+    parameters=[OpenApiParameter(name='q', type=str, description='검색어', required=True)],
+    responses={200: SchemaEchoSerializer},
+)
+
+
+class DeferredSchemaView(APIView):
+    @schema.extend_schema(**SCHEMA_ANNOTATION)
+    def get(self, request):
+        return Response({'q': request.GET.get('q')})
+
+
+class DirectSchemaView(APIView):
+    @spectacular_extend_schema(**SCHEMA_ANNOTATION)
+    def get(self, request):
+        return Response({'q': request.GET.get('q')})
+
+
+@override_settings(DATABASE_SHARDS=[])
+class SchemaTests(TestCase):
+    """미리 생성한 OpenAPI 스키마와 지연 적용 extend_schema"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = self.settings(PREBUILT_SCHEMA_DIR=Path(tmp.name))
+        override.enable()
+        self.addCleanup(override.disable)
+        schema._schema_cache.clear()
+        self.addCleanup(schema._schema_cache.clear)
+
+    def test_prebuilt_schema_etag(self):
+        call_command('build_schema', stdout=io.StringIO())
+
+        response = self.client.get('/api/schema/', {'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.oai.openapi+json; charset=utf-8')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertEqual(response.content, schema.schema_path('json').read_bytes())
+        etag = response['ETag']
+
+        response = self.client.get('/api/schema/', {'format': 'json'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        yaml_response = self.client.get('/api/schema/')
+        self.assertTrue(yaml_response['Content-Type'].startswith('application/vnd.oai.openapi;'))
+        self.assertNotEqual(yaml_response['ETag'], etag)
+
+        # 파일을 다시 만들면 새 ETag
+        json_file = schema.schema_path('json')
+        json_file.write_bytes(json_file.read_bytes() + b'\n')
+        os.utime(json_file, (json_file.stat().st_atime, json_file.stat().st_mtime + 10))
+        response = self.client.get('/api/schema/', {'format': 'json'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_compressed_schema_etag_still_matches(self):
+        call_command('build_schema', stdout=io.StringIO())
+
+        response = self.client.get('/api/schema/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        for if_none_match in (etag, f'"other", {etag}', '*'):
+            with self.subTest(if_none_match=if_none_match):
+                response = self.client.get('/api/schema/', HTTP_ACCEPT_ENCODING='gzip',
+                                           HTTP_IF_NONE_MATCH=if_none_match)
+                self.assertEqual(response.status_code, 304)
+
+        response = self.client.get('/api/schema/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_generates_schema_without_prebuilt_files(self):
+        response = self.client.get('/api/schema/', {'format': 'json'})
+
+        self.assertEqual(response.status_code, 200)
+        document = json.loads(response.content)
+        self.assertEqual(document['paths']['/api/search/']['get']['summary'], '전문 검색')
+        self.assertEqual(schema._deferred_annotations, [])
+
+    def test_deferred_extend_schema_matches_drf_spectacular(self):
+        def generate(view):
+            schema.apply_deferred_schemas()
+            generator = SchemaGenerator(patterns=[path('echo/', view.as_view())])
+            return generator.get_schema(request=None, public=True)
+
+        deferred = generate(DeferredSchemaView)
+        self.assertEqual(deferred, generate(DirectSchemaView))
+        self.assertEqual(deferred['paths']['/echo/']['get']['summary'], '에코')
+
+
+@override_settings(DATABASE_SHARDS=[])
+class WebOnlyMiddlewareTests(TestCase):
+    """API 경로에서 세션/CSRF/인증/메시지 미들웨어 건너뛰기"""
+
+    WEB_ONLY = [WebOnlySessionMiddleware, WebOnlyAuthenticationMiddleware, WebOnlyMessageMiddleware]
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def run_request_hooks(self, path):
+        request = self.factory.get(path)
+        for middleware_class in self.WEB_ONLY:
+            middleware_class(lambda r: HttpResponse()).process_request(request)
+        return request
+
+    def test_request_hooks_skip_api_paths(self):
+        api = self.run_request_hooks('/api/tasks/')
+        for attribute in ('session', 'user', '_messages'):
+            self.assertFalse(hasattr(api, attribute), attribute)
+
+        web = self.run_request_hooks('/admin/')
+        self.assertFalse(web.user.is_authenticated)
+        self.assertTrue(hasattr(web, 'session'))
+        self.assertTrue(hasattr(web, '_messages'))
+
+    def test_subclasses_keep_system_checks_happy(self):
+        self.assertTrue(issubclass(WebOnlySessionMiddleware, SessionMiddleware))
+        self.assertTrue(issubclass(WebOnlyCsrfViewMiddleware, CsrfViewMiddleware))
+        self.assertEqual(WebOnlyMessageMiddleware.__name__, 'WebOnlyMessageMiddleware')
+
+    def test_csrf_is_enforced_only_outside_api(self):
+        User.objects.create_user('tester', password='pass1234!')
+        client = APIClient(enforce_csrf_checks=True)
+        credentials = {'username': 'tester', 'password': 'pass1234!'}
+
+        self.assertEqual(client.post('/api/users/login/', credentials).status_code, 200)
+        self.assertEqual(client.post('/admin/login/', credentials).status_code, 403)
+
+    def test_api_responses_do_not_touch_the_session(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass1234!')
+        self.client.force_login(admin)
+
+        # 세션 쿠키가 있어도 API 요청은 세션을 읽지 않는다
+        api = self.client.get('/api/schema/swagger-ui/')
+        self.assertEqual(api.status_code, 200)
+        self.assertFalse(hasattr(api.wsgi_request, 'session'))
+        self.assertNotIn('Cookie', api.get('Vary', ''))
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, api.cookies)
+
+        web = self.client.get('/admin/')
+        self.assertEqual(web.status_code, 200)
+        self.assertIn('Cookie', web['Vary'])
+        self.assertEqual(web.wsgi_request.user, admin)
+
+
+class ColumnarLayoutTests(SimpleTestCase):
+    """목록 응답의 컬럼형 변환"""
+
+    def test_to_columnar(self):
+        rows = [{'id': 1, 'title': 'a'}, {'id': 2, 'title': 'b'}]
+        self.assertEqual(to_columnar(rows), {'columns': ['id', 'title'], 'rows': [[1, 'a'], [2, 'b']]})
+        self.assertEqual(to_columnar([]), {'columns': [], 'rows': []})
+        self.assertIsNone(to_columnar([{'id': 1}, {'id': 2, 'title': 'b'}]))
+        self.assertIsNone(to_columnar([{'id': 1}, 2]))
+        self.assertIsNone(to_columnar({'id': 1}))
+
+    def test_paginated_and_other_payloads(self):
+        page = {'count': 1, 'next': None, 'previous': None, 'results': [{'id': 1}]}
+        self.assertEqual(
+            ColumnarJSONRenderer().render(page),
+            json.dumps({**page, 'results': {'columns': ['id'], 'rows': [[1]]}}, separators=(',', ':')).encode()
+        )
+        # 목록이 아니면 그대로
+        self.assertEqual(json.loads(ColumnarJSONRenderer().render({'detail': '없음'})), {'detail': '없음'})
+        self.assertEqual(ColumnarMessagePackRenderer().render(None), b'')
+
+
+@skipUnless(importlib.util.find_spec('msgpack'), 'msgpack 미설치')
+@override_settings(DATABASE_SHARDS=[])
+class CompactRendererAPITests(TestCase):
+    """Accept 헤더/format 으로 고르는 압축 포맷 응답"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        for i in range(3):
+            Task.objects.create(user=cls.user, title=f'할 일 {i}', task_type='once', due_date=date(2026, 10, 20 + i))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, path='/api/tasks/', **extra):
+        response = self.client.get(path, **extra)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_json_stays_the_default(self):
+        response = self.get()
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIsInstance(response.json()[0], dict)
+
+    def test_columnar_json(self):
+        plain = self.get().json()
+        response = self.get(HTTP_ACCEPT='application/vnd.columnar+json')
+
+        self.assertEqual(response['Content-Type'], 'application/vnd.columnar+json')
+        payload = json.loads(response.content)
+        self.assertEqual([dict(zip(payload['columns'], row)) for row in payload['rows']], plain)
+        self.assertEqual(json.loads(self.get('/api/tasks/?format=columnar').content), payload)
+
+    def test_msgpack(self):
+        import msgpack
+
+        plain = self.get().json()
+        response = self.get(HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(response['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(response.content), plain)
+
+        response = self.get(HTTP_ACCEPT='application/vnd.columnar+msgpack')
+        payload = msgpack.unpackb(response.content)
+        self.assertEqual(payload['columns'], list(plain[0]))
+        self.assertEqual(len(payload['rows']), 3)
+
+    def test_content_negotiation(self):
+        # 여러 포맷을 받으면 렌더러 목록 순서(JSON 우선)를 따른다
+        self.assertEqual(self.get(HTTP_ACCEPT='*/*')['Content-Type'], 'application/json')
+        self.assertEqual(
+            self.get(HTTP_ACCEPT='application/msgpack, application/json')['Content-Type'], 'application/json'
+        )
+        self.assertEqual(
+            self.get(HTTP_ACCEPT='application/msgpack, application/vnd.columnar+json')['Content-Type'],
+            'application/vnd.columnar+json'
+        )
+        # 상세/에러 같은 목록이 아닌 응답은 컬럼형으로 바꾸지 않는다
+        task_id = self.get().json()[0]['id']
+        detail = json.loads(self.get(f'/api/tasks/{task_id}/', HTTP_ACCEPT='application/vnd.columnar+json').content)
+        self.assertEqual(detail['id'], task_id)
+
+        self.assertEqual(self.client.get('/api/tasks/', HTTP_ACCEPT='text/csv').status_code, 406)
+        self.assertEqual(self.client.get('/api/tasks/?format=xml').status_code, 404)
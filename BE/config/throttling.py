@@ -0,0 +1,169 @@
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'120/min' 형식을 초당 토큰 수로 변환"""
+    num, period = rate.split('/')
+    return int(num) / PERIODS[period[0]]
+
+
+class LocalBucketStore:
+    """프로세스 메모리 토큰 버킷 저장소
+
+    잠금 없이 (남은 토큰, 마지막 갱신 시각, 다시 가득 차는 시각) 튜플을 통째로 바꿔 끼운다.
+    dict 읽기/쓰기 자체는 GIL 로 원자적이고, 같은 키에 동시 요청이 겹치면
+    토큰 한두 개를 더 허용할 수 있지만 요청마다 잠금을 잡는 비용보다 싸다.
+
+    버킷은 마지막으로 쓴 순서로 두고, max_keys 를 넘으면 오래 쓰지 않은 것부터
+    각자의 가득 차는 시각이 지난 버킷(= 없는 것과 같은 버킷)을 지운다.
+    한 번에 max_keys 의 prune_ratio 만큼 비우므로 정리 비용은 새 키마다 상수로 나뉜다.
+    """
+    max_keys = 100_000
+    prune_ratio = 0.1
+
+    now = staticmethod(time.monotonic)
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+
+    def consume(self, key, rate, burst, cost):
+        """cost 만큼 토큰을 꺼낸다. (허용 여부, 다시 시도까지 남은 초) 반환"""
+        now = self.now()
+        tokens, stamp, _ = self._buckets.get(key) or (burst, now, now)
+        tokens = min(burst, tokens + (now - stamp) * rate)
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._prune(now)
+        return (True, 0.0) if allowed else (False, (cost - tokens) / rate)
+
+    def _prune(self, now):
+        """max_keys 의 (1 - prune_ratio) 까지 줄인다
+
+        오래 쓰지 않은 것부터 가득 찬 버킷을 지우고, 그래도 남으면(모두 아직 차는 중)
+        가장 오래 쓰지 않은 버킷부터 지운다 (그 클라이언트는 burst 를 다시 받음).
+        """
+        excess = len(self._buckets) - int(self.max_keys * (1 - self.prune_ratio))
+        items = list(self._buckets.items())
+        full = {key for key, (_, _, full_at) in items if full_at <= now}
+        evict = [key for key, _ in items if key in full][:excess]
+        if len(evict) < excess:
+            evict += [key for key, _ in items if key not in full][:excess - len(evict)]
+        for key in evict:
+            self._buckets.pop(key, None)
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class CacheBucketStore:
+    """Django 캐시 토큰 버킷 저장소 (여러 프로세스/서버가 버킷 공유)
+
+    THROTTLE_CACHE_ALIAS 캐시(Redis, Memcached 등)를 사용한다.
+    읽기-계산-쓰기가 원자적이지 않으므로 동시 요청에서 약간 더 허용될 수 있다.
+    """
+
+    now = staticmethod(time.time)
+
+    def __init__(self):
+        self.cache = caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def consume(self, key, rate, burst, cost):
+        """cost 만큼 토큰을 꺼낸다. (허용 여부, 다시 시도까지 남은 초) 반환"""
+        now = self.now()
+        tokens, stamp = self.cache.get(key) or (burst, now)
+        tokens = min(burst, tokens + (now - stamp) * rate)
+        # 다시 가득 찰 시간이 지나면 없는 키와 같으므로 그때 만료
+        timeout = int(burst / rate) + 1
+
+        if tokens >= cost:
+            self.cache.set(key, (tokens - cost, now), timeout)
+            return True, 0.0
+
+        self.cache.set(key, (tokens, now), timeout)
+        return False, (cost - tokens) / rate
+
+    def clear(self):
+        self.cache.clear()
+
+
+_store = None
+
+
+def get_bucket_store():
+    """THROTTLE_BUCKET_STORE 설정에 지정된 저장소 (프로세스당 1개)"""
+    global _store
+    if _store is None:
+        _store = import_string(settings.THROTTLE_BUCKET_STORE)()
+    return _store
+
+
+def reset_bucket_store():
+    """저장소를 버리고 다음 검사 때 새로 생성 (설정 변경, 테스트용)"""
+    global _store
+    _store = None
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """토큰 버킷 스로틀
+
+    - THROTTLE_BUCKETS[scope] 의 rate('120/min')로 토큰이 차고 burst 개까지 쌓인다
+    - 요청마다 view.throttle_costs[action] 개(기본 1)의 토큰을 쓴다
+    - scope 에 해당하는 버킷 설정이 없으면 제한하지 않는다
+    """
+    scope = None
+
+    def get_scope(self, request, view):
+        return self.scope
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+    def get_cost(self, view, burst):
+        costs = getattr(view, 'throttle_costs', None) or {}
+        return min(costs.get(getattr(view, 'action', None), 1), burst)
+
+    def allow_request(self, request, view):
+        self._wait = None
+        scope = self.get_scope(request, view)
+        bucket = settings.THROTTLE_BUCKETS.get(scope) if scope else None
+        if bucket is None:
+            return True
+
+        rate = parse_rate(bucket['rate'])
+        burst = bucket['burst']
+        key = f'throttle:{scope}:{self.get_ident_key(request)}'
+
+        allowed, self._wait = get_bucket_store().consume(key, rate, burst, self.get_cost(view, burst))
+        return allowed
+
+    def wait(self):
+        return self._wait
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """사용자(비로그인은 IP)별 전체 요청 스로틀"""
+
+    def get_scope(self, request, view):
+        return 'user' if request.user and request.user.is_authenticated else 'anon'
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """view.throttle_scope 별 스로틀 (사용자마다 따로)"""
+
+    def get_scope(self, request, view):
+        return getattr(view, 'throttle_scope', None)
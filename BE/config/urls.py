@@ -16,7 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from config.schema import lazy_view, schema_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,8 +25,11 @@ urlpatterns = [
     path('api/users/', include('users.urls')),
     path('api/tasks/', include('tasks.urls')),
     path('api/completions/', include('completions.urls')),
+    path('api/search/', include('search.urls')),
+    path('api/reminders/', include('reminders.urls')),
+    path('api/webhooks/', include('webhooks.urls')),
 
     # Swagger
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/schema/swagger-ui/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    path('api/schema/', schema_view, name='schema'),
+    path('api/schema/swagger-ui/', lazy_view('drf_spectacular.views.SpectacularSwaggerView', url_name='schema'), name='swagger-ui'),
 ]
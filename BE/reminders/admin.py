@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Reminder
+
+
+@admin.register(Reminder)
+class ReminderAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'user', 'kind', 'remind_time', 'is_active', 'next_fire_at', 'last_fired_at']
+    list_filter = ['kind', 'is_active']
+    raw_id_fields = ['task', 'user']
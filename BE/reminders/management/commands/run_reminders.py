@@ -0,0 +1,46 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reminders.services import ReminderService
+from reminders.sinks import get_sink
+
+
+class Command(BaseCommand):
+    """알림 스케줄러 워커
+
+    next_fire_at 인덱스에서 가장 빠른 알림 시각을 확인해 그때까지 잠들고,
+    시각이 된 알림을 배치로 발송한다. 새로 등록된 알림을 놓치지 않도록
+    --poll-interval 보다 오래 잠들지는 않는다.
+    """
+    help = '알림 스케줄러 실행'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='트랜잭션당 처리할 알림 수')
+        parser.add_argument('--poll-interval', type=float, default=30.0, help='최대 대기 시간(초)')
+        parser.add_argument('--once', action='store_true', help='현재 시각 기준으로 한 번만 처리하고 종료')
+
+    def handle(self, *args, **options):
+        sink = get_sink()
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        while not self._stopping:
+            fired = ReminderService.fire_due_all(sink, batch_size=options['batch_size'])
+            if fired:
+                self.stdout.write(f'[{timezone.localtime():%Y-%m-%d %H:%M:%S}] {fired}건 처리')
+            if options['once']:
+                break
+            time.sleep(self._sleep_seconds(options['poll_interval']))
+
+    def _sleep_seconds(self, poll_interval):
+        next_fire_at = ReminderService.next_fire_time()
+        if next_fire_at is None:
+            return poll_interval
+        return min(max((next_fire_at - timezone.now()).total_seconds(), 0.05), poll_interval)
+
+    def _stop(self, signum, frame):
+        self._stopping = True
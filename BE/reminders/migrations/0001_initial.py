@@ -0,0 +1,39 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tasks', '0002_task_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('due', '마감 알림'), ('habit', '미완료 습관 알림')], max_length=10, verbose_name='알림 종류')),
+                ('remind_time', models.TimeField(verbose_name='알림 시각')),
+                ('days_before', models.PositiveSmallIntegerField(default=0, help_text='마감 알림: 마감일 며칠 전에 알릴지', verbose_name='며칠 전')),
+                ('is_active', models.BooleanField(default=True, verbose_name='활성')),
+                ('next_fire_at', models.DateTimeField(blank=True, null=True, verbose_name='다음 알림 일시')),
+                ('last_fired_at', models.DateTimeField(blank=True, null=True, verbose_name='마지막 알림 일시')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일시')),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='tasks.task', verbose_name='할 일')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+            ],
+            options={
+                'verbose_name': '알림',
+                'verbose_name_plural': '알림 목록',
+                'ordering': ['next_fire_at'],
+                'indexes': [models.Index(fields=['is_active', 'next_fire_at'], name='reminder_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import models
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from config.sharding import ShardedQuerySet
+from tasks.models import Task
+
+
+class Reminder(models.Model):
+    """알림 모델
+
+    next_fire_at 에 다음 발송 시각을 미리 계산해 두고 인덱스로 조회하므로
+    스케줄러는 전체 할 일이 아니라 발송 시각이 된 알림만 읽는다.
+    """
+
+    KIND_CHOICES = [
+        ('due', '마감 알림'),
+        ('habit', '미완료 습관 알림'),
+    ]
+
+    # 관계
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reminders', verbose_name='사용자')
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='reminders', verbose_name='할 일')
+
+    # 알림 설정
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name='알림 종류')
+    remind_time = models.TimeField(verbose_name='알림 시각')
+    days_before = models.PositiveSmallIntegerField(default=0, verbose_name='며칠 전',
+                                                   help_text='마감 알림: 마감일 며칠 전에 알릴지')
+
+    # 스케줄 상태
+    is_active = models.BooleanField(default=True, verbose_name='활성')
+    next_fire_at = models.DateTimeField(null=True, blank=True, verbose_name='다음 알림 일시')
+    last_fired_at = models.DateTimeField(null=True, blank=True, verbose_name='마지막 알림 일시')
+
+    # 메타 정보
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = '알림'
+        verbose_name_plural = '알림 목록'
+        ordering = ['next_fire_at']
+        indexes = [
+            # 스케줄러: is_active=True AND next_fire_at <= now ORDER BY next_fire_at
+            models.Index(fields=['is_active', 'next_fire_at'], name='reminder_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task.title} - {self.get_kind_display()} {self.remind_time}"
+
+    def clean(self):
+        """모델 검증"""
+        if self.kind == 'due' and self.task_id and self.task.task_type != 'once':
+            raise ValidationError({'kind': '마감 알림은 once 타입 할 일에만 설정할 수 있습니다.'})
+        if self.kind == 'habit' and self.task_id and self.task.task_type == 'once':
+            raise ValidationError({'kind': '습관 알림은 반복 할 일에만 설정할 수 있습니다.'})
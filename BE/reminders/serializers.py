@@ -0,0 +1,49 @@
+from rest_framework import serializers
+from tasks.models import Task
+from .models import Reminder
+from .services import ReminderService
+
+
+class ReminderSerializer(serializers.ModelSerializer):
+    """알림 Serializer"""
+    task_title = serializers.CharField(source='task.title', read_only=True)
+
+    class Meta:
+        model = Reminder
+        fields = [
+            'id', 'task', 'task_title', 'kind', 'remind_time', 'days_before',
+            'is_active', 'next_fire_at', 'last_fired_at', 'created_at'
+        ]
+        read_only_fields = ['is_active', 'next_fire_at', 'last_fired_at', 'created_at']
+
+    def validate_task(self, value):
+        """Task 권한 확인"""
+        if value.user_id != self.context['request'].user.id:
+            raise serializers.ValidationError('해당 할 일을 찾을 수 없거나 권한이 없습니다.')
+        return value
+
+    def validate(self, attrs):
+        """전체 데이터 검증"""
+        task = attrs.get('task', getattr(self.instance, 'task', None))
+        kind = attrs.get('kind', getattr(self.instance, 'kind', None))
+
+        if kind == 'due' and task.task_type != 'once':
+            raise serializers.ValidationError({'kind': '마감 알림은 once 타입 할 일에만 설정할 수 있습니다.'})
+        if kind == 'habit' and task.task_type == 'once':
+            raise serializers.ValidationError({'kind': '습관 알림은 반복 할 일에만 설정할 수 있습니다.'})
+        return attrs
+
+    def create(self, validated_data):
+        """next_fire_at 을 계산해서 저장"""
+        reminder = Reminder(**validated_data)
+        ReminderService.schedule(reminder)
+        reminder.save()
+        return reminder
+
+    def update(self, instance, validated_data):
+        """설정이 바뀌면 next_fire_at 재계산"""
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        ReminderService.schedule(instance)
+        instance.save()
+        return instance
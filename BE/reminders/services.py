@@ -0,0 +1,174 @@
+from datetime import datetime, timedelta
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from completions.models import Completion
+from config.sharding import all_databases, use_shard
+from .models import Reminder
+
+
+class ReminderService:
+    """Reminder 관련 비즈니스 로직"""
+
+    @staticmethod
+    def _fire_at(day, remind_time):
+        return timezone.make_aware(datetime.combine(day, remind_time))
+
+    @staticmethod
+    def compute_next_fire(reminder, after):
+        """after 이후의 다음 알림 일시 (없으면 None)"""
+        task = reminder.task
+        if task.status != 'active':
+            return None
+
+        if reminder.kind == 'due':
+            if not task.due_date:
+                return None
+            fire_at = ReminderService._fire_at(task.due_date - timedelta(days=reminder.days_before), reminder.remind_time)
+            return fire_at if fire_at > after else None
+
+        # habit: 할 일의 다음 일정일의 알림 시각 (오늘 알림 시각이 지났으면 다음 일정일)
+        rule = task.rule()
+        day = rule.next_on_or_after(timezone.localtime(after).date())
+        if day is not None and ReminderService._fire_at(day, reminder.remind_time) <= after:
+            day = rule.next_on_or_after(day + timedelta(days=1))
+        if day is None:
+            return None
+        return ReminderService._fire_at(day, reminder.remind_time)
+
+    @staticmethod
+    def schedule(reminder, after=None):
+        """next_fire_at 을 다시 계산 (저장은 호출한 쪽에서)"""
+        if after is None:
+            after = timezone.now()
+        reminder.next_fire_at = ReminderService.compute_next_fire(reminder, after)
+        reminder.is_active = reminder.next_fire_at is not None
+        return reminder
+
+    @staticmethod
+    def reschedule_task(task):
+        """할 일이 바뀌었을 때 해당 할 일의 알림 일정 재계산"""
+        reminders = list(task.reminders.all())
+        if not reminders:
+            return 0
+        now = timezone.now()
+        for reminder in reminders:
+            reminder.task = task
+            ReminderService.schedule(reminder, now)
+        Reminder.objects.using(task._state.db).bulk_update(reminders, ['next_fire_at', 'is_active'])
+        return len(reminders)
+
+    @staticmethod
+    def reschedule_tasks(task_ids, using):
+        """queryset.update() 로 상태를 바꾼 할 일들의 알림 일정 재계산 (post_save 가 없는 일괄 경로용)
+
+        변경한 트랜잭션 안에서 호출한다. 알림과 할 일을 한 번에 읽고 bulk_update 1번으로 저장한다.
+        """
+        reminders = list(Reminder.objects.using(using).filter(task_id__in=task_ids).select_related('task'))
+        if not reminders:
+            return 0
+        now = timezone.now()
+        for reminder in reminders:
+            ReminderService.schedule(reminder, now)
+        Reminder.objects.using(using).bulk_update(reminders, ['next_fire_at', 'is_active'])
+        return len(reminders)
+
+    @staticmethod
+    def _is_stale(reminder, fire_date):
+        """할 일이 보관되었거나 일정이 바뀌어 이 날짜에 보낼 알림이 아닌지
+
+        일괄 update() 처럼 알림 일정을 다시 계산하지 않는 변경이 있어도 발송 직전에 걸러낸다.
+        """
+        task = reminder.task
+        if task.status != 'active':
+            return True
+        if reminder.kind == 'due':
+            return task.due_date is None or task.due_date - timedelta(days=reminder.days_before) != fire_date
+        return not task.rule().occurs_on(fire_date)
+
+    @staticmethod
+    def next_fire_time():
+        """가장 빠른 다음 알림 일시 (DB 마다 next_fire_at 인덱스 한 번 조회)"""
+        times = [
+            Reminder.objects.using(alias).filter(is_active=True, next_fire_at__isnull=False)
+            .order_by('next_fire_at')
+            .values_list('next_fire_at', flat=True)
+            .first()
+            for alias in all_databases()
+        ]
+        return min((t for t in times if t is not None), default=None)
+
+    @staticmethod
+    def fire_due(sink, now=None, batch_size=500):
+        """발송 시각이 된 알림을 한 배치 처리하고 처리한 알림 수를 반환
+
+        - 인덱스(is_active, next_fire_at)로 시각이 된 알림만 읽는다
+        - 습관 알림은 해당 날짜에 이미 완료했으면 보내지 않는다 (배치당 쿼리 1회)
+        - 할 일이 보관되었거나 마감일/반복 규칙이 바뀌어 그 날짜의 알림이 아니면 보내지 않고 다시 계산한다
+        - 발송과 다음 일정 갱신을 한 트랜잭션으로 묶어 실패 시 다음 주기에 다시 시도한다
+        - PostgreSQL 에서는 SKIP LOCKED 로 여러 워커가 나눠서 처리한다
+        - 샤딩을 쓰면 use_shard() 로 활성화된 DB 에서 처리한다 (fire_due_all 참고)
+        """
+        if now is None:
+            now = timezone.now()
+
+        with transaction.atomic(using=router.db_for_write(Reminder)):
+            batch = list(
+                Reminder.objects.select_for_update(skip_locked=True, of=('self',))
+                .select_related('task')
+                .filter(is_active=True, next_fire_at__lte=now)
+                .order_by('next_fire_at')[:batch_size]
+            )
+            if not batch:
+                return 0
+
+            fire_dates = {r.id: timezone.localtime(r.next_fire_at).date() for r in batch}
+            habit_ids = [r.task_id for r in batch if r.kind == 'habit']
+            completed = set(
+                Completion.objects.filter(
+                    task_id__in=habit_ids,
+                    completed_date__in=set(fire_dates.values())
+                ).values_list('task_id', 'completed_date')
+            ) if habit_ids else set()
+
+            notifications = []
+            for reminder in batch:
+                fire_at = reminder.next_fire_at
+                fire_date = fire_dates[reminder.id]
+                skip = (
+                    ReminderService._is_stale(reminder, fire_date)
+                    or (reminder.kind == 'habit' and (reminder.task_id, fire_date) in completed)
+                )
+                if not skip:
+                    notifications.append({
+                        'reminder_id': reminder.id,
+                        'user_id': reminder.user_id,
+                        'task_id': reminder.task_id,
+                        'kind': reminder.kind,
+                        'title': reminder.task.title,
+                        'due_date': reminder.task.due_date,
+                        'fire_at': fire_at,
+                    })
+                    reminder.last_fired_at = now
+                ReminderService.schedule(reminder, after=max(fire_at, now))
+
+            Reminder.objects.bulk_update(batch, ['next_fire_at', 'is_active', 'last_fired_at'])
+            sink.send(notifications)
+
+        return len(batch)
+
+    @staticmethod
+    def fire_due_all(sink, now=None, batch_size=500):
+        """모든 DB 에서 발송 시각이 된 알림이 남지 않을 때까지 처리하고 처리한 알림 수를 반환"""
+        if now is None:
+            now = timezone.now()
+        total = 0
+        for alias in all_databases():
+            with use_shard(alias):
+                while True:
+                    fired = ReminderService.fire_due(sink, now=now, batch_size=batch_size)
+                    total += fired
+                    if fired < batch_size:
+                        break
+        return total
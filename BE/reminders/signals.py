@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from tasks.models import Task
+from .services import ReminderService
+
+
+@receiver(post_save, sender=Task)
+def reschedule_task_reminders(sender, instance, created, **kwargs):
+    """마감일/반복 설정/상태가 바뀌면 알림 일정 재계산"""
+    if not created:
+        ReminderService.reschedule_task(instance)
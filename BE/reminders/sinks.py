@@ -0,0 +1,48 @@
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('reminders')
+
+
+class BaseSink:
+    """알림 발송 대상 (푸시/메일 등으로 교체 가능)"""
+
+    def send(self, notifications):
+        """notifications: dict 목록 (user_id, task_id, kind, title, fire_at, ...)"""
+        raise NotImplementedError
+
+
+class LogSink(BaseSink):
+    """로그로 출력 (개발용)"""
+
+    def send(self, notifications):
+        for notification in notifications:
+            logger.info('reminder %s', json.dumps(notification, cls=DjangoJSONEncoder, ensure_ascii=False))
+
+
+class FileSink(BaseSink):
+    """JSON Lines 파일에 추가 (로컬 대체용)"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = path or settings.REMINDER_SINK_FILE
+
+    def send(self, notifications):
+        if not notifications:
+            return
+        lines = ''.join(
+            json.dumps(n, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n' for n in notifications
+        )
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+
+def get_sink():
+    """REMINDER_SINK 설정에 지정된 sink 인스턴스"""
+    return import_string(settings.REMINDER_SINK)()
@@ -0,0 +1,214 @@
+import json
+import tempfile
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from completions.models import Completion
+from tasks.models import Task
+from tasks.services import TaskService
+from .models import Reminder
+from .services import ReminderService
+from .sinks import BaseSink, FileSink, LogSink, get_sink
+
+# 2026-10-19 (월) 09:00
+NOW = timezone.make_aware(datetime(2026, 10, 19, 9, 0))
+
+
+def at(day, hour):
+    return timezone.make_aware(datetime.combine(day, time(hour)))
+
+
+class ListSink(BaseSink):
+    """받은 알림을 모아 두는 테스트용 sink"""
+
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+
+    def send(self, notifications):
+        if self.fail:
+            raise ConnectionError('sink down')
+        self.sent.extend(notifications)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class ComputeNextFireTests(TestCase):
+    """다음 알림 일시 계산"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+
+    def reminder(self, kind, remind_time, **task_fields):
+        task = Task(user=self.user, title='할 일', **task_fields)
+        return Reminder(user=self.user, task=task, kind=kind, remind_time=remind_time)
+
+    def test_due_reminder_fires_days_before_due_date(self):
+        reminder = self.reminder('due', time(8), task_type='once', due_date=date(2026, 10, 25))
+        reminder.days_before = 1
+
+        self.assertEqual(ReminderService.compute_next_fire(reminder, NOW), at(date(2026, 10, 24), 8))
+        self.assertIsNone(ReminderService.compute_next_fire(reminder, at(date(2026, 10, 24), 8)))
+
+    def test_due_reminder_without_due_date_or_inactive_task(self):
+        self.assertIsNone(ReminderService.compute_next_fire(self.reminder('due', time(8), task_type='once'), NOW))
+
+        reminder = self.reminder('due', time(8), task_type='once', due_date=date(2026, 10, 25), status='archived')
+        self.assertIsNone(ReminderService.compute_next_fire(reminder, NOW))
+
+    def test_habit_reminder_uses_today_until_remind_time_passes(self):
+        self.assertEqual(
+            ReminderService.compute_next_fire(self.reminder('habit', time(10), task_type='daily'), NOW),
+            at(date(2026, 10, 19), 10)
+        )
+        self.assertEqual(
+            ReminderService.compute_next_fire(self.reminder('habit', time(8), task_type='daily'), NOW),
+            at(date(2026, 10, 20), 8)
+        )
+
+    def test_habit_reminder_follows_task_schedule(self):
+        weekly = self.reminder('habit', time(8), task_type='weekly', repeat_days='Mon,Wed')
+        self.assertEqual(ReminderService.compute_next_fire(weekly, NOW), at(date(2026, 10, 21), 8))
+
+        ended = self.reminder('habit', time(8), task_type='period',
+                              start_date=date(2026, 10, 1), end_date=date(2026, 10, 19))
+        self.assertIsNone(ReminderService.compute_next_fire(ended, NOW))
+
+
+@override_settings(DATABASE_SHARDS=[])
+class FireDueTests(TestCase):
+    """발송 시각이 된 알림 배치 처리"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        cls.tasks = [Task.objects.create(user=cls.user, title=f'습관 {i}', task_type='daily') for i in range(5)]
+        Reminder.objects.bulk_create([
+            Reminder(user=cls.user, task=task, kind='habit', remind_time=time(8),
+                     next_fire_at=at(date(2026, 10, 19), 8))
+            for task in cls.tasks
+        ])
+
+    def test_processes_in_batches_and_reschedules(self):
+        sink = ListSink()
+
+        fired = [ReminderService.fire_due(sink, now=NOW, batch_size=2) for _ in range(4)]
+
+        self.assertEqual(fired, [2, 2, 1, 0])
+        self.assertEqual(sorted(n['task_id'] for n in sink.sent), sorted(t.id for t in self.tasks))
+        self.assertEqual(
+            set(Reminder.objects.values_list('next_fire_at', 'last_fired_at')),
+            {(at(date(2026, 10, 20), 8), NOW)}
+        )
+
+    def test_is_idempotent_for_the_same_time(self):
+        sink = ListSink()
+
+        self.assertEqual(ReminderService.fire_due_all(sink, now=NOW, batch_size=2), 5)
+        self.assertEqual(ReminderService.fire_due_all(sink, now=NOW, batch_size=2), 0)
+        self.assertEqual(len(sink.sent), 5)
+
+    def test_sink_failure_rolls_back_the_batch(self):
+        with self.assertRaises(ConnectionError):
+            ReminderService.fire_due(ListSink(fail=True), now=NOW)
+
+        self.assertEqual(Reminder.objects.filter(next_fire_at=at(date(2026, 10, 19), 8)).count(), 5)
+
+        sink = ListSink()
+        self.assertEqual(ReminderService.fire_due(sink, now=NOW), 5)
+        self.assertEqual(len(sink.sent), 5)
+
+    def test_completed_habit_is_skipped_but_rescheduled(self):
+        Completion.objects.create(task=self.tasks[0], completed_date=date(2026, 10, 19))
+        sink = ListSink()
+
+        self.assertEqual(ReminderService.fire_due(sink, now=NOW), 5)
+
+        self.assertNotIn(self.tasks[0].id, [n['task_id'] for n in sink.sent])
+        skipped = Reminder.objects.get(task=self.tasks[0])
+        self.assertEqual(skipped.next_fire_at, at(date(2026, 10, 20), 8))
+        self.assertIsNone(skipped.last_fired_at)
+
+    def test_due_reminder_is_deactivated_after_firing(self):
+        task = Task.objects.create(user=self.user, title='보고서', task_type='once', due_date=date(2026, 10, 19))
+        Reminder.objects.create(user=self.user, task=task, kind='due', remind_time=time(8),
+                                next_fire_at=at(date(2026, 10, 19), 8))
+        sink = ListSink()
+
+        ReminderService.fire_due_all(sink, now=NOW)
+
+        reminder = Reminder.objects.get(task=task)
+        self.assertFalse(reminder.is_active)
+        self.assertIsNone(reminder.next_fire_at)
+        self.assertEqual([n['kind'] for n in sink.sent if n['task_id'] == task.id], ['due'])
+
+    def test_stale_due_reminder_is_skipped_and_rescheduled(self):
+        task = Task.objects.create(user=self.user, title='보고서', task_type='once', due_date=date(2026, 10, 19))
+        Reminder.objects.create(user=self.user, task=task, kind='due', remind_time=time(8),
+                                next_fire_at=at(date(2026, 10, 19), 8))
+        # post_save 없이 마감일만 바뀐 경우
+        Task.objects.filter(pk=task.pk).update(due_date=date(2026, 10, 22))
+        sink = ListSink()
+
+        ReminderService.fire_due_all(sink, now=NOW)
+
+        self.assertNotIn(task.id, [n['task_id'] for n in sink.sent])
+        self.assertEqual(Reminder.objects.get(task=task).next_fire_at, at(date(2026, 10, 22), 8))
+
+    def test_bulk_archive_and_restore_reschedule_reminders(self):
+        ids = [task.id for task in self.tasks[:2]]
+
+        self.assertEqual(TaskService.archive_tasks(ids, 'default'), 2)
+        self.assertEqual(
+            list(Reminder.objects.filter(task_id__in=ids).values_list('is_active', 'next_fire_at')),
+            [(False, None), (False, None)]
+        )
+
+        self.assertEqual(TaskService.restore_tasks(ids, 'default'), 2)
+        for reminder in Reminder.objects.filter(task_id__in=ids):
+            self.assertTrue(reminder.is_active)
+            self.assertIsNotNone(reminder.next_fire_at)
+        self.assertEqual(TaskService.restore_tasks(ids, 'default'), 0)
+
+    def test_next_fire_time_and_future_reminders(self):
+        self.assertEqual(ReminderService.next_fire_time(), at(date(2026, 10, 19), 8))
+        self.assertEqual(ReminderService.fire_due(ListSink(), now=NOW - timedelta(hours=2)), 0)
+
+
+class SinkTests(SimpleTestCase):
+    """알림 발송 대상"""
+
+    NOTIFICATION = {'reminder_id': 1, 'user_id': 2, 'task_id': 3, 'kind': 'habit', 'title': '물 마시기',
+                    'due_date': None, 'fire_at': NOW}
+
+    def test_file_sink_appends_json_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'reminders.jsonl'
+            sink = FileSink(path)
+            sink.send([self.NOTIFICATION])
+            sink.send([])
+            sink.send([self.NOTIFICATION])
+
+            lines = path.read_text(encoding='utf-8').splitlines()
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])['title'], '물 마시기')
+        self.assertEqual(json.loads(lines[0])['fire_at'], NOW.isoformat())
+
+    def test_log_sink_logs_each_notification(self):
+        with self.assertLogs('reminders', 'INFO') as logs:
+            LogSink().send([self.NOTIFICATION, self.NOTIFICATION])
+
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn('물 마시기', logs.output[0])
+
+    @override_settings(REMINDER_SINK='reminders.sinks.FileSink', REMINDER_SINK_FILE='/tmp/reminders-test.jsonl')
+    def test_get_sink_uses_setting(self):
+        sink = get_sink()
+
+        self.assertIsInstance(sink, FileSink)
+        self.assertEqual(sink.path, '/tmp/reminders-test.jsonl')
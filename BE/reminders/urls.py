@@ -0,0 +1,7 @@
+from rest_framework.routers import DefaultRouter
+from .views import ReminderViewSet
+
+router = DefaultRouter()
+router.register('', ReminderViewSet, basename='reminder')
+
+urlpatterns = router.urls
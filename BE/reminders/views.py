@@ -0,0 +1,56 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from config.schema import extend_schema
+from config.sharding import ShardedViewMixin
+from .models import Reminder
+from .serializers import ReminderSerializer
+
+
+class ReminderViewSet(ShardedViewMixin, viewsets.ModelViewSet):
+    """알림 ViewSet"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = ReminderSerializer
+
+    def get_queryset(self):
+        """사용자의 알림만 조회"""
+        if getattr(self, 'swagger_fake_view', False):
+            return Reminder.objects.none()
+        return Reminder.objects.using(self.shard).filter(user=self.request.user).select_related('task')
+
+    @extend_schema(tags=['Reminders'], summary='알림 목록')
+    def list(self, request, *args, **kwargs):
+        """알림 목록"""
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        tags=['Reminders'],
+        summary='알림 생성',
+        description='마감 알림(once 할 일) 또는 미완료 습관 알림(반복 할 일)을 등록합니다.'
+    )
+    def create(self, request, *args, **kwargs):
+        """알림 생성"""
+        return super().create(request, *args, **kwargs)
+
+    @extend_schema(tags=['Reminders'], summary='알림 상세')
+    def retrieve(self, request, *args, **kwargs):
+        """알림 상세"""
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(tags=['Reminders'], summary='알림 수정')
+    def update(self, request, *args, **kwargs):
+        """알림 수정"""
+        return super().update(request, *args, **kwargs)
+
+    @extend_schema(tags=['Reminders'], summary='알림 부분 수정')
+    def partial_update(self, request, *args, **kwargs):
+        """알림 부분 수정"""
+        return super().partial_update(request, *args, **kwargs)
+
+    @extend_schema(tags=['Reminders'], summary='알림 삭제')
+    def destroy(self, request, *args, **kwargs):
+        """알림 삭제"""
+        return super().destroy(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        """알림 생성 시 현재 사용자 설정"""
+        serializer.save(user=self.request.user)
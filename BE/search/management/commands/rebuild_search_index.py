@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from config.sharding import all_databases
+from search import sql
+
+
+class Command(BaseCommand):
+    """검색 인덱스와 동기화 트리거를 다시 만들고 전체 데이터를 다시 채움
+
+    SQLite 에서 tasks_task / completions_completion 테이블이 재생성되는 마이그레이션 후
+    (트리거가 함께 삭제됨) 또는 인덱스가 어긋났을 때 실행합니다.
+    샤딩을 쓰면 할 일이 있는 모든 DB 에서 각각 재구축합니다.
+    """
+    help = '전문 검색 인덱스 재구축'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', help='특정 DB 별칭만 재구축 (기본: 전체)')
+
+    def handle(self, *args, **options):
+        for alias in [options['database']] if options['database'] else all_databases():
+            connection = connections[alias]
+            with transaction.atomic(using=alias), connection.cursor() as cursor:
+                sql.uninstall(connection, cursor.execute)
+                sql.install(connection, cursor.execute)
+            self.stdout.write(self.style.SUCCESS(f'{alias}: 검색 인덱스를 재구축했습니다.'))
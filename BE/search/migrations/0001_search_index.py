@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from search import sql
+
+
+def forwards(apps, schema_editor):
+    sql.install(schema_editor.connection, schema_editor.execute)
+
+
+def backwards(apps, schema_editor):
+    sql.uninstall(schema_editor.connection, schema_editor.execute)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+        ('completions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
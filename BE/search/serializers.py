@@ -0,0 +1,14 @@
+from rest_framework import serializers
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """검색 결과 Serializer"""
+    kind = serializers.ChoiceField(choices=['task', 'completion'])
+    task_id = serializers.IntegerField()
+    task_title = serializers.CharField()
+    task_type = serializers.CharField()
+    task_status = serializers.CharField()
+    completion_id = serializers.IntegerField(allow_null=True)
+    completed_date = serializers.DateField(allow_null=True)
+    snippet = serializers.CharField()
+    score = serializers.FloatField()
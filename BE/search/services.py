@@ -0,0 +1,252 @@
+import html
+import re
+
+from django.db import connections, router
+from django.db.models import Case, FloatField, Q, Value, When
+
+from tasks.models import Task
+from completions.models import Completion
+
+# 검색어에서 토큰으로 쓸 문자 (영문/숫자/한글 등)
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TOKENS = 8
+# 대체 검색 스니펫 길이 (단어 수)
+SNIPPET_WORDS = 16
+
+# 백엔드가 일치 구간을 표시하는 제어 문자 (HTML 이스케이프 후 <mark> 로 변환)
+HIGHLIGHT_START, HIGHLIGHT_STOP = '\x01', '\x02'
+
+
+def highlight(snippet):
+    """본문은 HTML 이스케이프하고 일치 구간만 <mark> 로 감싼다"""
+    return (
+        html.escape(snippet or '')
+        .replace(HIGHLIGHT_START, '<mark>')
+        .replace(HIGHLIGHT_STOP, '</mark>')
+    )
+
+
+def tokenize(query):
+    """검색어를 토큰 목록으로 분리 (연산자/특수문자 제거)"""
+    return TOKEN_RE.findall(query or '')[:MAX_TOKENS]
+
+
+class SQLiteSearchBackend:
+    """FTS5 search_index 기반 검색"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @staticmethod
+    def _match(user_id, tokens):
+        # 모든 토큰을 접두어 검색으로 AND 결합, owner 토큰으로 사용자 범위 제한
+        terms = ' AND '.join(f'"{t}"*' for t in tokens)
+        return f'owner : "u{user_id}" AND {{title body}} : ({terms})'
+
+    def count(self, user_id, tokens):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT count(*) FROM search_index WHERE search_index MATCH %s',
+                [self._match(user_id, tokens)]
+            )
+            return cursor.fetchone()[0]
+
+    def fetch(self, user_id, tokens, offset, limit):
+        # bm25 가중치: owner, title, body 순서 (제목 일치를 더 높게)
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT rowid, task_id, bm25(search_index, 0.0, 10.0, 1.0) AS score,
+                       snippet(search_index, 2, char(1), char(2), '…', 16)
+                FROM search_index
+                WHERE search_index MATCH %s
+                ORDER BY score
+                LIMIT %s OFFSET %s
+                """,
+                [self._match(user_id, tokens), limit, offset]
+            )
+            # bm25 는 값이 작을수록 관련도가 높으므로 부호를 바꿔 반환
+            return [(rowid, task_id, -score, snippet) for rowid, task_id, score, snippet in cursor.fetchall()]
+
+
+class PostgresSearchBackend:
+    """tsvector search_document 기반 검색"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @staticmethod
+    def _tsquery(tokens):
+        return ' & '.join(f"'{t}':*" for t in tokens)
+
+    def count(self, user_id, tokens):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT count(*) FROM search_document
+                WHERE owner_id = %s AND document @@ to_tsquery('simple', %s)
+                """,
+                [user_id, self._tsquery(tokens)]
+            )
+            return cursor.fetchone()[0]
+
+    def fetch(self, user_id, tokens, offset, limit):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, task_id, score,
+                       ts_headline('simple', body, q,
+                                   'StartSel=' || chr(1) || ', StopSel=' || chr(2) || ', MaxWords=16, MinWords=4')
+                FROM (
+                    SELECT id, task_id, title, body, q, ts_rank(document, q) AS score
+                    FROM search_document, to_tsquery('simple', %s) q
+                    WHERE owner_id = %s AND document @@ q
+                    ORDER BY score DESC
+                    LIMIT %s OFFSET %s
+                ) ranked
+                ORDER BY score DESC
+                """,
+                [self._tsquery(tokens), user_id, limit, offset]
+            )
+            return cursor.fetchall()
+
+
+class FallbackSearchBackend:
+    """전문 검색 인덱스가 없는 DB 용 대체 검색 (icontains, 모든 단어 포함)
+
+    인덱스 없이 사용자의 행을 훑으므로 느리다. 관련도 대신 제목 일치 할 일 > 설명 일치 할 일 > 완료 메모,
+    같은 점수는 최신 순으로 정렬한다.
+    """
+
+    def __init__(self, connection):
+        self.alias = connection.alias
+
+    def _tasks(self, user_id, tokens):
+        tasks = Task.objects.using(self.alias).filter(user_id=user_id)
+        for token in tokens:
+            tasks = tasks.filter(Q(title__icontains=token) | Q(description__icontains=token))
+        return tasks
+
+    def _completions(self, user_id, tokens):
+        completions = Completion.objects.using(self.alias).filter(user_id=user_id)
+        for token in tokens:
+            completions = completions.filter(note__icontains=token)
+        return completions
+
+    def count(self, user_id, tokens):
+        return self._tasks(user_id, tokens).count() + self._completions(user_id, tokens).count()
+
+    def fetch(self, user_id, tokens, offset, limit):
+        # 할 일을 먼저, 완료 메모를 뒤에 이어 붙인 순서로 페이지를 자른다
+        tasks = self._tasks(user_id, tokens)
+        task_count = tasks.count()
+        rows = []
+        if offset < task_count:
+            in_title = Q()
+            for token in tokens:
+                in_title &= Q(title__icontains=token)
+            ranked = tasks.annotate(
+                score=Case(When(in_title, then=Value(2.0)), default=Value(1.0), output_field=FloatField())
+            ).order_by('-score', '-id').values_list('id', 'description', 'score')
+            rows += [
+                (task_id * 2, task_id, score, self._snippet(description, tokens))
+                for task_id, description, score in ranked[offset:offset + limit]
+            ]
+        if len(rows) < limit:
+            start = max(offset - task_count, 0)
+            notes = self._completions(user_id, tokens).order_by('-id').values_list('id', 'task_id', 'note')
+            rows += [
+                (completion_id * 2 + 1, task_id, 0.5, self._snippet(note, tokens))
+                for completion_id, task_id, note in notes[start:start + limit - len(rows)]
+            ]
+        return rows
+
+    @staticmethod
+    def _snippet(text, tokens):
+        """첫 일치 단어 주변 SNIPPET_WORDS 단어를 잘라 일치 구간을 표시 문자로 감싼다"""
+        words = (text or '').split()
+        lowered = [t.lower() for t in tokens]
+        first = next((i for i, word in enumerate(words) if any(t in word.lower() for t in lowered)), 0)
+        start = max(first - SNIPPET_WORDS // 4, 0)
+        snippet = ' '.join(words[start:start + SNIPPET_WORDS])
+        if start > 0:
+            snippet = '…' + snippet
+        if start + SNIPPET_WORDS < len(words):
+            snippet += '…'
+        pattern = re.compile('|'.join(re.escape(t) for t in tokens), re.IGNORECASE)
+        return pattern.sub(lambda m: f'{HIGHLIGHT_START}{m.group(0)}{HIGHLIGHT_STOP}', snippet)
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+class SearchResults:
+    """페이지네이터에서 슬라이스할 때 해당 페이지만 조회하는 검색 결과"""
+
+    def __init__(self, backend, user_id, tokens):
+        self.backend = backend
+        self.user_id = user_id
+        self.tokens = tokens
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.backend.count(self.user_id, self.tokens) if self.tokens else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            raise TypeError('SearchResults 는 슬라이스만 지원합니다.')
+        if not self.tokens:
+            return []
+        offset = index.start or 0
+        limit = (index.stop - offset) if index.stop is not None else self.count() - offset
+        if limit <= 0:
+            return []
+        return SearchService.resolve(self.backend.fetch(self.user_id, self.tokens, offset, limit))
+
+
+class SearchService:
+    """할 일/완료 메모 전문 검색 비즈니스 로직"""
+
+    @staticmethod
+    def search(user, query):
+        """사용자의 할 일 제목/설명, 완료 메모 검색 (관련도 순, 인덱스가 없는 DB 는 FallbackSearchBackend)"""
+        # 검색 인덱스는 할 일 테이블과 같은 DB(사용자의 샤드)에 있다
+        connection = connections[router.db_for_read(Task)]
+        backend = BACKENDS.get(connection.vendor, FallbackSearchBackend)
+        return SearchResults(backend(connection), user.id, tokenize(query))
+
+    @staticmethod
+    def resolve(rows):
+        """인덱스 결과(rowid, task_id, score, snippet)에 할 일/완료 기록 정보를 붙인다"""
+        task_ids = {task_id for _, task_id, _, _ in rows}
+        completion_ids = [rowid // 2 for rowid, _, _, _ in rows if rowid % 2 == 1]
+
+        tasks = Task.objects.only('id', 'title', 'task_type', 'status').in_bulk(task_ids)
+        completions = Completion.objects.only('id', 'completed_date').in_bulk(completion_ids)
+
+        results = []
+        for rowid, task_id, score, snippet in rows:
+            task = tasks.get(task_id)
+            if task is None:
+                continue
+            completion = completions.get(rowid // 2) if rowid % 2 == 1 else None
+            results.append({
+                'kind': 'completion' if completion else 'task',
+                'task_id': task.id,
+                'task_title': task.title,
+                'task_type': task.task_type,
+                'task_status': task.status,
+                'completion_id': completion.id if completion else None,
+                'completed_date': completion.completed_date if completion else None,
+                'snippet': highlight(snippet),
+                'score': score,
+            })
+        return results
@@ -0,0 +1,277 @@
+"""전문 검색 인덱스 DDL
+
+- SQLite: FTS5 가상 테이블 search_index
+- PostgreSQL: tsvector 생성 컬럼 + GIN 인덱스를 가진 search_document 테이블
+
+두 경우 모두 트리거로 tasks_task / completions_completion 과 동기화한다.
+rowid(id) 는 할 일 = task.id * 2, 완료 기록 = completion.id * 2 + 1 로 인코딩해
+삭제/수정 시 기본 키로 바로 찾을 수 있게 한다.
+owner 에는 'u<user_id>' 토큰을 넣어 사용자 범위 검색도 인덱스로 처리한다.
+"""
+from django.db.migrations.operations.base import Operation
+
+SQLITE_TABLE = [
+    """
+    CREATE VIRTUAL TABLE search_index USING fts5(
+        owner, title, body,
+        task_id UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+]
+
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER search_task_ai AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO search_index(rowid, owner, title, body, task_id)
+        VALUES (new.id * 2, 'u' || new.user_id, new.title, new.description, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER search_task_au AFTER UPDATE OF title, description, user_id ON tasks_task BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+        INSERT INTO search_index(rowid, owner, title, body, task_id)
+        VALUES (new.id * 2, 'u' || new.user_id, new.title, new.description, new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER search_task_ad AFTER DELETE ON tasks_task BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER search_completion_ai AFTER INSERT ON completions_completion
+    WHEN new.note != '' BEGIN
+        INSERT INTO search_index(rowid, owner, title, body, task_id)
+        SELECT new.id * 2 + 1, 'u' || t.user_id, '', new.note, new.task_id
+        FROM tasks_task t WHERE t.id = new.task_id;
+    END
+    """,
+    """
+    CREATE TRIGGER search_completion_au AFTER UPDATE OF note, task_id ON completions_completion BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+        INSERT INTO search_index(rowid, owner, title, body, task_id)
+        SELECT new.id * 2 + 1, 'u' || t.user_id, '', new.note, new.task_id
+        FROM tasks_task t WHERE t.id = new.task_id AND new.note != '';
+    END
+    """,
+    """
+    CREATE TRIGGER search_completion_ad AFTER DELETE ON completions_completion BEGIN
+        DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+]
+
+SQLITE_BACKFILL = [
+    """
+    INSERT INTO search_index(rowid, owner, title, body, task_id)
+    SELECT id * 2, 'u' || user_id, title, description, id FROM tasks_task
+    """,
+    """
+    INSERT INTO search_index(rowid, owner, title, body, task_id)
+    SELECT c.id * 2 + 1, 'u' || t.user_id, '', c.note, c.task_id
+    FROM completions_completion c JOIN tasks_task t ON t.id = c.task_id
+    WHERE c.note != ''
+    """,
+]
+
+SQLITE_DROP_TRIGGERS = [
+    'DROP TRIGGER IF EXISTS search_task_ai',
+    'DROP TRIGGER IF EXISTS search_task_au',
+    'DROP TRIGGER IF EXISTS search_task_ad',
+    'DROP TRIGGER IF EXISTS search_completion_ai',
+    'DROP TRIGGER IF EXISTS search_completion_au',
+    'DROP TRIGGER IF EXISTS search_completion_ad',
+]
+
+SQLITE_DROP_TABLE = [
+    'DROP TABLE IF EXISTS search_index',
+]
+
+POSTGRES_TABLE = [
+    """
+    CREATE TABLE search_document (
+        id bigint PRIMARY KEY,
+        owner_id bigint NOT NULL,
+        task_id bigint NOT NULL,
+        title text NOT NULL DEFAULT '',
+        body text NOT NULL DEFAULT '',
+        document tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('simple', title), 'A') ||
+            setweight(to_tsvector('simple', body), 'B')
+        ) STORED
+    )
+    """,
+    'CREATE INDEX search_document_document_idx ON search_document USING GIN (document)',
+    'CREATE INDEX search_document_owner_idx ON search_document (owner_id)',
+]
+
+POSTGRES_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION search_task_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            DELETE FROM search_document WHERE id = OLD.id * 2;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO search_document(id, owner_id, task_id, title, body)
+            VALUES (NEW.id * 2, NEW.user_id, NEW.id, NEW.title, NEW.description);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER search_task_sync
+    AFTER INSERT OR DELETE OR UPDATE OF title, description, user_id ON tasks_task
+    FOR EACH ROW EXECUTE FUNCTION search_task_sync()
+    """,
+    """
+    CREATE OR REPLACE FUNCTION search_completion_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            DELETE FROM search_document WHERE id = OLD.id * 2 + 1;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.note <> '' THEN
+            INSERT INTO search_document(id, owner_id, task_id, body)
+            SELECT NEW.id * 2 + 1, t.user_id, NEW.task_id, NEW.note
+            FROM tasks_task t WHERE t.id = NEW.task_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER search_completion_sync
+    AFTER INSERT OR DELETE OR UPDATE OF note, task_id ON completions_completion
+    FOR EACH ROW EXECUTE FUNCTION search_completion_sync()
+    """,
+]
+
+POSTGRES_BACKFILL = [
+    """
+    INSERT INTO search_document(id, owner_id, task_id, title, body)
+    SELECT id * 2, user_id, id, title, description FROM tasks_task
+    """,
+    """
+    INSERT INTO search_document(id, owner_id, task_id, body)
+    SELECT c.id * 2 + 1, t.user_id, c.task_id, c.note
+    FROM completions_completion c JOIN tasks_task t ON t.id = c.task_id
+    WHERE c.note <> ''
+    """,
+]
+
+POSTGRES_DROP_TRIGGERS = [
+    'DROP TRIGGER IF EXISTS search_task_sync ON tasks_task',
+    'DROP TRIGGER IF EXISTS search_completion_sync ON completions_completion',
+]
+
+POSTGRES_DROP_TABLE = [
+    'DROP FUNCTION IF EXISTS search_task_sync()',
+    'DROP FUNCTION IF EXISTS search_completion_sync()',
+    'DROP TABLE IF EXISTS search_document',
+]
+
+STATEMENTS = {
+    'sqlite': {
+        'table': SQLITE_TABLE,
+        'triggers': SQLITE_TRIGGERS,
+        'backfill': SQLITE_BACKFILL,
+        'drop_triggers': SQLITE_DROP_TRIGGERS,
+        'drop_table': SQLITE_DROP_TABLE,
+    },
+    'postgresql': {
+        'table': POSTGRES_TABLE,
+        'triggers': POSTGRES_TRIGGERS,
+        'backfill': POSTGRES_BACKFILL,
+        'drop_triggers': POSTGRES_DROP_TRIGGERS,
+        'drop_table': POSTGRES_DROP_TABLE,
+    },
+}
+
+
+def install(connection, execute):
+    """검색 인덱스 테이블/트리거 생성 및 기존 데이터 채우기
+
+    execute 는 schema_editor.execute 또는 cursor.execute
+    """
+    _run(connection, execute, 'table', 'triggers', 'backfill')
+
+
+def uninstall(connection, execute):
+    """검색 인덱스 테이블/트리거 삭제"""
+    _run(connection, execute, 'drop_triggers', 'drop_table')
+
+
+def drop_triggers(connection, execute):
+    """동기화 트리거만 삭제 (마이그레이션에서는 WithoutSearchTriggers 사용)"""
+    _run(connection, execute, 'drop_triggers')
+
+
+def install_triggers(connection, execute):
+    """동기화 트리거만 다시 생성"""
+    _run(connection, execute, 'drop_triggers', 'triggers')
+
+
+class WithoutSearchTriggers(Operation):
+    """동기화 트리거를 내린 상태로 operations 를 실행하고 다시 만드는 마이그레이션 작업
+
+    SQLite 에서 tasks_task / completions_completion 을 재생성하는 작업(_remake_table: NOT NULL/기본값 컬럼 추가,
+    GeneratedField 추가 등)은 트리거가 남아 있으면 테이블 이름 변경 단계에서 실패하므로 이것으로 감싼다.
+    되돌릴 때도 같은 방식으로 감싸 역순으로 되돌린다.
+
+        sql.WithoutSearchTriggers(
+            migrations.AddField(...),
+            migrations.RunPython(backfill, migrations.RunPython.noop),
+        )
+    """
+    reduces_to_sql = False
+
+    def __init__(self, *operations):
+        self.operations = operations
+
+    @property
+    def reversible(self):
+        return all(operation.reversible for operation in self.operations)
+
+    def state_forwards(self, app_label, state):
+        for operation in self.operations:
+            operation.state_forwards(app_label, state)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        drop_triggers(schema_editor.connection, schema_editor.execute)
+        for operation, before, after in self._steps(app_label, from_state):
+            operation.database_forwards(app_label, schema_editor, before, after)
+        install_triggers(schema_editor.connection, schema_editor.execute)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        drop_triggers(schema_editor.connection, schema_editor.execute)
+        for operation, before, after in reversed(self._steps(app_label, to_state)):
+            operation.database_backwards(app_label, schema_editor, after, before)
+        install_triggers(schema_editor.connection, schema_editor.execute)
+
+    def _steps(self, app_label, state):
+        """[(작업, 작업 전 상태, 작업 후 상태)]"""
+        steps = []
+        for operation in self.operations:
+            after = state.clone()
+            operation.state_forwards(app_label, after)
+            steps.append((operation, state, after))
+            state = after
+        return steps
+
+    def describe(self):
+        return '검색 트리거를 내리고 실행: ' + '; '.join(operation.describe() for operation in self.operations)
+
+    @property
+    def migration_name_fragment(self):
+        return self.operations[0].migration_name_fragment if self.operations else None
+
+
+def _run(connection, execute, *groups):
+    statements = STATEMENTS.get(connection.vendor)
+    if statements is None:
+        return
+    for group in groups:
+        for sql in statements[group]:
+            execute(sql)
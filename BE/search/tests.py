@@ -0,0 +1,92 @@
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from completions.models import Completion
+from tasks.models import Task
+from . import services
+from .services import FallbackSearchBackend, SearchService
+
+
+@override_settings(DATABASE_SHARDS=[])
+class SearchTests(TestCase):
+    """전문 검색 (관련도, 트리거 동기화, 사용자 범위)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        cls.other = User.objects.create_user('other')
+        cls.in_title = Task.objects.create(user=cls.user, title='영어 단어 외우기', description='매일 스무 개')
+        cls.in_body = Task.objects.create(user=cls.user, title='아침 공부', description='영어 신문 읽기')
+        cls.unrelated = Task.objects.create(user=cls.user, title='운동', description='스쿼트 50회')
+        cls.others = Task.objects.create(user=cls.other, title='영어 회화', description='')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def search(self, query):
+        response = self.client.get('/api/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_title_match_ranks_above_body_match(self):
+        results = self.search('영어')
+
+        self.assertEqual([r['task_id'] for r in results], [self.in_title.id, self.in_body.id])
+        self.assertGreater(results[0]['score'], results[1]['score'])
+        self.assertIn('<mark>영어</mark>', results[1]['snippet'])
+
+    def test_other_users_tasks_are_not_returned(self):
+        task_ids = {r['task_id'] for r in self.search('영어')}
+
+        self.assertNotIn(self.others.id, task_ids)
+        self.assertEqual(self.search('회화'), [])
+
+    def test_triggers_follow_task_updates_and_deletes(self):
+        self.unrelated.title = '영어 듣기'
+        self.unrelated.save()
+        self.assertIn(self.unrelated.id, [r['task_id'] for r in self.search('듣기')])
+        self.assertEqual(self.search('운동'), [])
+
+        self.in_title.delete()
+        self.assertNotIn(self.in_title.id, [r['task_id'] for r in self.search('영어')])
+
+    def test_triggers_follow_completion_notes(self):
+        completion = Completion.objects.create(task=self.unrelated, completed_date=date.today(), note='무릎이 아팠다')
+
+        results = self.search('무릎')
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['kind'], 'completion')
+        self.assertEqual(results[0]['completion_id'], completion.id)
+
+        completion.note = ''
+        completion.save()
+        self.assertEqual(self.search('무릎'), [])
+
+    def test_prefix_and_all_terms(self):
+        self.assertEqual([r['task_id'] for r in self.search('외우')], [self.in_title.id])
+        self.assertEqual([r['task_id'] for r in self.search('영어 신문')], [self.in_body.id])
+
+    def test_query_is_required(self):
+        self.assertEqual(self.client.get('/api/search/', {'q': ' '}).status_code, 400)
+
+    def test_other_databases_fall_back_to_icontains(self):
+        Completion.objects.create(task=self.unrelated, completed_date=date.today(), note='영어 노래 들으며 운동')
+
+        with mock.patch.dict(services.BACKENDS, clear=True):
+            paged = SearchService.search(self.user, '영어')
+            results = self.search('영어')
+            self.assertIsInstance(paged.backend, FallbackSearchBackend)
+            self.assertEqual(paged.count(), 3)
+            self.assertEqual([r['kind'] for r in paged[1:3]], ['task', 'completion'])
+
+        self.assertEqual(
+            [(r['kind'], r['task_id']) for r in results],
+            [('task', self.in_title.id), ('task', self.in_body.id), ('completion', self.unrelated.id)]
+        )
+        self.assertGreater(results[0]['score'], results[1]['score'])
+        self.assertEqual(results[1]['snippet'], '<mark>영어</mark> 신문 읽기')
@@ -0,0 +1,7 @@
+from rest_framework.routers import DefaultRouter
+from .views import SearchViewSet
+
+router = DefaultRouter()
+router.register('', SearchViewSet, basename='search')
+
+urlpatterns = router.urls
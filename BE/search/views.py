@@ -0,0 +1,40 @@
+from rest_framework import viewsets, status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.settings import api_settings
+from drf_spectacular.utils import OpenApiParameter
+from config.renderers import compact_renderer_classes
+from config.schema import extend_schema
+from config.sharding import ShardedViewMixin
+from completions.writebehind import PendingCompletionsMixin
+from .serializers import SearchResultSerializer
+from .services import SearchService
+
+
+class SearchViewSet(ShardedViewMixin, PendingCompletionsMixin, viewsets.GenericViewSet):
+    """전문 검색 ViewSet"""
+    permission_classes = [IsAuthenticated]
+    renderer_classes = compact_renderer_classes()
+    throttle_scope = 'search'
+    serializer_class = SearchResultSerializer
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+
+    @extend_schema(
+        tags=['Search'],
+        summary='전문 검색',
+        description='할 일 제목/설명과 완료 메모를 관련도 순으로 검색합니다. (접두어 일치, 모든 단어 포함)',
+        parameters=[
+            OpenApiParameter(name='q', type=str, description='검색어', required=True),
+            OpenApiParameter(name='page', type=int, description='페이지 번호', required=False),
+        ]
+    )
+    def list(self, request):
+        """전문 검색"""
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'detail': 'q는 필수입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        results = SearchService.search(request.user, query)
+        page = self.paginate_queryset(results)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -1,13 +1,26 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from config.contention import immediate_atomic
+from config.pagination import EstimatedCountPaginator
 from .models import Task
+from .services import TaskService
 
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ['title', 'user', 'task_type', 'priority', 'status', 'due_date', 'created_at']
-    list_filter = ['task_type', 'priority', 'status', 'created_at']
+    list_filter = ['task_type', 'priority', 'status']
+    list_select_related = ['user']
     search_fields = ['title', 'description']
-    readonly_fields = ['created_at', 'updated_at', 'archived_at']
+    readonly_fields = ['next_occurrence', 'created_at', 'updated_at', 'archived_at']
+    autocomplete_fields = ['user']
+    date_hierarchy = 'created_at'
+    actions = ['archive_tasks', 'restore_tasks', 'archive_expired_tasks', 'recompute_occurrences']
+
+    # 대용량 테이블에서 COUNT(*) 전체 스캔 방지
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # 다음 일정일 재계산 액션의 청크 크기
+    RECOMPUTE_CHUNK_SIZE = 1000
 
     fieldsets = (
         ('기본 정보', {
@@ -17,12 +30,37 @@ class TaskAdmin(admin.ModelAdmin):
             'fields': ('task_type', 'priority', 'status')
         }),
         ('반복 설정', {
-            'fields': ('repeat_days',)
+            'fields': ('repeat_days', 'recurrence')
         }),
         ('날짜', {
-            'fields': ('start_date', 'end_date', 'due_date')
+            'fields': ('start_date', 'end_date', 'due_date', 'next_occurrence')
         }),
         ('메타 정보', {
             'fields': ('created_at', 'updated_at', 'archived_at')
         }),
     )
+
+    @admin.action(description='선택한 할 일 보관')
+    def archive_tasks(self, request, queryset):
+        updated = TaskService.archive_tasks(list(queryset.values_list('id', flat=True)), queryset.db)
+        self.message_user(request, f'{updated}개의 할 일을 보관했습니다.', messages.SUCCESS)
+
+    @admin.action(description='선택한 할 일 복구')
+    def restore_tasks(self, request, queryset):
+        updated = TaskService.restore_tasks(list(queryset.values_list('id', flat=True)), queryset.db)
+        self.message_user(request, f'{updated}개의 할 일을 복구했습니다.', messages.SUCCESS)
+
+    @admin.action(description='선택한 할 일 중 기간이 끝난 할 일 보관 (자동 보관 규칙 재적용)')
+    def archive_expired_tasks(self, request, queryset):
+        stats = TaskService.archive_expired(tasks=queryset)
+        self.message_user(request, f"{stats['archived']}개의 할 일을 보관했습니다.", messages.SUCCESS)
+
+    @admin.action(description='선택한 할 일의 다음 일정일 다시 계산')
+    def recompute_occurrences(self, request, queryset):
+        ids = list(queryset.values_list('id', flat=True))
+        changed = 0
+        # 읽은 완료 기록으로 바로 쓰므로 청크마다 쓰기 잠금을 잡고 계산한다 (TaskService.roll_occurrences 와 같음)
+        for start in range(0, len(ids), self.RECOMPUTE_CHUNK_SIZE):
+            with immediate_atomic(using=queryset.db):
+                changed += TaskService.refresh_occurrences(ids[start:start + self.RECOMPUTE_CHUNK_SIZE], queryset.db)
+        self.message_user(request, f'{changed}개의 할 일의 다음 일정일을 고쳤습니다.', messages.SUCCESS)
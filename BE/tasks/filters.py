@@ -0,0 +1,65 @@
+from datetime import date
+
+import django_filters
+from django.db.models import Exists, OuterRef, Q
+
+from .models import Task
+
+
+class TaskFilter(django_filters.FilterSet):
+    """할 일 목록 필터
+
+    정렬은 ORDERINGS 에 등록된 조합만 허용하며, 각 조합은
+    Task.Meta.indexes 의 (user, status, ...) 인덱스로 정렬 없이 처리된다.
+    날짜 범위 조건은 같은 컬럼으로 정렬할 때 인덱스 범위 스캔이 된다 (예: due_date 범위 + due_date 정렬).
+    """
+
+    ORDERINGS = {
+        'created_at': ('created_at', 'id'),
+        '-created_at': ('-created_at', '-id'),
+        'due_date': ('due_date', 'id'),
+        '-due_date': ('-due_date', '-id'),
+        'priority': ('priority_rank', 'due_date', 'id'),
+        '-priority': ('-priority_rank', '-due_date', '-id'),
+    }
+    WEEKDAY_CHOICES = [(d, d) for d in ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')]
+
+    task_type = django_filters.MultipleChoiceFilter(choices=Task.TASK_TYPE_CHOICES)
+    priority = django_filters.MultipleChoiceFilter(choices=Task.PRIORITY_CHOICES)
+    status = django_filters.ChoiceFilter(choices=Task.STATUS_CHOICES, empty_label=None)
+
+    due_date = django_filters.DateFromToRangeFilter()
+    start_date = django_filters.DateFromToRangeFilter()
+    end_date = django_filters.DateFromToRangeFilter()
+
+    has_completed_today = django_filters.BooleanFilter(method='filter_has_completed_today')
+    repeat_weekday = django_filters.ChoiceFilter(choices=WEEKDAY_CHOICES, method='filter_repeat_weekday')
+
+    ordering = django_filters.ChoiceFilter(
+        choices=[(key, key) for key in ORDERINGS],
+        method='filter_ordering',
+    )
+
+    class Meta:
+        model = Task
+        fields = []
+
+    def filter_queryset(self, queryset):
+        # 상태를 지정하지 않으면 기존 목록처럼 활성 할 일만
+        if not self.form.cleaned_data.get('status'):
+            queryset = queryset.filter(status='active')
+        queryset = super().filter_queryset(queryset)
+        if not self.form.cleaned_data.get('ordering'):
+            queryset = queryset.order_by(*self.ORDERINGS['-created_at'])
+        return queryset
+
+    def filter_has_completed_today(self, queryset, name, value):
+        from completions.models import Completion
+        completed_today = Completion.objects.filter(task=OuterRef('pk'), completed_date=date.today())
+        return queryset.filter(Exists(completed_today) if value else ~Exists(completed_today))
+
+    def filter_repeat_weekday(self, queryset, name, value):
+        return queryset.filter(Q(task_type='weekly') & Q(repeat_days__contains=value))
+
+    def filter_ordering(self, queryset, name, value):
+        return queryset.order_by(*self.ORDERINGS[value])
@@ -0,0 +1,47 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.services import TaskService
+
+
+class Command(BaseCommand):
+    """마감일이 지난 once 할 일, 종료일이 지난 period 할 일 자동 보관
+
+    사용자별 유예 일수(UserSetting.archive_grace_days, 기본 AUTO_ARCHIVE_GRACE_DAYS)가 지난 할 일만 보관한다.
+    cron 등으로 하루 한 번 실행하는 것을 가정한다.
+    """
+    help = '기간이 끝난 once/period 할 일 자동 보관'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='특정 사용자(username)만 처리')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='트랜잭션당 보관할 할 일 수')
+        parser.add_argument('--date', type=date.fromisoformat, help='기준 날짜 (YYYY-MM-DD, 기본: 오늘)')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f"사용자를 찾을 수 없습니다: {options['user']}")
+
+        stats = TaskService.archive_expired(
+            user=user,
+            today=options['date'],
+            chunk_size=options['chunk_size'],
+            progress=self._report if options['verbosity'] > 1 else None
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['archived']}건 보관 ({stats['chunks']}개 청크, {stats['seconds']:.2f}초, "
+            f"{self._rate(stats):.0f}건/초)"
+        ))
+
+    def _report(self, stats):
+        self.stdout.write(f"  {stats['chunks']}번째 청크: 누적 {stats['archived']}건, {self._rate(stats):.0f}건/초")
+
+    @staticmethod
+    def _rate(stats):
+        return stats['archived'] / stats['seconds'] if stats['seconds'] else 0.0
@@ -0,0 +1,51 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from config.sharding import all_databases
+from tasks import rollover
+from tasks.models import Task
+from tasks.services import TaskService
+
+
+class Command(BaseCommand):
+    """다음 일정일(next_occurrence)이 지난 반복 할 일을 오늘 이후 일정으로 넘김
+
+    날짜가 바뀐 직후 하루 1번 실행한다 (cron 등). 실행 전에도 오늘/다가오는 할 일 조회는
+    사용자 범위로 같은 처리를 먼저 하므로 결과가 틀리지 않고, 이 명령은 그 비용을 미리 치르는 역할이다.
+    --verify 는 갱신하기 전에 배열 계산 결과를 할 일별 계산(Task.compute_next_occurrence 와 같은 계산)과 비교한다.
+    """
+    help = '반복 할 일의 다음 일정일 갱신'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000, help='트랜잭션당 처리할 할 일 수')
+        parser.add_argument('--date', type=date.fromisoformat, help='기준 날짜 (YYYY-MM-DD, 기본: 오늘)')
+        parser.add_argument('--verify', action='store_true', help='갱신 전에 배열 계산 결과를 할 일별 계산과 비교')
+
+    def handle(self, *args, **options):
+        today = options['date'] or date.today()
+        if options['verify']:
+            self._verify(today, options['chunk_size'])
+        rolled = TaskService.roll_occurrences(today=today, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'반복 할 일 {rolled}건의 다음 일정일 갱신'))
+
+    def _verify(self, today, chunk_size):
+        """대상 할 일을 id 순 청크로 읽어 비교하고, 다르면 갱신하지 않고 중단"""
+        checked = 0
+        for alias in all_databases():
+            candidates = Task.objects.using(alias).filter(
+                status='active', next_occurrence__lt=today
+            ).exclude(task_type='once').order_by('id').values_list(*rollover.COLUMNS, named=True)
+            last_id = 0
+            while True:
+                rows = list(candidates.filter(id__gt=last_id)[:chunk_size])
+                if not rows:
+                    break
+                mismatches = rollover.verify_chunk(rows, today)
+                if mismatches:
+                    for task_id, actual, expected in mismatches[:10]:
+                        self.stderr.write(f'  {alias} task={task_id}: 배열 {actual}, 할 일별 {expected}')
+                    raise CommandError(f'다음 일정일 계산 결과가 {len(mismatches)}건 다릅니다.')
+                checked += len(rows)
+                last_id = rows[-1].id
+        self.stdout.write(f'배열 계산 결과 {checked}건 확인')
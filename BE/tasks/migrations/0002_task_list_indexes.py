@@ -0,0 +1,38 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+from search import sql
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+        ('search', '0001_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # SQLite 는 GeneratedField 추가 시 테이블을 재생성하므로 검색 동기화 트리거를 내린 상태로 실행
+        sql.WithoutSearchTriggers(
+            migrations.AddField(
+                model_name='task',
+                name='priority_rank',
+                field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(priority='high', then=models.Value(0)), models.When(priority='medium', then=models.Value(1)), default=models.Value(2)), output_field=models.SmallIntegerField(), verbose_name='우선순위 순서'),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status', 'created_at', 'id'], name='task_user_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status', 'due_date', 'id'], name='task_user_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status', 'priority_rank', 'due_date', 'id'], name='task_user_status_prio_idx'),
+        ),
+    ]
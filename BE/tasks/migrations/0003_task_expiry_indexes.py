@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_task_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'active'), ('task_type', 'once')), fields=['due_date'], name='task_once_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'active'), ('task_type', 'period')), fields=['end_date'], name='task_period_expiry_idx'),
+        ),
+    ]
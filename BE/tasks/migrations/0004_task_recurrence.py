@@ -0,0 +1,76 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:23
+
+from collections import defaultdict
+from datetime import date
+
+from django.conf import settings
+from django.db import migrations, models
+
+from search import sql
+from tasks import recurrence
+
+BACKFILL_CHUNK_SIZE = 2000
+
+
+def backfill_next_occurrence(apps, schema_editor):
+    """기존 활성 할 일의 next_occurrence 를 타입/날짜와 완료 기록으로 계산 (id 순 청크 단위)"""
+    Task = apps.get_model('tasks', 'Task')
+    Completion = apps.get_model('completions', 'Completion')
+    db = schema_editor.connection.alias
+    today = date.today()
+
+    last_id = 0
+    while True:
+        tasks = list(Task.objects.using(db).filter(id__gt=last_id, status='active').order_by('id')[:BACKFILL_CHUNK_SIZE])
+        if not tasks:
+            break
+        last_id = tasks[-1].id
+        floor = min([today] + [t.due_date for t in tasks if t.due_date])
+        completed = defaultdict(set)
+        for task_id, completed_date in Completion.objects.using(db).filter(
+            task_id__in=[t.id for t in tasks], completed_date__gte=floor
+        ).values_list('task_id', 'completed_date'):
+            completed[task_id].add(completed_date)
+        for task in tasks:
+            task.next_occurrence = recurrence.next_pending(recurrence.compile_task(task), today, completed[task.id])
+        Task.objects.using(db).bulk_update(tasks, ['next_occurrence'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_expiry_indexes'),
+        ('completions', '0004_streak_stat'),
+        ('search', '0001_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # SQLite 는 기본값이 있는 NOT NULL 컬럼(recurrence) 추가 시 테이블을 재생성하므로 검색 동기화 트리거를 내린 상태로 실행
+        sql.WithoutSearchTriggers(
+            migrations.AddField(
+                model_name='task',
+                name='next_occurrence',
+                field=models.DateField(blank=True, editable=False, null=True, verbose_name='다음 일정일'),
+            ),
+            migrations.AddField(
+                model_name='task',
+                name='recurrence',
+                field=models.CharField(blank=True, help_text='RRULE 형식 (예: FREQ=MONTHLY;BYDAY=2TU;EXDATE=2026-12-08)', max_length=200, verbose_name='반복 규칙'),
+            ),
+            migrations.AlterField(
+                model_name='task',
+                name='task_type',
+                field=models.CharField(choices=[('once', '한 번만'), ('daily', '매일'), ('weekly', '요일별'), ('period', '기간'), ('custom', '반복 규칙')], default='once', max_length=10, verbose_name='할 일 타입'),
+            ),
+        ),
+        migrations.RunPython(backfill_next_occurrence, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'status', 'next_occurrence', 'id'], name='task_user_status_next_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'active'), models.Q(('task_type', 'once'), _negated=True)), fields=['next_occurrence'], name='task_rollover_idx'),
+        ),
+    ]
@@ -1,6 +1,11 @@
+from datetime import date
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from config.sharding import ShardedQuerySet
+from . import recurrence
 
 
 class Task(models.Model):
@@ -11,6 +16,7 @@ class Task(models.Model):
         ('daily', '매일'),
         ('weekly', '요일별'),
         ('period', '기간'),
+        ('custom', '반복 규칙'),
     ]
 
     PRIORITY_CHOICES = [
@@ -36,24 +42,63 @@ class Task(models.Model):
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium', verbose_name='우선순위')
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active', verbose_name='상태')
 
+    # 우선순위 정렬용 (high=0, medium=1, low=2), DB 가 priority 로부터 계산
+    priority_rank = models.GeneratedField(
+        expression=models.Case(
+            models.When(priority='high', then=models.Value(0)),
+            models.When(priority='medium', then=models.Value(1)),
+            default=models.Value(2),
+        ),
+        output_field=models.SmallIntegerField(),
+        db_persist=True,
+        verbose_name='우선순위 순서',
+    )
+
     # 반복 설정 (weekly 타입용)
     repeat_days = models.CharField(max_length=50, blank=True, verbose_name='반복 요일',
                                    help_text='Mon,Tue,Wed,Thu,Fri,Sat,Sun 형식')
 
+    # 반복 규칙 (custom 타입용, tasks.recurrence 참고)
+    recurrence = models.CharField(max_length=200, blank=True, verbose_name='반복 규칙',
+                                  help_text='RRULE 형식 (예: FREQ=MONTHLY;BYDAY=2TU;EXDATE=2026-12-08)')
+
     # 날짜
     start_date = models.DateField(null=True, blank=True, verbose_name='시작일')
     end_date = models.DateField(null=True, blank=True, verbose_name='종료일')
     due_date = models.DateField(null=True, blank=True, verbose_name='마감일')
 
+    # 완료하지 않은 다음 일정일 (저장/완료/롤오버 때 갱신, 오늘/마감 지남/다가오는 할 일 조회용)
+    next_occurrence = models.DateField(null=True, blank=True, editable=False, verbose_name='다음 일정일')
+
     # 메타 정보
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일시')
     archived_at = models.DateTimeField(null=True, blank=True, verbose_name='보관일시')
 
+    objects = ShardedQuerySet.as_manager()
+
     class Meta:
         verbose_name = '할 일'
         verbose_name_plural = '할 일 목록'
         ordering = ['-created_at']
+        # 목록 정렬(TaskFilter.ORDERINGS)마다 (user, status, 정렬 컬럼, id) 인덱스
+        indexes = [
+            models.Index(fields=['user', 'status', 'created_at', 'id'], name='task_user_status_created_idx'),
+            models.Index(fields=['user', 'status', 'due_date', 'id'], name='task_user_status_due_idx'),
+            models.Index(fields=['user', 'status', 'priority_rank', 'due_date', 'id'], name='task_user_status_prio_idx'),
+            # admin date_hierarchy (사용자 조건 없이 created_at 범위/연월 목록 조회)
+            models.Index(fields=['created_at'], name='task_created_idx'),
+            # 오늘/마감 지남/다가오는 할 일 (next_occurrence 범위 조회)
+            models.Index(fields=['user', 'status', 'next_occurrence', 'id'], name='task_user_status_next_idx'),
+            # 자동 보관(TaskService.archive_expired) 대상 조회용 부분 인덱스
+            models.Index(fields=['due_date'], condition=models.Q(status='active', task_type='once'),
+                         name='task_once_expiry_idx'),
+            models.Index(fields=['end_date'], condition=models.Q(status='active', task_type='period'),
+                         name='task_period_expiry_idx'),
+            # 놓친 반복 일정을 넘기는 롤오버(TaskService.roll_occurrences) 대상 조회용 부분 인덱스
+            models.Index(fields=['next_occurrence'], condition=models.Q(status='active') & ~models.Q(task_type='once'),
+                         name='task_rollover_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.get_task_type_display()})"
@@ -74,6 +119,48 @@ class Task(models.Model):
             if self.start_date > self.end_date:
                 raise ValidationError({'end_date': '종료일은 시작일보다 이후여야 합니다.'})
 
+        # custom 타입은 반복 규칙과 시작일(규칙의 기준일) 필수
+        if self.task_type == 'custom':
+            if not self.recurrence:
+                raise ValidationError({'recurrence': 'custom 타입은 반복 규칙을 지정해야 합니다.'})
+            try:
+                recurrence.parse(self.recurrence)
+            except ValueError as exc:
+                raise ValidationError({'recurrence': str(exc)})
+            if not self.start_date:
+                raise ValidationError({'start_date': 'custom 타입은 시작일을 지정해야 합니다.'})
+            if self.end_date and self.start_date > self.end_date:
+                raise ValidationError({'end_date': '종료일은 시작일보다 이후여야 합니다.'})
+
+    def rule(self):
+        """타입/날짜/반복 규칙을 컴파일한 Recurrence"""
+        return recurrence.compile_task(self)
+
+    def compute_next_occurrence(self, today=None, completed=()):
+        """완료하지 않은 다음 일정일 (completed: 완료한 날짜 집합)"""
+        return recurrence.next_pending(self.rule(), today or date.today(), completed)
+
+    # 보관/복구처럼 이 필드만 저장할 때는 검증할 값이 없으므로 full_clean 을 건너뛴다
+    # (사용자 외래 키 조회 등 검증 쿼리가 쓰기 트랜잭션 안에서 실행되지 않게)
+    STATE_FIELDS = frozenset({'status', 'archived_at', 'updated_at'})
+
     def save(self, *args, **kwargs):
-        self.full_clean()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or not set(update_fields) <= self.STATE_FIELDS:
+            # priority_rank 는 DB 가 계산하는 값이라 저장 전에는 읽을 수 없다
+            self.full_clean(exclude=['priority_rank'])
+            # 일정이 바뀌었을 수 있으므로 다음 일정일을 다시 계산
+            today = date.today()
+            completed = ()
+            if self.pk is not None and not self._state.adding:
+                completed = set(self.completions.filter(completed_date__gte=min(
+                    today, self.due_date or today
+                )).values_list('completed_date', flat=True))
+            self.next_occurrence = self.compute_next_occurrence(today, completed)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'next_occurrence'}
+        if self._state.adding and self.pk is None and settings.DATABASE_SHARDS and not args:
+            # 샤딩 중에는 pre_save 에서 id 를 붙이므로, 없는 행을 UPDATE 하려다
+            # 아직 읽지 않은 priority_rank(GeneratedField)를 조회하지 않게 바로 INSERT
+            kwargs.setdefault('force_insert', True)
         super().save(*args, **kwargs)
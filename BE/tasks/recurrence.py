@@ -0,0 +1,329 @@
+"""할 일 반복 규칙
+
+RFC 5545 RRULE 의 일부를 지원한다. 세미콜론으로 구분한 KEY=VALUE 목록이며
+시작일/종료일은 규칙이 아니라 할 일의 start_date(DTSTART)/end_date(UNTIL)를 쓴다.
+
+- FREQ=DAILY|WEEKLY|MONTHLY (필수)
+- INTERVAL=N: N 일/주/개월마다 (기본 1, 시작일이 속한 일/주/월 기준)
+- BYDAY=MO,WE (WEEKLY), BYDAY=2TU,-1FR (MONTHLY, n 번째 요일. 숫자가 없으면 그 달의 모든 해당 요일)
+- BYMONTHDAY=1,15,-1 (MONTHLY, 음수는 말일부터. 그 달에 없는 날은 건너뜀)
+- EXDATE=2026-12-25,2027-01-01: 제외할 날짜
+
+예: 'FREQ=DAILY;INTERVAL=3', 'FREQ=MONTHLY;BYMONTHDAY=15', 'FREQ=MONTHLY;BYDAY=2TU;EXDATE=2026-12-08'
+
+compile_task() 는 기존 타입(once/daily/weekly/period)도 같은 규칙으로 바꿔서
+'이 날짜에 표시하는가'와 '이 날짜 이후 첫 일정일'을 한 가지 방식으로 계산한다.
+"""
+import calendar
+from datetime import date, timedelta
+from functools import lru_cache
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+# repeat_days(Mon,Tue, ...) -> weekday() 값
+REPEAT_DAY_NUMBERS = {day: i for i, day in enumerate(('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'))}
+
+# 시작일이 없는 규칙의 INTERVAL 기준일 (월요일)
+EPOCH = date(2001, 1, 1)
+# 일정일이 한 번도 없는 규칙(예: 2월 30일)을 찾다가 멈출 때까지 볼 개월 수 (윤년 4년 주기 x 2)
+MAX_MONTH_SCAN = 12 * 8
+
+
+class Recurrence:
+    """컴파일된 반복 규칙
+
+    규칙 문자열을 한 번만 해석해서 요일 비트마스크/날짜 집합으로 바꿔 두고,
+    occurs_on() 은 산술 연산만으로, next_on_or_after() 는 주기 단위로 건너뛰며 계산한다.
+    """
+
+    def __init__(self, freq='DAILY', interval=1, weekdays=(), monthdays=(), nth_weekdays=(),
+                 exdates=(), start=None, end=None, dates=None):
+        self.freq = freq
+        self.interval = interval
+        self.weekday_mask = sum(1 << day for day in weekdays)
+        self.monthdays = tuple(sorted(set(monthdays)))
+        self.nth_weekdays = tuple(sorted(set(nth_weekdays)))
+        self.exdates = frozenset(exdates)
+        self.start = start
+        self.end = end
+        # 정해진 날짜만 있는 규칙 (once)
+        self.dates = None if dates is None else tuple(sorted(set(dates)))
+        anchor = start or EPOCH
+        self._anchor = anchor
+        self._anchor_monday = anchor - timedelta(days=anchor.weekday())
+        self._anchor_month = anchor.year * 12 + anchor.month - 1
+
+    @property
+    def repeats(self):
+        """지난 일정일을 놓치면 다음 일정으로 넘어가는 규칙인지 (once 만 아님)"""
+        return self.dates is None
+
+    def occurs_on(self, day):
+        if self.dates is not None:
+            return day in self.dates and day not in self.exdates
+        if (self.start and day < self.start) or (self.end and day > self.end) or day in self.exdates:
+            return False
+        return self._matches(day)
+
+    def _matches(self, day):
+        """시작/종료일과 EXDATE 를 빼고 주기만 보는 판단"""
+        if self.freq == 'DAILY':
+            return (day - self._anchor).days % self.interval == 0
+        if self.freq == 'WEEKLY':
+            return (
+                self.weekday_mask >> day.weekday() & 1
+                and (day - self._anchor_monday).days // 7 % self.interval == 0
+            )
+        month = day.year * 12 + day.month - 1
+        return (month - self._anchor_month) % self.interval == 0 and day.day in self._month_days(day.year, day.month)
+
+    def count_between(self, first, last):
+        """first ~ last 사이의 일정일 수 (DAILY 는 산술 계산, WEEKLY/MONTHLY 는 주/월 단위로 센다)"""
+        if self.dates is not None:
+            return sum(1 for d in self.dates if first <= d <= last and d not in self.exdates)
+        if self.start and first < self.start:
+            first = self.start
+        if self.end and last > self.end:
+            last = self.end
+        if first > last:
+            return 0
+
+        if self.freq == 'DAILY':
+            count = (last - self._anchor).days // self.interval + (first - self._anchor).days // -self.interval + 1
+        elif self.freq == 'WEEKLY':
+            count = 0
+            per_week = bin(self.weekday_mask).count('1')
+            monday = first - timedelta(days=first.weekday())
+            monday += timedelta(weeks=-((monday - self._anchor_monday).days // 7) % self.interval)
+            while monday <= last:
+                if monday >= first and monday + timedelta(days=6) <= last:
+                    count += per_week
+                else:
+                    count += sum(
+                        1 for weekday in range(7)
+                        if self.weekday_mask >> weekday & 1 and first <= monday + timedelta(days=weekday) <= last
+                    )
+                monday += timedelta(weeks=self.interval)
+        else:
+            count = 0
+            month = first.year * 12 + first.month - 1
+            month += -(month - self._anchor_month) % self.interval
+            while date(month // 12, month % 12 + 1, 1) <= last:
+                year, month_number = divmod(month, 12)
+                count += sum(
+                    1 for month_day in self._month_days(year, month_number + 1)
+                    if first <= date(year, month_number + 1, month_day) <= last
+                )
+                month += self.interval
+
+        return max(count, 0) - sum(1 for d in self.exdates if first <= d <= last and self._matches(d))
+
+    def occurs_between(self, first, last):
+        """first ~ last 사이에 일정일이 있는지"""
+        day = self.next_on_or_after(first)
+        return day is not None and day <= last
+
+    def next_on_or_after(self, day):
+        """day 와 같거나 이후인 첫 일정일 (없으면 None)"""
+        if self.dates is not None:
+            return next((d for d in self.dates if d >= day and d not in self.exdates), None)
+        if self.start and day < self.start:
+            day = self.start
+        if self.freq == 'DAILY':
+            found = self._next_daily(day)
+        elif self.freq == 'WEEKLY':
+            found = self._next_weekly(day)
+        else:
+            found = self._next_monthly(day)
+        if found is None or (self.end and found > self.end):
+            return None
+        return found
+
+    def _next_daily(self, day):
+        step = timedelta(days=self.interval)
+        # 기준일로부터 INTERVAL 의 배수가 되는 첫 날 (올림 나눗셈)
+        day = self._anchor + step * -(-(day - self._anchor).days // self.interval)
+        while day in self.exdates:
+            day += step
+        return day
+
+    def _next_weekly(self, day):
+        if not self.weekday_mask:
+            return None
+        monday = day - timedelta(days=day.weekday())
+        weeks = (monday - self._anchor_monday).days // 7
+        skip = -weeks % self.interval
+        if skip:
+            day = monday = monday + timedelta(weeks=skip)
+        while self.end is None or monday <= self.end:
+            for weekday in range(day.weekday(), 7):
+                candidate = monday + timedelta(days=weekday)
+                if self.weekday_mask >> weekday & 1 and candidate not in self.exdates:
+                    return candidate
+            day = monday = monday + timedelta(weeks=self.interval)
+        return None
+
+    def _next_monthly(self, day):
+        month = day.year * 12 + day.month - 1
+        month += -(month - self._anchor_month) % self.interval
+        if month != day.year * 12 + day.month - 1:
+            day = date(month // 12, month % 12 + 1, 1)
+        for _ in range(MAX_MONTH_SCAN * self.interval + len(self.exdates)):
+            year, month_number = divmod(month, 12)
+            if self.end and date(year, month_number + 1, 1) > self.end:
+                return None
+            for month_day in self._month_days(year, month_number + 1):
+                candidate = date(year, month_number + 1, month_day)
+                if candidate >= day and candidate not in self.exdates:
+                    return candidate
+            month += self.interval
+        return None
+
+    def _month_days(self, year, month):
+        """그 달의 일정일(일) 목록 (오름차순)"""
+        return _month_days(self.monthdays, self.nth_weekdays, self._anchor.day, year, month)
+
+
+@lru_cache(maxsize=4096)
+def _month_days(monthdays, nth_weekdays, default_day, year, month):
+    first_weekday, length = calendar.monthrange(year, month)
+    days = set()
+    for month_day in monthdays:
+        month_day = month_day if month_day > 0 else length + month_day + 1
+        if 1 <= month_day <= length:
+            days.add(month_day)
+    for nth, weekday in nth_weekdays:
+        first = 1 + (weekday - first_weekday) % 7
+        matches = list(range(first, length + 1, 7))
+        if nth == 0:
+            days.update(matches)
+        elif -len(matches) <= nth <= len(matches):
+            days.add(matches[nth - 1 if nth > 0 else nth])
+    if not monthdays and not nth_weekdays and default_day <= length:
+        days.add(default_day)
+    return sorted(days)
+
+
+def parse(text):
+    """규칙 문자열을 Recurrence 인자 dict 로 (잘못된 규칙이면 ValueError)"""
+    parts = {}
+    for part in filter(None, (p.strip() for p in text.upper().split(';'))):
+        key, sep, value = part.partition('=')
+        if not sep or not value:
+            raise ValueError(f'올바르지 않은 규칙 항목입니다: {part}')
+        if key in parts:
+            raise ValueError(f'{key} 가 두 번 지정되었습니다.')
+        parts[key] = value
+
+    unknown = set(parts) - {'FREQ', 'INTERVAL', 'BYDAY', 'BYMONTHDAY', 'EXDATE'}
+    if unknown:
+        raise ValueError(f'지원하지 않는 항목입니다: {", ".join(sorted(unknown))}')
+
+    freq = parts.get('FREQ')
+    if freq not in FREQUENCIES:
+        raise ValueError(f'FREQ 는 {", ".join(FREQUENCIES)} 중 하나여야 합니다.')
+
+    try:
+        interval = int(parts.get('INTERVAL', 1))
+    except ValueError:
+        raise ValueError('INTERVAL 은 숫자여야 합니다.')
+    if not 1 <= interval <= 366:
+        raise ValueError('INTERVAL 은 1 ~ 366 이어야 합니다.')
+
+    rule = {'freq': freq, 'interval': interval, 'weekdays': [], 'monthdays': [], 'nth_weekdays': [], 'exdates': []}
+
+    for item in filter(None, parts.get('BYDAY', '').split(',')):
+        code, prefix = item[-2:], item[:-2]
+        if code not in WEEKDAYS:
+            raise ValueError(f'올바르지 않은 요일입니다: {item}')
+        if freq == 'WEEKLY':
+            if prefix:
+                raise ValueError('WEEKLY 의 BYDAY 에는 순번을 붙일 수 없습니다.')
+            rule['weekdays'].append(WEEKDAYS.index(code))
+        elif freq == 'MONTHLY':
+            try:
+                nth = int(prefix) if prefix else 0
+            except ValueError:
+                raise ValueError(f'올바르지 않은 요일입니다: {item}')
+            if not -5 <= nth <= 5:
+                raise ValueError(f'요일 순번은 -5 ~ 5 입니다: {item}')
+            rule['nth_weekdays'].append((nth, WEEKDAYS.index(code)))
+        else:
+            raise ValueError('BYDAY 는 WEEKLY, MONTHLY 에서만 쓸 수 있습니다.')
+
+    if 'BYMONTHDAY' in parts:
+        if freq != 'MONTHLY':
+            raise ValueError('BYMONTHDAY 는 MONTHLY 에서만 쓸 수 있습니다.')
+        for item in parts['BYMONTHDAY'].split(','):
+            try:
+                month_day = int(item)
+            except ValueError:
+                raise ValueError(f'올바르지 않은 날짜입니다: {item}')
+            if not 1 <= abs(month_day) <= 31:
+                raise ValueError(f'BYMONTHDAY 는 1 ~ 31 또는 -1 ~ -31 입니다: {item}')
+            rule['monthdays'].append(month_day)
+
+    if freq == 'WEEKLY' and not rule['weekdays']:
+        raise ValueError('WEEKLY 는 BYDAY 로 요일을 지정해야 합니다.')
+
+    for item in filter(None, parts.get('EXDATE', '').split(',')):
+        try:
+            rule['exdates'].append(date.fromisoformat(item))
+        except ValueError:
+            raise ValueError(f'EXDATE 는 YYYY-MM-DD 형식입니다: {item}')
+
+    return rule
+
+
+@lru_cache(maxsize=4096)
+def compile_rule(text, start=None, end=None):
+    """규칙 문자열을 Recurrence 로 (같은 규칙/기간이면 캐시된 객체를 재사용)"""
+    rule = parse(text)
+    return Recurrence(
+        rule['freq'], rule['interval'],
+        weekdays=rule['weekdays'], monthdays=rule['monthdays'], nth_weekdays=rule['nth_weekdays'],
+        exdates=rule['exdates'], start=start, end=end,
+    )
+
+
+NEVER = Recurrence(dates=())
+
+
+@lru_cache(maxsize=4096)
+def _compile(task_type, recurrence, repeat_days, start_date, end_date, due_date):
+    if task_type == 'once':
+        return Recurrence(dates=[due_date] if due_date else [])
+    if task_type == 'daily':
+        return Recurrence('DAILY', start=start_date, end=end_date)
+    if task_type == 'weekly':
+        # 기존 동작과 같이 weekly 는 시작/종료일을 보지 않는다
+        days = [REPEAT_DAY_NUMBERS[d.strip()] for d in repeat_days.split(',') if d.strip() in REPEAT_DAY_NUMBERS]
+        return Recurrence('WEEKLY', weekdays=days)
+    if task_type == 'period':
+        if not start_date or not end_date:
+            return NEVER
+        return Recurrence('DAILY', start=start_date, end=end_date)
+    if task_type == 'custom' and recurrence:
+        try:
+            return compile_rule(recurrence, start_date, end_date)
+        except ValueError:
+            return NEVER
+    return NEVER
+
+
+def compile_task(task):
+    """할 일의 타입/날짜를 Recurrence 로 (규칙이 잘못됐거나 날짜가 빠졌으면 일정일이 없는 규칙)"""
+    return _compile(task.task_type, task.recurrence, task.repeat_days,
+                    task.start_date, task.end_date, task.due_date)
+
+
+def next_pending(rule, today, completed=()):
+    """아직 완료하지 않은 다음 일정일
+
+    반복 규칙은 today 이후, once 는 날짜와 관계없이 완료하지 않은 첫 일정일이다.
+    (놓친 반복 일정은 다음 일정으로 넘어가고, 놓친 once 는 마감 지남으로 남는다)
+    """
+    day = rule.next_on_or_after(today if rule.repeats else date.min)
+    while day is not None and day in completed:
+        day = rule.next_on_or_after(day + timedelta(days=1))
+    return day
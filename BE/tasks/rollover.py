@@ -0,0 +1,140 @@
+"""반복 할 일의 다음 일정일(next_occurrence) 일괄 갱신 (NumPy)
+
+날짜가 바뀐 직후 next_occurrence 가 지난 반복 할 일 전체를 청크 단위 컬럼 배열
+(타입 코드, 날짜 ordinal, 요일 비트마스크)로 읽어 한 번에 계산한다.
+오늘 할 일 조회는 이 컬럼을 (user, status, next_occurrence) 인덱스로 바로 읽는다.
+
+- daily/period/weekly 는 배열 연산으로 계산한다 (weekly 는 (요일 마스크, 오늘 요일) -> 며칠 뒤 표)
+- custom 규칙과 오늘 이후 완료 기록이 있는 할 일은 Task.compute_next_occurrence() 와 같이 한 건씩 계산한다
+- 결과는 같은 날짜끼리 묶어 UPDATE ... WHERE id IN (...) 로 쓰므로 청크당 문장 수는 날짜 종류 수만큼이다
+"""
+from collections import defaultdict
+from datetime import date
+
+import numpy as np
+
+from . import recurrence
+from .models import Task
+
+DAILY, WEEKLY, PERIOD, SCALAR = 1, 2, 3, 4
+TYPE_CODES = {'daily': DAILY, 'weekly': WEEKLY, 'period': PERIOD}
+# 일정일이 없음 (next_occurrence = NULL)
+NONE = 0
+
+# values_list(*COLUMNS, named=True) 행은 recurrence.compile_task() 에 그대로 넘길 수 있다
+COLUMNS = ('id', 'task_type', 'repeat_days', 'recurrence', 'start_date', 'end_date', 'due_date')
+
+
+def _next_offsets():
+    """[요일 마스크, 기준 요일] -> 기준일부터 며칠 뒤가 첫 일정일인지 (없으면 -1)"""
+    table = np.full((128, 7), -1, dtype=np.int8)
+    for mask in range(1, 128):
+        for weekday in range(7):
+            table[mask, weekday] = next(k for k in range(7) if mask >> (weekday + k) % 7 & 1)
+    return table
+
+
+NEXT_OFFSET = _next_offsets()
+
+
+def weekday_mask(repeat_days):
+    """'Mon,Wed' -> 0b101 (compile_task 와 같은 규칙으로 해석)"""
+    mask = 0
+    for day in repeat_days.split(','):
+        number = recurrence.REPEAT_DAY_NUMBERS.get(day.strip())
+        if number is not None:
+            mask |= 1 << number
+    return mask
+
+
+def to_columns(rows):
+    """values_list(*COLUMNS, named=True) 행 -> 컬럼 배열 dict (날짜는 ordinal, 없으면 0)"""
+    count = len(rows)
+    columns = {
+        'id': np.empty(count, dtype=np.int64),
+        'code': np.empty(count, dtype=np.int8),
+        'mask': np.zeros(count, dtype=np.int8),
+        'start': np.zeros(count, dtype=np.int32),
+        'end': np.zeros(count, dtype=np.int32),
+    }
+    for i, row in enumerate(rows):
+        columns['id'][i] = row.id
+        code = columns['code'][i] = TYPE_CODES.get(row.task_type, SCALAR)
+        if code == WEEKLY:
+            columns['mask'][i] = weekday_mask(row.repeat_days)
+        if row.start_date:
+            columns['start'][i] = row.start_date.toordinal()
+        if row.end_date:
+            columns['end'][i] = row.end_date.toordinal()
+    return columns
+
+
+def next_occurrences(columns, today):
+    """today 이후 첫 일정일 ordinal 배열 (없으면 NONE, SCALAR 행은 계산하지 않음)
+
+    완료 기록은 보지 않으므로 today 이후 완료 기록이 있는 할 일은 호출하는 쪽에서 따로 계산한다.
+    """
+    code, start, end = columns['code'], columns['start'], columns['end']
+    day = today.toordinal()
+    result = np.full(len(code), NONE, dtype=np.int32)
+
+    # daily: 시작일(있으면)과 오늘 중 늦은 날, 종료일이 지났으면 없음
+    # period: daily 와 같지만 시작/종료일이 모두 있어야 한다
+    ranged = (code == DAILY) | ((code == PERIOD) & (start > 0) & (end > 0))
+    first = np.maximum(start, day)
+    ranged &= (end == 0) | (first <= end)
+    result[ranged] = first[ranged]
+
+    # weekly: 시작/종료일을 보지 않는다 (compile_task 와 같음)
+    weekly = code == WEEKLY
+    offsets = NEXT_OFFSET[columns['mask'][weekly], today.weekday()].astype(np.int32)
+    result[weekly] = np.where(offsets >= 0, day + offsets, NONE)
+    return result
+
+
+def _next_pending(row, today, completed=()):
+    """Task.compute_next_occurrence() 와 같은 한 건씩 계산"""
+    return recurrence.next_pending(recurrence.compile_task(row), today, completed)
+
+
+def roll_chunk(rows, alias, today):
+    """next_occurrence 가 지난 반복 할 일 한 청크를 갱신 (트랜잭션 안에서 호출). 갱신한 수 반환"""
+    from completions.models import Completion
+
+    if not rows:
+        return 0
+    columns = to_columns(rows)
+    ids = columns['id']
+    values = next_occurrences(columns, today)
+
+    completed = defaultdict(set)
+    for task_id, completed_date in Completion.objects.using(alias).filter(
+        task_id__in=ids.tolist(), completed_date__gte=today
+    ).values_list('task_id', 'completed_date'):
+        completed[task_id].add(completed_date)
+    scalar = columns['code'] == SCALAR
+    if completed:
+        scalar |= np.isin(ids, list(completed))
+    for i in np.flatnonzero(scalar):
+        next_occurrence = _next_pending(rows[i], today, completed[rows[i].id])
+        values[i] = next_occurrence.toordinal() if next_occurrence else NONE
+
+    for value in np.unique(values):
+        next_occurrence = None if value == NONE else date.fromordinal(int(value))
+        Task.objects.using(alias).filter(id__in=ids[values == value].tolist()).update(next_occurrence=next_occurrence)
+    return len(rows)
+
+
+def verify_chunk(rows, today):
+    """배열 계산 결과를 한 건씩 계산한 결과와 비교해 다른 (id, 배열 결과, 기대값) 목록 반환"""
+    columns = to_columns(rows)
+    values = next_occurrences(columns, today)
+    mismatches = []
+    for row, code, value in zip(rows, columns['code'], values):
+        if code == SCALAR:
+            continue
+        expected = _next_pending(row, today)
+        actual = None if value == NONE else date.fromordinal(int(value))
+        if actual != expected:
+            mismatches.append((row.id, actual, expected))
+    return mismatches
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from .models import Task
+from .services import TaskService
+from . import recurrence
 from datetime import date
 
 
@@ -11,11 +13,15 @@ class TaskListSerializer(serializers.ModelSerializer):
         model = Task
         fields = [
             'id', 'title', 'task_type', 'priority', 'status',
-            'due_date', 'created_at', 'is_completed_today'
+            'due_date', 'next_occurrence', 'created_at', 'is_completed_today'
         ]
 
     def get_is_completed_today(self, obj):
-        """오늘 완료 여부"""
+        """오늘 완료 여부 (context 에 완료 ID 목록이 있으면 쿼리 없이 판단)"""
+        completed_today_ids = self.context.get('completed_today_ids')
+        if completed_today_ids is not None:
+            return obj.id in completed_today_ids
+
         from completions.services import CompletionService
         return CompletionService.is_completed_on_date(obj.id)
 
@@ -29,7 +35,7 @@ class TaskDetailSerializer(serializers.ModelSerializer):
         model = Task
         fields = [
             'id', 'title', 'description', 'task_type', 'priority', 'status',
-            'repeat_days', 'start_date', 'end_date', 'due_date',
+            'repeat_days', 'recurrence', 'start_date', 'end_date', 'due_date', 'next_occurrence',
             'created_at', 'updated_at', 'archived_at',
             'is_completed_today', 'completion_count'
         ]
@@ -51,7 +57,7 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
         model = Task
         fields = [
             'title', 'description', 'task_type', 'priority',
-            'repeat_days', 'start_date', 'end_date', 'due_date'
+            'repeat_days', 'recurrence', 'start_date', 'end_date', 'due_date'
         ]
 
     def validate_title(self, value):
@@ -75,6 +81,16 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
                     )
         return value
 
+    def validate_recurrence(self, value):
+        """반복 규칙 검증"""
+        if value:
+            try:
+                recurrence.parse(value)
+            except ValueError as exc:
+                raise serializers.ValidationError(str(exc))
+            return value.strip().upper()
+        return value
+
     def validate(self, attrs):
         """전체 데이터 검증"""
         task_type = attrs.get('task_type')
@@ -102,6 +118,17 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
                     'end_date': '종료일은 시작일보다 이후여야 합니다.'
                 })
 
+        # custom 타입 검증
+        if task_type == 'custom':
+            if not attrs.get('recurrence'):
+                raise serializers.ValidationError({
+                    'recurrence': 'custom 타입은 반복 규칙을 지정해야 합니다.'
+                })
+            if not attrs.get('start_date'):
+                raise serializers.ValidationError({
+                    'start_date': 'custom 타입은 시작일(규칙의 기준일)을 지정해야 합니다.'
+                })
+
         # once 타입 검증
         if task_type == 'once':
             if not attrs.get('due_date'):
@@ -114,5 +141,23 @@ class TaskCreateUpdateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """할 일 생성"""
         user = self.context['request'].user
-        task = Task.objects.create(user=user, **validated_data)
-        return task
+        return TaskService.create_task(user, **validated_data)
+
+
+class DashboardCountsSerializer(serializers.Serializer):
+    """대시보드 집계 Serializer"""
+    today_total = serializers.IntegerField()
+    today_completed = serializers.IntegerField()
+    weekly_total = serializers.IntegerField()
+    overdue = serializers.IntegerField()
+    active = serializers.IntegerField()
+    archived = serializers.IntegerField()
+
+
+class DashboardSerializer(serializers.Serializer):
+    """대시보드 요약 Serializer"""
+    date = serializers.DateField()
+    today = TaskListSerializer(many=True)
+    weekly = TaskListSerializer(many=True)
+    overdue = TaskListSerializer(many=True)
+    counts = DashboardCountsSerializer()
@@ -1,54 +1,44 @@
+import time
+from collections import defaultdict
 from datetime import date, timedelta
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from config.contention import immediate_atomic, retry_on_lock
+from config.sharding import all_databases, shard_for_user, use_shard
+from webhooks.services import WebhookService, task_payload
 from .models import Task
 
 
 class TaskService:
     """Task 관련 비즈니스 로직"""
 
+    # 다가오는 할 일 조회 최대 일수
+    UPCOMING_MAX_DAYS = 31
+
     @staticmethod
     def get_today_tasks(user):
         """오늘 표시할 할 일 목록"""
-        today = date.today()
-        weekday = today.strftime('%a')  # Mon, Tue, Wed, ...
-
-        active_tasks = Task.objects.filter(user=user, status='active')
-        today_tasks = []
-
-        for task in active_tasks:
-            if TaskService._should_show_today(task, today, weekday):
-                today_tasks.append(task)
+        from completions.models import Completion
 
-        return today_tasks
+        today = date.today()
+        completed_today_ids = set(
+            Completion.objects.filter(user=user, completed_date=today).values_list('task_id', flat=True)
+        )
+        return TaskService._today_tasks(user, today, completed_today_ids)
 
     @staticmethod
-    def _should_show_today(task, today, weekday):
-        """특정 할 일을 오늘 보여줄지 판단"""
-        if task.task_type == 'once':
-            # 한 번만: due_date가 오늘이면 표시
-            return task.due_date == today
-
-        elif task.task_type == 'daily':
-            # 매일: 항상 표시 (단, start_date/end_date 확인)
-            if task.start_date and today < task.start_date:
-                return False
-            if task.end_date and today > task.end_date:
-                return False
-            return True
-
-        elif task.task_type == 'weekly':
-            # 요일별: repeat_days에 오늘 요일이 포함되면 표시
-            if not task.repeat_days:
-                return False
-            days = [d.strip() for d in task.repeat_days.split(',')]
-            return weekday in days
-
-        elif task.task_type == 'period':
-            # 기간: start_date ~ end_date 사이면 표시
-            if not task.start_date or not task.end_date:
-                return False
-            return task.start_date <= today <= task.end_date
-
-        return False
+    def _today_tasks(user, today, completed_today_ids):
+        """next_occurrence 가 오늘인 할 일 + 오늘 완료해서 다음 일정일로 넘어간 할 일
+
+        (user, status, next_occurrence) 인덱스와 완료 기록 id 로 찾으므로 활성 할 일 전체를 읽지 않는다.
+        """
+        TaskService.roll_occurrences(user=user, today=today)
+        tasks = Task.objects.filter(user=user, status='active').filter(
+            Q(next_occurrence=today) | Q(id__in=completed_today_ids)
+        )
+        return [task for task in tasks if task.next_occurrence == today or task.rule().occurs_on(today)]
 
     @staticmethod
     def get_weekly_tasks(user):
@@ -58,50 +48,313 @@ class TaskService:
         end_of_week = start_of_week + timedelta(days=6)  # 이번 주 일요일
 
         active_tasks = Task.objects.filter(user=user, status='active')
-        weekly_tasks = []
-
-        for task in active_tasks:
-            if TaskService._should_show_this_week(task, start_of_week, end_of_week):
-                weekly_tasks.append(task)
-
-        return weekly_tasks
+        return [task for task in active_tasks if task.rule().occurs_between(start_of_week, end_of_week)]
 
     @staticmethod
-    def _should_show_this_week(task, start_of_week, end_of_week):
-        """특정 할 일을 이번 주에 보여줄지 판단"""
-        if task.task_type == 'once':
-            # 한 번만: due_date가 이번 주면 표시
-            if task.due_date:
-                return start_of_week <= task.due_date <= end_of_week
-            return False
-
-        elif task.task_type == 'daily':
-            # 매일: 이번 주와 겹치면 표시
-            if task.start_date and task.start_date > end_of_week:
-                return False
-            if task.end_date and task.end_date < start_of_week:
-                return False
-            return True
-
-        elif task.task_type == 'weekly':
-            # 요일별: 무조건 표시
-            return True
-
-        elif task.task_type == 'period':
-            # 기간: 이번 주와 겹치면 표시
-            if not task.start_date or not task.end_date:
-                return False
-            return not (task.end_date < start_of_week or task.start_date > end_of_week)
-
-        return False
+    def get_overdue_tasks(user):
+        """마감 지난 할 일 (마감일까지 완료하지 않은 once 할 일)"""
+        today = date.today()
+        return Task.objects.filter(
+            user=user,
+            status='active',
+            next_occurrence__lt=today,
+            task_type='once'
+        ).order_by('next_occurrence', 'id')
 
     @staticmethod
-    def get_overdue_tasks(user):
-        """마감 지난 할 일"""
+    def get_upcoming_tasks(user, days=7):
+        """내일부터 days 일 안에 일정이 있는 할 일 (다음 일정일순)"""
         today = date.today()
+        TaskService.roll_occurrences(user=user, today=today)
         return Task.objects.filter(
             user=user,
             status='active',
-            task_type='once',
-            due_date__lt=today
+            next_occurrence__gt=today,
+            next_occurrence__lte=today + timedelta(days=days)
+        ).order_by('next_occurrence', 'id')
+
+    @staticmethod
+    def get_dashboard(user):
+        """대시보드 요약 (오늘/이번 주/마감 지난 할 일 + 집계)
+
+        오늘 완료 기록 1회, 보관한 할 일까지 포함한 사용자 할 일 1회만 읽고 나머지는 Python 으로 나눠
+        할 일 개수와 관계없이 쿼리 2번으로 계산한다. 읽기 경로에서는 롤오버를 쓰지 않고(roll_occurrences 명령 담당),
+        아직 넘어가지 않은 반복 할 일은 규칙으로 오늘 일정인지 판단한다.
+        """
+        from completions.models import Completion
+
+        today = date.today()
+        start_of_week = today - timedelta(days=today.weekday())
+        end_of_week = start_of_week + timedelta(days=6)
+
+        completed_today_ids = set(
+            Completion.objects.filter(
+                user=user,
+                completed_date=today
+            ).values_list('task_id', flat=True)
+        )
+        tasks = list(Task.objects.filter(user=user))
+        active_tasks = [t for t in tasks if t.status == 'active']
+
+        def is_today(task):
+            if task.next_occurrence == today:
+                return True
+            # 오늘 완료해서 다음 일정일로 넘어갔거나, 롤오버 전이라 지난 일정일에 머무른 반복 할 일
+            stale = task.task_type != 'once' and task.next_occurrence is not None and task.next_occurrence < today
+            return (task.id in completed_today_ids or stale) and task.rule().occurs_on(today)
+
+        today_tasks = [t for t in active_tasks if is_today(t)]
+        weekly_tasks = [t for t in active_tasks if t.rule().occurs_between(start_of_week, end_of_week)]
+        overdue_tasks = sorted(
+            (t for t in active_tasks if t.task_type == 'once' and t.next_occurrence and t.next_occurrence < today),
+            key=lambda t: (t.next_occurrence, t.id)
         )
+
+        counts = {
+            'active': len(active_tasks),
+            'archived': sum(1 for t in tasks if t.status == 'archived'),
+            'overdue': len(overdue_tasks),
+            'today_total': len(today_tasks),
+            'today_completed': sum(1 for t in today_tasks if t.id in completed_today_ids),
+            'weekly_total': len(weekly_tasks),
+        }
+
+        return {
+            'date': today,
+            'today': today_tasks,
+            'weekly': weekly_tasks,
+            'overdue': overdue_tasks,
+            'counts': counts,
+            'completed_today_ids': completed_today_ids,
+        }
+
+    @staticmethod
+    def refresh_occurrences(task_ids, using, today=None):
+        """할 일의 next_occurrence 를 완료 기록으로 다시 계산 (완료/완료 취소 트랜잭션 안에서 호출). 바뀐 수 반환"""
+        from completions.models import Completion
+
+        if today is None:
+            today = date.today()
+        tasks = list(Task.objects.using(using).filter(id__in=task_ids))
+        if not tasks:
+            return 0
+
+        # once 는 마감일부터, 반복 할 일은 오늘부터의 완료 기록만 필요
+        floor = min([today] + [t.due_date for t in tasks if t.due_date])
+        completed = defaultdict(set)
+        for task_id, completed_date in Completion.objects.using(using).filter(
+            task_id__in=[t.id for t in tasks], completed_date__gte=floor
+        ).values_list('task_id', 'completed_date'):
+            completed[task_id].add(completed_date)
+
+        changed = []
+        for task in tasks:
+            next_occurrence = task.compute_next_occurrence(today, completed[task.id])
+            if next_occurrence != task.next_occurrence:
+                task.next_occurrence = next_occurrence
+                changed.append(task)
+        Task.objects.using(using).bulk_update(changed, ['next_occurrence'])
+        return len(changed)
+
+    @staticmethod
+    @retry_on_lock
+    def roll_occurrences(user=None, today=None, chunk_size=1000):
+        """next_occurrence 가 지난 반복 할 일을 오늘 이후 일정으로 넘김. 넘긴 할 일 수 반환
+
+        날짜가 바뀐 뒤 하루 1번 전체를 처리하고(roll_occurrences 명령), 조회할 때도 user 범위로 먼저 실행해
+        명령이 아직 돌지 않았어도 오늘 일정이 빠지지 않게 한다. 대상이 없으면 task_rollover_idx 조회 1번으로 끝난다.
+        전체 처리는 tasks.rollover 의 배열 계산을 쓰고, 사용자 범위는 건수가 적으므로 한 건씩 계산한다.
+        처리한 할 일은 next_occurrence 가 오늘 이후나 NULL 이 되어 대상에서 빠지므로 정렬 없이 앞에서부터 읽는다.
+        """
+        from . import rollover
+
+        if today is None:
+            today = date.today()
+        databases = [shard_for_user(user)] if user is not None else all_databases()
+
+        rolled = 0
+        for alias in databases:
+            candidates = Task.objects.using(alias).filter(
+                status='active', next_occurrence__lt=today
+            ).exclude(task_type='once').order_by()
+            if user is not None:
+                candidates = candidates.filter(user=user)
+            while True:
+                if user is None:
+                    # 읽은 값으로 바로 쓰므로 같은 트랜잭션에서 읽는다 (명령에서만 실행되는 경로)
+                    with immediate_atomic(using=alias):
+                        rows = list(candidates.values_list(*rollover.COLUMNS, named=True)[:chunk_size])
+                        rollover.roll_chunk(rows, alias, today)
+                else:
+                    rows = list(candidates.values_list('id', flat=True)[:chunk_size])
+                    if rows:
+                        with immediate_atomic(using=alias):
+                            TaskService.refresh_occurrences(rows, alias, today)
+                if not rows:
+                    break
+                rolled += len(rows)
+        return rolled
+
+    @staticmethod
+    def create_task(user, **data):
+        """할 일 생성 (task.created 이벤트를 같은 트랜잭션에 기록)"""
+        task = Task(user=user, **data)
+        db = router.db_for_write(Task, instance=task)
+        with transaction.atomic(using=db):
+            task.save()
+            WebhookService.record(task.user_id, 'task.created', task_payload(task), db)
+        return task
+
+    @staticmethod
+    @retry_on_lock
+    def set_archived(task, archived):
+        """할 일 보관/복구 (상태 필드만 저장하므로 동시에 눌러도 마지막 요청 상태로 남음)"""
+        task.status = 'archived' if archived else 'active'
+        task.archived_at = timezone.now() if archived else None
+        db = router.db_for_write(Task, instance=task)
+        with immediate_atomic(using=db):
+            # 쓰기 잠금을 잡은 뒤 읽으므로 연속 탭/동시 요청 중 실제로 보관한 요청만 이벤트를 남긴다
+            previous = Task.objects.using(db).filter(pk=task.pk).values_list('status', flat=True).first()
+            task.save(update_fields=['status', 'archived_at', 'updated_at'])
+            if archived and previous != 'archived':
+                WebhookService.record(task.user_id, 'task.archived', task_payload(task), db)
+        return task
+
+    @staticmethod
+    def archive_tasks(ids, using):
+        """ids 중 아직 보관하지 않은 할 일을 보관하고 task.archived 이벤트를 같은 트랜잭션에 기록. 보관한 수 반환
+
+        update() 는 post_save 를 보내지 않으므로 알림 일정도 같은 트랜잭션에서 다시 계산한다.
+        """
+        from reminders.services import ReminderService
+
+        with immediate_atomic(using=using):
+            tasks = list(Task.objects.using(using).filter(id__in=ids, status='active').only(
+                'id', 'user_id', 'title', 'task_type', 'due_date', 'start_date', 'end_date'
+            ))
+            if not tasks:
+                return 0
+            archived_at = timezone.now()
+            Task.objects.using(using).filter(id__in=[task.id for task in tasks]).update(
+                status='archived', archived_at=archived_at
+            )
+            for task in tasks:
+                task.status, task.archived_at = 'archived', archived_at
+            WebhookService.record_many([(task.user_id, 'task.archived', task_payload(task)) for task in tasks], using)
+            ReminderService.reschedule_tasks([task.id for task in tasks], using)
+        return len(tasks)
+
+    @staticmethod
+    def restore_tasks(ids, using):
+        """ids 중 보관한 할 일을 복구하고 알림 일정을 다시 계산. 복구한 수 반환"""
+        from reminders.services import ReminderService
+
+        with immediate_atomic(using=using):
+            restored = list(Task.objects.using(using).filter(id__in=ids, status='archived').values_list('id', flat=True))
+            if not restored:
+                return 0
+            Task.objects.using(using).filter(id__in=restored).update(status='active', archived_at=None)
+            ReminderService.reschedule_tasks(restored, using)
+        return len(restored)
+
+    # 자동 보관 대상 타입과 기준 날짜 필드 (task_once_expiry_idx / task_period_expiry_idx)
+    EXPIRY_FIELDS = (('once', 'due_date'), ('period', 'end_date'))
+
+    @staticmethod
+    def _grace_days(user=None):
+        """(기본 유예 일수, {user_id: 유예 일수}) - 자동 보관을 끈 사용자는 None
+
+        UserSetting 이 없거나 archive_grace_days 가 비어 있으면 AUTO_ARCHIVE_GRACE_DAYS 를 쓴다.
+        기본값과 다른 설정을 가진 사용자만 dict 에 담는다.
+        """
+        from users.models import UserSetting
+
+        default_days = settings.AUTO_ARCHIVE_GRACE_DAYS
+        custom = UserSetting.objects.filter(Q(auto_archive=False) | Q(archive_grace_days__isnull=False))
+        if user is not None:
+            custom = custom.filter(user=user)
+        overrides = {
+            user_id: (days if days is not None else default_days) if auto_archive else None
+            for user_id, auto_archive, days in custom.values_list('user_id', 'auto_archive', 'archive_grace_days')
+        }
+        return default_days, overrides
+
+    @staticmethod
+    def _expired_chunk(queryset, task_type, field, cutoff, after=None):
+        """보관 후보 (id, user_id, 마감/종료일) 를 (마감/종료일, id) 순으로 읽는 queryset
+
+        타입별로 따로 조회해야 부분 인덱스(task_once_expiry_idx, task_period_expiry_idx)를 탄다 (OR 조건이면 전체 스캔).
+        인덱스 순서가 (날짜, id) 이므로 after=(마지막 날짜, 마지막 id) 다음부터 정렬 없이 인덱스 범위로 읽는다.
+        """
+        candidates = queryset.filter(status='active', task_type=task_type, **{f'{field}__lt': cutoff})
+        if after is not None:
+            last_date, last_id = after
+            candidates = candidates.filter(**{f'{field}__gte': last_date}).exclude(
+                **{field: last_date, 'id__lte': last_id}
+            )
+        return candidates.order_by(field, 'id').values_list('id', 'user_id', field)
+
+    @staticmethod
+    def archive_expired(user=None, today=None, chunk_size=1000, progress=None, tasks=None):
+        """마감/종료일이 유예 기간보다 더 지난 once, period 할 일을 보관 처리
+
+        - 타입마다 부분 인덱스를 (마감/종료일, id) 순으로 한 번 훑는다. 가장 짧은 유예 일수의 기준일까지 읽고
+          사용자별 유예 일수(자동 보관을 끈 사용자 제외)는 읽은 행에서 확인한다
+          (사용자 조건을 SQL 에 넣으면 사용자 인덱스 + 정렬로 바뀐다)
+        - chunk_size 개씩 읽고 청크마다 별도 트랜잭션에서 update() 해 쓰기 잠금을 짧게 유지한다
+          (보관 이벤트도 청크의 트랜잭션에서 기록한다)
+        - 마지막으로 읽은 (날짜, id) 다음부터 읽으므로 (다른 요청이 먼저 보관해) 청크에서 보관한 수가 0 이어도
+          멈추지 않고 같은 행을 두 번 읽지 않는다
+        - progress(stats) 를 주면 보관할 할 일이 있는 청크마다 호출한다
+        - 샤딩을 쓰면 user 의 샤드(user 가 없으면 모든 DB)에서 차례로 처리한다
+
+        반환값: {'archived', 'chunks', 'seconds'}
+        """
+        if today is None:
+            today = date.today()
+
+        stats = {'archived': 0, 'chunks': 0, 'seconds': 0.0}
+        started = time.monotonic()
+
+        default_days, overrides = TaskService._grace_days(user)
+        if user is not None and overrides.get(user.pk, default_days) is None:
+            return stats
+        shortest = min(days for days in [default_days, *overrides.values()] if days is not None)
+        cutoff = today - timedelta(days=shortest)
+
+        if tasks is not None:
+            databases = [tasks.db]
+        elif user is not None:
+            databases = [shard_for_user(user)]
+        else:
+            databases = all_databases()
+
+        def is_expired(user_id, expiry):
+            days = overrides.get(user_id, default_days)
+            return days is not None and expiry < today - timedelta(days=days)
+
+        for alias in databases:
+            with use_shard(alias):
+                queryset = Task.objects.all() if tasks is None else tasks
+                if user is not None:
+                    queryset = queryset.filter(user=user)
+                for task_type, field in TaskService.EXPIRY_FIELDS:
+                    last = None
+                    while True:
+                        rows = list(TaskService._expired_chunk(queryset, task_type, field, cutoff, last)[:chunk_size])
+                        if not rows:
+                            break
+                        last_id, _, last_date = rows[-1]
+                        last = (last_date, last_id)
+                        ids = [task_id for task_id, user_id, expiry in rows if is_expired(user_id, expiry)]
+                        if not ids:
+                            continue
+                        archived = TaskService.archive_tasks(ids, alias)
+                        stats['archived'] += archived
+                        stats['chunks'] += 1
+                        stats['seconds'] = time.monotonic() - started
+                        if progress is not None:
+                            progress(stats)
+
+        stats['seconds'] = time.monotonic() - started
+        return stats
@@ -1,3 +1,431 @@
-from django.test import TestCase
+import io
+from datetime import date, timedelta
+from itertools import product
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings, skipUnlessDBFeature
+from rest_framework.test import APIClient
+
+from completions.models import Completion
+from completions.services import CompletionService
+from users.models import UserSetting
+from . import rollover
+from .filters import TaskFilter
+from .models import Task
+from .recurrence import compile_rule
+from .services import TaskService
+
+
+@override_settings(DATABASE_SHARDS=[])
+class TaskFilterTests(TestCase):
+    """할 일 목록 필터/정렬"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pass1234!')
+        other = User.objects.create_user('other', password='pass1234!')
+        today = date.today()
+
+        cls.high = Task.objects.create(user=cls.user, title='높음', task_type='once', priority='high',
+                                       due_date=today + timedelta(days=3))
+        cls.low = Task.objects.create(user=cls.user, title='낮음', task_type='once', priority='low',
+                                      due_date=today + timedelta(days=1))
+        cls.weekly = Task.objects.create(user=cls.user, title='요일', task_type='weekly', repeat_days='Mon,Wed')
+        cls.archived = Task.objects.create(user=cls.user, title='보관', task_type='daily', status='archived')
+        Task.objects.create(user=other, title='남의 할 일', task_type='daily')
+
+        Completion.objects.create(task=cls.weekly, completed_date=today)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_ids(self, **params):
+        response = self.client.get('/api/tasks/', params)
+        self.assertEqual(response.status_code, 200)
+        return [task['id'] for task in response.data]
+
+    def test_default_lists_active_tasks_newest_first(self):
+        self.assertEqual(self.get_ids(), [self.weekly.id, self.low.id, self.high.id])
+
+    def test_filters(self):
+        self.assertEqual(self.get_ids(status='archived'), [self.archived.id])
+        self.assertEqual(self.get_ids(task_type='weekly'), [self.weekly.id])
+        self.assertEqual(set(self.get_ids(priority=['high', 'low'])), {self.high.id, self.low.id})
+        self.assertEqual(self.get_ids(due_date_before=date.today() + timedelta(days=2)), [self.low.id])
+        self.assertEqual(self.get_ids(has_completed_today='true'), [self.weekly.id])
+        self.assertEqual(self.get_ids(repeat_weekday='Wed'), [self.weekly.id])
+        self.assertEqual(self.get_ids(repeat_weekday='Fri'), [])
+
+    def test_orderings(self):
+        self.assertEqual(self.get_ids(ordering='priority'), [self.high.id, self.weekly.id, self.low.id])
+        self.assertEqual(self.get_ids(ordering='due_date')[-2:], [self.low.id, self.high.id])
+
+    def test_unknown_ordering_is_rejected(self):
+        response = self.client.get('/api/tasks/', {'ordering': 'title'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail_actions_ignore_list_filters(self):
+        response = self.client.post(f'/api/tasks/{self.archived.id}/restore/')
+        self.assertEqual(response.status_code, 200)
+
+    @skipUnlessDBFeature('supports_explaining_query_execution')
+    def test_every_ordering_is_index_backed(self):
+        """허용된 모든 정렬이 인덱스로 처리되어 별도 정렬 단계가 없는지 EXPLAIN 으로 확인"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN 출력 형식이 SQLite 기준입니다.')
+
+        cases = [(ordering, extra) for ordering in TaskFilter.ORDERINGS for extra in ({}, {'task_type': 'once'})]
+        # 마감일 범위 조건은 마감일 정렬과 함께 쓸 때 인덱스 범위 스캔으로 처리된다
+        cases += [(ordering, {'due_date_after': date.today()}) for ordering in ('due_date', '-due_date')]
+
+        for ordering, extra in cases:
+            with self.subTest(ordering=ordering, **extra):
+                queryset = TaskFilter(
+                    {'ordering': ordering, **extra},
+                    queryset=Task.objects.filter(user=self.user),
+                ).qs
+                plan = queryset.explain()
+                self.assertIn('task_user_status_', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class RecurrenceTests(TestCase):
+    """반복 규칙과 next_occurrence 인덱스 조회"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester', password='pass1234!')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.today = date.today()
+
+    def test_rules(self):
+        second_tuesday = compile_rule('FREQ=MONTHLY;BYDAY=2TU;EXDATE=2026-11-10', date(2026, 1, 1))
+        self.assertEqual(second_tuesday.next_on_or_after(date(2026, 10, 14)), date(2026, 12, 8))
+        self.assertTrue(second_tuesday.occurs_on(date(2026, 10, 13)))
+
+        month_end = compile_rule('FREQ=MONTHLY;INTERVAL=2;BYMONTHDAY=-1', date(2026, 1, 15), date(2026, 6, 30))
+        self.assertEqual(month_end.next_on_or_after(date(2026, 2, 1)), date(2026, 3, 31))
+        self.assertIsNone(month_end.next_on_or_after(date(2026, 6, 1)))
+
+        every_third_day = compile_rule('FREQ=DAILY;INTERVAL=3', date(2026, 10, 1))
+        self.assertEqual(every_third_day.next_on_or_after(date(2026, 10, 5)), date(2026, 10, 7))
+        self.assertFalse(every_third_day.occurs_on(date(2026, 10, 5)))
+
+        with self.assertRaises(ValueError):
+            compile_rule('FREQ=YEARLY')
+
+    def test_custom_task_requires_valid_rule_and_start_date(self):
+        response = self.client.post('/api/tasks/', {'title': '규칙', 'task_type': 'custom', 'recurrence': 'FREQ=WEEKLY'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('recurrence', response.data)
+
+        response = self.client.post('/api/tasks/', {
+            'title': '격일', 'task_type': 'custom', 'recurrence': 'freq=daily;interval=2',
+            'start_date': self.today - timedelta(days=1),
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['recurrence'], 'FREQ=DAILY;INTERVAL=2')
+        self.assertEqual(response.data['next_occurrence'], (self.today + timedelta(days=1)).isoformat())
+
+    def test_completion_advances_next_occurrence(self):
+        once = Task.objects.create(user=self.user, title='제출', task_type='once', due_date=self.today - timedelta(days=2))
+        daily = Task.objects.create(user=self.user, title='운동', task_type='daily')
+        self.assertEqual(list(TaskService.get_overdue_tasks(self.user)), [once])
+
+        completion, _ = CompletionService.mark_complete(once, once.due_date)
+        CompletionService.mark_complete(daily)
+        once.refresh_from_db()
+        daily.refresh_from_db()
+        self.assertIsNone(once.next_occurrence)
+        self.assertEqual(daily.next_occurrence, self.today + timedelta(days=1))
+        self.assertEqual(list(TaskService.get_overdue_tasks(self.user)), [])
+        # 오늘 완료한 할 일도 오늘 목록에 남는다
+        self.assertEqual(TaskService.get_today_tasks(self.user), [daily])
+
+        CompletionService.delete_completion(completion)
+        once.refresh_from_db()
+        self.assertEqual(once.next_occurrence, once.due_date)
+
+    def test_missed_occurrences_roll_forward(self):
+        weekly = Task.objects.create(user=self.user, title='요일', task_type='weekly',
+                                     repeat_days=self.today.strftime('%a'))
+        upcoming = Task.objects.create(user=self.user, title='마감', task_type='once',
+                                       due_date=self.today + timedelta(days=3))
+        # 롤오버가 돌지 않은 상태 (지난주 일정에 머무름)
+        Task.objects.filter(pk=weekly.pk).update(next_occurrence=self.today - timedelta(days=7))
+
+        self.assertEqual(self.client.get('/api/tasks/today/').data[0]['id'], weekly.id)
+        self.assertEqual([t['id'] for t in self.client.get('/api/tasks/upcoming/', {'days': 3}).data], [upcoming.id])
+        self.assertEqual(self.client.get('/api/tasks/upcoming/', {'days': 2}).data, [])
+
+        Task.objects.filter(pk=weekly.pk).update(next_occurrence=self.today - timedelta(days=7))
+        self.assertEqual(TaskService.roll_occurrences(today=self.today), 1)
+        weekly.refresh_from_db()
+        self.assertEqual(weekly.next_occurrence, self.today)
+
+    def test_vectorized_rollover_matches_scalar(self):
+        yesterday, week = self.today - timedelta(days=1), timedelta(days=7)
+        specs = [
+            {'task_type': 'daily'},
+            {'task_type': 'daily', 'start_date': self.today + week},
+            {'task_type': 'daily', 'start_date': yesterday - week, 'end_date': yesterday},
+            {'task_type': 'period', 'start_date': yesterday - week, 'end_date': self.today + week},
+            {'task_type': 'period', 'start_date': yesterday - week, 'end_date': yesterday},
+            {'task_type': 'custom', 'recurrence': 'FREQ=DAILY;INTERVAL=3', 'start_date': yesterday - week},
+        ] + [{'task_type': 'weekly', 'repeat_days': days} for days in ('Mon', 'Tue,Thu', 'Sat,Sun', 'Fri,Mon,Wed')]
+        tasks = [Task.objects.create(user=self.user, title=f'할 일 {i}', **spec) for i, spec in enumerate(specs)]
+        # 오늘 이미 완료한 daily 는 한 건씩 계산해서 내일로 넘어가야 한다
+        Completion.objects.create(task=tasks[0], completed_date=self.today)
+        Task.objects.filter(user=self.user).update(next_occurrence=yesterday)
+
+        rows = list(Task.objects.order_by('id').values_list(*rollover.COLUMNS, named=True))
+        self.assertEqual(rollover.verify_chunk(rows, self.today), [])
+        self.assertEqual(TaskService.roll_occurrences(today=self.today, chunk_size=4), len(tasks))
+
+        for spec, task in zip(specs, tasks):
+            completed = set(task.completions.values_list('completed_date', flat=True))
+            with self.subTest(spec=spec):
+                expected = task.compute_next_occurrence(self.today, completed)
+                task.refresh_from_db()
+                self.assertEqual(task.next_occurrence, expected)
+        self.assertEqual(tasks[0].next_occurrence, self.today + timedelta(days=1))
+
+    @skipUnlessDBFeature('supports_explaining_query_execution')
+    def test_date_views_are_index_range_scans(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN 출력 형식이 SQLite 기준입니다.')
+
+        for queryset in (TaskService.get_overdue_tasks(self.user), TaskService.get_upcoming_tasks(self.user)):
+            plan = queryset.explain()
+            self.assertIn('task_user_status_next_idx', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class TaskDashboardTests(TestCase):
+    """대시보드 요약 (할 일 수와 관계없이 쿼리 수가 일정해야 함)"""
+
+    # 오늘 완료 기록, 사용자 할 일 전체 (보관 포함)
+    DASHBOARD_QUERIES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        cls.single = User.objects.create_user('single')
+        Task.objects.create(user=cls.single, title='하나', task_type='daily')
+
+        cls.many = User.objects.create_user('many')
+        daily = [Task.objects.create(user=cls.many, title=f'매일 {i}', task_type='daily') for i in range(10)]
+        Task.objects.create(user=cls.many, title='요일', task_type='weekly', repeat_days='Mon,Tue,Wed,Thu,Fri,Sat,Sun')
+        for i in range(5):
+            Task.objects.create(user=cls.many, title=f'마감 지남 {i}', task_type='once',
+                                due_date=today - timedelta(days=i + 1))
+        Task.objects.create(user=cls.many, title='보관', task_type='daily', status='archived')
+        for task in daily[:4]:
+            CompletionService.mark_complete(task, today)
+
+    def dashboard(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.assertNumQueries(self.DASHBOARD_QUERIES):
+            response = client.get('/api/tasks/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_query_count_does_not_grow_with_tasks(self):
+        self.assertEqual(self.dashboard(self.single)['counts']['today_total'], 1)
+
+        counts = self.dashboard(self.many)['counts']
+        self.assertEqual(counts['today_total'], 11)
+        self.assertEqual(counts['today_completed'], 4)
+        self.assertEqual(counts['overdue'], 5)
+        self.assertEqual(counts['archived'], 1)
+        self.assertEqual(counts['weekly_total'], 11)
+
+    def test_stale_occurrence_is_shown_without_rolling(self):
+        today = date.today()
+        task = Task.objects.get(user=self.single)
+        # 롤오버 명령이 아직 돌지 않은 상태
+        Task.objects.filter(pk=task.pk).update(next_occurrence=today - timedelta(days=2))
+
+        data = self.dashboard(self.single)
+
+        self.assertEqual([t['id'] for t in data['today']], [task.id])
+        self.assertEqual(data['counts']['overdue'], 0)
+        task.refresh_from_db()
+        self.assertEqual(task.next_occurrence, today - timedelta(days=2))
+
+
+@override_settings(DATABASE_SHARDS=[])
+class TaskAdminTests(TestCase):
+    """대용량 테이블용 할 일 admin"""
+
+    # 세션, 사용자, 행 수 추정(2), 제한 COUNT, 목록, date_hierarchy(2)
+    CHANGELIST_QUERIES = 8
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass1234!')
+        users = [User.objects.create_user(f'user{i}') for i in range(5)]
+        cls.tasks = Task.objects.bulk_create([
+            Task(user=users[i % len(users)], title=f'할 일 {i}', task_type='once',
+                 due_date=date.today() - timedelta(days=i))
+            for i in range(120)
+        ])
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def test_changelist_page_has_constant_query_count(self):
+        with self.assertNumQueries(self.CHANGELIST_QUERIES):
+            response = self.client.get('/admin/tasks/task/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 100)
+
+    def test_bulk_archive_and_restore(self):
+        ids = [task.id for task in self.tasks[:50]]
+        self.client.post('/admin/tasks/task/', {'action': 'archive_tasks', '_selected_action': ids})
+        self.assertEqual(Task.objects.filter(status='archived', archived_at__isnull=False).count(), 50)
+
+        self.client.post('/admin/tasks/task/', {'action': 'restore_tasks', '_selected_action': ids})
+        self.assertFalse(Task.objects.filter(status='archived').exists())
+
+    def test_recompute_occurrences_fixes_stale_rows(self):
+        ids = [task.id for task in self.tasks[:3]]
+        Task.objects.filter(id__in=ids).update(next_occurrence=None)
+
+        with mock.patch('tasks.admin.TaskAdmin.RECOMPUTE_CHUNK_SIZE', 2):
+            self.client.post('/admin/tasks/task/', {'action': 'recompute_occurrences', '_selected_action': ids})
+
+        for task in Task.objects.filter(id__in=ids):
+            self.assertEqual(task.next_occurrence, task.due_date)
+
+    @skipUnlessDBFeature('supports_explaining_query_execution')
+    def test_date_hierarchy_reads_created_at_index(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN 출력 형식이 SQLite 기준입니다.')
+
+        plan = Task.objects.filter(created_at__year=date.today().year).dates('created_at', 'month').explain()
+        self.assertIn('task_created_idx', plan)
+
+    def test_bulk_archive_expired_applies_grace_period(self):
+        ids = [task.id for task in self.tasks]
+        with self.settings(AUTO_ARCHIVE_GRACE_DAYS=7):
+            self.client.post('/admin/tasks/task/', {'action': 'archive_expired_tasks', '_selected_action': ids})
+        # 마감일이 8일 이상 지난 할 일만 보관
+        self.assertEqual(Task.objects.filter(status='archived').count(), 120 - 8)
+
+
+@override_settings(DATABASE_SHARDS=[], AUTO_ARCHIVE_GRACE_DAYS=7)
+class ArchiveExpiredTests(TestCase):
+    """기간이 끝난 once/period 할 일 자동 보관"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date(2026, 10, 19)
+        cls.default = User.objects.create_user('default')
+        cls.strict = User.objects.create_user('strict')
+        cls.lenient = User.objects.create_user('lenient')
+        cls.opted_out = User.objects.create_user('opted_out')
+        UserSetting.objects.create(user=cls.strict, archive_grace_days=0)
+        UserSetting.objects.create(user=cls.lenient, archive_grace_days=30)
+        UserSetting.objects.create(user=cls.opted_out, auto_archive=False)
+
+        for user in (cls.default, cls.strict, cls.lenient, cls.opted_out):
+            Task.objects.create(user=user, title='3일 지남', task_type='once', due_date=cls.today - timedelta(days=3))
+            Task.objects.create(user=user, title='10일 지남', task_type='period',
+                                start_date=cls.today - timedelta(days=20), end_date=cls.today - timedelta(days=10))
+            Task.objects.create(user=user, title='매일', task_type='daily')
+
+    def archived_titles(self, user):
+        return set(Task.objects.filter(user=user, status='archived').values_list('title', flat=True))
+
+    def test_applies_each_users_grace_days(self):
+        stats = TaskService.archive_expired(today=self.today)
+
+        self.assertEqual(stats['archived'], 3)
+        self.assertEqual(self.archived_titles(self.default), {'10일 지남'})
+        self.assertEqual(self.archived_titles(self.strict), {'3일 지남', '10일 지남'})
+        self.assertEqual(self.archived_titles(self.lenient), set())
+        self.assertEqual(self.archived_titles(self.opted_out), set())
+
+    def test_single_user_and_opt_out(self):
+        self.assertEqual(TaskService.archive_expired(user=self.strict, today=self.today)['archived'], 2)
+        self.assertEqual(TaskService.archive_expired(user=self.opted_out, today=self.today)['archived'], 0)
+        self.assertEqual(self.archived_titles(self.default), set())
+
+    def test_chunks_are_read_in_expiry_order(self):
+        Task.objects.bulk_create([
+            Task(user=self.strict, title=f'지난 {i}', task_type='once', due_date=self.today - timedelta(days=i + 1))
+            for i in range(5)
+        ])
+        chunks = []
+        archive_tasks = TaskService.archive_tasks
+
+        def record(ids, using):
+            chunks.append(ids)
+            return archive_tasks(ids, using)
+
+        progress = []
+        with mock.patch.object(TaskService, 'archive_tasks', side_effect=record):
+            stats = TaskService.archive_expired(user=self.strict, today=self.today, chunk_size=2,
+                                                progress=lambda s: progress.append(s['archived']))
+
+        ids = [task_id for chunk in chunks for task_id in chunk]
+        self.assertEqual(stats['archived'], 7)
+        self.assertEqual(progress, [2, 4, 6, 7])
+        # once 6건을 (마감일, id) 순으로 읽은 뒤 period 1건
+        once = Task.objects.filter(user=self.strict, task_type='once').order_by('due_date', 'id')
+        self.assertEqual(ids[:6], list(once.values_list('id', flat=True)))
+        self.assertEqual(len(set(ids)), 7)
+
+    @skipUnlessDBFeature('supports_explaining_query_execution')
+    def test_chunks_are_partial_index_range_scans(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('EXPLAIN 출력 형식이 SQLite 기준입니다.')
+
+        indexes = {'due_date': 'task_once_expiry_idx', 'end_date': 'task_period_expiry_idx'}
+        for (task_type, field), after in product(TaskService.EXPIRY_FIELDS, (None, (self.today, 1))):
+            with self.subTest(task_type=task_type, after=after):
+                plan = TaskService._expired_chunk(Task.objects.all(), task_type, field, self.today, after)[:100].explain()
+                self.assertIn(indexes[field], plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_chunk_already_archived_elsewhere_does_not_stop_the_run(self):
+        first = Task.objects.get(user=self.strict, task_type='once')
+        extra = Task.objects.create(user=self.strict, title='나중', task_type='once', due_date=self.today - timedelta(days=1))
+        archive_tasks = TaskService.archive_tasks
+
+        def archive_after_race(ids, using):
+            # 첫 청크는 다른 요청이 먼저 보관해 이번 실행에서 보관한 수가 0 인 상황
+            if first.id in ids:
+                return 0
+            return archive_tasks(ids, using)
+
+        with mock.patch.object(TaskService, 'archive_tasks', side_effect=archive_after_race):
+            TaskService.archive_expired(user=self.strict, today=self.today, chunk_size=1)
+
+        self.assertEqual(Task.objects.get(id=extra.id).status, 'archived')
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('archive_expired_tasks', '--date=2026-10-19', '--chunk-size=1', verbosity=2, stdout=out)
+
+        self.assertIn('3건 보관 (3개 청크', out.getvalue())
+        self.assertIn('3번째 청크: 누적 3건', out.getvalue())
+
+        out = io.StringIO()
+        call_command('archive_expired_tasks', '--user=lenient', '--date=2026-11-30', stdout=out)
+        self.assertEqual(self.archived_titles(self.lenient), {'3일 지남', '10일 지남'})
+        self.assertIn('2건 보관', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('archive_expired_tasks', user='nobody')
@@ -2,24 +2,42 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.utils import timezone
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.utils import OpenApiParameter
+from config.schema import extend_schema
+from config.idempotency import idempotency_key_parameter, idempotent
+from config.renderers import compact_renderer_classes
+from config.sharding import ShardedViewMixin
+from completions.writebehind import PendingCompletionsMixin
 from .models import Task
 from .serializers import (
     TaskListSerializer,
     TaskDetailSerializer,
-    TaskCreateUpdateSerializer
+    TaskCreateUpdateSerializer,
+    DashboardSerializer
 )
+from .filters import TaskFilter
 from .services import TaskService
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ShardedViewMixin, PendingCompletionsMixin, viewsets.ModelViewSet):
     """할 일 ViewSet"""
     permission_classes = [IsAuthenticated]
+    renderer_classes = compact_renderer_classes()
+    throttle_costs = {'dashboard': 2}
+    filterset_class = TaskFilter
 
     def get_queryset(self):
         """사용자의 할 일만 조회"""
-        return Task.objects.filter(user=self.request.user)
+        if getattr(self, 'swagger_fake_view', False):
+            # 스키마 생성 시 (필터 파라미터 문서화를 위해 모델 정보만 필요)
+            return Task.objects.none()
+        return Task.objects.using(self.shard).filter(user=self.request.user)
+
+    def filter_queryset(self, queryset):
+        """목록 조회에만 TaskFilter 적용 (상세/보관/복구는 상태와 관계없이 조회)"""
+        if self.action != 'list':
+            return queryset
+        return super().filter_queryset(queryset)
 
     def get_serializer_class(self):
         """액션에 따라 다른 Serializer 사용"""
@@ -32,19 +50,25 @@ class TaskViewSet(viewsets.ModelViewSet):
     @extend_schema(
         tags=['Tasks'],
         summary='할 일 목록 조회',
-        description='사용자의 모든 활성 할 일 목록을 조회합니다.'
+        description=(
+            '사용자의 할 일 목록을 조회합니다. 기본값은 활성 할 일, 최신순입니다. '
+            'task_type/priority/status, 날짜 범위(due_date_after, due_date_before 등), '
+            'has_completed_today, repeat_weekday 로 필터링하고 ordering 으로 정렬할 수 있습니다.'
+        )
     )
     def list(self, request, *args, **kwargs):
         """할 일 목록"""
-        queryset = self.get_queryset().filter(status='active')
+        queryset = self.filter_queryset(self.get_queryset())
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
     @extend_schema(
         tags=['Tasks'],
         summary='할 일 생성',
-        description='새로운 할 일을 생성합니다.'
+        description='새로운 할 일을 생성합니다.',
+        parameters=[idempotency_key_parameter]
     )
+    @idempotent
     def create(self, request, *args, **kwargs):
         """할 일 생성"""
         serializer = self.get_serializer(data=request.data)
@@ -109,7 +133,7 @@ class TaskViewSet(viewsets.ModelViewSet):
     @extend_schema(
         tags=['Tasks'],
         summary='마감 지난 할 일',
-        description='마감일이 지난 할 일 목록을 조회합니다.'
+        description='마감일까지 완료하지 않은 once 할 일 목록을 마감일순으로 조회합니다.'
     )
     @action(detail=False, methods=['get'])
     def overdue(self, request):
@@ -118,6 +142,41 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = TaskListSerializer(tasks, many=True, context={'request': request})
         return Response(serializer.data)
 
+    @extend_schema(
+        tags=['Tasks'],
+        summary='다가오는 할 일',
+        description='내일부터 days 일 안에 완료하지 않은 일정이 있는 할 일을 다음 일정일(next_occurrence)순으로 조회합니다.',
+        parameters=[
+            OpenApiParameter(name='days', type=int, description='며칠 뒤까지 (기본 7, 최대 31)', required=False)
+        ]
+    )
+    @action(detail=False, methods=['get'])
+    def upcoming(self, request):
+        """다가오는 할 일"""
+        try:
+            days = min(max(int(request.query_params.get('days', 7)), 1), TaskService.UPCOMING_MAX_DAYS)
+        except ValueError:
+            return Response({'detail': 'days는 숫자여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        tasks = TaskService.get_upcoming_tasks(request.user, days)
+        serializer = TaskListSerializer(tasks, many=True, context={'request': request})
+        return Response(serializer.data)
+
+    @extend_schema(
+        tags=['Tasks'],
+        summary='대시보드 요약',
+        description='오늘/이번 주/마감 지난 할 일과 완료·보관 개수를 한 번에 조회합니다.',
+        responses={200: DashboardSerializer}
+    )
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """대시보드 요약"""
+        dashboard = TaskService.get_dashboard(request.user)
+        serializer = DashboardSerializer(dashboard, context={
+            'request': request,
+            'completed_today_ids': dashboard['completed_today_ids'],
+        })
+        return Response(serializer.data)
+
     @extend_schema(
         tags=['Tasks'],
         summary='보관된 할 일',
@@ -133,15 +192,15 @@ class TaskViewSet(viewsets.ModelViewSet):
     @extend_schema(
         tags=['Tasks'],
         summary='할 일 보관',
-        description='할 일을 보관합니다.'
+        description='할 일을 보관합니다.',
+        parameters=[idempotency_key_parameter]
     )
     @action(detail=True, methods=['post'])
+    @idempotent
     def archive(self, request, pk=None):
         """할 일 보관"""
         task = self.get_object()
-        task.status = 'archived'
-        task.archived_at = timezone.now()
-        task.save()
+        TaskService.set_archived(task, archived=True)
         return Response({
             'message': '할 일이 보관되었습니다.',
             'task': TaskDetailSerializer(task).data
@@ -150,15 +209,15 @@ class TaskViewSet(viewsets.ModelViewSet):
     @extend_schema(
         tags=['Tasks'],
         summary='할 일 복구',
-        description='보관된 할 일을 복구합니다.'
+        description='보관된 할 일을 복구합니다.',
+        parameters=[idempotency_key_parameter]
     )
     @action(detail=True, methods=['post'])
+    @idempotent
     def restore(self, request, pk=None):
         """할 일 복구"""
         task = self.get_object()
-        task.status = 'active'
-        task.archived_at = None
-        task.save()
+        TaskService.set_archived(task, archived=False)
         return Response({
             'message': '할 일이 복구되었습니다.',
             'task': TaskDetailSerializer(task).data
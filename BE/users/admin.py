@@ -1,3 +1,10 @@
 from django.contrib import admin
+from .models import UserSetting
 
-# Register your models here.
+
+@admin.register(UserSetting)
+class UserSettingAdmin(admin.ModelAdmin):
+    list_display = ['user', 'auto_archive', 'archive_grace_days']
+    list_filter = ['auto_archive']
+    search_fields = ['user__username']
+    raw_id_fields = ['user']
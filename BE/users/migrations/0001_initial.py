@@ -0,0 +1,30 @@
+# Generated by Django 5.0.1 on 2026-10-19 11:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSetting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('auto_archive', models.BooleanField(default=True, help_text='마감/종료일이 지난 once, period 할 일을 자동으로 보관', verbose_name='자동 보관')),
+                ('archive_grace_days', models.PositiveSmallIntegerField(blank=True, help_text='비워두면 AUTO_ARCHIVE_GRACE_DAYS 설정값 사용', null=True, verbose_name='보관 유예 일수')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='setting', to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+            ],
+            options={
+                'verbose_name': '사용자 설정',
+                'verbose_name_plural': '사용자 설정 목록',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersetting',
+            name='leaderboard_opt_in',
+            field=models.BooleanField(default=False, help_text='연속 달성 순위표에 내 기록을 공개', verbose_name='순위표 참여'),
+        ),
+    ]
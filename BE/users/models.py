@@ -1,3 +1,25 @@
 from django.db import models
+from django.contrib.auth.models import User
 
-# Create your models here.
+
+class UserSetting(models.Model):
+    """사용자별 설정"""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='setting', verbose_name='사용자')
+
+    # 자동 보관
+    auto_archive = models.BooleanField(default=True, verbose_name='자동 보관',
+                                       help_text='마감/종료일이 지난 once, period 할 일을 자동으로 보관')
+    archive_grace_days = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name='보관 유예 일수',
+                                                          help_text='비워두면 AUTO_ARCHIVE_GRACE_DAYS 설정값 사용')
+
+    # 연속 달성 순위표
+    leaderboard_opt_in = models.BooleanField(default=False, verbose_name='순위표 참여',
+                                             help_text='연속 달성 순위표에 내 기록을 공개')
+
+    class Meta:
+        verbose_name = '사용자 설정'
+        verbose_name_plural = '사용자 설정 목록'
+
+    def __str__(self):
+        return f"{self.user.username} 설정"
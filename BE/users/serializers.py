@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.tokens import RefreshToken
+from .models import UserSetting
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -45,6 +46,13 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'date_joined')
 
 
+class UserSettingSerializer(serializers.ModelSerializer):
+    """사용자 설정 Serializer"""
+    class Meta:
+        model = UserSetting
+        fields = ('auto_archive', 'archive_grace_days', 'leaderboard_opt_in')
+
+
 class TokenSerializer(serializers.Serializer):
     """토큰 응답 Serializer"""
     access = serializers.CharField()
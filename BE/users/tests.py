@@ -1,3 +1,48 @@
-from django.test import TestCase
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tasks.models import Task
+from .models import UserSetting
+
+
+@override_settings(DATABASE_SHARDS=[], AUTO_ARCHIVE_GRACE_DAYS=7)
+class LoginAutoArchiveTests(TestCase):
+    """로그인할 때 해당 사용자의 기간이 끝난 할 일 자동 보관"""
+
+    @classmethod
+    def setUpTestData(cls):
+        expired = date.today() - timedelta(days=10)
+        cls.user = User.objects.create_user('tester', password='pass1234!')
+        cls.other = User.objects.create_user('other', password='pass1234!')
+        cls.task = Task.objects.create(user=cls.user, title='지난 할 일', task_type='once', due_date=expired)
+        cls.other_task = Task.objects.create(user=cls.other, title='남의 할 일', task_type='once', due_date=expired)
+
+    def login(self):
+        response = APIClient().post('/api/users/login/', {'username': 'tester', 'password': 'pass1234!'})
+        self.assertEqual(response.status_code, 200)
+        self.task.refresh_from_db()
+        self.other_task.refresh_from_db()
+
+    @override_settings(AUTO_ARCHIVE_ON_LOGIN=True)
+    def test_archives_only_the_users_tasks(self):
+        self.login()
+
+        self.assertEqual(self.task.status, 'archived')
+        self.assertEqual(self.other_task.status, 'active')
+
+    @override_settings(AUTO_ARCHIVE_ON_LOGIN=True)
+    def test_respects_opt_out(self):
+        UserSetting.objects.create(user=self.user, auto_archive=False)
+
+        self.login()
+
+        self.assertEqual(self.task.status, 'active')
+
+    @override_settings(AUTO_ARCHIVE_ON_LOGIN=False)
+    def test_disabled_by_default(self):
+        self.login()
+
+        self.assertEqual(self.task.status, 'active')
@@ -7,4 +7,5 @@ urlpatterns = [
     path('login/', views.login, name='user-login'),
     path('refresh/', TokenRefreshView.as_view(), name='token-refresh'),
     path('me/', views.profile, name='user-profile'),
+    path('me/settings/', views.user_setting, name='user-setting'),
 ]
@@ -2,13 +2,19 @@ from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from django.conf import settings
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
-from drf_spectacular.utils import extend_schema, OpenApiResponse
+from drf_spectacular.utils import OpenApiResponse
+from config.schema import extend_schema
+from completions.services import LeaderboardService
+from tasks.services import TaskService
+from .models import UserSetting
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
     UserSerializer,
+    UserSettingSerializer,
     TokenSerializer
 )
 
@@ -71,6 +77,9 @@ def login(request):
         user = authenticate(username=username, password=password)
 
         if user is not None:
+            if settings.AUTO_ARCHIVE_ON_LOGIN:
+                # 사용자 인덱스 범위만 읽으므로 로그인 응답을 크게 늦추지 않는다
+                TaskService.archive_expired(user=user)
             tokens = get_tokens_for_user(user)
             return Response({
                 'message': '로그인 성공',
@@ -99,3 +108,30 @@ def profile(request):
     """내 정보 조회"""
     serializer = UserSerializer(request.user)
     return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+@extend_schema(
+    tags=['Users'],
+    request=UserSettingSerializer,
+    responses={
+        200: UserSettingSerializer,
+        400: OpenApiResponse(description='Validation Error')
+    },
+    description='내 설정 조회/수정 (자동 보관 여부, 보관 유예 일수, 연속 달성 순위표 참여)'
+)
+@api_view(['GET', 'PATCH'])
+@permission_classes([IsAuthenticated])
+def user_setting(request):
+    """내 설정 조회/수정"""
+    setting, _ = UserSetting.objects.get_or_create(user=request.user)
+
+    if request.method == 'PATCH':
+        opted_in = setting.leaderboard_opt_in
+        serializer = UserSettingSerializer(setting, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        if setting.leaderboard_opt_in != opted_in:
+            LeaderboardService.set_opt_in(request.user, setting.leaderboard_opt_in)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    return Response(UserSettingSerializer(setting).data, status=status.HTTP_200_OK)
@@ -0,0 +1,22 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import OutboxEvent, Webhook
+
+
+@admin.register(Webhook)
+class WebhookAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'url', 'events', 'is_active', 'created_at']
+    list_filter = ['is_active']
+    raw_id_fields = ['user']
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'event_type', 'status', 'attempts', 'next_attempt_at', 'last_error']
+    list_filter = ['status', 'event_type']
+    raw_id_fields = ['user']
+    actions = ['retry_now']
+
+    @admin.action(description='선택한 이벤트 바로 다시 전송')
+    def retry_now(self, request, queryset):
+        queryset.update(status='pending', attempts=0, next_attempt_at=timezone.now())
@@ -0,0 +1,226 @@
+import asyncio
+import ipaddress
+import socket
+import ssl
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+
+class HTTPError(Exception):
+    """연결/응답 오류 (상태 코드를 받지 못함)"""
+
+
+class BlockedAddressError(HTTPError):
+    """루프백/사설/링크 로컬/예약 주소로 보내려 함 (SSRF 방지)"""
+
+
+def is_public_address(address):
+    """인터넷에서 쓰는 주소인지 (루프백, 사설, 링크 로컬, 예약, 멀티캐스트 등은 False)"""
+    ip = ipaddress.ip_address(address.split('%', 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_public(host, infos):
+    """getaddrinfo 결과의 주소가 모두 공개 주소가 아니면 BlockedAddressError"""
+    for info in infos:
+        address = info[4][0]
+        if not is_public_address(address):
+            raise BlockedAddressError(f'{host} 은(는) 허용하지 않는 주소({address})입니다.')
+    return infos
+
+
+def resolve_public(host, port):
+    """host 를 조회해 모든 주소가 공개 주소인지 확인 (등록 시 검사용, 조회 실패는 OSError)"""
+    return check_public(host, socket.getaddrinfo(host, port, type=socket.SOCK_STREAM))
+
+
+class _Connection:
+    __slots__ = ('reader', 'writer', 'reused')
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.reused = False
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncHTTPClient:
+    """연결을 재사용하는 최소한의 비동기 HTTP/1.1 클라이언트 (웹훅 POST 용)
+
+    (scheme, host, port) 마다 keep-alive 연결을 max_per_host 개까지 열어 두고 재사용한다.
+    응답은 Content-Length 또는 chunked 본문까지 읽어 연결을 돌려놓고, 상태 코드와 본문을 반환한다.
+    재사용한 연결이 그 사이 서버에서 닫혔으면 새 연결로 한 번 다시 보낸다.
+    연결할 때마다 호스트를 조회해 공개 주소인지 확인하고 확인한 주소로 바로 연결한다
+    (등록 뒤 DNS 를 바꿔 내부 주소를 가리키게 해도 막힘). allow_private=True 면 검사하지 않는다.
+    한 이벤트 루프에서만 쓴다.
+    """
+
+    def __init__(self, max_per_host=10, timeout=5.0, ssl_context=None, allow_private=False):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self.allow_private = allow_private
+        self._idle = defaultdict(list)
+        self._slots = {}
+
+    async def post(self, url, body, headers=None):
+        """(상태 코드, 응답 본문). 연결/시간 초과/응답 형식 오류는 HTTPError"""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise HTTPError(f'지원하지 않는 URL: {url}')
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        host = parts.netloc.rpartition('@')[2]
+
+        lines = [f'POST {path} HTTP/1.1', f'Host: {host}', f'Content-Length: {len(body)}', 'Connection: keep-alive']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+        request = ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._slots[key] = asyncio.Semaphore(self.max_per_host)
+        async with slots:
+            try:
+                return await asyncio.wait_for(self._send(key, request), self.timeout)
+            except asyncio.TimeoutError:
+                raise HTTPError(f'{self.timeout}초 안에 응답이 없습니다.')
+
+    async def _send(self, key, request):
+        try:
+            connection = await self._acquire(key)
+        except OSError as exc:
+            raise HTTPError(str(exc) or type(exc).__name__) from exc
+        try:
+            try:
+                status, body, keep_alive = await self._exchange(connection, request)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not connection.reused:
+                    raise
+                # 유휴 연결이 서버에서 닫혀 있었다: 새 연결로 다시 보낸다
+                connection.close()
+                connection = await self._connect(key)
+                status, body, keep_alive = await self._exchange(connection, request)
+        except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+            connection.close()
+            raise HTTPError(str(exc) or type(exc).__name__) from exc
+        except BaseException:
+            connection.close()
+            raise
+
+        if keep_alive:
+            connection.reused = True
+            self._idle[key].append(connection)
+        else:
+            connection.close()
+        return status, body
+
+    async def _acquire(self, key):
+        idle = self._idle[key]
+        while idle:
+            connection = idle.pop()
+            if not connection.reader.at_eof():
+                return connection
+            connection.close()
+        return await self._connect(key)
+
+    async def _connect(self, key):
+        scheme, host, port = key
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        if not self.allow_private:
+            check_public(host, infos)
+        family, _, _, _, address = infos[0]
+        context = server_hostname = None
+        if scheme == 'https':
+            context = self.ssl_context or ssl.create_default_context()
+            server_hostname = host
+        reader, writer = await asyncio.open_connection(
+            address[0], address[1], family=family, ssl=context, server_hostname=server_hostname
+        )
+        return _Connection(reader, writer)
+
+    @staticmethod
+    async def _exchange(connection, request):
+        """요청을 쓰고 응답을 끝까지 읽는다. (상태 코드, 본문, 연결 재사용 가능 여부)"""
+        connection.writer.write(request)
+        await connection.writer.drain()
+        reader = connection.reader
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError('응답 없이 연결이 닫혔습니다.')
+        version, status, _ = (status_line.decode('latin-1').rstrip('\r\n') + ' ').split(' ', 2)
+        if not version.startswith('HTTP/'):
+            raise ValueError(f'올바르지 않은 응답: {status_line[:50]!r}')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+            keep_alive = False
+        return int(status), body, keep_alive
+
+    async def close(self):
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+
+class WebhookDispatcher:
+    """웹훅 요청을 동시에 보내는 전송기 (전송 워커 하나가 하나를 계속 쓴다)
+
+    이벤트 루프와 AsyncHTTPClient 를 유지해 배치가 바뀌어도 keep-alive 연결을 재사용한다.
+    동시에 보내는 요청은 concurrency 개까지이고, 요청마다 timeout 초를 넘기면 실패로 본다.
+    """
+
+    def __init__(self, concurrency=50, timeout=5.0, allow_private=False):
+        self.concurrency = concurrency
+        self.loop = asyncio.new_event_loop()
+        self.client = AsyncHTTPClient(max_per_host=concurrency, timeout=timeout, allow_private=allow_private)
+
+    def send(self, requests):
+        """[(url, 본문 bytes, 헤더 dict)] -> 요청마다 오류 메시지 (성공(2xx)이면 None)"""
+        if not requests:
+            return []
+        return self.loop.run_until_complete(self._send_all(requests))
+
+    async def _send_all(self, requests):
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def send(url, body, headers):
+            async with slots:
+                try:
+                    status, _ = await self.client.post(url, body, headers)
+                except HTTPError as exc:
+                    return str(exc)
+                return None if 200 <= status < 300 else f'HTTP {status}'
+
+        return await asyncio.gather(*(send(*request) for request in requests))
+
+    def close(self):
+        self.loop.run_until_complete(self.client.close())
+        self.loop.close()
@@ -0,0 +1,99 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from completions.services import CompletionService
+from tasks.models import Task
+from webhooks.client import WebhookDispatcher
+from webhooks.models import Webhook
+from webhooks.services import WebhookService
+from webhooks.stub import StubWebhookServer
+
+
+class Command(BaseCommand):
+    """웹훅 전송 처리량과 요청 경로 오버헤드 측정
+
+    - 전송: 로컬 스텁 서버(응답 지연 --latency-ms)에 웹훅 --webhooks 개를 등록하고 이벤트 --events 개를
+      (1) 이벤트마다 요청 하나를 차례로 보내는 방식(요청 처리 중에 바로 호출하는 것과 같음)과
+      (2) 웹훅마다 묶어 동시에 보내는 방식으로 전송해 비교한다
+    - 요청 경로: 완료 처리를 웹훅 없이/구독한 웹훅이 있을 때 각각 --completions 번 실행해 비교한다
+    측정용 데이터는 트랜잭션 안에서 만든 뒤 롤백한다.
+    """
+    help = '웹훅 전송 처리량과 완료 처리 오버헤드 측정'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=300, help='전송할 이벤트 수')
+        parser.add_argument('--webhooks', type=int, default=4, help='웹훅 수')
+        parser.add_argument('--latency-ms', type=float, default=10.0, help='스텁 서버 응답 지연(ms)')
+        parser.add_argument('--concurrency', type=int, default=50, help='묶어서 보낼 때 동시 요청 수')
+        parser.add_argument('--completions', type=int, default=300, help='요청 경로 측정 시 완료 처리 수')
+
+    def handle(self, *args, **options):
+        with StubWebhookServer(latency=options['latency_ms'] / 1000) as server, transaction.atomic():
+            user = User.objects.create(username='__bench_webhooks__')
+            Webhook.objects.bulk_create([
+                Webhook(user=user, url=server.url(f'/hook/{i}')) for i in range(options['webhooks'])
+            ])
+
+            delivery = {
+                'per-event': self._deliver(user, server, options['events'], concurrency=1, per_request=1),
+                'batched': self._deliver(
+                    user, server, options['events'], concurrency=options['concurrency'], per_request=100
+                ),
+            }
+
+            Webhook.objects.filter(user=user).delete()
+            overhead = {'no webhook': self._complete(user, options['completions'])}
+            Webhook.objects.create(user=user, url=server.url('/hook'), events='completion.created')
+            overhead['subscribed'] = self._complete(user, options['completions'])
+
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            f'전송: 이벤트 {options["events"]}개 x 웹훅 {options["webhooks"]}개, 응답 지연 {options["latency_ms"]:g}ms'
+        )
+        self.stdout.write(f'  {"mode":<12}{"seconds":>10}{"deliveries/s":>14}{"requests/s":>12}{"connections":>13}')
+        for label, (seconds, requests, connections) in delivery.items():
+            deliveries = options['events'] * options['webhooks']
+            self.stdout.write(
+                f'  {label:<12}{seconds:>10.2f}{deliveries / seconds:>14.0f}{requests / seconds:>12.0f}{connections:>13}'
+            )
+
+        self.stdout.write(f'요청 경로: 완료 처리 x {options["completions"]}')
+        self.stdout.write(f'  {"mode":<12}{"us/request":>12}{"queries/request":>18}')
+        for label, (per_request, queries) in overhead.items():
+            self.stdout.write(f'  {label:<12}{per_request * 1_000_000:>12.1f}{queries:>18.2f}')
+        base, subscribed = overhead['no webhook'][0], overhead['subscribed'][0]
+        self.stdout.write(f'  추가 비용: {(subscribed - base) * 1_000_000:.1f} us/request')
+
+    def _deliver(self, user, server, count, concurrency, per_request):
+        """(걸린 시간, 요청 수, 새로 연 연결 수)"""
+        WebhookService.record_many([
+            (user.id, 'task.created', {'id': i, 'title': f'bench {i}'}) for i in range(count)
+        ])
+        requests, connections = len(server.requests), server.connections
+        dispatcher = WebhookDispatcher(concurrency=concurrency, timeout=30, allow_private=True)  # 로컬 스텁 서버
+        try:
+            with override_settings(WEBHOOK_MAX_EVENTS_PER_REQUEST=per_request):
+                started = time.perf_counter()
+                WebhookService.deliver_due_all(dispatcher)
+                elapsed = time.perf_counter() - started
+        finally:
+            dispatcher.close()
+        return elapsed, len(server.requests) - requests, server.connections - connections
+
+    def _complete(self, user, count):
+        """(완료 처리 1회 시간, 쿼리 수)"""
+        task = Task.objects.create(user=user, title='bench', task_type='daily')
+        today = date.today()
+        CompletionService.mark_complete(task, today - timedelta(days=count))  # 워밍업
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            for day in range(count):
+                CompletionService.mark_complete(task, today - timedelta(days=day))
+            elapsed = time.perf_counter() - started
+        return elapsed / count, len(captured.captured_queries) / count
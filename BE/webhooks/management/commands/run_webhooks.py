@@ -0,0 +1,48 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from webhooks.services import WebhookService, get_dispatcher
+
+
+class Command(BaseCommand):
+    """웹훅 전송 워커
+
+    outbox 에서 전송할 때가 된 이벤트를 배치로 가져와 웹훅마다 묶어 동시에 보낸다.
+    가장 빠른 다음 전송 시각까지 잠들되, 새로 기록된 이벤트를 늦게 보내지 않도록
+    --poll-interval 보다 오래 잠들지는 않는다. 연결은 워커가 끝날 때까지 재사용한다.
+    """
+    help = '웹훅 전송 워커 실행'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='한 번에 가져올 이벤트 수 (기본 WEBHOOK_BATCH_SIZE)')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='최대 대기 시간(초)')
+        parser.add_argument('--once', action='store_true', help='현재 시각 기준으로 한 번만 처리하고 종료')
+
+    def handle(self, *args, **options):
+        dispatcher = get_dispatcher()
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        try:
+            while not self._stopping:
+                delivered = WebhookService.deliver_due_all(dispatcher, batch_size=options['batch_size'])
+                if delivered:
+                    self.stdout.write(f'[{timezone.localtime():%Y-%m-%d %H:%M:%S}] {delivered}건 처리')
+                if options['once']:
+                    break
+                time.sleep(self._sleep_seconds(options['poll_interval']))
+        finally:
+            dispatcher.close()
+
+    def _sleep_seconds(self, poll_interval):
+        next_attempt_at = WebhookService.next_attempt_time()
+        if next_attempt_at is None:
+            return poll_interval
+        return min(max((next_attempt_at - timezone.now()).total_seconds(), 0.05), poll_interval)
+
+    def _stop(self, signum, frame):
+        self._stopping = True
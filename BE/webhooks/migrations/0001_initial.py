@@ -0,0 +1,58 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:00
+
+import django.core.serializers.json
+import django.db.models.deletion
+import webhooks.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('task.created', '할 일 생성'), ('task.archived', '할 일 보관'), ('completion.created', '완료 처리')], max_length=40, verbose_name='이벤트')),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='내용')),
+                ('pending_webhooks', models.JSONField(default=list, verbose_name='전송할 웹훅 id')),
+                ('status', models.CharField(choices=[('pending', '전송 대기'), ('failed', '전송 실패')], default='pending', max_length=10, verbose_name='상태')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='전송 시도 수')),
+                ('next_attempt_at', models.DateTimeField(verbose_name='다음 전송 일시')),
+                ('last_error', models.CharField(blank=True, max_length=500, verbose_name='마지막 오류')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일시')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_events', to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+            ],
+            options={
+                'verbose_name': '전송할 이벤트',
+                'verbose_name_plural': '전송할 이벤트 목록',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['next_attempt_at'], name='outbox_due_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Webhook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, verbose_name='URL')),
+                ('events', models.CharField(blank=True, help_text='쉼표로 구분 (예: task.created,completion.created), 비우면 모든 이벤트', max_length=200, verbose_name='이벤트')),
+                ('secret', models.CharField(default=webhooks.models.generate_secret, editable=False, max_length=64, verbose_name='서명 키')),
+                ('is_active', models.BooleanField(default=True, verbose_name='활성')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일시')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='webhooks', to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+            ],
+            options={
+                'verbose_name': '웹훅',
+                'verbose_name_plural': '웹훅 목록',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['user', 'is_active'], name='webhook_user_active_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,93 @@
+import secrets
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from config.sharding import ShardedQuerySet
+
+# 구독할 수 있는 이벤트
+EVENT_CHOICES = [
+    ('task.created', '할 일 생성'),
+    ('task.archived', '할 일 보관'),
+    ('completion.created', '완료 처리'),
+]
+EVENT_TYPES = tuple(value for value, _ in EVENT_CHOICES)
+
+
+def generate_secret():
+    return secrets.token_hex(32)
+
+
+class Webhook(models.Model):
+    """웹훅 구독
+
+    사용자의 할 일/완료 이벤트를 url 로 POST 한다. 본문은 secret 으로 서명(HMAC-SHA256)해서
+    X-Webhook-Signature 헤더로 보낸다. events 가 비어 있으면 모든 이벤트를 받는다.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='webhooks', verbose_name='사용자')
+    url = models.URLField(max_length=500, verbose_name='URL')
+    events = models.CharField(max_length=200, blank=True, verbose_name='이벤트',
+                              help_text='쉼표로 구분 (예: task.created,completion.created), 비우면 모든 이벤트')
+    secret = models.CharField(max_length=64, default=generate_secret, editable=False, verbose_name='서명 키')
+    is_active = models.BooleanField(default=True, verbose_name='활성')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = '웹훅'
+        verbose_name_plural = '웹훅 목록'
+        ordering = ['id']
+        indexes = [
+            # 이벤트 기록: user_id=? AND is_active=True
+            models.Index(fields=['user', 'is_active'], name='webhook_user_active_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.url}'
+
+    def event_list(self):
+        return [event.strip() for event in self.events.split(',') if event.strip()]
+
+    def subscribes(self, event_type):
+        return not self.events or event_type in self.event_list()
+
+
+class OutboxEvent(models.Model):
+    """전송할 이벤트 (transactional outbox)
+
+    변경과 같은 트랜잭션에서 기록하므로 변경이 롤백되면 이벤트도 남지 않고, 커밋되면 반드시 남는다.
+    기록할 때 구독한 웹훅 id 를 pending_webhooks 에 넣고, 전송 워커가 성공한 웹훅을 지운다.
+    모두 성공하면 행을 삭제하고, WEBHOOK_MAX_ATTEMPTS 번 실패하면 status 를 failed 로 남긴다.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', '전송 대기'),
+        ('failed', '전송 실패'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='outbox_events', verbose_name='사용자')
+    event_type = models.CharField(max_length=40, choices=EVENT_CHOICES, verbose_name='이벤트')
+    payload = models.JSONField(encoder=DjangoJSONEncoder, verbose_name='내용')
+    pending_webhooks = models.JSONField(default=list, verbose_name='전송할 웹훅 id')
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name='상태')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='전송 시도 수')
+    next_attempt_at = models.DateTimeField(verbose_name='다음 전송 일시')
+    last_error = models.CharField(max_length=500, blank=True, verbose_name='마지막 오류')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일시')
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = '전송할 이벤트'
+        verbose_name_plural = '전송할 이벤트 목록'
+        ordering = ['id']
+        indexes = [
+            # 전송 워커: status='pending' AND next_attempt_at <= now ORDER BY next_attempt_at
+            models.Index(fields=['next_attempt_at'], name='outbox_due_idx', condition=models.Q(status='pending')),
+        ]
+
+    def __str__(self):
+        return f'{self.event_type} #{self.id}'
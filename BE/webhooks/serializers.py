@@ -0,0 +1,43 @@
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from rest_framework import serializers
+from .client import BlockedAddressError, resolve_public
+from .models import EVENT_TYPES, Webhook
+
+
+class WebhookSerializer(serializers.ModelSerializer):
+    """웹훅 Serializer (secret 은 서명 검증용으로 조회만 가능)"""
+    events = serializers.ListField(
+        child=serializers.ChoiceField(choices=EVENT_TYPES), required=False,
+        help_text='받을 이벤트 목록 (비우면 모든 이벤트)'
+    )
+
+    class Meta:
+        model = Webhook
+        fields = ['id', 'url', 'events', 'secret', 'is_active', 'created_at']
+        read_only_fields = ['secret', 'created_at']
+
+    def validate_url(self, value):
+        """공개 주소를 가리키는 http/https URL 만 허용 (전송할 때도 다시 확인)"""
+        parts = urlsplit(value)
+        if parts.scheme not in ('http', 'https'):
+            raise serializers.ValidationError('http 또는 https URL 만 등록할 수 있습니다.')
+        if settings.WEBHOOK_ALLOW_PRIVATE_URLS:
+            return value
+        try:
+            resolve_public(parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        except BlockedAddressError as exc:
+            raise serializers.ValidationError(str(exc))
+        except (OSError, ValueError):
+            raise serializers.ValidationError('호스트를 찾을 수 없습니다.')
+        return value
+
+    def validate_events(self, value):
+        """중복을 없애고 쉼표로 구분한 문자열로 저장"""
+        return ','.join(dict.fromkeys(value))
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['events'] = instance.event_list()
+        return data
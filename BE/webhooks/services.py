@@ -0,0 +1,232 @@
+import hashlib
+import hmac
+import json
+import random
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router
+from django.utils import timezone
+
+from config.contention import immediate_atomic
+from config.sharding import all_databases, use_shard
+from .client import WebhookDispatcher
+from .models import OutboxEvent, Webhook
+
+# 전송 중인 이벤트를 다른 워커가 가져가지 않도록 미뤄 두는 시간 (워커가 죽으면 이 시간 뒤 다시 전송)
+LEASE = timedelta(minutes=5)
+
+
+def task_payload(task):
+    return {
+        'id': task.id,
+        'title': task.title,
+        'task_type': task.task_type,
+        'status': task.status,
+        'due_date': task.due_date,
+        'start_date': task.start_date,
+        'end_date': task.end_date,
+        'archived_at': task.archived_at,
+    }
+
+
+def completion_payload(completion):
+    # 쓰기 지연(write-behind) 경로의 기록에는 id 가 없을 수 있어 (task_id, completed_date) 로 식별한다
+    return {
+        'task_id': completion.task_id,
+        'completed_date': completion.completed_date,
+        'note': completion.note,
+    }
+
+
+def sign(secret, body):
+    """X-Webhook-Signature 헤더 값 (본문의 HMAC-SHA256)"""
+    return 'sha256=' + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def get_dispatcher():
+    return WebhookDispatcher(
+        concurrency=settings.WEBHOOK_CONCURRENCY,
+        timeout=settings.WEBHOOK_TIMEOUT_SECONDS,
+        allow_private=settings.WEBHOOK_ALLOW_PRIVATE_URLS,
+    )
+
+
+class WebhookService:
+    """웹훅 이벤트 기록과 전송"""
+
+    @staticmethod
+    def record(user_id, event_type, payload, using=None):
+        """이벤트 하나를 outbox 에 기록 (record_many 참고)"""
+        return WebhookService.record_many([(user_id, event_type, payload)], using)
+
+    @staticmethod
+    def record_many(events, using=None):
+        """[(user_id, 이벤트, 내용)] 을 구독한 웹훅이 있는 것만 outbox 에 기록하고 기록한 수를 반환
+
+        변경을 저장한 트랜잭션 안에서 호출하므로 변경과 이벤트가 함께 커밋/롤백된다.
+        요청 경로에서는 사용자의 활성 웹훅을 인덱스(user, is_active)로 한 번 조회하는 비용만 든다.
+        """
+        if not events:
+            return 0
+        using = using or router.db_for_write(OutboxEvent)
+        webhooks = defaultdict(list)
+        for webhook in Webhook.objects.using(using).filter(
+            user_id__in={user_id for user_id, _, _ in events}, is_active=True
+        ).only('id', 'user_id', 'events'):
+            webhooks[webhook.user_id].append(webhook)
+        if not webhooks:
+            return 0
+
+        now = timezone.now()
+        outbox = []
+        for user_id, event_type, payload in events:
+            pending = [webhook.id for webhook in webhooks[user_id] if webhook.subscribes(event_type)]
+            if pending:
+                outbox.append(OutboxEvent(
+                    user_id=user_id, event_type=event_type, payload=payload,
+                    pending_webhooks=pending, next_attempt_at=now,
+                ))
+        OutboxEvent.objects.using(using).bulk_create(outbox)
+        return len(outbox)
+
+    @staticmethod
+    def retry_delay(attempts):
+        """attempts 번째 실패 뒤 대기 시간 (지터를 준 지수 백오프)"""
+        ceiling = min(settings.WEBHOOK_RETRY_MAX_SECONDS, settings.WEBHOOK_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+        return timedelta(seconds=random.uniform(0, ceiling))
+
+    @staticmethod
+    def build_requests(events, webhooks):
+        """웹훅마다 이벤트를 묶은 요청 목록과 보낼 곳이 없는 (이벤트 id, 웹훅 id) 목록
+
+        요청: (웹훅 id, [이벤트 id], (url, 본문, 헤더)). 한 요청에 WEBHOOK_MAX_EVENTS_PER_REQUEST 개까지 묶는다.
+        """
+        grouped = defaultdict(list)
+        dropped = []
+        for event in events:
+            for webhook_id in event.pending_webhooks:
+                webhook = webhooks.get(webhook_id)
+                if webhook is None or not webhook.is_active:
+                    dropped.append((event.id, webhook_id))
+                else:
+                    grouped[webhook_id].append(event)
+
+        size = settings.WEBHOOK_MAX_EVENTS_PER_REQUEST
+        requests = []
+        for webhook_id, webhook_events in grouped.items():
+            webhook = webhooks[webhook_id]
+            for start in range(0, len(webhook_events), size):
+                chunk = webhook_events[start:start + size]
+                body = json.dumps({'events': [{
+                    'id': event.id,
+                    'type': event.event_type,
+                    'created_at': event.created_at,
+                    'data': event.payload,
+                } for event in chunk]}, cls=DjangoJSONEncoder, ensure_ascii=False).encode()
+                headers = {
+                    'Content-Type': 'application/json',
+                    'X-Webhook-Signature': sign(webhook.secret, body),
+                }
+                requests.append((webhook_id, [event.id for event in chunk], (webhook.url, body, headers)))
+        return requests, dropped
+
+    @staticmethod
+    def deliver_due(dispatcher, now=None, batch_size=None):
+        """전송할 때가 된 이벤트를 한 배치 전송하고 처리한 이벤트 수를 반환
+
+        - 짧은 트랜잭션에서 이벤트를 가져오며 next_attempt_at 을 LEASE 만큼 미뤄 다른 워커와 겹치지 않게 한다
+          (PostgreSQL 에서는 SKIP LOCKED 로 나눠 가져간다)
+        - 웹훅마다 이벤트를 묶어 요청 하나로 보내고, 요청들은 트랜잭션 밖에서 동시에 보낸다
+        - 성공(2xx)한 웹훅은 이벤트의 pending_webhooks 에서 빼고 남은 웹훅이 없으면 행을 삭제한다
+        - 실패하면 지수 백오프 뒤에 남은 웹훅에만 다시 보내고, WEBHOOK_MAX_ATTEMPTS 번 실패하면 failed 로 남긴다
+        - 샤딩을 쓰면 use_shard() 로 활성화된 DB 에서 처리한다 (deliver_due_all 참고)
+        """
+        if now is None:
+            now = timezone.now()
+        if batch_size is None:
+            batch_size = settings.WEBHOOK_BATCH_SIZE
+        db = router.db_for_write(OutboxEvent)
+
+        with immediate_atomic(using=db):
+            events = list(
+                OutboxEvent.objects.using(db).select_for_update(skip_locked=True)
+                .filter(status='pending', next_attempt_at__lte=now)
+                .order_by('next_attempt_at')[:batch_size]
+            )
+            if not events:
+                return 0
+            OutboxEvent.objects.using(db).filter(id__in=[event.id for event in events]).update(
+                next_attempt_at=now + LEASE
+            )
+
+        webhook_ids = {webhook_id for event in events for webhook_id in event.pending_webhooks}
+        webhooks = Webhook.objects.using(db).in_bulk(webhook_ids)
+        requests, dropped = WebhookService.build_requests(events, webhooks)
+        errors = dispatcher.send([request for _, _, request in requests])
+
+        done = defaultdict(set)  # 이벤트 id -> 더 보내지 않을 웹훅 id
+        failures = {}  # 이벤트 id -> 마지막 오류
+        for event_id, webhook_id in dropped:
+            done[event_id].add(webhook_id)
+        for (webhook_id, event_ids, _), error in zip(requests, errors):
+            for event_id in event_ids:
+                if error is None:
+                    done[event_id].add(webhook_id)
+                else:
+                    failures[event_id] = f'{webhooks[webhook_id].url}: {error}'[:500]
+
+        sent_at = timezone.now()
+        finished, retry = [], []
+        for event in events:
+            event.pending_webhooks = [w for w in event.pending_webhooks if w not in done[event.id]]
+            if not event.pending_webhooks:
+                finished.append(event.id)
+                continue
+            event.attempts += 1
+            event.last_error = failures.get(event.id, '')
+            if event.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                event.status = 'failed'
+            else:
+                event.next_attempt_at = sent_at + WebhookService.retry_delay(event.attempts)
+            retry.append(event)
+
+        with immediate_atomic(using=db):
+            if finished:
+                OutboxEvent.objects.using(db).filter(id__in=finished).delete()
+            OutboxEvent.objects.using(db).bulk_update(
+                retry, ['pending_webhooks', 'status', 'attempts', 'next_attempt_at', 'last_error']
+            )
+        return len(events)
+
+    @staticmethod
+    def deliver_due_all(dispatcher, now=None, batch_size=None):
+        """모든 DB 에서 전송할 때가 된 이벤트가 남지 않을 때까지 전송하고 처리한 이벤트 수를 반환"""
+        if now is None:
+            now = timezone.now()
+        if batch_size is None:
+            batch_size = settings.WEBHOOK_BATCH_SIZE
+        total = 0
+        for alias in all_databases():
+            with use_shard(alias):
+                while True:
+                    delivered = WebhookService.deliver_due(dispatcher, now=now, batch_size=batch_size)
+                    total += delivered
+                    if delivered < batch_size:
+                        break
+        return total
+
+    @staticmethod
+    def next_attempt_time():
+        """가장 빠른 다음 전송 일시 (DB 마다 outbox_due_idx 한 번 조회)"""
+        times = [
+            OutboxEvent.objects.using(alias).filter(status='pending')
+            .order_by('next_attempt_at')
+            .values_list('next_attempt_at', flat=True)
+            .first()
+            for alias in all_databases()
+        ]
+        return min((t for t in times if t is not None), default=None)
+
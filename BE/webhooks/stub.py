@@ -0,0 +1,76 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # 기본값(5)이면 동시에 여는 연결이 많을 때 SYN 이 버려져 1초 뒤 재전송된다
+    request_queue_size = 128
+
+
+class StubWebhookServer:
+    """웹훅을 받아 기록만 하는 로컬 HTTP 서버 (테스트/벤치마크용)
+
+    127.0.0.1 의 빈 포트에서 스레드로 실행하고 keep-alive(HTTP/1.1)를 지원한다.
+    status 로 응답 코드를, latency 로 응답 전 지연(초)을 바꿀 수 있다.
+    받은 요청은 requests 에 (경로, 헤더 dict, 본문 bytes) 로 쌓인다.
+    """
+
+    def __init__(self, status=200, latency=0.0):
+        self.status = status
+        self.latency = latency
+        self.requests = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # 헤더와 본문을 따로 쓰므로 Nagle 알고리즘을 끄지 않으면 응답마다 지연 ACK 만큼 늦어진다
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with stub._lock:
+                    stub.requests.append((self.path, dict(self.headers), body))
+                if stub.latency:
+                    time.sleep(stub.latency)
+                self.send_response(stub.status)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'ok')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def url(self, path='/'):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}{path}'
+
+    def events(self):
+        """받은 모든 이벤트 (요청 본문의 events 를 이어 붙임)"""
+        with self._lock:
+            bodies = [body for _, _, body in self.requests]
+        return [event for body in bodies for event in json.loads(body)['events']]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,236 @@
+import hashlib
+import hmac
+import ipaddress
+import json
+import socket
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from completions.services import CompletionService
+from tasks.models import Task
+from tasks.services import TaskService
+from .client import WebhookDispatcher, is_public_address
+from .models import OutboxEvent, Webhook
+from .services import WebhookService
+from .stub import StubWebhookServer
+
+
+def resolves_to(address):
+    """socket.getaddrinfo 대신 항상 address 를 돌려주는 함수 (테스트 환경에는 DNS 가 없음)"""
+    def getaddrinfo(host, port, *args, **kwargs):
+        try:
+            ipaddress.ip_address(host)  # IP 를 그대로 쓴 URL 은 그 주소
+        except ValueError:
+            resolved = address
+        else:
+            resolved = host
+        family = socket.AF_INET6 if ':' in resolved else socket.AF_INET
+        return [(family, socket.SOCK_STREAM, 6, '', (resolved, int(port)))]
+    return getaddrinfo
+
+
+@override_settings(DATABASE_SHARDS=[])
+class OutboxRecordTests(TestCase):
+    """변경과 같은 트랜잭션에서 outbox 에 이벤트 기록"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        cls.webhook = Webhook.objects.create(user=cls.user, url='http://127.0.0.1:9/hook')
+
+    def test_task_create_records_event(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post('/api/tasks/', {'title': '운동', 'task_type': 'daily'}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event_type, 'task.created')
+        self.assertEqual(event.payload['title'], '운동')
+        self.assertEqual(event.pending_webhooks, [self.webhook.id])
+
+    def test_rolled_back_change_leaves_no_event(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            TaskService.create_task(self.user, title='운동', task_type='daily')
+            raise RuntimeError
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_only_subscribed_active_webhooks_get_events(self):
+        Webhook.objects.filter(pk=self.webhook.pk).update(events='task.archived')
+        inactive = Webhook.objects.create(user=self.user, url='http://127.0.0.1:9/off', is_active=False)
+        other = User.objects.create_user('other')
+        Webhook.objects.create(user=other, url='http://127.0.0.1:9/other')
+
+        task = TaskService.create_task(self.user, title='보고서', task_type='once', due_date=date.today())
+        CompletionService.mark_complete(task)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+        TaskService.set_archived(task, archived=True)
+        TaskService.set_archived(task, archived=True)  # 이미 보관한 할 일을 다시 보관하면 이벤트 없음
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event_type, 'task.archived')
+        self.assertNotIn(inactive.id, event.pending_webhooks)
+
+    def test_completion_and_auto_archive_record_events(self):
+        task = Task.objects.create(user=self.user, title='보고서', task_type='once', due_date=date.today() - timedelta(days=30))
+        CompletionService.mark_complete(task, task.due_date)
+        TaskService.archive_expired()
+        TaskService.archive_expired()  # 이미 보관한 할 일은 다시 기록하지 않음
+
+        events = list(OutboxEvent.objects.values_list('event_type', 'payload'))
+        self.assertEqual([event_type for event_type, _ in events], ['completion.created', 'task.archived'])
+        self.assertEqual(events[0][1]['completed_date'], task.due_date.isoformat())
+        self.assertEqual(events[1][1]['id'], task.id)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class DeliveryTests(TestCase):
+    """로컬 스텁 서버로 전송/재시도 확인"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+
+    def setUp(self):
+        # 스텁 서버가 127.0.0.1 이므로 사설 주소를 허용
+        self.dispatcher = WebhookDispatcher(concurrency=4, timeout=5, allow_private=True)
+        self.addCleanup(self.dispatcher.close)
+
+    def record(self, count):
+        WebhookService.record_many([(self.user.id, 'task.created', {'id': i}) for i in range(count)])
+
+    def test_events_are_batched_per_webhook_and_signed(self):
+        with StubWebhookServer() as server:
+            webhook = Webhook.objects.create(user=self.user, url=server.url('/hook'))
+            self.record(3)
+            self.assertEqual(WebhookService.deliver_due(self.dispatcher), 3)
+
+        self.assertEqual(len(server.requests), 1)
+        path, headers, body = server.requests[0]
+        self.assertEqual(path, '/hook')
+        expected = 'sha256=' + hmac.new(webhook.secret.encode(), body, hashlib.sha256).hexdigest()
+        self.assertEqual(headers['X-Webhook-Signature'], expected)
+        self.assertEqual([event['data']['id'] for event in json.loads(body)['events']], [0, 1, 2])
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    @override_settings(WEBHOOK_MAX_ATTEMPTS=2)
+    def test_failed_webhook_is_retried_with_backoff_then_marked_failed(self):
+        with StubWebhookServer() as ok, StubWebhookServer(status=500) as failing:
+            Webhook.objects.create(user=self.user, url=ok.url())
+            bad = Webhook.objects.create(user=self.user, url=failing.url())
+            self.record(1)
+
+            now = timezone.now()
+            WebhookService.deliver_due(self.dispatcher, now=now)
+            event = OutboxEvent.objects.get()
+            # 성공한 웹훅은 빼고 실패한 웹훅에만 다시 보낸다
+            self.assertEqual(event.pending_webhooks, [bad.id])
+            self.assertEqual(event.attempts, 1)
+            self.assertIn('HTTP 500', event.last_error)
+            self.assertGreater(event.next_attempt_at, now)
+            self.assertEqual(WebhookService.deliver_due(self.dispatcher, now=now), 0)
+
+            WebhookService.deliver_due(self.dispatcher, now=now + timedelta(hours=2))
+
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('failed', 2))
+        self.assertEqual((len(ok.requests), len(failing.requests)), (1, 2))
+
+    def test_unreachable_and_deleted_webhooks(self):
+        with StubWebhookServer() as server:
+            url = server.url()
+        Webhook.objects.create(user=self.user, url=url)  # 서버를 닫아 연결이 거부됨
+        deleted = Webhook.objects.create(user=self.user, url=url + 'deleted')
+        self.record(1)
+        deleted.delete()
+
+        WebhookService.deliver_due(self.dispatcher)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.attempts, 1)
+        self.assertNotIn(deleted.id, event.pending_webhooks)
+        self.assertTrue(event.last_error)
+
+    def test_private_address_is_blocked_at_delivery(self):
+        dispatcher = WebhookDispatcher(concurrency=4, timeout=5)
+        self.addCleanup(dispatcher.close)
+        with StubWebhookServer() as server:
+            # 등록할 때는 공개 주소였던 이름이 전송할 때 루프백을 가리킴 (DNS rebinding)
+            port = server.url().rsplit(':', 1)[1].rstrip('/')
+            Webhook.objects.create(user=self.user, url=f'http://hooks.example.com:{port}/')
+            self.record(1)
+            with mock.patch('socket.getaddrinfo', resolves_to('127.0.0.1')):
+                WebhookService.deliver_due(dispatcher)
+
+        self.assertEqual(server.requests, [])
+        self.assertIn('허용하지 않는 주소', OutboxEvent.objects.get().last_error)
+
+    def test_public_address_check(self):
+        for address in ('127.0.0.1', '10.1.2.3', '172.16.0.1', '192.168.0.1', '169.254.169.254',
+                        '100.64.0.1', '0.0.0.0', '224.0.0.1', '::1', 'fe80::1', 'fc00::1', '::ffff:127.0.0.1'):
+            self.assertFalse(is_public_address(address), address)
+        for address in ('93.184.216.34', '2606:2800:220:1::1'):
+            self.assertTrue(is_public_address(address), address)
+
+
+@override_settings(DATABASE_SHARDS=[])
+@mock.patch('socket.getaddrinfo', resolves_to('93.184.216.34'))
+class WebhookAPITests(TestCase):
+    """웹훅 등록 API"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('tester')
+        other = User.objects.create_user('other')
+        Webhook.objects.create(user=other, url='https://example.com/other')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_create_returns_secret_and_event_list(self):
+        response = self.client.post('/api/webhooks/', {
+            'url': 'https://example.com/hook', 'events': ['task.created', 'task.created', 'completion.created'],
+            'secret': 'ignored',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['events'], ['task.created', 'completion.created'])
+        self.assertEqual(len(response.data['secret']), 64)
+        self.assertEqual(Webhook.objects.get(pk=response.data['id']).secret, response.data['secret'])
+
+        response = self.client.get('/api/webhooks/')
+        self.assertEqual(response.data['count'], 1)
+
+    def test_invalid_event_or_scheme_is_rejected(self):
+        response = self.client.post('/api/webhooks/', {'url': 'ftp://example.com/hook'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('url', response.data)
+
+        response = self.client.post(
+            '/api/webhooks/', {'url': 'https://example.com/hook', 'events': ['task.deleted']}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('events', response.data)
+
+    def test_private_or_internal_url_is_rejected(self):
+        for url in ('http://127.0.0.1:8000/hook', 'http://169.254.169.254/latest/meta-data/',
+                    'http://10.0.0.5/hook', 'http://[::1]/hook'):
+            response = self.client.post('/api/webhooks/', {'url': url}, format='json')
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn('url', response.data)
+
+        with mock.patch('socket.getaddrinfo', resolves_to('192.168.0.10')):
+            response = self.client.post('/api/webhooks/', {'url': 'https://intranet.example.com/hook'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Webhook.objects.filter(user=self.user).exists())
+
+    @override_settings(WEBHOOK_ALLOW_PRIVATE_URLS=True)
+    def test_private_url_allowed_for_local_development(self):
+        response = self.client.post('/api/webhooks/', {'url': 'http://127.0.0.1:8000/hook'}, format='json')
+        self.assertEqual(response.status_code, 201)
@@ -0,0 +1,60 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from config.schema import extend_schema
+from config.sharding import ShardedViewMixin
+from .models import Webhook
+from .serializers import WebhookSerializer
+
+
+class WebhookViewSet(ShardedViewMixin, viewsets.ModelViewSet):
+    """웹훅 ViewSet"""
+    permission_classes = [IsAuthenticated]
+    serializer_class = WebhookSerializer
+
+    def get_queryset(self):
+        """사용자의 웹훅만 조회"""
+        if getattr(self, 'swagger_fake_view', False):
+            return Webhook.objects.none()
+        return Webhook.objects.using(self.shard).filter(user=self.request.user)
+
+    @extend_schema(tags=['Webhooks'], summary='웹훅 목록')
+    def list(self, request, *args, **kwargs):
+        """웹훅 목록"""
+        return super().list(request, *args, **kwargs)
+
+    @extend_schema(
+        tags=['Webhooks'],
+        summary='웹훅 등록',
+        description=(
+            '할 일 생성(task.created), 보관(task.archived), 완료 처리(completion.created) 이벤트를 받을 URL 을 등록합니다. '
+            '이벤트는 {"events": [...]} 로 묶어 POST 하며, 본문을 secret 으로 서명한 HMAC-SHA256 값을 '
+            'X-Webhook-Signature: sha256=<hex> 헤더로 보냅니다. 실패하면 지수 백오프로 다시 보냅니다.'
+        )
+    )
+    def create(self, request, *args, **kwargs):
+        """웹훅 등록"""
+        return super().create(request, *args, **kwargs)
+
+    @extend_schema(tags=['Webhooks'], summary='웹훅 상세')
+    def retrieve(self, request, *args, **kwargs):
+        """웹훅 상세"""
+        return super().retrieve(request, *args, **kwargs)
+
+    @extend_schema(tags=['Webhooks'], summary='웹훅 수정')
+    def update(self, request, *args, **kwargs):
+        """웹훅 수정"""
+        return super().update(request, *args, **kwargs)
+
+    @extend_schema(tags=['Webhooks'], summary='웹훅 부분 수정')
+    def partial_update(self, request, *args, **kwargs):
+        """웹훅 부분 수정"""
+        return super().partial_update(request, *args, **kwargs)
+
+    @extend_schema(tags=['Webhooks'], summary='웹훅 삭제')
+    def destroy(self, request, *args, **kwargs):
+        """웹훅 삭제 (아직 보내지 못한 이벤트는 이 웹훅으로 보내지 않음)"""
+        return super().destroy(request, *args, **kwargs)
+
+    def perform_create(self, serializer):
+        """웹훅 등록 시 현재 사용자 설정"""
+        serializer.save(user=self.request.user)